@@ -0,0 +1,97 @@
+"""School directory: stored email suggestions, keyset and search indexes.
+
+Revision ID: 0f1a2b3c4d5e
+Revises: 9e0f1a2b3c4d
+Create Date: 2026-10-19
+
+- ``school_contacts.suggested_correction``: the typo fix proposed by
+  routes/schools.validate_email, computed when the contact is written instead
+  of on every directory load. Backfilled here from the same domain map
+  (``EMAIL_TYPO_CORRECTIONS``).
+- Partial keyset indexes for the directory sort orders (name, city, newest,
+  bookings) over non-archived schools, ending in ``id`` so the key is unique.
+- pg_trgm indexes on the accent-folded search documents the directory search
+  matches against (``public.catalog_unaccent`` from 5a6b7c8d9e0f). The
+  expressions must stay identical to SCHOOL_SEARCH_DOCUMENT /
+  CONTACT_SEARCH_DOCUMENT in routes/schools.py.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0f1a2b3c4d5e'
+down_revision: Union[str, Sequence[str], None] = '9e0f1a2b3c4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EMAIL_TYPO_CORRECTIONS = {
+    'gmial.com': 'gmail.com',
+    'gmal.com': 'gmail.com',
+    'gmail.cz': 'gmail.com',
+    'gamil.com': 'gmail.com',
+    'gnail.com': 'gmail.com',
+    'hotmal.com': 'hotmail.com',
+    'hotmai.com': 'hotmail.com',
+    'hotmial.com': 'hotmail.com',
+    'sezanm.cz': 'seznam.cz',
+    'seznma.cz': 'seznam.cz',
+    'sezam.cz': 'seznam.cz',
+    'outlook.cz': 'outlook.com',
+}
+
+ACTIVE_SCHOOLS = "deleted_at IS NULL"
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE school_contacts ADD COLUMN IF NOT EXISTS suggested_correction TEXT")
+    typo_values = ", ".join(f"('{typo}', '{fix}')" for typo, fix in EMAIL_TYPO_CORRECTIONS.items())
+    op.execute(f"""
+        UPDATE school_contacts sc
+        SET suggested_correction = replace(lower(trim(sc.email)), t.typo, t.fix)
+        FROM (VALUES {typo_values}) AS t(typo, fix)
+        WHERE split_part(lower(trim(sc.email)), '@', 2) = t.typo
+          AND sc.suggested_correction IS NULL
+    """)
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_schools_dir_name "
+        f"ON schools (institution_id, name, id) WHERE {ACTIVE_SCHOOLS}"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_schools_dir_city "
+        f"ON schools (institution_id, (COALESCE(city, '')), name, id) WHERE {ACTIVE_SCHOOLS}"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_schools_dir_newest "
+        f"ON schools (institution_id, created_at DESC, id DESC) WHERE {ACTIVE_SCHOOLS}"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_schools_dir_bookings "
+        f"ON schools (institution_id, (COALESCE(booking_count, 0)) DESC, id DESC) WHERE {ACTIVE_SCHOOLS}"
+    )
+
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_schools_search_trgm ON schools USING gin (
+            public.catalog_unaccent(name || ' ' || COALESCE(city, '') || ' ' || COALESCE(email, ''))
+            gin_trgm_ops
+        )
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_school_contacts_search_trgm ON school_contacts USING gin (
+            public.catalog_unaccent(email || ' ' || COALESCE(name, '')) gin_trgm_ops
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_school_contacts_search_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_schools_search_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_schools_dir_bookings")
+    op.execute("DROP INDEX IF EXISTS idx_schools_dir_newest")
+    op.execute("DROP INDEX IF EXISTS idx_schools_dir_city")
+    op.execute("DROP INDEX IF EXISTS idx_schools_dir_name")
+    op.execute("ALTER TABLE school_contacts DROP COLUMN IF EXISTS suggested_correction")
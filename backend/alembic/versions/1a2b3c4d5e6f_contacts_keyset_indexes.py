@@ -0,0 +1,43 @@
+"""Keyset and facet indexes for the Contacts CRM listing.
+
+Revision ID: 1a2b3c4d5e6f
+Revises: 0f1a2b3c4d5e
+Create Date: 2026-10-19
+
+- ``idx_contacts_inst_activity`` serves GET /contacts ordered by last
+  activity (never-active contacts last), created_at, id. The expression must
+  stay identical to ``ACTIVITY_KEY`` in services/contact_service.py.
+- ``idx_contacts_inst_deliverability`` serves the deliverability filter,
+  which is now applied in SQL instead of on the loaded rows.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '1a2b3c4d5e6f'
+down_revision: Union[str, Sequence[str], None] = '0f1a2b3c4d5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_contacts_inst_activity ON contacts (
+            institution_id,
+            (COALESCE(last_activity_at, '1970-01-01 00:00:00+00'::timestamptz)) DESC,
+            created_at DESC,
+            id DESC
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_contacts_inst_deliverability "
+        "ON contacts (institution_id, deliverability_status)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_contacts_inst_deliverability")
+    op.execute("DROP INDEX IF EXISTS idx_contacts_inst_activity")
@@ -0,0 +1,55 @@
+"""lower(email) indexes for the remaining case-insensitive email lookups.
+
+Revision ID: 2b3c4d5e6f7a
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-19
+
+Lookups compare ``lower(email)`` with a value already normalised in Python
+(``strip().lower()``); contacts and school_contacts got the same expression
+indexes in 8d9e0f1a2b3c.
+
+- ``idx_users_lower_email``: login, join and superadmin user lookups.
+- ``idx_schools_inst_lower_email``: legacy schools.email lookups and the
+  duplicate-contact checks in routes/schools.py.
+- ``idx_marketing_subscription_inst_lower_email``: opt-out / consent lookups.
+- ``idx_reservations_lower_contact_email``: the public booking prefill (latest
+  reservation per e-mail).
+
+Expression indexes instead of a stored normalised column: nothing to backfill
+and no write path that could forget to fill it. mailing_campaign_recipients
+needs none, recipients are matched by email_provider_id, never by email.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '2b3c4d5e6f7a'
+down_revision: Union[str, Sequence[str], None] = '1a2b3c4d5e6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_users_lower_email ON users (lower(email))")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_schools_inst_lower_email "
+        "ON schools (institution_id, lower(email)) WHERE email IS NOT NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_marketing_subscription_inst_lower_email "
+        "ON marketing_subscriptions (institution_id, lower(email))"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reservations_lower_contact_email "
+        "ON reservations (lower(contact_email), created_at DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_reservations_lower_contact_email")
+    op.execute("DROP INDEX IF EXISTS idx_marketing_subscription_inst_lower_email")
+    op.execute("DROP INDEX IF EXISTS idx_schools_inst_lower_email")
+    op.execute("DROP INDEX IF EXISTS idx_users_lower_email")
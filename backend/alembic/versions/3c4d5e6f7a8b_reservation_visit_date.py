@@ -0,0 +1,66 @@
+"""Typed visit date and composite indexes for reservation day queries.
+
+Revision ID: 3c4d5e6f7a8b
+Revises: 2b3c4d5e6f7a
+Create Date: 2026-10-19
+
+- ``reservations.visit_date``: a STORED generated DATE column computed from the
+  text ``date`` column, so it can never drift from it and no write path has
+  to fill it. ``public.reservation_visit_date`` parses YYYY-MM-DD with
+  make_date (a ``::date`` cast is not IMMUTABLE, it depends on DateStyle) and
+  returns NULL for anything unparsable instead of failing the write.
+- ``idx_reservations_inst_visit_date_active``: the collision / availability /
+  dashboard lookups ("this institution, this day, not cancelled"). The
+  predicate must stay identical to ``reservation_is_active()`` in
+  database/models.py.
+- ``idx_reservations_inst_visit_date``: the statistics ranges, which also
+  count cancelled bookings per status.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '3c4d5e6f7a8b'
+down_revision: Union[str, Sequence[str], None] = '2b3c4d5e6f7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.reservation_visit_date(value text) RETURNS date
+        LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$
+        BEGIN
+            IF value !~ '^\\d{4}-\\d{2}-\\d{2}' THEN
+                RETURN NULL;
+            END IF;
+            RETURN make_date(substr(value, 1, 4)::int, substr(value, 6, 2)::int, substr(value, 9, 2)::int);
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        ALTER TABLE reservations ADD COLUMN IF NOT EXISTS visit_date date
+        GENERATED ALWAYS AS (public.reservation_visit_date(date)) STORED
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reservations_inst_visit_date_active "
+        "ON reservations (institution_id, visit_date) "
+        "WHERE status <> 'cancelled' AND deleted_at IS NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reservations_inst_visit_date "
+        "ON reservations (institution_id, visit_date, status) WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_reservations_inst_visit_date")
+    op.execute("DROP INDEX IF EXISTS idx_reservations_inst_visit_date_active")
+    op.execute("ALTER TABLE reservations DROP COLUMN IF EXISTS visit_date")
+    op.execute("DROP FUNCTION IF EXISTS public.reservation_visit_date(text)")
@@ -0,0 +1,122 @@
+"""Per-institution monthly booking counters for the dashboard and plan quota.
+
+Revision ID: 4d5e6f7a8b9c
+Revises: 3c4d5e6f7a8b
+Create Date: 2026-10-19
+
+``institution_booking_usage`` holds, per institution and UTC month of
+``reservations.created_at``, the number of bookings created
+(``bookings_created``, dashboard "bookings used") and of those not cancelled
+(``bookings_active``, plan quota). A row trigger on reservations keeps it
+current on insert, delete and status / institution / created_at change; the
+scheduler reconciles recent months nightly
+(services/usage_service.reconcile_booking_usage).
+
+``idx_reservations_inst_created`` serves the half-open ``created_at`` range
+recount used by the backfill and the reconciliation.
+
+The uncounted status must stay in sync with
+services/usage_service.BOOKING_USAGE_EXCLUDED_STATUS. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '4d5e6f7a8b9c'
+down_revision: Union[str, Sequence[str], None] = '3c4d5e6f7a8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reservations_inst_created "
+        "ON reservations (institution_id, created_at)"
+    )
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS institution_booking_usage (
+            institution_id UUID NOT NULL REFERENCES institutions(id) ON DELETE CASCADE,
+            month DATE NOT NULL,
+            bookings_created INTEGER NOT NULL DEFAULT 0,
+            bookings_active INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (institution_id, month)
+        )
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.reservations_usage_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            old_month date;
+            new_month date;
+            old_active integer := 0;
+            new_active integer := 0;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                old_month := date_trunc('month', OLD.created_at AT TIME ZONE 'UTC')::date;
+                old_active := CASE WHEN OLD.status IS DISTINCT FROM 'cancelled' THEN 1 ELSE 0 END;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                new_month := date_trunc('month', NEW.created_at AT TIME ZONE 'UTC')::date;
+                new_active := CASE WHEN NEW.status IS DISTINCT FROM 'cancelled' THEN 1 ELSE 0 END;
+            END IF;
+
+            IF TG_OP = 'UPDATE' AND OLD.institution_id = NEW.institution_id AND old_month = new_month THEN
+                IF old_active <> new_active THEN
+                    UPDATE institution_booking_usage
+                    SET bookings_active = GREATEST(bookings_active + new_active - old_active, 0),
+                        updated_at = NOW()
+                    WHERE institution_id = NEW.institution_id AND month = new_month;
+                END IF;
+                RETURN NULL;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE institution_booking_usage
+                SET bookings_created = GREATEST(bookings_created - 1, 0),
+                    bookings_active = GREATEST(bookings_active - old_active, 0),
+                    updated_at = NOW()
+                WHERE institution_id = OLD.institution_id AND month = old_month;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO institution_booking_usage (institution_id, month, bookings_created, bookings_active, updated_at)
+                VALUES (NEW.institution_id, new_month, 1, new_active, NOW())
+                ON CONFLICT (institution_id, month) DO UPDATE
+                SET bookings_created = institution_booking_usage.bookings_created + 1,
+                    bookings_active = institution_booking_usage.bookings_active + EXCLUDED.bookings_active,
+                    updated_at = NOW();
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_reservations_usage ON reservations")
+    op.execute("""
+        CREATE TRIGGER trg_reservations_usage
+        AFTER INSERT OR DELETE OR UPDATE OF status, institution_id, created_at ON reservations
+        FOR EACH ROW EXECUTE FUNCTION public.reservations_usage_refresh()
+    """)
+
+    # Backfill (same statement as the nightly reconciliation, over all months)
+    op.execute("""
+        INSERT INTO institution_booking_usage (institution_id, month, bookings_created, bookings_active, updated_at)
+        SELECT r.institution_id,
+               date_trunc('month', r.created_at AT TIME ZONE 'UTC')::date,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE r.status IS DISTINCT FROM 'cancelled'),
+               NOW()
+        FROM reservations r
+        GROUP BY 1, 2
+        ON CONFLICT (institution_id, month) DO UPDATE
+        SET bookings_created = EXCLUDED.bookings_created,
+            bookings_active = EXCLUDED.bookings_active,
+            updated_at = NOW()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_reservations_usage ON reservations")
+    op.execute("DROP FUNCTION IF EXISTS public.reservations_usage_refresh()")
+    op.execute("DROP TABLE IF EXISTS institution_booking_usage")
+    op.execute("DROP INDEX IF EXISTS idx_reservations_inst_created")
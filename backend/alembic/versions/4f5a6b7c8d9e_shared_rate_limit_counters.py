@@ -0,0 +1,33 @@
+"""Shared rate-limit counters for multi-worker deployments.
+
+Revision ID: 4f5a6b7c8d9e
+Revises: 3e4f5a6b7c8d
+Create Date: 2026-10-19
+
+UNLOGGED on purpose: counters are short-lived (seconds to an hour) and losing
+them on a crash only resets the windows. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '4f5a6b7c8d9e'
+down_revision: Union[str, Sequence[str], None] = '3e4f5a6b7c8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_counters (
+            key TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL DEFAULT 0,
+            expires_at TIMESTAMPTZ NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires ON rate_limit_counters(expires_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS rate_limit_counters")
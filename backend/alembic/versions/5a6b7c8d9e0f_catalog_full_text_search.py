@@ -0,0 +1,170 @@
+"""Full-text and trigram search for the public program catalog.
+
+Revision ID: 5a6b7c8d9e0f
+Revises: 4f5a6b7c8d9e
+Create Date: 2026-10-19
+
+- ``cs_unaccent`` text search configuration: ``simple`` + unaccent. PostgreSQL
+  ships no Czech stemmer, so matching is accent-insensitive and prefix based
+  (the catalog query appends ``:*`` to every word).
+- ``programs.search_vector`` (name A, tags + institution name B, description C).
+  The institution name lives in another table, so the column is maintained by
+  triggers instead of being a GENERATED column. It is only read by raw SQL in
+  routes/catalog.py and is intentionally not mapped on the ORM model.
+- Partial GIN indexes restricted to programs visible in the catalog, plus
+  pg_trgm indexes for fuzzy name / city / tag matching.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '5a6b7c8d9e0f'
+down_revision: Union[str, Sequence[str], None] = '4f5a6b7c8d9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CATALOG_VISIBLE = (
+    "is_in_catalog = TRUE AND deleted_at IS NULL AND is_published = TRUE AND status = 'active'"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Historically added at app startup / outside Alembic; the trigger and the
+    # partial indexes below need them now.
+    op.execute("ALTER TABLE programs ADD COLUMN IF NOT EXISTS is_in_catalog BOOLEAN NOT NULL DEFAULT FALSE")
+    op.execute("ALTER TABLE programs ADD COLUMN IF NOT EXISTS subject_tags TEXT[] DEFAULT '{}'")
+
+    # unaccent() is only STABLE; index expressions need an IMMUTABLE wrapper
+    # with the dictionary schema-qualified (Supabase installs it in `extensions`).
+    op.execute("""
+        DO $$
+        DECLARE ext_schema text;
+        BEGIN
+            SELECT n.nspname INTO ext_schema
+            FROM pg_extension e JOIN pg_namespace n ON n.oid = e.extnamespace
+            WHERE e.extname = 'unaccent';
+
+            EXECUTE format(
+                'CREATE OR REPLACE FUNCTION public.catalog_unaccent(value text) RETURNS text '
+                'LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT '
+                'AS $f$ SELECT lower(%I.unaccent(%L::regdictionary, value)) $f$',
+                ext_schema, ext_schema || '.unaccent'
+            );
+
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'cs_unaccent') THEN
+                CREATE TEXT SEARCH CONFIGURATION public.cs_unaccent (COPY = pg_catalog.simple);
+                EXECUTE format(
+                    'ALTER TEXT SEARCH CONFIGURATION public.cs_unaccent '
+                    'ALTER MAPPING FOR hword, hword_part, word WITH %I.unaccent, simple',
+                    ext_schema
+                );
+            END IF;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.catalog_tags_text(tags text[]) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT public.catalog_unaccent(coalesce(array_to_string(tags, '|'), '')) $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.catalog_search_document(
+            name_cs text, name_en text, description_cs text, subject_tags text[], institution_name text
+        ) RETURNS tsvector
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT setweight(to_tsvector('public.cs_unaccent'::regconfig, coalesce(name_cs, '') || ' ' || coalesce(name_en, '')), 'A')
+                || setweight(to_tsvector('public.cs_unaccent'::regconfig, coalesce(array_to_string(subject_tags, ' '), '')), 'B')
+                || setweight(to_tsvector('public.cs_unaccent'::regconfig, coalesce(institution_name, '')), 'B')
+                || setweight(to_tsvector('public.cs_unaccent'::regconfig, coalesce(description_cs, '')), 'C')
+        $$
+    """)
+
+    op.execute("ALTER TABLE programs ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.programs_search_vector_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := public.catalog_search_document(
+                NEW.name_cs, NEW.name_en, NEW.description_cs, NEW.subject_tags,
+                (SELECT name FROM institutions WHERE id = NEW.institution_id)
+            );
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_programs_search_vector ON programs")
+    op.execute("""
+        CREATE TRIGGER trg_programs_search_vector
+        BEFORE INSERT OR UPDATE OF name_cs, name_en, description_cs, subject_tags, institution_id
+        ON programs FOR EACH ROW EXECUTE FUNCTION public.programs_search_vector_refresh()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.institutions_search_vector_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE programs
+            SET search_vector = public.catalog_search_document(
+                name_cs, name_en, description_cs, subject_tags, NEW.name
+            )
+            WHERE institution_id = NEW.id;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_institutions_search_vector ON institutions")
+    op.execute("""
+        CREATE TRIGGER trg_institutions_search_vector
+        AFTER UPDATE OF name ON institutions
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION public.institutions_search_vector_refresh()
+    """)
+
+    # Backfill existing programs
+    op.execute("""
+        UPDATE programs p
+        SET search_vector = public.catalog_search_document(
+            p.name_cs, p.name_en, p.description_cs, p.subject_tags, i.name
+        )
+        FROM institutions i
+        WHERE i.id = p.institution_id
+    """)
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_programs_catalog_search ON programs "
+        f"USING gin (search_vector) WHERE {CATALOG_VISIBLE}"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_programs_catalog_name_trgm ON programs "
+        f"USING gin (public.catalog_unaccent(name_cs) gin_trgm_ops) WHERE {CATALOG_VISIBLE}"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_programs_catalog_tags_trgm ON programs "
+        f"USING gin (public.catalog_tags_text(subject_tags) gin_trgm_ops) WHERE {CATALOG_VISIBLE}"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_institutions_city_trgm ON institutions "
+        "USING gin (public.catalog_unaccent(city) gin_trgm_ops) WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_institutions_city_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_programs_catalog_tags_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_programs_catalog_name_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_programs_catalog_search")
+    op.execute("DROP TRIGGER IF EXISTS trg_institutions_search_vector ON institutions")
+    op.execute("DROP TRIGGER IF EXISTS trg_programs_search_vector ON programs")
+    op.execute("DROP FUNCTION IF EXISTS public.institutions_search_vector_refresh()")
+    op.execute("DROP FUNCTION IF EXISTS public.programs_search_vector_refresh()")
+    op.execute("ALTER TABLE programs DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP FUNCTION IF EXISTS public.catalog_search_document(text, text, text, text[], text)")
+    op.execute("DROP FUNCTION IF EXISTS public.catalog_tags_text(text[])")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS public.cs_unaccent")
+    op.execute("DROP FUNCTION IF EXISTS public.catalog_unaccent(text)")
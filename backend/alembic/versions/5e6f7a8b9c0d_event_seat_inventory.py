@@ -0,0 +1,118 @@
+"""Seat inventory counters for event registrations and a variable-symbol sequence.
+
+Revision ID: 5e6f7a8b9c0d
+Revises: 4d5e6f7a8b9c
+Create Date: 2026-10-19
+
+- ``event_dates.seats_taken`` / ``events.seats_taken`` (applications without
+  a date) count seat-occupying applications. A new application claims its
+  seat with one conditional ``UPDATE ... RETURNING``
+  (services/event_seats.claim_seat) instead of an advisory lock + COUNT.
+- A row trigger on event_applications reconciles the counters on status /
+  date / event change and on delete. Inserts are counted by the claim, not
+  by the trigger. The scheduler recounts nightly
+  (services/event_seats.reconcile_event_seats).
+- ``idx_event_applications_date_status`` serves the recount.
+- ``event_application_vs_seq`` hands out 9-digit variable symbols; the
+  legacy random ones are 10 digits, so the ranges never collide.
+
+The occupying statuses must stay in sync with
+services/event_seats.OCCUPYING_STATUSES. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '5e6f7a8b9c0d'
+down_revision: Union[str, Sequence[str], None] = '4d5e6f7a8b9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE event_dates ADD COLUMN IF NOT EXISTS seats_taken INTEGER NOT NULL DEFAULT 0")
+    op.execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS seats_taken INTEGER NOT NULL DEFAULT 0")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_event_applications_date_status "
+        "ON event_applications (event_date_id, status)"
+    )
+    op.execute("""
+        CREATE SEQUENCE IF NOT EXISTS event_application_vs_seq
+        AS bigint START WITH 100000000 MINVALUE 100000000 MAXVALUE 999999999 NO CYCLE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.event_applications_seats_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            old_taken boolean := OLD.status IN ('pending', 'approved');
+            new_taken boolean := false;
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                new_taken := NEW.status IN ('pending', 'approved');
+                IF old_taken = new_taken
+                   AND OLD.event_id = NEW.event_id
+                   AND OLD.event_date_id IS NOT DISTINCT FROM NEW.event_date_id THEN
+                    RETURN NULL;
+                END IF;
+            END IF;
+
+            IF old_taken THEN
+                IF OLD.event_date_id IS NOT NULL THEN
+                    UPDATE event_dates SET seats_taken = GREATEST(seats_taken - 1, 0)
+                    WHERE id = OLD.event_date_id;
+                ELSE
+                    UPDATE events SET seats_taken = GREATEST(seats_taken - 1, 0)
+                    WHERE id = OLD.event_id;
+                END IF;
+            END IF;
+            IF new_taken THEN
+                IF NEW.event_date_id IS NOT NULL THEN
+                    UPDATE event_dates SET seats_taken = seats_taken + 1 WHERE id = NEW.event_date_id;
+                ELSE
+                    UPDATE events SET seats_taken = seats_taken + 1 WHERE id = NEW.event_id;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_event_applications_seats ON event_applications")
+    op.execute("""
+        CREATE TRIGGER trg_event_applications_seats
+        AFTER DELETE OR UPDATE OF status, event_id, event_date_id ON event_applications
+        FOR EACH ROW EXECUTE FUNCTION public.event_applications_seats_refresh()
+    """)
+
+    # Backfill (same recount as the nightly reconciliation, over every row)
+    op.execute("""
+        UPDATE event_dates ed SET seats_taken = counts.taken
+        FROM (
+            SELECT d.id, COUNT(a.id) AS taken
+            FROM event_dates d
+            LEFT JOIN event_applications a
+              ON a.event_date_id = d.id AND a.status IN ('pending', 'approved')
+            GROUP BY d.id
+        ) counts
+        WHERE ed.id = counts.id AND ed.seats_taken IS DISTINCT FROM counts.taken
+    """)
+    op.execute("""
+        UPDATE events ev SET seats_taken = counts.taken
+        FROM (
+            SELECT e.id, COUNT(a.id) AS taken
+            FROM events e
+            LEFT JOIN event_applications a
+              ON a.event_id = e.id AND a.event_date_id IS NULL AND a.status IN ('pending', 'approved')
+            GROUP BY e.id
+        ) counts
+        WHERE ev.id = counts.id AND ev.seats_taken IS DISTINCT FROM counts.taken
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_event_applications_seats ON event_applications")
+    op.execute("DROP FUNCTION IF EXISTS public.event_applications_seats_refresh()")
+    op.execute("DROP SEQUENCE IF EXISTS event_application_vs_seq")
+    op.execute("DROP INDEX IF EXISTS idx_event_applications_date_status")
+    op.execute("ALTER TABLE events DROP COLUMN IF EXISTS seats_taken")
+    op.execute("ALTER TABLE event_dates DROP COLUMN IF EXISTS seats_taken")
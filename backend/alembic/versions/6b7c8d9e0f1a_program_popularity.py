@@ -0,0 +1,103 @@
+"""Materialised per-program popularity counters for the public catalog.
+
+Revision ID: 6b7c8d9e0f1a
+Revises: 5a6b7c8d9e0f
+Create Date: 2026-10-19
+
+``program_popularity.reservation_count`` replaces the GROUP BY over the whole
+reservations table that every catalog request used to run. A row trigger on
+reservations keeps it current on every insert, delete and status / program
+change; the scheduler reconciles it nightly
+(services/catalog_popularity.reconcile_program_popularity).
+
+The counted statuses must stay in sync with
+services/catalog_popularity.POPULARITY_STATUSES. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '6b7c8d9e0f1a'
+down_revision: Union[str, Sequence[str], None] = '5a6b7c8d9e0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS program_popularity (
+            program_id UUID PRIMARY KEY REFERENCES programs(id) ON DELETE CASCADE,
+            reservation_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_program_popularity_count "
+        "ON program_popularity(reservation_count DESC, program_id)"
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.reservations_popularity_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            old_counted boolean := false;
+            new_counted boolean := false;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                old_counted := OLD.status IN ('confirmed', 'pending_approval', 'done', 'approved');
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                new_counted := NEW.status IN ('confirmed', 'pending_approval', 'done', 'approved');
+            END IF;
+            IF TG_OP = 'UPDATE' AND old_counted = new_counted
+               AND OLD.program_id IS NOT DISTINCT FROM NEW.program_id THEN
+                RETURN NULL;
+            END IF;
+
+            IF old_counted AND OLD.program_id IS NOT NULL THEN
+                UPDATE program_popularity
+                SET reservation_count = GREATEST(reservation_count - 1, 0), updated_at = NOW()
+                WHERE program_id = OLD.program_id;
+            END IF;
+            IF new_counted AND NEW.program_id IS NOT NULL THEN
+                INSERT INTO program_popularity (program_id, reservation_count, updated_at)
+                VALUES (NEW.program_id, 1, NOW())
+                ON CONFLICT (program_id) DO UPDATE
+                SET reservation_count = program_popularity.reservation_count + 1, updated_at = NOW();
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS trg_reservations_popularity ON reservations")
+    op.execute("""
+        CREATE TRIGGER trg_reservations_popularity
+        AFTER INSERT OR DELETE OR UPDATE OF status, program_id ON reservations
+        FOR EACH ROW EXECUTE FUNCTION public.reservations_popularity_refresh()
+    """)
+
+    # Backfill (same statement as the nightly reconciliation)
+    op.execute("""
+        INSERT INTO program_popularity (program_id, reservation_count, updated_at)
+        SELECT p.id,
+               COUNT(r.id) FILTER (WHERE r.status IN ('confirmed', 'pending_approval', 'done', 'approved')),
+               NOW()
+        FROM programs p
+        LEFT JOIN reservations r ON r.program_id = p.id
+        GROUP BY p.id
+        ON CONFLICT (program_id) DO UPDATE
+        SET reservation_count = EXCLUDED.reservation_count, updated_at = NOW()
+    """)
+
+    # Keyset pagination for the catalog "newest" sort
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_programs_catalog_newest ON programs (created_at DESC, id DESC) "
+        "WHERE is_in_catalog = TRUE AND deleted_at IS NULL AND is_published = TRUE AND status = 'active'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_programs_catalog_newest")
+    op.execute("DROP TRIGGER IF EXISTS trg_reservations_popularity ON reservations")
+    op.execute("DROP FUNCTION IF EXISTS public.reservations_popularity_refresh()")
+    op.execute("DROP TABLE IF EXISTS program_popularity")
@@ -0,0 +1,34 @@
+"""Index for the teacher portal booking history.
+
+Revision ID: 6f7a8b9c0d1e
+Revises: 5e6f7a8b9c0d
+Create Date: 2026-10-19
+
+- ``idx_reservations_lower_contact_visit`` serves GET /teacher/bookings: all
+  reservations (of every institution) whose ``lower(contact_email)`` is the
+  teacher's, keyset paginated on (date, time_block, id) — newest first for
+  the history, scanned backwards from today for the "upcoming" view. A page
+  reads only its own rows, whatever the size of ``reservations``.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '6f7a8b9c0d1e'
+down_revision: Union[str, Sequence[str], None] = '5e6f7a8b9c0d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reservations_lower_contact_visit "
+        "ON reservations (lower(contact_email), date DESC, time_block DESC, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_reservations_lower_contact_visit")
@@ -0,0 +1,55 @@
+"""Date-range column and GiST index for waitlist matching.
+
+Revision ID: 7a8b9c0d1e2f
+Revises: 6f7a8b9c0d1e
+Create Date: 2026-10-19
+
+- ``waitlist_entries.requested_range``: a STORED generated DATERANGE of the
+  requested day (``specific_date``) or the inclusive ``range_start_date`` ..
+  ``range_end_date`` span (``date_range``). Dates are parsed with
+  ``public.reservation_visit_date`` (alembic 3c4d5e6f7a8b); an unparsable or
+  reversed request gets NULL and never matches.
+- ``idx_waitlist_active_program_range`` (GiST, needs btree_gist for the uuid
+  column) serves "active entries of this program whose range contains the
+  freed day" in services/waitlist_service.find_matches_for_slots.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '7a8b9c0d1e2f'
+down_revision: Union[str, Sequence[str], None] = '6f7a8b9c0d1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute("""
+        ALTER TABLE waitlist_entries ADD COLUMN IF NOT EXISTS requested_range DATERANGE
+        GENERATED ALWAYS AS (
+            CASE
+                WHEN request_type = 'specific_date'
+                     AND public.reservation_visit_date(requested_date) IS NOT NULL
+                THEN daterange(public.reservation_visit_date(requested_date),
+                               public.reservation_visit_date(requested_date), '[]')
+                WHEN request_type = 'date_range'
+                     AND public.reservation_visit_date(range_start_date)
+                         <= public.reservation_visit_date(range_end_date)
+                THEN daterange(public.reservation_visit_date(range_start_date),
+                               public.reservation_visit_date(range_end_date), '[]')
+            END
+        ) STORED
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_waitlist_active_program_range "
+        "ON waitlist_entries USING gist (program_id, requested_range) WHERE status = 'active'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_waitlist_active_program_range")
+    op.execute("ALTER TABLE waitlist_entries DROP COLUMN IF EXISTS requested_range")
@@ -0,0 +1,129 @@
+"""Per-email deliverability ledger for mailing delivery health.
+
+Revision ID: 7c8d9e0f1a2b
+Revises: 6b7c8d9e0f1a
+Create Date: 2026-10-19
+
+``email_deliverability`` keeps one row per (institution, lower(trim(email)))
+with send / success / failure counters and the latest delivery status. The
+campaign sender and the Resend webhook update it incrementally
+(services/email_deliverability), so /mailings/delivery-health and the
+auto-flagging of invalid contacts no longer scan every campaign recipient.
+
+The backfill classifies recipients exactly like
+services/email_deliverability.recipient_outcome; re-running it rebuilds the
+counters from the full recipient history. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '7c8d9e0f1a2b'
+down_revision: Union[str, Sequence[str], None] = '6b7c8d9e0f1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Older databases predate the Resend delivery columns
+    op.execute("ALTER TABLE mailing_campaign_recipients ADD COLUMN IF NOT EXISTS delivery_status TEXT NOT NULL DEFAULT 'unknown'")
+    op.execute("ALTER TABLE mailing_campaign_recipients ADD COLUMN IF NOT EXISTS delivery_event_at TIMESTAMPTZ")
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS email_deliverability (
+            institution_id UUID NOT NULL REFERENCES institutions(id) ON DELETE CASCADE,
+            email_norm TEXT NOT NULL,
+            email TEXT NOT NULL,
+            contact_id UUID REFERENCES school_contacts(id) ON DELETE SET NULL,
+            school_id UUID REFERENCES schools(id) ON DELETE SET NULL,
+            school_name TEXT,
+            contact_name TEXT,
+            total_sends INTEGER NOT NULL DEFAULT 0,
+            successful INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            last_status TEXT,
+            last_failure_status TEXT,
+            last_failure_reason TEXT,
+            last_sent_at TIMESTAMPTZ,
+            last_event_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (institution_id, email_norm)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_email_deliverability_failed "
+        "ON email_deliverability (institution_id, failed DESC, email_norm) WHERE failed > 0"
+    )
+
+    op.execute("""
+        WITH classified AS (
+            SELECT
+                mc.institution_id,
+                lower(btrim(r.email)) AS email_norm,
+                r.email, r.contact_id, r.school_id, r.school_name, r.contact_name,
+                r.status, r.failure_reason, r.sent_at,
+                COALESCE(r.delivery_event_at, r.sent_at, r.created_at) AS event_at,
+                CASE WHEN r.delivery_status IS NOT NULL AND r.delivery_status NOT IN ('', 'unknown')
+                     THEN r.delivery_status ELSE r.status END AS last_status,
+                COALESCE(NULLIF(r.delivery_status, ''), NULLIF(r.status, ''), 'unknown') AS ds
+            FROM mailing_campaign_recipients r
+            JOIN mailing_campaigns mc ON mc.id = r.campaign_id
+            WHERE btrim(COALESCE(r.email, '')) <> ''
+        ), outcomes AS (
+            SELECT c.*,
+                   (ds IN ('delivered', 'opened', 'clicked')
+                    OR (status = 'sent' AND ds IN ('sent', 'unknown'))) AS is_success
+            FROM classified c
+        ), scored AS (
+            SELECT o.*,
+                   (NOT is_success
+                    AND (ds IN ('bounced_hard', 'failed', 'complained', 'suppressed', 'unsubscribed')
+                         OR status = 'failed')) AS is_failure
+            FROM outcomes o
+        )
+        INSERT INTO email_deliverability (
+            institution_id, email_norm, email, contact_id, school_id, school_name, contact_name,
+            total_sends, successful, failed, last_status, last_failure_status, last_failure_reason,
+            last_sent_at, last_event_at, updated_at
+        )
+        SELECT
+            institution_id,
+            email_norm,
+            (array_agg(email ORDER BY event_at DESC))[1],
+            (array_agg(contact_id ORDER BY event_at DESC) FILTER (WHERE contact_id IS NOT NULL))[1],
+            (array_agg(school_id ORDER BY event_at DESC) FILTER (WHERE school_id IS NOT NULL))[1],
+            (array_agg(school_name ORDER BY event_at DESC) FILTER (WHERE school_name IS NOT NULL))[1],
+            (array_agg(contact_name ORDER BY event_at DESC) FILTER (WHERE contact_name IS NOT NULL))[1],
+            COUNT(*) FILTER (WHERE status IN ('sent', 'failed')),
+            COUNT(*) FILTER (WHERE is_success),
+            COUNT(*) FILTER (WHERE is_failure),
+            (array_agg(last_status ORDER BY event_at DESC) FILTER (WHERE status IN ('sent', 'failed')))[1],
+            (array_agg(last_status ORDER BY event_at DESC) FILTER (WHERE is_failure))[1],
+            (array_agg(failure_reason ORDER BY event_at DESC) FILTER (WHERE is_failure))[1],
+            MAX(sent_at) FILTER (WHERE is_success),
+            MAX(event_at) FILTER (WHERE status IN ('sent', 'failed')),
+            NOW()
+        FROM scored
+        GROUP BY institution_id, email_norm
+        HAVING COUNT(*) FILTER (WHERE status IN ('sent', 'failed')) > 0
+        ON CONFLICT (institution_id, email_norm) DO UPDATE SET
+            email = EXCLUDED.email,
+            contact_id = EXCLUDED.contact_id,
+            school_id = EXCLUDED.school_id,
+            school_name = EXCLUDED.school_name,
+            contact_name = EXCLUDED.contact_name,
+            total_sends = EXCLUDED.total_sends,
+            successful = EXCLUDED.successful,
+            failed = EXCLUDED.failed,
+            last_status = EXCLUDED.last_status,
+            last_failure_status = EXCLUDED.last_failure_status,
+            last_failure_reason = EXCLUDED.last_failure_reason,
+            last_sent_at = EXCLUDED.last_sent_at,
+            last_event_at = EXCLUDED.last_event_at,
+            updated_at = NOW()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS email_deliverability")
@@ -0,0 +1,80 @@
+"""Daily page-view rollups for the superadmin traffic dashboard.
+
+Revision ID: 8b9c0d1e2f3a
+Revises: 7a8b9c0d1e2f
+Create Date: 2026-10-19
+
+- ``page_view_daily``: per UTC day the number of page views and of distinct
+  ``session_id`` values. Session ids are salted with the UTC day
+  (routes/analytics._session_id), so the daily distinct counts add up to the
+  exact unique-visitor count of any range of days.
+- ``page_view_daily_paths``: per UTC day and path the number of page views.
+- ``public.rollup_page_views(day)`` rebuilds one day of both tables from
+  ``page_views`` (a ``created_at`` range over ``idx_page_views_created_at``).
+  The scheduler refreshes today every 10 minutes and re-rolls the last days
+  nightly (services/page_views.py). The backfill rolls every day that already
+  has page views.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '8b9c0d1e2f3a'
+down_revision: Union[str, Sequence[str], None] = '7a8b9c0d1e2f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS page_view_daily (
+            day DATE PRIMARY KEY,
+            views INTEGER NOT NULL DEFAULT 0,
+            unique_visitors INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS page_view_daily_paths (
+            day DATE NOT NULL,
+            path TEXT NOT NULL,
+            views INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, path)
+        )
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION public.rollup_page_views(p_day date) RETURNS void
+        LANGUAGE sql AS $$
+            DELETE FROM page_view_daily_paths WHERE day = p_day;
+
+            INSERT INTO page_view_daily_paths (day, path, views)
+            SELECT p_day, path, count(*)
+            FROM page_views
+            WHERE created_at >= p_day::timestamp AT TIME ZONE 'UTC'
+              AND created_at < (p_day + 1)::timestamp AT TIME ZONE 'UTC'
+            GROUP BY path;
+
+            INSERT INTO page_view_daily (day, views, unique_visitors, updated_at)
+            SELECT p_day, count(*), count(DISTINCT session_id), NOW()
+            FROM page_views
+            WHERE created_at >= p_day::timestamp AT TIME ZONE 'UTC'
+              AND created_at < (p_day + 1)::timestamp AT TIME ZONE 'UTC'
+            ON CONFLICT (day) DO UPDATE
+            SET views = EXCLUDED.views,
+                unique_visitors = EXCLUDED.unique_visitors,
+                updated_at = EXCLUDED.updated_at;
+        $$
+    """)
+    op.execute("""
+        SELECT public.rollup_page_views(day)
+        FROM (SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::date AS day FROM page_views) AS days
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS public.rollup_page_views(date)")
+    op.execute("DROP TABLE IF EXISTS page_view_daily_paths")
+    op.execute("DROP TABLE IF EXISTS page_view_daily")
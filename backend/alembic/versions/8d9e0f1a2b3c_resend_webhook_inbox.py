@@ -0,0 +1,56 @@
+"""Staging inbox for Resend webhooks and lower(email) lookup indexes.
+
+Revision ID: 8d9e0f1a2b3c
+Revises: 7c8d9e0f1a2b
+Create Date: 2026-10-19
+
+The webhook route now only verifies the signature and inserts the raw body
+into ``resend_webhook_inbox``; the scheduler applies staged events in batches
+(services/resend_delivery.process_delivery_inbox). The batch applier matches
+contacts by ``(institution_id, lower(email))`` and recipients by
+``email_provider_id``, which get their own indexes here. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '8d9e0f1a2b3c'
+down_revision: Union[str, Sequence[str], None] = '7c8d9e0f1a2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS resend_webhook_inbox (
+            id BIGSERIAL PRIMARY KEY,
+            svix_id TEXT NOT NULL UNIQUE,
+            payload JSONB NOT NULL,
+            received_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            processed_at TIMESTAMPTZ,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_resend_webhook_inbox_pending "
+        "ON resend_webhook_inbox (id) WHERE processed_at IS NULL"
+    )
+
+    op.execute("CREATE INDEX IF NOT EXISTS idx_contacts_inst_lower_email ON contacts (institution_id, lower(email))")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_school_contacts_inst_lower_email "
+        "ON school_contacts (institution_id, lower(email))"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mcr_provider_id "
+        "ON mailing_campaign_recipients (email_provider_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_mcr_provider_id")
+    op.execute("DROP INDEX IF EXISTS idx_school_contacts_inst_lower_email")
+    op.execute("DROP INDEX IF EXISTS idx_contacts_inst_lower_email")
+    op.execute("DROP TABLE IF EXISTS resend_webhook_inbox")
@@ -0,0 +1,76 @@
+"""Per-program feedback aggregate.
+
+Revision ID: 9c0d1e2f3a4b
+Revises: 8b9c0d1e2f3a
+Create Date: 2026-10-19
+
+``feedback_program_stats`` holds, per program, the submitted feedback
+responses: their count, the rating count / sum and per-star distribution and
+the would-recommend answers. POST /feedback/public/{token} adds a response
+in the submitting transaction (services/feedback_stats.record_feedback_response);
+the scheduler rebuilds it nightly so deleted or re-assigned feedback cannot
+leave it drifting. The program archive report and its PDF read it instead of
+aggregating ``feedbacks``.
+
+The backfill aggregates all submitted feedback with a program. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '9c0d1e2f3a4b'
+down_revision: Union[str, Sequence[str], None] = '8b9c0d1e2f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS feedback_program_stats (
+            program_id UUID PRIMARY KEY REFERENCES programs(id) ON DELETE CASCADE,
+            institution_id UUID NOT NULL REFERENCES institutions(id) ON DELETE CASCADE,
+            responses INTEGER NOT NULL DEFAULT 0,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            rating_1 INTEGER NOT NULL DEFAULT 0,
+            rating_2 INTEGER NOT NULL DEFAULT 0,
+            rating_3 INTEGER NOT NULL DEFAULT 0,
+            rating_4 INTEGER NOT NULL DEFAULT 0,
+            rating_5 INTEGER NOT NULL DEFAULT 0,
+            recommend_yes INTEGER NOT NULL DEFAULT 0,
+            recommend_answered INTEGER NOT NULL DEFAULT 0,
+            last_submitted_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_feedback_program_stats_institution "
+        "ON feedback_program_stats (institution_id)"
+    )
+    op.execute("""
+        INSERT INTO feedback_program_stats (
+            program_id, institution_id, responses, rating_count, rating_sum,
+            rating_1, rating_2, rating_3, rating_4, rating_5,
+            recommend_yes, recommend_answered, last_submitted_at, updated_at
+        )
+        SELECT f.program_id, p.institution_id, count(*),
+               count(f.overall_rating), COALESCE(sum(f.overall_rating), 0),
+               count(*) FILTER (WHERE f.overall_rating = 1),
+               count(*) FILTER (WHERE f.overall_rating = 2),
+               count(*) FILTER (WHERE f.overall_rating = 3),
+               count(*) FILTER (WHERE f.overall_rating = 4),
+               count(*) FILTER (WHERE f.overall_rating = 5),
+               count(*) FILTER (WHERE f.would_recommend),
+               count(f.would_recommend),
+               max(f.submitted_at), NOW()
+        FROM feedbacks f
+        JOIN programs p ON p.id = f.program_id
+        WHERE f.status = 'submitted'
+        GROUP BY f.program_id, p.institution_id
+        ON CONFLICT (program_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS feedback_program_stats")
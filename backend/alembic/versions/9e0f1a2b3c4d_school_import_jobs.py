@@ -0,0 +1,52 @@
+"""Background school/contact import jobs.
+
+Revision ID: 9e0f1a2b3c4d
+Revises: 8d9e0f1a2b3c
+Create Date: 2026-10-19
+
+POST /schools/import now runs as a background job
+(services/school_import.run_school_import). ``school_import_jobs`` holds the
+job status and progress, the final counters and the row-level error report,
+so the progress endpoint works from any worker. Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '9e0f1a2b3c4d'
+down_revision: Union[str, Sequence[str], None] = '8d9e0f1a2b3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS school_import_jobs (
+            id UUID PRIMARY KEY,
+            institution_id UUID NOT NULL REFERENCES institutions(id) ON DELETE CASCADE,
+            created_by UUID,
+            filename TEXT,
+            update_existing BOOLEAN NOT NULL DEFAULT FALSE,
+            status TEXT NOT NULL DEFAULT 'queued',
+            phase TEXT,
+            total_rows INTEGER NOT NULL DEFAULT 0,
+            total_records INTEGER NOT NULL DEFAULT 0,
+            processed_records INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            error_report JSONB NOT NULL DEFAULT '[]'::jsonb,
+            result JSONB,
+            failure_reason TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            finished_at TIMESTAMPTZ
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_school_import_jobs_institution "
+        "ON school_import_jobs (institution_id, created_at DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS school_import_jobs")
@@ -0,0 +1,44 @@
+"""Public holiday calendar and the due-reminder index for visit reminders.
+
+Revision ID: a0b1c2d3e4f5
+Revises: 9c0d1e2f3a4b
+Create Date: 2026-10-19
+
+- ``public_holidays``: non-working days besides weekends. The statutory Czech
+  holidays are inserted by services/working_days.ensure_public_holidays for
+  the years a job needs; extra days can be added by hand.
+- ``idx_reservations_visit_reminder_due`` (partial, on ``visit_date``) holds
+  only active reservations whose visit reminder has not been sent, so the
+  daily job reads the reservations of its due visit dates and nothing else.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'a0b1c2d3e4f5'
+down_revision: Union[str, Sequence[str], None] = '9c0d1e2f3a4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS public_holidays (
+            day DATE PRIMARY KEY,
+            name TEXT NOT NULL
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_reservations_visit_reminder_due "
+        "ON reservations (visit_date) "
+        "WHERE visit_reminder_sent_at IS NULL AND deleted_at IS NULL "
+        "AND status IN ('pending', 'confirmed')"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_reservations_visit_reminder_due")
+    op.execute("DROP TABLE IF EXISTS public_holidays")
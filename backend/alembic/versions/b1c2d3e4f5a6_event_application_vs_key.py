@@ -0,0 +1,48 @@
+"""Key for the non-sequential event-application variable symbols.
+
+Revision ID: b1c2d3e4f5a6
+Revises: a0b1c2d3e4f5
+Create Date: 2026-10-19
+
+- ``event_application_vs_key``: one row holding the secret with which
+  services/event_seats.next_variable_symbol permutes
+  ``event_application_vs_seq`` values inside the 9-digit range, so
+  consecutive applications do not get guessable, adjacent symbols. The key
+  must never change, otherwise new symbols could repeat issued ones.
+- ``issued_below`` is the first sequence value not yet handed out; symbols
+  issued before this revision were the raw sequence values, and the
+  permutation never lands below it.
+
+Idempotent.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'b1c2d3e4f5a6'
+down_revision: Union[str, Sequence[str], None] = 'a0b1c2d3e4f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS event_application_vs_key (
+            id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+            secret TEXT NOT NULL,
+            issued_below BIGINT NOT NULL
+        )
+    """)
+    op.execute("""
+        INSERT INTO event_application_vs_key (id, secret, issued_below)
+        SELECT 1,
+               replace(gen_random_uuid()::text, '-', '') || replace(gen_random_uuid()::text, '-', ''),
+               CASE WHEN is_called THEN last_value + 1 ELSE last_value END
+        FROM event_application_vs_seq
+        ON CONFLICT (id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS event_application_vs_key")
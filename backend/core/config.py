@@ -10,6 +10,28 @@ load_dotenv(ROOT_DIR / '.env')
 
 # Database
 DATABASE_URL = os.environ.get('DATABASE_URL')
+# Supabase transaction pooler: a "session" there is a shared / rotating backend
+# connection, so session-level advisory locks and LISTEN do not work through it.
+TRANSACTION_POOLER_PORT = 6543
+
+
+def session_database_url(value=None):
+    """SCHEDULER_LOCK_DATABASE_URL if it is a real session connection, else None.
+
+    Used for the scheduler leader lock and the response-cache LISTEN. A direct
+    connection or the session pooler qualify, the transaction pooler (port
+    6543) does not. There is no fallback to DATABASE_URL, which goes through
+    the transaction pooler.
+    """
+    from urllib.parse import urlsplit
+    dsn = ((os.getenv("SCHEDULER_LOCK_DATABASE_URL") if value is None else value) or "").strip()
+    if not dsn:
+        return None
+    try:
+        port = urlsplit(dsn).port
+    except ValueError:
+        return None
+    return None if port == TRANSACTION_POOLER_PORT else dsn
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET')
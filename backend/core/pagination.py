@@ -0,0 +1,53 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor is the sort key of the last row of a page (e.g. ``[count,
+created_at, id]``), JSON-encoded and base64url'd. Clients pass it back
+unchanged to get the next page; the route turns it into a row-value
+comparison such as ``(a, b, id) < (:c0, :c1, :c2)``.
+"""
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last returned row."""
+    raw = json.dumps([_plain(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], parsers: Sequence[Callable[[Any], Any]]) -> Optional[List[Any]]:
+    """Decode a cursor with one parser per key part; HTTP 400 when malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor shape")
+        return [parse(v) for parse, v in zip(parsers, values)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Neplatný stránkovací kurzor")
+
+
+def parse_datetime(value: Any) -> datetime:
+    """Cursor parser for ISO timestamps."""
+    return datetime.fromisoformat(value)
+
+
+def parse_uuid(value: Any) -> uuid.UUID:
+    """Cursor parser for UUID keys."""
+    return uuid.UUID(str(value))
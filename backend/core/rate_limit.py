@@ -0,0 +1,229 @@
+"""
+Shared rate-limit storage for all slowapi limiters.
+
+Every router used to build its own ``Limiter`` with the default in-memory
+storage, so counters lived inside one uvicorn worker. With several workers or
+replicas each process would allow the full quota on its own. All routers now
+import the single ``limiter`` defined here, and its storage is selected by
+``RATE_LIMIT_STORAGE_URI``:
+
+- ``memory://`` (default) — process-local counters; used in tests and for the
+  classic single-worker deployment.
+- ``postgresql://...`` — fixed-window counters in the UNLOGGED
+  ``rate_limit_counters`` table, shared by every worker and replica.
+
+slowapi and the limits strategies call the storage synchronously. With the
+PostgreSQL storage every check is a network round trip, so for async
+endpoints (and ``hit_shared_limit``) the check runs on a small dedicated
+thread pool of ``RATE_LIMIT_POOL_SIZE`` threads — as many as the storage
+has connections — and the event loop never waits on the database.
+"""
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from limits import parse
+from limits.storage import Storage, storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_STORAGE_URI = os.environ.get("RATE_LIMIT_STORAGE_URI") or "memory://"
+RATE_LIMIT_POOL_SIZE = int(os.environ.get("RATE_LIMIT_POOL_SIZE", "4"))
+
+
+class PostgresStorage(Storage):
+    """Fixed-window rate-limit counters kept in PostgreSQL.
+
+    One atomic upsert per hit: an expired window is restarted in place, so
+    no cleanup is needed for correctness (the scheduler only prunes old rows).
+    slowapi calls storages synchronously, therefore this uses a small
+    psycopg2 pool in autocommit mode; every call is a single statement, which
+    also keeps it compatible with the Supabase transaction pooler. The calls
+    are made from ``_storage_executor`` threads (see ``run_storage_io``).
+    """
+
+    STORAGE_SCHEME = ["postgresql", "postgres"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        self._dsn = uri
+        self._max_connections = int(options.pop("max_connections", RATE_LIMIT_POOL_SIZE))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        import psycopg2
+        return psycopg2.Error
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    from psycopg2.pool import ThreadedConnectionPool
+                    self._pool = ThreadedConnectionPool(1, self._max_connections, self._dsn)
+        return self._pool
+
+    def _fetchone(self, sql: str, params: dict | None = None):
+        pool = self._get_pool()
+        conn = pool.getconn()
+        broken = False
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(sql, params or {})
+                return cur.fetchone() if cur.description else cur.rowcount
+        except self.base_exceptions:
+            broken = True
+            raise
+        finally:
+            pool.putconn(conn, close=broken)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        row = self._fetchone(
+            """
+            INSERT INTO rate_limit_counters AS c (key, hits, expires_at)
+            VALUES (%(key)s, %(amount)s, now() + make_interval(secs => %(expiry)s))
+            ON CONFLICT (key) DO UPDATE SET
+                hits = CASE WHEN c.expires_at <= now() THEN EXCLUDED.hits
+                            ELSE c.hits + EXCLUDED.hits END,
+                expires_at = CASE WHEN c.expires_at <= now() THEN EXCLUDED.expires_at
+                                  ELSE c.expires_at END
+            RETURNING hits
+            """,
+            {"key": key, "amount": amount, "expiry": expiry},
+        )
+        return int(row[0])
+
+    def get(self, key: str) -> int:
+        row = self._fetchone(
+            "SELECT hits FROM rate_limit_counters WHERE key = %(key)s AND expires_at > now()",
+            {"key": key},
+        )
+        return int(row[0]) if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self._fetchone(
+            "SELECT EXTRACT(EPOCH FROM expires_at) FROM rate_limit_counters "
+            "WHERE key = %(key)s AND expires_at > now()",
+            {"key": key},
+        )
+        return float(row[0]) if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._fetchone("SELECT 1")
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    def reset(self) -> int | None:
+        return self._fetchone("DELETE FROM rate_limit_counters")
+
+    def clear(self, key: str) -> None:
+        self._fetchone("DELETE FROM rate_limit_counters WHERE key = %(key)s", {"key": key})
+
+
+def uses_blocking_storage(uri: str = RATE_LIMIT_STORAGE_URI) -> bool:
+    """True when ``uri`` selects the PostgreSQL storage (network I/O per check)."""
+    return uri.split(":", 1)[0] in PostgresStorage.STORAGE_SCHEME
+
+
+# At most one storage call per connection: the psycopg2 pool is never exhausted
+# (getconn would raise) and never waited on by the event loop.
+_storage_executor = None
+_storage_executor_lock = threading.Lock()
+
+
+async def run_storage_io(func, *args):
+    """Run a blocking storage call (``func(*args)``) off the event loop."""
+    global _storage_executor
+    if _storage_executor is None:
+        with _storage_executor_lock:
+            if _storage_executor is None:
+                _storage_executor = ThreadPoolExecutor(
+                    max_workers=RATE_LIMIT_POOL_SIZE, thread_name_prefix="rate-limit"
+                )
+    return await asyncio.get_running_loop().run_in_executor(_storage_executor, func, *args)
+
+
+class OffloadingLimiter(Limiter):
+    """slowapi ``Limiter`` that checks the limits of async endpoints in
+    ``run_storage_io`` when ``offload`` is set (blocking storage).
+
+    The check runs before slowapi's own wrapper and marks the request as
+    checked, so the wrapper only adds the rate-limit headers.
+    """
+
+    def __init__(self, *args, offload: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._offload = offload
+
+    def limit(self, *args, **kwargs):
+        return self._offloaded(super().limit(*args, **kwargs))
+
+    def shared_limit(self, *args, **kwargs):
+        return self._offloaded(super().shared_limit(*args, **kwargs))
+
+    def _offloaded(self, slowapi_decorator):
+        def decorator(func):
+            wrapped = slowapi_decorator(func)
+            if not self._offload or not asyncio.iscoroutinefunction(func):
+                return wrapped
+
+            @functools.wraps(wrapped)
+            async def offloaded(*args, **kwargs):
+                request = kwargs.get("request")
+                if request is None:
+                    request = next((a for a in args if isinstance(a, Request)), None)
+                if (
+                    self.enabled and self._auto_check and isinstance(request, Request)
+                    and not getattr(request.state, "_rate_limiting_complete", False)
+                ):
+                    await run_storage_io(self._check_request_limit, request, func, False)
+                    request.state._rate_limiting_complete = True
+                return await wrapped(*args, **kwargs)
+
+            return offloaded
+        return decorator
+
+
+# Single limiter shared by every router. swallow_errors: if the shared store is
+# unreachable, requests are let through instead of failing with HTTP 500.
+limiter = OffloadingLimiter(
+    key_func=get_remote_address,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    swallow_errors=True,
+    offload=uses_blocking_storage(),
+)
+
+# Manual throttles (e.g. the X-Forwarded-For based prefill guard) use the same
+# storage backend, so they are enforced across workers as well.
+_manual_limiter = FixedWindowRateLimiter(storage_from_string(RATE_LIMIT_STORAGE_URI))
+
+
+def _hit(limit: str, identifiers: tuple) -> bool:
+    try:
+        return _manual_limiter.hit(parse(limit), *identifiers)
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"Rate-limit storage unavailable, allowing request: {type(e).__name__}")
+        return True
+
+
+async def hit_shared_limit(limit: str, *identifiers: str) -> bool:
+    """Count one hit against ``limit`` (e.g. ``"6/minute"``) for ``identifiers``.
+
+    Returns True when the request is within the limit, False when it should be
+    rejected with 429. Storage failures fail open, like the slowapi limiter.
+    """
+    if uses_blocking_storage():
+        return await run_storage_io(_hit, limit, identifiers)
+    return _hit(limit, identifiers)
@@ -0,0 +1,281 @@
+"""
+Response cache for anonymous, read-mostly public endpoints.
+
+Landing pages, the catalog and booking pages hit a handful of public GET
+endpoints whose payload is identical for every visitor. ``cached_response``
+keeps the serialised JSON per worker:
+
+- fresh for ``ttl`` seconds, then served stale for up to ``stale_ttl`` more
+  while a single background task reloads it (stale-while-revalidate);
+- concurrent misses for the same key share one load (request coalescing);
+- every response carries an ``ETag`` and a CDN-friendly ``Cache-Control``;
+  ``If-None-Match`` is answered with 304.
+
+Entries are tagged (e.g. ``institution:<id>``, ``catalog``) and dropped by
+``invalidate_public_cache`` from the program / institution / theme repositories.
+Other per-process caches keyed by the same tags (services/institution_context)
+subscribe with ``on_invalidate``.
+With several workers set ``RESPONSE_CACHE_SYNC=postgres``: invalidations are
+then broadcast with ``pg_notify`` and every worker listens on a dedicated
+session (``SCHEDULER_LOCK_DATABASE_URL``). LISTEN needs a real session, so
+without that URL, or with it on the transaction pooler, the listener logs an
+error and does not start.
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+RESPONSE_CACHE_SYNC = (os.environ.get("RESPONSE_CACHE_SYNC") or "").strip().lower()
+INVALIDATION_CHANNEL = "response_cache_invalidate"
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    tags: FrozenSet[str]
+    stored_at: float = field(default_factory=time.monotonic)
+
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+
+class ResponseCache:
+    """Per-process LRU of serialised responses with tag invalidation."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Bumped on every invalidation; a load that started before it must not
+        # store its (possibly outdated) result.
+        self._epoch = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: str, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop entries carrying any of ``tags``; no tags drops everything."""
+        self._epoch += 1
+        if not tags:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+        wanted = set(tags)
+        stale = [k for k, e in self._entries.items() if e.tags & wanted]
+        for k in stale:
+            del self._entries[k]
+        return len(stale)
+
+    async def load(self, key: str, loader: Callable[[], Any], tags: FrozenSet[str]) -> CachedResponse:
+        """Run ``loader`` once per key even under concurrent misses."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, tags))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, loader: Callable[[], Any], tags: FrozenSet[str]) -> CachedResponse:
+        epoch = self._epoch
+        payload = await loader()
+        body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = CachedResponse(body=body, etag=f'"{hashlib.sha1(body).hexdigest()[:20]}"', tags=tags)
+        if epoch == self._epoch:
+            self.store(key, entry)
+        return entry
+
+    def is_loading(self, key: str) -> bool:
+        return key in self._inflight
+
+
+response_cache = ResponseCache()
+
+# Callbacks receiving the invalidated tags (empty tuple = everything).
+_invalidation_hooks: list = []
+
+
+def on_invalidate(hook: Callable[[tuple], None]) -> Callable[[tuple], None]:
+    """Register ``hook`` to run on every local or broadcast invalidation."""
+    _invalidation_hooks.append(hook)
+    return hook
+
+
+def _invalidate_local(*tags: str) -> None:
+    response_cache.invalidate(*tags)
+    for hook in _invalidation_hooks:
+        try:
+            hook(tags)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Cache invalidation hook failed: {e}")
+
+
+def _cache_key(namespace: str, request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{namespace}:{request.url.path}?{query}"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _build_response(request: Request, entry: CachedResponse, ttl: int, stale_ttl: int, status: str) -> Response:
+    max_age = max(0, int(ttl - entry.age()))
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={max_age}, s-maxage={max_age}, stale-while-revalidate={stale_ttl}",
+        "X-Cache": status,
+    }
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def cached_response(
+    namespace: str,
+    ttl: int,
+    stale_ttl: int = 0,
+    tags: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None,
+):
+    """Cache a public GET endpoint's JSON result.
+
+    ``tags`` receives the endpoint kwargs and returns invalidation tags; the
+    namespace itself is always a tag. The endpoint must take ``request`` and
+    ``db``; every load (miss or background revalidation) runs with its own
+    session, because it is shared by all waiting requests and may outlive the
+    one that started it. Errors (HTTP exceptions included) are never cached.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"]
+            if not RESPONSE_CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            key = _cache_key(namespace, request)
+            entry_tags = frozenset([namespace, *(tags(kwargs) if tags else ())])
+            entry = response_cache.get(key)
+
+            if entry is not None:
+                age = entry.age()
+                if age < ttl:
+                    return _build_response(request, entry, ttl, stale_ttl, "HIT")
+                if age < ttl + stale_ttl:
+                    if not response_cache.is_loading(key):
+                        task = asyncio.ensure_future(
+                            response_cache.load(key, _background_loader(func, args, kwargs), entry_tags)
+                        )
+                        task.add_done_callback(_log_revalidation_error)
+                    return _build_response(request, entry, ttl, stale_ttl, "STALE")
+
+            entry = await response_cache.load(key, _background_loader(func, args, kwargs), entry_tags)
+            return _build_response(request, entry, ttl, stale_ttl, "MISS")
+
+        return wrapper
+    return decorator
+
+
+def _background_loader(func, args, kwargs):
+    """Load with a dedicated session: the request's session may be closed
+    (request finished or cancelled) before the shared load completes."""
+    async def loader():
+        from database.supabase import AsyncSessionLocal
+        async with AsyncSessionLocal() as db:
+            return await func(*args, **{**kwargs, "db": db})
+    return loader
+
+
+def _log_revalidation_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Response cache revalidation failed: {task.exception()}")
+
+
+async def invalidate_public_cache(db, *tags: str) -> None:
+    """Drop cached public responses for ``tags`` in this and (if synced) all workers.
+
+    Call after the change is committed. With ``RESPONSE_CACHE_SYNC=postgres``
+    the tags are broadcast through ``pg_notify`` on ``db``.
+    """
+    _invalidate_local(*tags)
+    if RESPONSE_CACHE_SYNC != "postgres" or db is None:
+        return
+    try:
+        from sqlalchemy import text
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": INVALIDATION_CHANNEL, "payload": json.dumps(list(tags))},
+        )
+        await db.commit()
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"Response cache invalidation broadcast failed: {e}")
+
+
+def _on_invalidation_notice(_conn, _pid, _channel, payload: str) -> None:
+    try:
+        tags = json.loads(payload) if payload else []
+    except ValueError:
+        tags = []
+    _invalidate_local(*tags)
+
+
+async def listen_for_invalidations(retry_seconds: float = 30):
+    """Apply invalidations broadcast by other workers until cancelled."""
+    import asyncpg
+    from core.config import session_database_url
+    dsn = session_database_url()
+    if dsn is None:
+        logger.error(
+            "RESPONSE_CACHE_SYNC=postgres needs SCHEDULER_LOCK_DATABASE_URL on a session connection "
+            "(not the transaction pooler); cross-worker cache invalidation is off"
+        )
+        return
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(dsn, statement_cache_size=0)
+            await conn.add_listener(INVALIDATION_CHANNEL, _on_invalidation_notice)
+            # Notifications sent while disconnected are lost; start clean.
+            _invalidate_local()
+            while True:
+                await asyncio.sleep(retry_seconds)
+                await conn.fetchval("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Response cache listener reconnecting: {e}")
+            _invalidate_local()
+        finally:
+            if conn is not None:
+                try:
+                    await conn.close()
+                except Exception:  # noqa: BLE001
+                    pass
+        await asyncio.sleep(retry_seconds)
@@ -3,12 +3,13 @@ SQLAlchemy models for Supabase (PostgreSQL) database.
 These models mirror the schema defined in /app/supabase/migrations/001_schema.sql
 """
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from typing import Optional
 from sqlalchemy import (
-    Column, String, Text, Integer, Float, Boolean, DateTime, 
-    ForeignKey, ARRAY, JSON, Index, UniqueConstraint
+    Column, String, Text, Integer, Float, Boolean, DateTime, Date, Computed,
+    ForeignKey, ARRAY, JSON, Index, UniqueConstraint, BigInteger, SmallInteger, text, and_, false
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import DATERANGE, UUID, JSONB
 from sqlalchemy.orm import relationship, DeclarativeBase
 
 
@@ -139,6 +140,7 @@ class User(Base):
     __table_args__ = (
         Index('idx_users_institution', 'institution_id'),
         Index('idx_users_email', 'email'),
+        Index('idx_users_lower_email', text('lower(email)')),
         Index('idx_users_role', 'role'),
     )
 
@@ -248,6 +250,9 @@ class Reservation(Base):
     
     # Booking Details
     date = Column(Text, nullable=False)  # YYYY-MM-DD format
+    # Typed copy of `date`, generated by Postgres (NULL when `date` is not a
+    # valid YYYY-MM-DD). Filter and group on this one so the indexes apply.
+    visit_date = Column(Date, Computed("public.reservation_visit_date(date)", persisted=True))
     time_block = Column(Text, nullable=False)
     
     # School/Group Info
@@ -324,9 +329,43 @@ class Reservation(Base):
         Index('idx_reservations_program', 'program_id'),
         Index('idx_reservations_date', 'date'),
         Index('idx_reservations_status', 'status'),
+        Index('idx_reservations_lower_contact_email', text('lower(contact_email)'), text('created_at DESC')),
+        Index('idx_reservations_lower_contact_visit', text('lower(contact_email)'), text('date DESC'),
+              text('time_block DESC'), text('id DESC')),
+        Index('idx_reservations_inst_visit_date_active', 'institution_id', 'visit_date',
+              postgresql_where=text("status <> 'cancelled' AND deleted_at IS NULL")),
+        Index('idx_reservations_inst_visit_date', 'institution_id', 'visit_date', 'status',
+              postgresql_where=text('deleted_at IS NULL')),
+        Index('idx_reservations_inst_created', 'institution_id', 'created_at'),
+        Index('idx_reservations_visit_reminder_due', 'visit_date',
+              postgresql_where=text("visit_reminder_sent_at IS NULL AND deleted_at IS NULL "
+                                    "AND status IN ('pending', 'confirmed')")),
     )
 
 
+def parse_visit_date(value) -> Optional[date]:
+    """Parse a Reservation.date string the way public.reservation_visit_date() does."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value or "")[:10])
+    except ValueError:
+        return None
+
+
+def reservation_on(value):
+    """``visit_date = value`` for a YYYY-MM-DD string; matches nothing when unparsable."""
+    day = parse_visit_date(value)
+    return Reservation.visit_date == day if day else false()
+
+
+def reservation_is_active():
+    """Not cancelled and not soft-deleted: the predicate of the partial visit_date indexes."""
+    return and_(Reservation.status != 'cancelled', Reservation.deleted_at.is_(None))
+
+
 class School(Base):
     """School/CRM model for repeat visitors."""
     __tablename__ = 'schools'
@@ -369,6 +408,8 @@ class School(Base):
     __table_args__ = (
         Index('idx_schools_institution', 'institution_id'),
         Index('idx_schools_email', 'email'),
+        Index('idx_schools_inst_lower_email', 'institution_id', text('lower(email)'),
+              postgresql_where=text('email IS NOT NULL')),
         Index('idx_schools_name_city', 'institution_id', 'name', 'city'),
     )
 
@@ -413,6 +454,7 @@ class SchoolContact(Base):
     # Email Validation
     email_validated = Column(Boolean, default=False)
     email_validation_error = Column(Text)
+    suggested_correction = Column(Text)  # typo fix from validate_email, set on write
     last_email_sent_at = Column(DateTime(timezone=True))
     last_email_bounced = Column(Boolean, default=False)
     deliverability_status = Column(Text, nullable=False, default='unknown')
@@ -436,11 +478,39 @@ class SchoolContact(Base):
     __table_args__ = (
         Index('idx_school_contacts_school', 'school_id'),
         Index('idx_school_contacts_email', 'email'),
+        Index('idx_school_contacts_inst_lower_email', 'institution_id', text('lower(email)')),
         Index('idx_school_contacts_institution', 'institution_id'),
         Index('idx_school_contacts_status', 'status'),
     )
 
 
+class SchoolImportJob(Base):
+    """Background school/contact import (services.school_import, alembic 9e0f1a2b3c4d)."""
+    __tablename__ = 'school_import_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    institution_id = Column(UUID(as_uuid=True), ForeignKey('institutions.id', ondelete='CASCADE'), nullable=False)
+    created_by = Column(UUID(as_uuid=True))
+    filename = Column(Text)
+    update_existing = Column(Boolean, nullable=False, default=False)
+    status = Column(Text, nullable=False, default='queued')  # queued | running | done | failed
+    phase = Column(Text)  # parsing | writing | done
+    total_rows = Column(Integer, nullable=False, default=0)
+    total_records = Column(Integer, nullable=False, default=0)
+    processed_records = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    error_report = Column(JSONB, nullable=False, default=list)  # [{row, error}]
+    result = Column(JSONB)  # ImportResult payload
+    failure_reason = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index('idx_school_import_jobs_institution', 'institution_id', text('created_at DESC')),
+    )
+
+
 class ThemeSetting(Base):
     """Theme settings for institution branding."""
     __tablename__ = 'theme_settings'
@@ -927,6 +997,8 @@ class Event(Base):
     # Subset of the institution's globally-allowed methods offered for THIS event.
     # NULL for free events (no payment). Values: qr, gateway, cash.
     allowed_payment_methods = Column(JSON)
+    # Seats taken by applications without a date (see EventDate.seats_taken).
+    seats_taken = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
@@ -945,6 +1017,10 @@ class EventDate(Base):
     end_datetime = Column(DateTime(timezone=True), nullable=False)
     capacity_override = Column(Integer)
     registration_deadline_override = Column(DateTime(timezone=True))
+    # Seat-occupying applications. Claimed by services.event_seats.claim_seat,
+    # kept current by the trg_event_applications_seats trigger (alembic
+    # 5e6f7a8b9c0d), reconciled nightly by services.event_seats.
+    seats_taken = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
 
     __table_args__ = (
@@ -983,6 +1059,7 @@ class EventApplication(Base):
         Index('idx_event_applications_event', 'event_id'),
         Index('idx_event_applications_institution', 'institution_id'),
         Index('idx_event_applications_vs', 'variable_symbol'),
+        Index('idx_event_applications_date_status', 'event_date_id', 'status'),
     )
 
 
@@ -1071,6 +1148,16 @@ class WaitlistEntry(Base):
     requested_date = Column(Text)  # "2026-05-15"
     range_start_date = Column(Text)
     range_end_date = Column(Text)
+    # Requested day / inclusive span as a DATERANGE, generated by Postgres
+    # (NULL when the dates are unparsable or reversed). Matched with @>.
+    requested_range = Column(DATERANGE, Computed(
+        "CASE WHEN request_type = 'specific_date' AND public.reservation_visit_date(requested_date) IS NOT NULL "
+        "THEN daterange(public.reservation_visit_date(requested_date), public.reservation_visit_date(requested_date), '[]') "
+        "WHEN request_type = 'date_range' AND public.reservation_visit_date(range_start_date) "
+        "<= public.reservation_visit_date(range_end_date) "
+        "THEN daterange(public.reservation_visit_date(range_start_date), public.reservation_visit_date(range_end_date), '[]') END",
+        persisted=True,
+    ))
     preferred_time_of_day = Column(Text, default='any')  # morning, midday, afternoon, any
     notes = Column(Text)
     status = Column(Text, nullable=False, default='active')  # active, contacted, booked, cancelled, expired
@@ -1083,6 +1170,8 @@ class WaitlistEntry(Base):
         Index('idx_waitlist_program', 'program_id'),
         Index('idx_waitlist_status', 'status'),
         Index('idx_waitlist_email_program', 'email', 'program_id'),
+        Index('idx_waitlist_active_program_range', 'program_id', 'requested_range',
+              postgresql_using='gist', postgresql_where=text("status = 'active'")),
     )
 
 
@@ -1181,6 +1270,7 @@ class MailingCampaignRecipient(Base):
     __table_args__ = (
         Index('idx_mcr_campaign', 'campaign_id'),
         Index('idx_mcr_status', 'status'),
+        Index('idx_mcr_provider_id', 'email_provider_id'),
     )
 
 
@@ -1199,6 +1289,38 @@ class MailingRecipientProgram(Base):
     )
 
 
+class EmailDeliverability(Base):
+    """Per-email delivery ledger used by delivery health and auto-flagging.
+
+    Updated incrementally by the campaign sender and the Resend webhook
+    (services.email_deliverability, alembic 7c8d9e0f1a2b).
+    """
+    __tablename__ = 'email_deliverability'
+
+    institution_id = Column(UUID(as_uuid=True), ForeignKey('institutions.id', ondelete='CASCADE'), primary_key=True)
+    email_norm = Column(Text, primary_key=True)  # lower(trim(email))
+    email = Column(Text, nullable=False)
+    contact_id = Column(UUID(as_uuid=True), ForeignKey('school_contacts.id', ondelete='SET NULL'))
+    school_id = Column(UUID(as_uuid=True), ForeignKey('schools.id', ondelete='SET NULL'))
+    school_name = Column(Text)
+    contact_name = Column(Text)
+
+    total_sends = Column(Integer, nullable=False, default=0)
+    successful = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    last_status = Column(Text)
+    last_failure_status = Column(Text)
+    last_failure_reason = Column(Text)
+    last_sent_at = Column(DateTime(timezone=True))
+    last_event_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_email_deliverability_failed', 'institution_id', text('failed DESC'), 'email_norm',
+              postgresql_where=text('failed > 0')),
+    )
+
+
 class MarketingSubscription(Base):
     """Institution-scoped promotional-mail consent state for one e-mail."""
     __tablename__ = 'marketing_subscriptions'
@@ -1216,6 +1338,7 @@ class MarketingSubscription(Base):
 
     __table_args__ = (
         Index('uq_marketing_subscription_inst_email', 'institution_id', 'email', unique=True),
+        Index('idx_marketing_subscription_inst_lower_email', 'institution_id', text('lower(email)')),
         Index('idx_marketing_subscription_status', 'institution_id', 'subscribed'),
     )
 
@@ -1271,6 +1394,82 @@ class UsageMetric(Base):
     )
 
 
+class InstitutionBookingUsage(Base):
+    """Bookings created per institution and UTC month (of reservations.created_at).
+
+    Maintained by the trg_reservations_usage trigger (alembic 4d5e6f7a8b9c),
+    reconciled nightly by services.usage_service.
+    """
+    __tablename__ = 'institution_booking_usage'
+
+    institution_id = Column(UUID(as_uuid=True), ForeignKey('institutions.id', ondelete='CASCADE'), primary_key=True)
+    month = Column(Date, primary_key=True)
+    bookings_created = Column(Integer, nullable=False, default=0)  # dashboard "bookings used"
+    bookings_active = Column(Integer, nullable=False, default=0)  # not cancelled → plan quota
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+
+class ProgramPopularity(Base):
+    """Reservation counter per program for the catalog "popular" sort.
+
+    Maintained by the trg_reservations_popularity trigger (alembic 6b7c8d9e0f1a),
+    reconciled nightly by services.catalog_popularity.
+    """
+    __tablename__ = 'program_popularity'
+
+    program_id = Column(UUID(as_uuid=True), ForeignKey('programs.id', ondelete='CASCADE'), primary_key=True)
+    reservation_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+class PublicHoliday(Base):
+    """Non-working day besides weekends (Czech public holidays, see services.working_days)."""
+    __tablename__ = 'public_holidays'
+
+    day = Column(Date, primary_key=True)
+    name = Column(Text, nullable=False)
+
+
+class EventApplicationVsKey(Base):
+    """Secret for the variable-symbol permutation (services.event_seats, alembic b1c2d3e4f5a6).
+
+    One row; must never change once symbols have been issued with it.
+    """
+    __tablename__ = 'event_application_vs_key'
+
+    id = Column(SmallInteger, primary_key=True, default=1)
+    secret = Column(Text, nullable=False)
+    issued_below = Column(BigInteger, nullable=False)
+
+
+class FeedbackProgramStats(Base):
+    """Submitted feedback aggregated per program (archive report, its PDF).
+
+    Updated by POST /feedback/public/{token} (services.feedback_stats,
+    alembic 9c0d1e2f3a4b), rebuilt nightly by services.feedback_stats.
+    """
+    __tablename__ = 'feedback_program_stats'
+
+    program_id = Column(UUID(as_uuid=True), ForeignKey('programs.id', ondelete='CASCADE'), primary_key=True)
+    institution_id = Column(UUID(as_uuid=True), ForeignKey('institutions.id', ondelete='CASCADE'), nullable=False)
+    responses = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+    recommend_yes = Column(Integer, nullable=False, default=0)
+    recommend_answered = Column(Integer, nullable=False, default=0)
+    last_submitted_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_feedback_program_stats_institution', 'institution_id'),
+    )
+
 
 class ReservationObserver(Base):
     """Náslech — lecturer joins reservation as observer. Does NOT affect collision logic."""
@@ -1379,6 +1578,30 @@ class PageView(Base):
     )
 
 
+class PageViewDaily(Base):
+    """Page views and distinct sessions per UTC day (rollup of page_views).
+
+    Built by public.rollup_page_views (alembic 8b9c0d1e2f3a), refreshed by
+    services.page_views. Session ids are salted per day, so ``unique_visitors``
+    of several days add up to their exact unique count.
+    """
+    __tablename__ = 'page_view_daily'
+
+    day = Column(Date, primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+    unique_visitors = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+class PageViewDailyPath(Base):
+    """Page views per UTC day and path (rollup of page_views, see PageViewDaily)."""
+    __tablename__ = 'page_view_daily_paths'
+
+    day = Column(Date, primary_key=True)
+    path = Column(Text, primary_key=True)
+    views = Column(Integer, nullable=False, default=0)
+
+
 
 # ──────────────────────────────────────────────────────────────────────────
 #  Contacts (Phase 76 — M1)
@@ -1428,6 +1651,7 @@ class Contact(Base):
     __table_args__ = (
         Index('idx_contacts_institution', 'institution_id'),
         Index('idx_contacts_email_inst', 'institution_id', 'email', unique=True),
+        Index('idx_contacts_inst_lower_email', 'institution_id', text('lower(email)')),
         Index('idx_contacts_type', 'type'),
         Index('idx_contacts_consent', 'marketing_consent'),
     )
@@ -1451,6 +1675,27 @@ class ResendWebhookEvent(Base):
     )
 
 
+class ResendWebhookInbox(Base):
+    """Verified Resend webhook bodies waiting for the batch applier.
+
+    Filled by routes/resend_webhooks, drained by
+    services.resend_delivery.process_delivery_inbox (alembic 8d9e0f1a2b3c).
+    """
+    __tablename__ = 'resend_webhook_inbox'
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    svix_id = Column(Text, nullable=False, unique=True)
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    processed_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+
+    __table_args__ = (
+        Index('idx_resend_webhook_inbox_pending', 'id', postgresql_where=text('processed_at IS NULL')),
+    )
+
+
 class ContactLink(Base):
     """Many-to-many between a Contact and a concrete activity (program / event).
 
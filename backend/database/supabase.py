@@ -15,11 +15,17 @@ DATABASE_URL = os.environ.get('DATABASE_URL')
 # Convert to async URL (postgresql:// -> postgresql+asyncpg://)
 ASYNC_DATABASE_URL = DATABASE_URL.replace('postgresql://', 'postgresql+asyncpg://') if DATABASE_URL else None
 
+# Per-process pool. With several uvicorn workers every worker gets its own
+# pool, so lower DB_POOL_SIZE to keep workers × (size + overflow) under the
+# pooler's client limit.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '5'))
+
 # Create async engine with Transaction Pooler compatible settings
 engine = create_async_engine(
     ASYNC_DATABASE_URL,
-    pool_size=10,
-    max_overflow=5,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     pool_timeout=30,
     pool_recycle=1800,
     pool_pre_ping=False,
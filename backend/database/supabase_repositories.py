@@ -4,7 +4,7 @@ Uses SQLAlchemy async for all database queries.
 """
 import uuid
 import logging
-from datetime import datetime, timezone
+from datetime import date as date_type, datetime, timezone
 from typing import List, Optional, Dict, Any
 
 from sqlalchemy import select, update, delete, func, and_, or_, text
@@ -13,12 +13,29 @@ from sqlalchemy.orm import selectinload
 
 from .models import (
     Institution, User, Program, Reservation, School, 
-    ThemeSetting, Payment, ContactMessage, ProgramEmailTemplate, EmailLog
+    ThemeSetting, Payment, ContactMessage, ProgramEmailTemplate, EmailLog, InstitutionBookingUsage,
+    parse_visit_date, reservation_is_active, reservation_on,
 )
+from core.response_cache import invalidate_public_cache
 
 logger = logging.getLogger(__name__)
 
 
+def user_by_email(email: str):
+    """Case-insensitive user lookup served by ``idx_users_lower_email``.
+
+    ``users.email`` is unique as stored, so older mixed-case rows can collide
+    with a lower-case duplicate; the exact spelling wins in that case.
+    """
+    email = (email or "").strip()
+    return (
+        select(User)
+        .where(func.lower(User.email) == email.lower())
+        .order_by((User.email == email).desc())
+        .limit(1)
+    )
+
+
 def to_dict(obj, exclude: set = None) -> dict:
     """Convert SQLAlchemy model to dictionary."""
     if obj is None:
@@ -31,8 +48,8 @@ def to_dict(obj, exclude: set = None) -> dict:
             # Convert UUID to string
             if isinstance(value, uuid.UUID):
                 value = str(value)
-            # Convert datetime to ISO string
-            elif isinstance(value, datetime):
+            # Convert datetime / date to ISO string
+            elif isinstance(value, (datetime, date_type)):
                 value = value.isoformat()
             result[c.name] = value
     return result
@@ -46,9 +63,7 @@ class UserRepositorySupabase:
     
     async def find_by_email(self, email: str) -> Optional[dict]:
         """Find user by email."""
-        result = await self.db.execute(
-            select(User).where(User.email == email)
-        )
+        result = await self.db.execute(user_by_email(email))
         user = result.scalar_one_or_none()
         return to_dict(user) if user else None
     
@@ -208,6 +223,8 @@ class InstitutionRepositorySupabase:
             .values(**update_data)
         )
         await self.db.commit()
+        # Name, city and plan are shown on public booking / catalog pages
+        await invalidate_public_cache(self.db, f"institution:{institution_id}", "catalog")
         return result.rowcount
     
     async def update_pro_settings(self, institution_id: str, pro_settings: dict) -> int:
@@ -345,6 +362,7 @@ class ProgramRepositorySupabase:
         self.db.add(prog)
         await self.db.commit()
         await self.db.refresh(prog)
+        await invalidate_public_cache(self.db, f"institution:{institution_id}", "catalog")
         return to_dict(prog)
     
     async def update(self, program_id: str, institution_id: str, update_data: dict) -> int:
@@ -407,6 +425,7 @@ class ProgramRepositorySupabase:
             .values(**processed_data)
         )
         await self.db.commit()
+        await invalidate_public_cache(self.db, f"institution:{institution_id}", "catalog")
         return result.rowcount
     
     async def delete(self, program_id: str, institution_id: str) -> int:
@@ -419,6 +438,7 @@ class ProgramRepositorySupabase:
             ))
         )
         await self.db.commit()
+        await invalidate_public_cache(self.db, f"institution:{institution_id}", "catalog")
         return result.rowcount
 
 
@@ -471,8 +491,8 @@ class BookingRepositorySupabase:
         result = await self.db.execute(
             select(Reservation).where(and_(
                 Reservation.institution_id == uuid.UUID(institution_id),
-                Reservation.date == date,
-                Reservation.status != 'cancelled'
+                reservation_on(date),
+                reservation_is_active(),
             ))
         )
         bookings = result.scalars().all()
@@ -486,8 +506,8 @@ class BookingRepositorySupabase:
             select(Reservation).where(and_(
                 Reservation.institution_id == uuid.UUID(institution_id),
                 Reservation.program_id == uuid.UUID(program_id),
-                Reservation.date == date,
-                Reservation.status != 'cancelled'
+                reservation_on(date),
+                reservation_is_active(),
             ))
         )
         bookings = result.scalars().all()
@@ -498,8 +518,8 @@ class BookingRepositorySupabase:
         result = await self.db.execute(
             select(func.count(Reservation.id)).where(and_(
                 Reservation.institution_id == uuid.UUID(institution_id),
-                Reservation.date == today,
-                Reservation.status != 'cancelled'
+                reservation_on(today),
+                reservation_is_active(),
             ))
         )
         return result.scalar() or 0
@@ -509,19 +529,23 @@ class BookingRepositorySupabase:
         result = await self.db.execute(
             select(func.count(Reservation.id)).where(and_(
                 Reservation.institution_id == uuid.UUID(institution_id),
-                Reservation.date >= today,
-                Reservation.status != 'cancelled'
+                Reservation.visit_date >= parse_visit_date(today),
+                reservation_is_active(),
             ))
         )
         return result.scalar() or 0
     
     async def count_month(self, institution_id: str, month_prefix: str) -> int:
-        """Count bookings created this month."""
-        # For PostgreSQL, we need to compare timestamps differently
+        """Count bookings created in the given YYYY-MM (UTC) month.
+
+        Reads the trigger-maintained institution_booking_usage counter
+        instead of counting reservations.
+        """
+        year, month = (int(part) for part in month_prefix[:7].split('-'))
         result = await self.db.execute(
-            select(func.count(Reservation.id)).where(and_(
-                Reservation.institution_id == uuid.UUID(institution_id),
-                func.to_char(Reservation.created_at, 'YYYY-MM').like(f'{month_prefix}%')
+            select(InstitutionBookingUsage.bookings_created).where(and_(
+                InstitutionBookingUsage.institution_id == uuid.UUID(institution_id),
+                InstitutionBookingUsage.month == date_type(year, month, 1),
             ))
         )
         return result.scalar() or 0
@@ -696,10 +720,10 @@ class SchoolRepositorySupabase:
                            s.booking_count, s.created_at, s.email, s.contact_person, s.phone
                     FROM schools s
                     JOIN school_contacts sc ON sc.school_id = s.id
-                    WHERE sc.institution_id = :inst_id AND sc.email = :email
+                    WHERE sc.institution_id = :inst_id AND lower(sc.email) = :email
                     LIMIT 1
                 """),
-                {"inst_id": institution_id, "email": email.lower()}
+                {"inst_id": institution_id, "email": email.strip().lower()}
             )
             row = contact_result.fetchone()
             if row:
@@ -724,8 +748,8 @@ class SchoolRepositorySupabase:
         result = await self.db.execute(
             select(School).where(and_(
                 School.institution_id == uuid.UUID(institution_id),
-                School.email == email
-            ))
+                func.lower(School.email) == email.strip().lower(),
+            )).limit(1)
         )
         school = result.scalar_one_or_none()
         if school:
@@ -768,11 +792,14 @@ class SchoolRepositorySupabase:
         # Also create contact in school_contacts table
         email = school_data.get('email')
         if email:
+            from routes.schools import email_suggestion
+
             try:
                 await self.db.execute(
                     text("""
-                        INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, status)
-                        VALUES (:id, :school_id, :inst_id, :email, :name, :phone, TRUE, 'active')
+                        INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, status,
+                                                     suggested_correction)
+                        VALUES (:id, :school_id, :inst_id, :email, :name, :phone, TRUE, 'active', :suggested)
                         ON CONFLICT DO NOTHING
                     """),
                     {
@@ -780,6 +807,7 @@ class SchoolRepositorySupabase:
                         "school_id": str(school_id),
                         "inst_id": institution_id,
                         "email": email.lower(),
+                        "suggested": email_suggestion(email),
                         "name": school_data.get('contact_person', ''),
                         "phone": school_data.get('phone', '')
                     }
@@ -836,6 +864,8 @@ class ThemeRepositorySupabase:
             self.db.add(theme)
             await self.db.commit()
         
+        # Logo on the public booking page
+        await invalidate_public_cache(self.db, f"institution:{institution_id}")
         return await self.find_by_institution(institution_id)
 
 
@@ -4,17 +4,17 @@ Modular FastAPI Application with Supabase (PostgreSQL)
 
 Main entry point that initializes the application and registers all routes.
 """
+import asyncio
 import logging
 from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse, Response
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import CORS_ORIGINS
+from core.rate_limit import limiter
 from core.security import get_current_user
 from database.supabase import get_db, engine
 from database.supabase_repositories import InstitutionRepositorySupabase, ContactRepositorySupabase
@@ -69,10 +69,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
-
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Add security headers to all responses."""
     async def dispatch(self, request: Request, call_next):
@@ -319,12 +315,24 @@ app.add_middleware(WAFMiddleware)
 async def startup_event():
     """Initialize resources on startup."""
     try:
-        from scheduler import start_scheduler
-        start_scheduler()
+        from scheduler import start_scheduler_for_process
+        start_scheduler_for_process()
         logger.info("Application startup - Feedback scheduler initialized")
     except Exception as e:
         logger.warning(f"Failed to start scheduler: {e}")
 
+    # Cross-worker invalidation of the public response cache (core/response_cache.py)
+    try:
+        from core.response_cache import RESPONSE_CACHE_SYNC, listen_for_invalidations
+        if RESPONSE_CACHE_SYNC == "postgres":
+            app.state.response_cache_listener = asyncio.create_task(listen_for_invalidations())
+    except Exception as e:
+        logger.warning(f"Response cache listener not started: {e}")
+
+    # Buffered page-view ingestion (services/page_views.py): every worker flushes its own buffer
+    from services.page_views import run_pageview_flusher
+    app.state.pageview_flusher = asyncio.create_task(run_pageview_flusher())
+
     try:
         from services.storage_service import init_storage
         init_storage()
@@ -381,10 +389,24 @@ async def startup_event():
 async def shutdown_event():
     """Clean up resources on shutdown."""
     try:
-        from scheduler import stop_scheduler
-        stop_scheduler()
+        from scheduler import stop_scheduler_for_process
+        await stop_scheduler_for_process()
     except Exception as e:
         logger.warning(f"Failed to stop scheduler: {e}")
+
+    listener = getattr(app.state, "response_cache_listener", None)
+    if listener is not None:
+        listener.cancel()
+
+    flusher = getattr(app.state, "pageview_flusher", None)
+    if flusher is not None:
+        flusher.cancel()
+        try:
+            await flusher  # final flush of the buffered page views
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"Page view buffer not flushed on shutdown: {e}")
     
     if engine:
         await engine.dispose()
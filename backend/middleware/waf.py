@@ -1,96 +1,176 @@
 """
 Simple WAF (Web Application Firewall) middleware.
 Blocks common SQL injection and XSS patterns in request parameters.
+
+All rules are compiled into one alternation with a named group per rule, and
+a value is only run through it when it contains one of the literal tokens
+every rule needs (``union``, ``<script``, ``'``, ...). Ordinary values such as
+names, dates or UUIDs are therefore cleared by a few substring checks.
+
+The middleware is plain ASGI: JSON bodies are collected as they are received
+(up to ``MAX_INSPECTED_BODY`` bytes), inspected, and the same messages are
+replayed to the application.
 """
 import logging
 import re
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from urllib.parse import parse_qsl
+
 from starlette.responses import JSONResponse
 
 logger = logging.getLogger(__name__)
 
-# Patterns that indicate SQL injection attempts
-_SQL_PATTERNS = [
-    re.compile(r"(?:--|;)\s*(DROP|ALTER|TRUNCATE|DELETE|INSERT|UPDATE)\s", re.IGNORECASE),
-    re.compile(r"UNION\s+(ALL\s+)?SELECT", re.IGNORECASE),
-    re.compile(r"'\s*OR\s+'?\d*'?\s*=\s*'?\d*'?", re.IGNORECASE),
-    re.compile(r"'\s*;\s*(DROP|ALTER|TRUNCATE)", re.IGNORECASE),
-    re.compile(r"(SLEEP|BENCHMARK|WAITFOR)\s*\(", re.IGNORECASE),
-    re.compile(r"0x[0-9a-fA-F]{8,}", re.IGNORECASE),  # hex-encoded payloads
+# (rule name, threat type, pattern). Inner groups must be non-capturing so
+# that `match.lastgroup` names the rule that matched.
+_RULES = [
+    # SQL injection
+    ("sql_stacked", "sql_injection", r"(?:--|;)\s*(?:DROP|ALTER|TRUNCATE|DELETE|INSERT|UPDATE)\s"),
+    ("sql_union", "sql_injection", r"UNION\s+(?:ALL\s+)?SELECT"),
+    ("sql_tautology", "sql_injection", r"'\s*OR\s+'?\d*'?\s*=\s*'?\d*'?"),
+    ("sql_quote_ddl", "sql_injection", r"'\s*;\s*(?:DROP|ALTER|TRUNCATE)"),
+    ("sql_timing", "sql_injection", r"(?:SLEEP|BENCHMARK|WAITFOR)\s*\("),
+    ("sql_hex", "sql_injection", r"0x[0-9a-fA-F]{8,}"),  # hex-encoded payloads
+    # XSS
+    ("xss_script", "xss", r"<script[\s>]"),
+    ("xss_js_uri", "xss", r"javascript\s*:"),
+    ("xss_handler", "xss", r"on(?:load|error|click|mouseover|focus|blur)\s*="),
+    ("xss_iframe", "xss", r"<iframe[\s>]"),
+    ("xss_object", "xss", r"<object[\s>]"),
+    ("xss_eval", "xss", r"eval\s*\("),
+    ("xss_dom", "xss", r"document\.(?:cookie|location|write)"),
 ]
 
-# Patterns that indicate XSS attempts
-_XSS_PATTERNS = [
-    re.compile(r"<script[\s>]", re.IGNORECASE),
-    re.compile(r"javascript\s*:", re.IGNORECASE),
-    re.compile(r"on(load|error|click|mouseover|focus|blur)\s*=", re.IGNORECASE),
-    re.compile(r"<iframe[\s>]", re.IGNORECASE),
-    re.compile(r"<object[\s>]", re.IGNORECASE),
-    re.compile(r"eval\s*\(", re.IGNORECASE),
-    re.compile(r"document\.(cookie|location|write)", re.IGNORECASE),
-]
+_THREAT_BY_RULE = {name: threat for name, threat, _ in _RULES}
+_COMBINED = re.compile("|".join(f"(?P<{name}>{pattern})" for name, _, pattern in _RULES), re.IGNORECASE)
+
+# At least one of these (lower-case) literals occurs in any string matched by
+# a rule above; strings without them cannot match and skip the regex.
+_PREFILTER_TOKENS = (
+    "--", ";", "union", "'", "sleep", "benchmark", "waitfor", "0x",
+    "<script", "javascript", "onload", "onerror", "onclick", "onmouseover",
+    "onfocus", "onblur", "<iframe", "<object", "eval", "document.",
+)
+# Non-ASCII characters that re.IGNORECASE treats as ASCII letters
+# (İ, ı -> i, ſ -> s, Kelvin sign -> k); folded before the token check.
+_CASE_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
 
 # Exempt paths (e.g. legal text editing, email templates that contain HTML)
-_EXEMPT_PATHS = {"/api/email-templates", "/api/legal"}
+_EXEMPT_PATHS = ("/api/email-templates", "/api/legal")
+
+MAX_INSPECTED_BODY = 10240
+_INSPECTED_METHODS = ("POST", "PUT", "PATCH")
+_BLOCKED_DETAIL = "Požadavek zablokován bezpečnostním filtrem"
+
+
+def _may_match(value: str) -> bool:
+    folded = (value if value.isascii() else value.translate(_CASE_FOLD)).lower()
+    return any(token in folded for token in _PREFILTER_TOKENS)
 
 
 def _check_value(value: str) -> str | None:
     """Check a string value for malicious patterns. Returns pattern type or None."""
-    for pat in _SQL_PATTERNS:
-        if pat.search(value):
-            return "sql_injection"
-    for pat in _XSS_PATTERNS:
-        if pat.search(value):
-            return "xss"
-    return None
+    if not value or not _may_match(value):
+        return None
+    match = _COMBINED.search(value)
+    return _THREAT_BY_RULE[match.lastgroup] if match else None
+
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
 
+def _client_host(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
 
-class WAFMiddleware(BaseHTTPMiddleware):
+
+class WAFMiddleware:
     """Lightweight WAF that inspects query params, path, and small request bodies."""
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Skip exempt paths
-        for exempt in _EXEMPT_PATHS:
-            if path.startswith(exempt):
-                return await call_next(request)
+        path = scope["path"]
+        if path.startswith(_EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
 
-        # Check query parameters
-        for key, value in request.query_params.items():
-            threat = _check_value(value)
-            if threat:
-                logger.warning(f"WAF blocked {threat} in query param '{key}' from {request.client.host}: {value[:100]}")
-                return JSONResponse(
-                    status_code=403,
-                    content={"detail": "Požadavek zablokován bezpečnostním filtrem"},
-                )
+        # Check query parameters (every value, not just the last one per key)
+        query = scope.get("query_string", b"").decode("latin-1")
+        if query:
+            for key, value in parse_qsl(query, keep_blank_values=True):
+                threat = _check_value(value)
+                if threat:
+                    logger.warning(f"WAF blocked {threat} in query param '{key}' from {_client_host(scope)}: {value[:100]}")
+                    await self._block(scope, receive, send)
+                    return
 
         # Check path segments
         for segment in path.split("/"):
             if len(segment) > 4:  # skip short segments like 'api'
                 threat = _check_value(segment)
                 if threat:
-                    logger.warning(f"WAF blocked {threat} in path from {request.client.host}: {segment[:100]}")
-                    return JSONResponse(
-                        status_code=403,
-                        content={"detail": "Požadavek zablokován bezpečnostním filtrem"},
-                    )
+                    logger.warning(f"WAF blocked {threat} in path from {_client_host(scope)}: {segment[:100]}")
+                    await self._block(scope, receive, send)
+                    return
 
         # Check small JSON bodies (POST/PUT/PATCH) — only up to 10KB to avoid perf issues
-        if request.method in ("POST", "PUT", "PATCH"):
-            content_type = request.headers.get("content-type", "")
-            content_length = int(request.headers.get("content-length", "0") or "0")
-            if "application/json" in content_type and 0 < content_length <= 10240:
-                body = await request.body()
-                body_str = body.decode("utf-8", errors="ignore")
-                threat = _check_value(body_str)
-                if threat:
-                    logger.warning(f"WAF blocked {threat} in body from {request.client.host}: {body_str[:200]}")
-                    return JSONResponse(
-                        status_code=403,
-                        content={"detail": "Požadavek zablokován bezpečnostním filtrem"},
-                    )
+        if scope["method"] in _INSPECTED_METHODS and "application/json" in _header(scope, b"content-type"):
+            declared = _header(scope, b"content-length")
+            # Chunked bodies (no length) are inspected if they stay under the limit
+            if (0 < int(declared) <= MAX_INSPECTED_BODY) if declared.isdigit() else not declared:
+                messages, body, complete = await self._read_body(receive)
+                if complete and body:
+                    body_str = body.decode("utf-8", errors="ignore")
+                    threat = _check_value(body_str)
+                    if threat:
+                        logger.warning(f"WAF blocked {threat} in body from {_client_host(scope)}: {body_str[:200]}")
+                        await self._block(scope, receive, send)
+                        return
+                receive = self._replay(messages, receive)
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _read_body(receive):
+        """Receive body chunks until the end or past the inspection limit.
+
+        Returns the received messages (for replay), the collected bytes and
+        whether the whole body fit into the limit.
+        """
+        messages, chunks, size = [], [], 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return messages, b"", False
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_INSPECTED_BODY:
+                return messages, b"", False
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return messages, b"".join(chunks), True
+
+    @staticmethod
+    def _replay(messages, receive):
+        pending = list(messages)
+
+        async def replay_receive():
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        return replay_receive
 
-        return await call_next(request)
+    @staticmethod
+    async def _block(scope, receive, send):
+        response = JSONResponse(status_code=403, content={"detail": _BLOCKED_DETAIL})
+        await response(scope, receive, send)
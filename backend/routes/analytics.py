@@ -9,6 +9,8 @@ Design decisions:
     (``/api/``) are rejected at the record endpoint so the client never has
     to filter them.
   * Superadmin analytics endpoint is gated by ``get_current_user`` + role=='superadmin'.
+  * Ingestion is buffered in-process and flushed in batches; the stats read
+    the daily rollups only (services/page_views.py).
 """
 from __future__ import annotations
 
@@ -17,6 +19,7 @@ import ipaddress
 import logging
 import os
 import re
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
@@ -26,7 +29,8 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.supabase import get_db
-from database.models import PageView
+from database.models import PageViewDaily, PageViewDailyPath
+from services.page_views import enqueue_pageview, today_utc
 from core.security import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -135,14 +139,13 @@ class PageViewIn(BaseModel):
 async def record_pageview(
     body: PageViewIn,
     request: Request,
-    db: AsyncSession = Depends(get_db),
 ):
     """Record a single pageview. Silent-no-op when the path is ignorable,
     the UA looks like a bot, or the caller's IP matches ``ADMIN_IP``.
 
     Returns 202 Accepted unconditionally — the client doesn't need to know
     whether we decided to discard the sample (prevents analytics-adblocker
-    feedback loops).
+    feedback loops). Accepted samples are buffered and written in batches.
     """
     if _is_ignorable_path(body.path):
         return {"recorded": False, "reason": "ignored_path"}
@@ -156,21 +159,19 @@ async def record_pageview(
     if ip_raw in admin_ips:
         return {"recorded": False, "reason": "admin_ip"}
 
-    day_key = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    pv = PageView(
-        path=body.path[:500],
-        ip_hash=_ip_hash(ip_raw, day_key),
-        user_agent=user_agent[:500] if user_agent else None,
-        session_id=_session_id(ip_raw, user_agent, day_key),
-        referrer=(body.referrer or "")[:500] or None,
-    )
-    db.add(pv)
-    try:
-        await db.commit()
-    except Exception as e:
-        logger.warning(f"pageview commit failed: {e}")
-        await db.rollback()
-        return {"recorded": False, "reason": "db_error"}
+    # created_at and the session salt share one instant, so the row lands in
+    # the same UTC day its session id was salted with.
+    now = datetime.now(timezone.utc)
+    day_key = now.strftime("%Y-%m-%d")
+    enqueue_pageview({
+        "id": uuid.uuid4(),
+        "created_at": now,
+        "path": body.path[:500],
+        "ip_hash": _ip_hash(ip_raw, day_key),
+        "user_agent": user_agent[:500] if user_agent else None,
+        "session_id": _session_id(ip_raw, user_agent, day_key),
+        "referrer": (body.referrer or "")[:500] or None,
+    })
     return {"recorded": True}
 
 
@@ -215,65 +216,52 @@ async def get_stats(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    """Superadmin-only traffic dashboard payload."""
+    """Superadmin-only traffic dashboard payload (from the daily rollups)."""
     _ensure_superadmin(current_user)
     days = max(1, min(days, 365))
-    now = datetime.now(timezone.utc)
-    since = now - timedelta(days=days)
-    today_start = datetime.combine(now.date(), datetime.min.time(), tzinfo=timezone.utc)
-
-    # Aggregate KPI counters in one trip when possible.
-    total_q = await db.execute(select(func.count(PageView.id)))
-    total_views = total_q.scalar() or 0
+    today = today_utc()
+    since = today - timedelta(days=days - 1)
+    # Windows are whole UTC days, today included.
+    window_start = min(since, today - timedelta(days=29))
 
-    today_q = await db.execute(select(func.count(PageView.id)).where(PageView.created_at >= today_start))
-    today_views = today_q.scalar() or 0
-
-    views_7d_q = await db.execute(select(func.count(PageView.id)).where(PageView.created_at >= (now - timedelta(days=7))))
-    views_7d = views_7d_q.scalar() or 0
-
-    views_30d_q = await db.execute(select(func.count(PageView.id)).where(PageView.created_at >= (now - timedelta(days=30))))
-    views_30d = views_30d_q.scalar() or 0
+    daily_q = await db.execute(
+        select(PageViewDaily.day, PageViewDaily.views, PageViewDaily.unique_visitors)
+        .where(PageViewDaily.day >= window_start)
+        .order_by(PageViewDaily.day.asc())
+    )
+    rows = daily_q.all()
 
-    u7_q = await db.execute(select(func.count(func.distinct(PageView.session_id))).where(PageView.created_at >= (now - timedelta(days=7))))
-    unique_7d = u7_q.scalar() or 0
+    def _window(n: int, field: str) -> int:
+        start = today - timedelta(days=n - 1)
+        return sum(getattr(r, field) for r in rows if r.day >= start)
 
-    u30_q = await db.execute(select(func.count(func.distinct(PageView.session_id))).where(PageView.created_at >= (now - timedelta(days=30))))
-    unique_30d = u30_q.scalar() or 0
+    total_q = await db.execute(select(func.coalesce(func.sum(PageViewDaily.views), 0)))
+    total_views = total_q.scalar() or 0
 
     # Top paths (within the selected window).
+    path_views = func.sum(PageViewDailyPath.views)
     top_q = await db.execute(
-        select(PageView.path, func.count(PageView.id).label("views"))
-        .where(PageView.created_at >= since)
-        .group_by(PageView.path)
-        .order_by(func.count(PageView.id).desc())
+        select(PageViewDailyPath.path, path_views.label("views"))
+        .where(PageViewDailyPath.day >= since)
+        .group_by(PageViewDailyPath.path)
+        .order_by(path_views.desc())
         .limit(20)
     )
     top_paths = [{"path": r.path, "views": r.views} for r in top_q]
 
     # Daily histogram (views + unique sessions) for charting.
-    day_expr = func.date_trunc('day', PageView.created_at)
-    daily_q = await db.execute(
-        select(
-            day_expr.label("day"),
-            func.count(PageView.id).label("views"),
-            func.count(func.distinct(PageView.session_id)).label("unique_visitors"),
-        )
-        .where(PageView.created_at >= since)
-        .group_by(day_expr)
-        .order_by(day_expr.asc())
-    )
     daily = [
         DailyBucket(day=r.day.strftime('%Y-%m-%d'), views=r.views, unique_visitors=r.unique_visitors)
-        for r in daily_q
+        for r in rows
+        if r.day >= since and r.views
     ]
 
     return AnalyticsStats(
-        today_views=today_views,
-        views_7d=views_7d,
-        views_30d=views_30d,
-        unique_visitors_7d=unique_7d,
-        unique_visitors_30d=unique_30d,
+        today_views=_window(1, "views"),
+        views_7d=_window(7, "views"),
+        views_30d=_window(30, "views"),
+        unique_visitors_7d=_window(7, "unique_visitors"),
+        unique_visitors_30d=_window(30, "unique_visitors"),
         total_views=total_views,
         top_paths=top_paths,
         daily=daily,
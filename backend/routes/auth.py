@@ -10,8 +10,6 @@ from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, delete
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from models.schemas import UserCreate, UserLogin, TokenResponse, ForgotPasswordRequest
 from pydantic import BaseModel, EmailStr
@@ -22,6 +20,7 @@ from core.security import (
     COOKIE_NAME, REFRESH_COOKIE_NAME,
 )
 from core.config import FRONTEND_URL, JWT_SECRET
+from core.rate_limit import limiter
 from database.supabase import get_db
 from database.models import RefreshToken, User
 from database.supabase_repositories import (
@@ -37,7 +36,6 @@ from services.email_service import (
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 logger = logging.getLogger(__name__)
-limiter = Limiter(key_func=get_remote_address)
 
 
 # ── Helpers ────────────────────────────────────────────────────────
@@ -251,7 +249,7 @@ async def login(request: Request, credentials: UserLogin, db: AsyncSession = Dep
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    result = await db.execute(select(User).where(User.email == credentials.email))
+    result = await db.execute(select(User).where(User.id == uuid.UUID(user["id"])))
     user_obj = result.scalar_one_or_none()
 
     if not user_obj or not verify_password(credentials.password, user_obj.password_hash):
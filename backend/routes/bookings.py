@@ -7,11 +7,10 @@ from datetime import datetime, timezone
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from models.schemas import BookingCreate, Booking, BookingUpdate, PublicBooking
 from core.security import get_current_user
+from core.rate_limit import limiter as _booking_limiter
 from database.supabase import get_db, AsyncSessionLocal
 from database.supabase_repositories import (
     BookingRepositorySupabase, 
@@ -53,7 +52,6 @@ class AssignLecturerRequest(PydanticBaseModel):
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 logger = logging.getLogger(__name__)
-_booking_limiter = Limiter(key_func=get_remote_address)
 
 # Fields to strip from public booking responses
 _INTERNAL_BOOKING_FIELDS = {
@@ -706,6 +704,7 @@ async def bulk_update_booking_status(
             preferences = normalize_notifications(
                 (institution or {}).get("notification_settings")
             )
+            freed_slots = []
             for booking in bookings_before:
                 old_status = booking.get("status")
                 if old_status == request.status:
@@ -742,18 +741,9 @@ async def bulk_update_booking_status(
                             )
                             template_name = "reservation_cancelled"
                         
-                        # Waitlist Phase 2: notify candidates about freed slot
-                        try:
-                            from services.waitlist_service import on_booking_cancelled
-                            await on_booking_cancelled(
-                                db,
-                                program_id=booking.get("program_id", ""),
-                                date=booking.get("date", ""),
-                                time_block=booking.get("time_block", ""),
-                                institution_id=current_user["institution_id"],
-                            )
-                        except Exception as wl_err:
-                            logger.warning(f"Waitlist notify on cancel failed: {wl_err}")
+                        freed_slots.append((
+                            booking.get("program_id", ""), booking.get("date", ""), booking.get("time_block", ""),
+                        ))
                     
                     if email_result and template_name:
                         await log_repo.create({
@@ -768,6 +758,14 @@ async def bulk_update_booking_status(
                         })
                 except Exception as e:
                     logger.error(f"Bulk email error for booking {booking.get('id')}: {str(e)}")
+            
+            # Waitlist Phase 2: all freed slots matched in one query, one email batch
+            if freed_slots:
+                try:
+                    from services.waitlist_service import on_slots_freed
+                    await on_slots_freed(db, freed_slots, reason='bulk_cancelled')
+                except Exception as wl_err:
+                    logger.warning(f"Waitlist notify on bulk cancel failed: {wl_err}")
         except Exception as e:
             logger.error(f"Bulk email send failed: {str(e)}")
     
@@ -5,19 +5,20 @@ Reuses existing `programs` table. Programs are opted-in via `is_in_catalog`
 toggle on each program (admin-controlled). No duplication.
 """
 import logging
+import re
 from typing import Optional, List, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.pagination import decode_cursor, encode_cursor, parse_datetime, parse_uuid
+from core.rate_limit import limiter
+from core.response_cache import cached_response
 from database.supabase import get_db
 
 router = APIRouter(prefix="/public/catalog", tags=["Public Catalog"])
 logger = logging.getLogger(__name__)
-limiter = Limiter(key_func=get_remote_address)
 
 
 # ---- Helpers ----
@@ -45,6 +46,27 @@ def _age_label(code: str) -> str:
     }.get(code or "", code or "")
 
 
+# Full-text search (see alembic 5a6b7c8d9e0f): `programs.search_vector` uses the
+# `cs_unaccent` configuration, i.e. accent-insensitive words without stemming.
+# Every word is matched as a prefix so "výtvar" finds "výtvarná dílna".
+SEARCH_TS_CONFIG = "public.cs_unaccent"
+SEARCH_MAX_TERMS = 8
+_SEARCH_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _prefix_tsquery(q: Optional[str]) -> Optional[str]:
+    """Turn free text into a `to_tsquery` prefix query ("a:* & b:*").
+
+    Only word characters survive, so user input can never inject tsquery
+    operators. Returns None when nothing searchable is left.
+    """
+    terms = [t for t in _SEARCH_TERM_RE.findall((q or "").lower()) if t.strip("_")]
+    terms = terms[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return " & ".join(f"{t}:*" for t in terms)
+
+
 def _row_to_card(row) -> Dict[str, Any]:
     """Convert DB row (dict) → public card payload (no internal fields, no _id)."""
     target_groups = row.get("target_groups") or []
@@ -79,18 +101,25 @@ def _row_to_card(row) -> Dict[str, Any]:
 
 @router.get("")
 @limiter.limit("60/minute")
+@cached_response("catalog_list", ttl=60, stale_ttl=300, tags=lambda kw: ["catalog"])
 async def list_catalog(
     request: Request,
     db: AsyncSession = Depends(get_db),
     city: Optional[str] = Query(None, description="Filter by institution city (icontains)"),
     age: Optional[str] = Query(None, description="Age slug: ms | zs1 | zs2 | ss"),
     category: Optional[str] = Query(None, description="Subject tag (icontains)"),
-    q: Optional[str] = Query(None, description="Free text in name/description"),
+    q: Optional[str] = Query(None, description="Full-text search (name, tags, institution, description)"),
     sort: str = Query("popular", description="popular | newest"),
     limit: int = Query(60, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page (replaces offset)"),
 ):
-    """List public catalog programs with filters. Only `is_in_catalog=TRUE` programs."""
+    """List public catalog programs with filters. Only `is_in_catalog=TRUE` programs.
+
+    With `q`, results are ranked by text relevance (boosted by popularity)
+    unless `sort=newest` is requested explicitly. Pages are keyset based:
+    pass `next_cursor` back as `cursor`; `offset` is kept for older clients.
+    """
     where = [
         "p.is_in_catalog = TRUE",
         "p.deleted_at IS NULL",
@@ -101,8 +130,13 @@ async def list_catalog(
     params: Dict[str, Any] = {}
 
     if city:
-        where.append("LOWER(i.city) LIKE :city")
-        params["city"] = f"%{city.lower().strip()}%"
+        # Accent-insensitive substring, or a close match for typos ("Plzen", "Olomuoc");
+        # both served by idx_institutions_city_trgm.
+        where.append(
+            "(public.catalog_unaccent(i.city) LIKE '%' || public.catalog_unaccent(:city) || '%'"
+            " OR public.catalog_unaccent(:city) <% public.catalog_unaccent(i.city))"
+        )
+        params["city"] = city.strip()
 
     if age:
         codes = AGE_SLUG_MAP.get(age.lower())
@@ -114,14 +148,53 @@ async def list_catalog(
             params["age_codes"] = codes
 
     if category:
-        where.append("EXISTS (SELECT 1 FROM unnest(p.subject_tags) tag WHERE LOWER(tag) LIKE :cat)")
-        params["cat"] = f"%{category.lower().strip()}%"
+        # Tags joined with '|' so a match cannot span two tags (idx_programs_catalog_tags_trgm).
+        where.append("public.catalog_tags_text(p.subject_tags) LIKE '%' || public.catalog_unaccent(:cat) || '%'")
+        params["cat"] = category.strip()
+
+    tsquery = _prefix_tsquery(q)
+    rank_sql = "NULL::real"
+    if tsquery:
+        # Full-text hit on name/tags/institution/description, or a fuzzy
+        # word match on the program name for typos.
+        where.append(
+            f"(p.search_vector @@ to_tsquery('{SEARCH_TS_CONFIG}', :tsq)"
+            " OR public.catalog_unaccent(:q) <% public.catalog_unaccent(p.name_cs))"
+        )
+        params["tsq"] = tsquery
+        params["q"] = q.strip()
+        # Text relevance first, nudged by popularity (log-damped so a
+        # popular but barely matching program can't outrank an exact hit).
+        rank_sql = (
+            f"((ts_rank(p.search_vector, to_tsquery('{SEARCH_TS_CONFIG}', :tsq))"
+            " + 0.5 * word_similarity(public.catalog_unaccent(:q), public.catalog_unaccent(p.name_cs)))"
+            " * (1 + ln(1 + COALESCE(pp.reservation_count, 0)) / 10))::real"
+        )
 
-    if q:
-        where.append("(LOWER(p.name_cs) LIKE :q OR LOWER(p.description_cs) LIKE :q)")
-        params["q"] = f"%{q.lower().strip()}%"
+    # Every ordering ends with (created_at, id) so the keyset is unique.
+    if sort == "newest":
+        key_sql, key_parsers, key_fields = [], [], []
+    elif tsquery:
+        key_sql, key_parsers, key_fields = [rank_sql], [float], ["search_rank"]
+    else:
+        key_sql, key_parsers, key_fields = ["COALESCE(pp.reservation_count, 0)"], [int], ["reservation_count"]
+    key_sql += ["p.created_at", "p.id"]
+    key_parsers += [parse_datetime, parse_uuid]
+    key_fields += ["created_at", "id"]
+    order_sql = ", ".join(f"{k} DESC" for k in key_sql)
 
-    order_sql = "p.created_at DESC" if sort == "newest" else "reservation_count DESC NULLS LAST, p.created_at DESC"
+    # The total ignores the cursor; keep a copy of the plain filters for it.
+    filter_where = list(where)
+    filter_params = dict(params)
+
+    after = decode_cursor(cursor, key_parsers)
+    if after is not None:
+        # All keys are DESC, so "after the last row" is one row-value comparison.
+        where.append(
+            f"({', '.join(key_sql)}) < ({', '.join(f':c{i}' for i in range(len(after)))})"
+        )
+        params.update({f"c{i}": v for i, v in enumerate(after)})
+        offset = 0
 
     sql = f"""
         SELECT
@@ -129,14 +202,11 @@ async def list_catalog(
             p.duration, p.min_capacity, p.max_capacity, p.price, p.pricing_info,
             p.image_url, p.age_group, p.target_groups, p.subject_tags, p.created_at,
             i.name AS institution_name, i.city AS institution_city,
-            COALESCE(rc.cnt, 0) AS reservation_count
+            COALESCE(pp.reservation_count, 0) AS reservation_count,
+            {rank_sql} AS search_rank
         FROM programs p
         JOIN institutions i ON i.id = p.institution_id
-        LEFT JOIN (
-            SELECT program_id, COUNT(*) AS cnt FROM reservations
-            WHERE status IN ('confirmed','pending_approval','done','approved')
-            GROUP BY program_id
-        ) rc ON rc.program_id = p.id
+        LEFT JOIN program_popularity pp ON pp.program_id = p.id
         WHERE {" AND ".join(where)}
         ORDER BY {order_sql}
         LIMIT :limit OFFSET :offset
@@ -155,10 +225,9 @@ async def list_catalog(
     count_sql = f"""
         SELECT COUNT(*) FROM programs p
         JOIN institutions i ON i.id = p.institution_id
-        WHERE {" AND ".join(where)}
+        WHERE {" AND ".join(filter_where)}
     """
-    count_params = {k: v for k, v in params.items() if k not in ("limit", "offset")}
-    total = (await db.execute(text(count_sql), count_params)).scalar() or 0
+    total = (await db.execute(text(count_sql), filter_params)).scalar() or 0
 
     # Distinct cities & categories from currently-public programs (for filter UI)
     facets = await db.execute(text(
@@ -187,6 +256,7 @@ async def list_catalog(
         "total": int(total),
         "limit": limit,
         "offset": offset,
+        "next_cursor": encode_cursor([rows[-1][f] for f in key_fields]) if len(rows) == limit else None,
         "facets": {
             "cities":     sorted(cities, key=lambda s: s.lower()),
             "categories": sorted(cats, key=lambda s: s.lower()),
@@ -202,6 +272,7 @@ async def list_catalog(
 
 @router.get("/{program_id}")
 @limiter.limit("60/minute")
+@cached_response("catalog_detail", ttl=120, stale_ttl=600, tags=lambda kw: ["catalog"])
 async def get_catalog_detail(
     program_id: str,
     request: Request,
@@ -214,14 +285,10 @@ async def get_catalog_detail(
             p.duration, p.min_capacity, p.max_capacity, p.price, p.pricing_info,
             p.image_url, p.age_group, p.target_groups, p.subject_tags, p.created_at,
             i.name AS institution_name, i.city AS institution_city, i.address AS institution_address,
-            COALESCE(rc.cnt, 0) AS reservation_count
+            COALESCE(pp.reservation_count, 0) AS reservation_count
         FROM programs p
         JOIN institutions i ON i.id = p.institution_id
-        LEFT JOIN (
-            SELECT program_id, COUNT(*) AS cnt FROM reservations
-            WHERE status IN ('confirmed','pending_approval','done','approved')
-            GROUP BY program_id
-        ) rc ON rc.program_id = p.id
+        LEFT JOIN program_popularity pp ON pp.program_id = p.id
         WHERE p.id = :pid
           AND p.is_in_catalog = TRUE
           AND p.deleted_at IS NULL
@@ -1,7 +1,7 @@
 """Contacts API (Phase 76 — M1).
 
 Endpoints:
-    GET    /api/contacts                  → list with filters
+    GET    /api/contacts                  → keyset-paginated list with filters
     GET    /api/contacts/{id}             → detail with link history
     PATCH  /api/contacts/{id}             → update note/type/marketing_consent
     POST   /api/contacts                  → manual add
@@ -24,10 +24,15 @@ from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy import select, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.pagination import decode_cursor, encode_cursor, parse_datetime, parse_uuid
 from core.security import get_current_user
 from database.models import Contact, ContactLink, MarketingSubscription
 from database.supabase import get_db
 from services.contact_service import (
+    contact_facets,
+    contact_filters,
+    contact_sort_key,
+    count_contacts,
     list_contacts_for_institution,
     list_links_for_contact,
 )
@@ -35,6 +40,8 @@ from services.feature_flags import is_feature_enabled
 
 
 CONTACTS_FEATURE_KEY = "contacts_module"
+# The list total is counted exactly up to this many contacts, then shown as "N+".
+CONTACTS_COUNT_CAP = 10000
 
 
 async def require_contacts_module(
@@ -133,6 +140,14 @@ class ContactUpdate(BaseModel):
     note: Optional[str] = None
 
 
+class ContactPage(BaseModel):
+    items: list[ContactOut]
+    next_cursor: Optional[str] = None
+    # Only on the first page (no cursor); `total_exact` is False past CONTACTS_COUNT_CAP.
+    total: Optional[int] = None
+    total_exact: bool = True
+
+
 class ContactStats(BaseModel):
     total: int
     with_consent: int
@@ -189,33 +204,38 @@ def _institution_id_from_user(user: dict) -> uuid.UUID:
 
 # ── Endpoints ─────────────────────────────────────────────────────────────
 
-@router.get("", response_model=list[ContactOut])
+@router.get("", response_model=ContactPage)
 async def list_contacts(
     type: Optional[str] = Query(None, alias="type"),
     source: Optional[str] = None,
     consent: Optional[str] = None,
     deliverability: Optional[str] = None,
     search: Optional[str] = None,
-    limit: int = Query(500, ge=1, le=2000),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
     _guard=Depends(require_contacts_module),
 ):
+    """Contacts ordered by last activity; pass `next_cursor` back as `cursor`."""
     inst = _institution_id_from_user(current_user)
-    contacts = await list_contacts_for_institution(
-        db, inst,
+    after = decode_cursor(cursor, (parse_datetime, parse_datetime, parse_uuid))
+    filters = dict(
         type_filter=type, source_filter=source, consent_filter=consent,
-        search=search, limit=limit,
+        deliverability_filter=deliverability, search=search,
+    )
+    contacts = await list_contacts_for_institution(
+        db, inst, **filters, limit=limit, after=tuple(after) if after else None,
     )
-    if deliverability:
-        requested = {
-            'problem': {'bounced_hard', 'complained', 'suppressed', 'unsubscribed', 'failed'},
-            'warning': {'bounced_soft'},
-            'ok': {'delivered'},
-            'unknown': {'unknown'},
-        }.get(deliverability, {deliverability})
-        contacts = [c for c in contacts if (c.deliverability_status or 'unknown') in requested]
-    return [_to_out(c) for c in contacts]
+    page = ContactPage(
+        items=[_to_out(c) for c in contacts],
+        next_cursor=encode_cursor(contact_sort_key(contacts[-1])) if len(contacts) == limit else None,
+    )
+    if after is None:
+        page.total, page.total_exact = await count_contacts(
+            db, contact_filters(inst, **filters), CONTACTS_COUNT_CAP,
+        )
+    return page
 
 
 @router.get("/stats", response_model=ContactStats)
@@ -225,21 +245,7 @@ async def contacts_stats(
     _guard=Depends(require_contacts_module),
 ):
     inst = _institution_id_from_user(current_user)
-    base = select(func.count(Contact.id)).where(Contact.institution_id == inst)
-    total = (await db.execute(base)).scalar() or 0
-    with_c = (await db.execute(base.where(Contact.marketing_consent.is_(True)))).scalar() or 0
-    without_c = (await db.execute(base.where(Contact.marketing_consent.is_(False)))).scalar() or 0
-    unknown_c = (await db.execute(base.where(Contact.marketing_consent.is_(None)))).scalar() or 0
-    schools = (await db.execute(base.where(Contact.type.in_(['pedagog', 'skola'])))).scalar() or 0
-    public = (await db.execute(base.where(Contact.type.in_(['rodic', 'verejnost'])))).scalar() or 0
-    undeliverable = (await db.execute(base.where(Contact.deliverability_status.in_(
-        ['bounced_hard', 'complained', 'suppressed', 'unsubscribed', 'failed']
-    )))).scalar() or 0
-    return ContactStats(
-        total=total, with_consent=with_c, without_consent=without_c,
-        unknown_consent=unknown_c, schools=schools, public=public,
-        undeliverable=undeliverable,
-    )
+    return ContactStats(**await contact_facets(db, inst))
 
 
 @router.get("/export.csv")
@@ -247,6 +253,7 @@ async def export_csv(
     type: Optional[str] = Query(None, alias="type"),
     source: Optional[str] = None,
     consent: Optional[str] = None,
+    deliverability: Optional[str] = None,
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
@@ -255,7 +262,8 @@ async def export_csv(
     inst = _institution_id_from_user(current_user)
     contacts = await list_contacts_for_institution(
         db, inst, type_filter=type, source_filter=source,
-        consent_filter=consent, search=search, limit=10000,
+        consent_filter=consent, deliverability_filter=deliverability,
+        search=search, limit=10000,
     )
     buf = io.StringIO()
     w = csv.writer(buf, delimiter=';')
@@ -8,8 +8,9 @@ Public flow:
 3. Provider POSTs webhook → /api/event-payments/webhook/comgate.
 4. Webhook updates EventPayment.status, and for auto_confirm_paid enabled
    institutions auto-confirms the application.
-5. Provider redirects user back → /payment/return?vs=...&status=... on frontend,
-   which polls GET /api/event-payments/by-vs/{vs} until status is final.
+5. Provider redirects user back → /payment/return?refId=... on frontend,
+   which long-polls GET /api/event-payments/by-ref/{refId}?wait=... (or polls
+   GET /api/event-payments/by-vs/{institution}/{vs}) until status is final.
 
 Feature gated by `events_payments` (PRO+).
 """
@@ -17,7 +18,7 @@ import logging
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
 from sqlalchemy import select, and_
@@ -25,10 +26,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.supabase import get_db
 from database.models import (
-    EventApplication, EventPayment, Event, EventDate, Institution,
+    EventApplication, EventPayment, Event, Institution,
     InstitutionPaymentSettings,
 )
+from core.rate_limit import limiter
+from core.response_cache import invalidate_public_cache
 from services.payment_gateways import get_gateway_for_institution, GatewayMode
+from services.payment_status import (
+    FINAL_PAYMENT_STATUSES, PAYMENT_STATUS_MAX_WAIT,
+    load_payment_status, payment_status_tag, payment_status_version, wait_for_payment_change,
+)
 from services.plan_service import has_feature_access
 
 logger = logging.getLogger(__name__)
@@ -44,20 +51,6 @@ class InitiateBody(BaseModel):
 
 # ---- Helpers ----
 
-def _mask_email(email: str | None) -> str | None:
-    """GDPR: partially mask an e-mail for public confirmation pages so a third
-    party who knows only the (unguessable) refId can't harvest the full address.
-    e.g. ``jan.novak@skola.cz`` -> ``ja***@skola.cz``."""
-    if not email or "@" not in email:
-        return email
-    local, _, domain = email.partition("@")
-    if len(local) <= 2:
-        masked_local = local[0] + "***"
-    else:
-        masked_local = local[:2] + "***"
-    return f"{masked_local}@{domain}"
-
-
 def _to_dict(obj) -> dict:
     if obj is None:
         return None
@@ -202,6 +195,7 @@ async def initiate_payment(
     payment.status = "pending"
     application.payment_status = "pending"
     await db.commit()
+    await invalidate_public_cache(db, payment_status_tag(application.id))
 
     return {
         "ok": True,
@@ -298,6 +292,7 @@ async def comgate_webhook(request: Request, db: AsyncSession = Depends(get_db)):
         payment.status = "pending"
 
     await db.commit()
+    await invalidate_public_cache(db, payment_status_tag(payment.application_id))
     # Comgate expects plain-text ack
     return Response(content="code=0&message=OK", media_type="text/plain")
 
@@ -335,10 +330,12 @@ async def mock_complete(body: MockCompleteBody, db: AsyncSession = Depends(get_d
     if body.outcome == "paid":
         await _process_payment_paid(db, payment, payment.provider_payment_id)
         await db.commit()
+        await invalidate_public_cache(db, payment_status_tag(payment.application_id))
         return {"ok": True, "status": "paid"}
 
     payment.status = "failed"
     await db.commit()
+    await invalidate_public_cache(db, payment_status_tag(payment.application_id))
     return {"ok": True, "status": "failed"}
 
 
@@ -347,6 +344,7 @@ async def mock_complete(body: MockCompleteBody, db: AsyncSession = Depends(get_d
 @router.get("/by-ref/{ref_id}")
 async def get_payment_by_ref(
     ref_id: str,
+    wait: float = Query(0, ge=0, le=PAYMENT_STATUS_MAX_WAIT),
     db: AsyncSession = Depends(get_db),
 ):
     """Public lookup by ``refId`` (= application_id).
@@ -354,78 +352,42 @@ async def get_payment_by_ref(
     Used by the customer-return page when Comgate-portal-configured URLs are
     in play (they substitute ``${refId}`` automatically without needing the
     institution_id). We resolve institution from the application itself.
+
+    With ``wait`` (seconds) a payment that is not final yet is answered when
+    its state changes (webhook) or the wait runs out — long-polling instead
+    of a request every few seconds.
     """
     try:
         app_uuid = uuid.UUID(ref_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Neplatný refId")
 
-    pay_result = await db.execute(
-        select(EventPayment).where(
-            EventPayment.application_id == app_uuid
-        ).order_by(EventPayment.created_at.desc()).limit(1)
-    )
-    payment = pay_result.scalar_one_or_none()
-    if not payment:
+    version = payment_status_version(app_uuid)
+    status = await load_payment_status(db, app_uuid)
+    if not status:
         raise HTTPException(status_code=404, detail="Platba nenalezena")
 
-    app_res = await db.execute(select(EventApplication).where(EventApplication.id == payment.application_id))
-    app = app_res.scalar_one_or_none()
-
-    # Enrich with event/institution info so the customer-return page can render
-    # a full order summary without a second API roundtrip.
-    event_info = None
-    institution_name = None
-    if app:
-        try:
-            from database.models import Event, EventDate, Institution
-            ev_res = await db.execute(select(Event).where(Event.id == app.event_id))
-            ev = ev_res.scalar_one_or_none()
-            ed = None
-            if app.event_date_id:
-                ed_res = await db.execute(select(EventDate).where(EventDate.id == app.event_date_id))
-                ed = ed_res.scalar_one_or_none()
-            inst_res = await db.execute(select(Institution).where(Institution.id == payment.institution_id))
-            inst = inst_res.scalar_one_or_none()
-            if ev:
-                event_info = {
-                    "id": str(ev.id),
-                    "title": ev.name,
-                    "starts_at": (ed.start_datetime.isoformat() if ed and ed.start_datetime else None),
-                    "ends_at": (ed.end_datetime.isoformat() if ed and ed.end_datetime else None),
-                    "image_url": ev.image_url,
-                }
-            if inst:
-                institution_name = inst.name
-        except Exception as e:
-            logger.warning(f"by-ref enrichment failed: {e}")
-
-    return {
-        "payment_status": payment.status,
-        "amount": payment.amount,
-        "currency": payment.currency,
-        "provider": payment.provider,
-        "variable_symbol": payment.variable_symbol,
-        "institution_id": str(payment.institution_id),
-        "institution_name": institution_name,
-        "application_id": str(payment.application_id),
-        "application_status": app.status if app else None,
-        "application_payment_status": app.payment_status if app else None,
-        "applicant_name": app.applicant_name if app else None,
-        "applicant_email": _mask_email(app.applicant_email) if app else None,
-        "total_amount": app.total_amount if app else None,
-        "paid_at": payment.paid_at.isoformat() if payment.paid_at else None,
-        "event": event_info,
-    }
+    if wait and status["payment_status"] not in FINAL_PAYMENT_STATUSES:
+        # Don't hold a pooled connection while waiting
+        await db.rollback()
+        if await wait_for_payment_change(app_uuid, wait, since=version):
+            status = await load_payment_status(db, app_uuid) or status
+    return status
 
 
 @router.get("/by-vs/{institution_id}/{variable_symbol}")
+@limiter.limit("40/minute")  # the return page polls every 2 s
 async def get_payment_by_vs(
+    request: Request,
     institution_id: str,
     variable_symbol: str,
     db: AsyncSession = Depends(get_db),
 ):
-    """Public lookup so the return page can poll for final status."""
+    """Public lookup so the return page can poll for final status.
+
+    Knowing a VS is not a secret, so the answer carries no ``application_id``
+    (it would unlock the applicant details of ``/by-ref``).
+    """
     pay_result = await db.execute(
         select(EventPayment).where(and_(
             EventPayment.institution_id == institution_id,
@@ -445,7 +407,6 @@ async def get_payment_by_vs(
         "currency": payment.currency,
         "provider": payment.provider,
         "variable_symbol": payment.variable_symbol,
-        "application_id": str(payment.application_id),
         "application_status": app.status if app else None,
         "application_payment_status": app.payment_status if app else None,
         "paid_at": payment.paid_at.isoformat() if payment.paid_at else None,
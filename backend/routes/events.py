@@ -3,64 +3,30 @@ Events module API routes (Pilot feature).
 Handles: Events CRUD, EventDates, Applications, Payments, Feature flags.
 """
 import uuid
-import random
 import hashlib
 import hmac
 import logging
 from datetime import datetime, timezone
 from typing import Optional, List
 from urllib.parse import quote as url_quote
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, delete, text
-
-# A10 — application statuses that occupy a real capacity seat (waitlist + rejected
-# do NOT count against capacity).
-OCCUPYING_STATUSES = ('pending', 'approved')
+from sqlalchemy import select, func, and_, delete
 
 
 async def _resolve_application_status(db, event, event_date_uuid) -> str:
-    """Atomically decide whether a new application gets a confirmed seat
-    ('pending') or goes onto the WAITLIST ('waitlist').
+    """Claim a seat for a new application ('pending') or put it on the
+    WAITLIST ('waitlist') when the date / event is full.
 
-    Uses a transaction-scoped PostgreSQL advisory lock keyed on the event/date so
-    concurrent submissions can't overbook (race-safe). Capacity <= 0 / None means
-    unlimited → always 'pending'.
+    One conditional UPDATE on the seat counter (services.event_seats), so
+    concurrent submissions can't overbook. It locks the counter row until
+    commit — call it right before inserting the application.
     """
-    if event_date_uuid:
-        ed = (await db.execute(
-            select(EventDate).where(EventDate.id == event_date_uuid)
-        )).scalar_one_or_none()
-        capacity = (ed.capacity_override if ed and ed.capacity_override is not None
-                    else event.capacity)
-    else:
-        capacity = event.capacity
+    claimed = await claim_seat(db, event.id, event_date_uuid)
+    return 'pending' if claimed else 'waitlist'
 
-    if not capacity or capacity <= 0:
-        return 'pending'
-
-    lock_basis = str(event_date_uuid) if event_date_uuid else str(event.id)
-    lock_key = int(hashlib.sha256(lock_basis.encode()).hexdigest()[:15], 16)
-    await db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": lock_key})
-
-    if event_date_uuid:
-        cond = and_(
-            EventApplication.event_date_id == event_date_uuid,
-            EventApplication.status.in_(OCCUPYING_STATUSES),
-        )
-    else:
-        cond = and_(
-            EventApplication.event_id == event.id,
-            EventApplication.event_date_id.is_(None),
-            EventApplication.status.in_(OCCUPYING_STATUSES),
-        )
-    occupied = (await db.execute(
-        select(func.count(EventApplication.id)).where(cond)
-    )).scalar() or 0
-
-    return 'waitlist' if occupied >= capacity else 'pending'
 
 from database.supabase import get_db
 from database.models import (
@@ -69,10 +35,14 @@ from database.models import (
 )
 from core.security import get_current_user
 from core.config import JWT_SECRET
+from core.response_cache import cached_response, invalidate_public_cache
 from services.feature_flags import is_feature_enabled
+from services.institution_context import FEATURE_FLAGS_TAG
 from services.plan_service import require_feature
 from services.payment_gateways.factory import _detect_mode
 from services.contact_service import upsert_contact_from_event_application
+from services.event_seats import OCCUPYING_STATUSES, claim_seat, next_variable_symbol
+from services.payment_status import payment_status_tag
 from services.email_service import trigger_event_application_confirmation
 from core.permissions import (
     ensure_role, MANAGEMENT_ROLES, EVENT_MANAGE_ROLES, PAYMENTS_ROLES, MARK_PAID_ROLES,
@@ -85,6 +55,11 @@ logger = logging.getLogger(__name__)
 FEATURE_KEY = "events_module"
 
 
+def _public_events_tag(institution_id) -> str:
+    """Cache tag of an institution's public event data (events and dates)."""
+    return f"events:{str(institution_id).lower()}"
+
+
 # ============ Guards ============
 
 def _parse_public_uuid(value: str, field_name: str) -> uuid.UUID:
@@ -256,37 +231,6 @@ def _effective_registration_deadline(event: Event, event_date: Optional[EventDat
     return event_date.start_datetime if event_date else None
 
 
-def _generate_variable_symbol() -> str:
-    """Generate a random 10-digit variable symbol (no uniqueness guarantee).
-
-    Prefer `_generate_unique_variable_symbol` which checks for collisions.
-    """
-    return str(random.randint(1000000000, 9999999999))
-
-
-async def _generate_unique_variable_symbol(db, institution_id, max_attempts: int = 12) -> str:
-    """Generate a 10-digit VS that is unique within the institution.
-
-    VS is matched per-tenant (institution_id + variable_symbol) by the payment
-    lookups/reconciliation, so a duplicate inside the same institution could
-    mis-link a manual/QR bank transfer to the wrong application. We retry until
-    we find a free VS among existing EventApplications of this institution.
-    """
-    for _ in range(max_attempts):
-        vs = _generate_variable_symbol()
-        existing = await db.execute(
-            select(EventApplication.id).where(and_(
-                EventApplication.institution_id == institution_id,
-                EventApplication.variable_symbol == vs,
-            )).limit(1)
-        )
-        if existing.scalar_one_or_none() is None:
-            return vs
-    # Astronomically unlikely fallback (institution would need ~billions of rows).
-    logger.warning(f"VS uniqueness fallback after {max_attempts} attempts for institution {institution_id}")
-    return _generate_variable_symbol()
-
-
 def _generate_qr_payload(
     account_number: str,
     bank_code: str,
@@ -481,6 +425,7 @@ async def create_event(
     db.add(event)
     await db.commit()
     await db.refresh(event)
+    await invalidate_public_cache(db, _public_events_tag(inst_uuid))
     return _to_dict(event)
 
 
@@ -609,6 +554,7 @@ async def update_event(
 
     await db.commit()
     await db.refresh(event)
+    await invalidate_public_cache(db, _public_events_tag(event.institution_id))
     return _to_dict(event)
 
 
@@ -635,6 +581,7 @@ async def delete_event(
 
     await db.delete(event)
     await db.commit()
+    await invalidate_public_cache(db, _public_events_tag(inst_uuid))
     return {"message": "Událost smazána"}
 
 
@@ -685,6 +632,7 @@ async def add_event_date(
     db.add(event_date)
     await db.commit()
     await db.refresh(event_date)
+    await invalidate_public_cache(db, _public_events_tag(current_user["institution_id"]))
     return _to_dict(event_date)
 
 
@@ -731,6 +679,7 @@ async def update_event_date(
     event_date.registration_deadline_override = deadline_override
     await db.commit()
     await db.refresh(event_date)
+    await invalidate_public_cache(db, _public_events_tag(current_user["institution_id"]))
     return _to_dict(event_date)
 
 
@@ -757,6 +706,7 @@ async def remove_event_date(
 
     await db.delete(ed)
     await db.commit()
+    await invalidate_public_cache(db, _public_events_tag(current_user["institution_id"]))
     return {"message": "Termín odstraněn"}
 
 
@@ -867,6 +817,7 @@ async def update_application_status(
     app.updated_at = datetime.now(timezone.utc)
 
     await db.commit()
+    await invalidate_public_cache(db, payment_status_tag(app.id))
     return _to_dict(app)
 
 
@@ -1007,27 +958,64 @@ async def export_application_pdf(
 # ============ Public Endpoints ============
 
 @router.get("/public/{institution_id}")
+@cached_response("public_events", ttl=15, stale_ttl=60,
+                 tags=lambda kw: [_public_events_tag(kw["institution_id"]), FEATURE_FLAGS_TAG])
 async def get_public_events(
     institution_id: str,
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get active events for public display (no auth required)."""
+    """Get active events for public display (no auth required).
+
+    Three queries whatever the number of events: events (with an "has any
+    date" flag), all their future dates, application counts grouped by event.
+    The response is cached per institution and dropped on every event / date
+    change; ``applications_count`` may lag by the TTL since new applications
+    do not invalidate it.
+    """
     enabled = await is_feature_enabled(db, FEATURE_KEY, institution_id)
     if not enabled:
         raise HTTPException(status_code=404, detail="Not found")
 
-    inst_uuid = uuid.UUID(institution_id)
+    inst_uuid = _parse_public_uuid(institution_id, "instituce")
+    has_dates = select(EventDate.id).where(EventDate.event_id == Event.id).exists()
     result = await db.execute(
-        select(Event).where(and_(
+        select(Event, has_dates).where(and_(
             Event.institution_id == inst_uuid,
             Event.is_active == True,
             Event.is_archived == False,
         )).order_by(Event.created_at.desc())
     )
-    events = result.scalars().all()
+    rows = result.all()
+    if not rows:
+        return []
+    event_ids = [ev.id for ev, _ in rows]
+
+    now = datetime.now(timezone.utc)
+    future_dates = {}
+    dates_result = await db.execute(
+        select(EventDate).where(and_(
+            EventDate.event_id.in_(event_ids),
+            EventDate.start_datetime > now,
+        )).order_by(EventDate.start_datetime)
+    )
+    for d in dates_result.scalars().all():
+        future_dates.setdefault(d.event_id, []).append(d)
+
+    counts_result = await db.execute(
+        select(EventApplication.event_id, func.count(EventApplication.id)).where(and_(
+            EventApplication.event_id.in_(event_ids),
+            EventApplication.status != 'rejected',
+        )).group_by(EventApplication.event_id)
+    )
+    applications_count = dict(counts_result.all())
 
     out = []
-    for ev in events:
+    for ev, has_any_date in rows:
+        dates = future_dates.get(ev.id, [])
+        # Every date already started → nothing to register for.
+        if not dates and has_any_date:
+            continue
         ev_dict = {
             "id": str(ev.id),
             "name": ev.name,
@@ -1042,23 +1030,8 @@ async def get_public_events(
                 ev.registration_deadline.isoformat() if ev.registration_deadline else None
             ),
         }
-        # Get future dates
-        dates_result = await db.execute(
-            select(EventDate).where(and_(
-                EventDate.event_id == ev.id,
-                EventDate.start_datetime > datetime.now(timezone.utc),
-            )).order_by(EventDate.start_datetime)
-        )
-        future_dates = dates_result.scalars().all()
-        if not future_dates:
-            has_any_date = (await db.execute(
-                select(EventDate.id).where(EventDate.event_id == ev.id).limit(1)
-            )).scalar_one_or_none()
-            if has_any_date is not None:
-                continue
-        now = datetime.now(timezone.utc)
         dates_out = []
-        for d in future_dates:
+        for d in dates:
             dd = _to_dict(d)
             deadline = _effective_registration_deadline(ev, d)
             explicit_deadline = d.registration_deadline_override or ev.registration_deadline
@@ -1068,21 +1041,13 @@ async def get_public_events(
             dd["is_registration_open"] = deadline is None or now < deadline
             dates_out.append(dd)
         ev_dict["dates"] = dates_out
-        ev_dict["accepts_preregistration"] = not future_dates
+        ev_dict["accepts_preregistration"] = not dates
         ev_dict["is_registration_open"] = (
             any(d["is_registration_open"] for d in dates_out)
             if dates_out
             else ev.registration_deadline is None or now < ev.registration_deadline
         )
-
-        # Applications count per date
-        apps_count = await db.execute(
-            select(func.count(EventApplication.id)).where(and_(
-                EventApplication.event_id == ev.id,
-                EventApplication.status != 'rejected',
-            ))
-        )
-        ev_dict["applications_count"] = apps_count.scalar() or 0
+        ev_dict["applications_count"] = applications_count.get(ev.id, 0)
         out.append(ev_dict)
 
     return out
@@ -1142,6 +1107,20 @@ async def get_public_event_detail(
         if has_any_date is not None:
             raise HTTPException(status_code=404, detail="Událost již nemá dostupný termín")
 
+    # Seat-occupying (waitlist/rejected excluded) and waitlisted applications
+    # of every date in one grouped query.
+    counts = {}
+    if dates:
+        counts_result = await db.execute(
+            select(
+                EventApplication.event_date_id,
+                func.count(EventApplication.id).filter(EventApplication.status.in_(OCCUPYING_STATUSES)),
+                func.count(EventApplication.id).filter(EventApplication.status == 'waitlist'),
+            ).where(EventApplication.event_date_id.in_([d.id for d in dates]))
+            .group_by(EventApplication.event_date_id)
+        )
+        counts = {date_id: (taken, waiting) for date_id, taken, waiting in counts_result.all()}
+
     dates_out = []
     now = datetime.now(timezone.utc)
     for d in dates:
@@ -1152,21 +1131,7 @@ async def get_public_event_detail(
             explicit_deadline.isoformat() if explicit_deadline else None
         )
         dd["is_registration_open"] = deadline is None or now < deadline
-        # Count seat-occupying applications for this date (waitlist/rejected excluded)
-        cnt = await db.execute(
-            select(func.count(EventApplication.id)).where(and_(
-                EventApplication.event_date_id == d.id,
-                EventApplication.status.in_(OCCUPYING_STATUSES),
-            ))
-        )
-        dd["applications_count"] = cnt.scalar() or 0
-        wl = await db.execute(
-            select(func.count(EventApplication.id)).where(and_(
-                EventApplication.event_date_id == d.id,
-                EventApplication.status == 'waitlist',
-            ))
-        )
-        dd["waitlist_count"] = wl.scalar() or 0
+        dd["applications_count"], dd["waitlist_count"] = counts.get(d.id, (0, 0))
         dd["capacity"] = (
             d.capacity_override
             if d.capacity_override is not None
@@ -1276,14 +1241,6 @@ async def submit_application(
                 detail="Uzávěrka předzápisu na tuto událost již uplynula.",
             )
 
-    # A10 — race-safe capacity check. When full → onto the waitlist, not rejected.
-    app_status = await _resolve_application_status(db, event, event_date_uuid)
-    is_waitlisted = app_status == 'waitlist'
-
-    # Generate variable symbol (unique within the institution to avoid
-    # mis-linking manual/QR bank transfers to the wrong application).
-    vs = await _generate_unique_variable_symbol(db, inst_uuid)
-
     # Free event → no payment is ever required for this application.
     is_free = (event.price or 0) <= 0
 
@@ -1309,6 +1266,16 @@ async def submit_application(
         else:
             raise HTTPException(status_code=400, detail="Vyberte prosím způsob platby.")
 
+    # Variable symbol from a sequence: unique without collision lookups, so a
+    # manual/QR bank transfer can't be mis-linked to another application.
+    vs = None if is_free else await next_variable_symbol(db)
+
+    # A10 — race-safe capacity check, last before the insert so the seat
+    # counter row stays locked only until the commit below. When full → onto
+    # the waitlist, not rejected.
+    app_status = await _resolve_application_status(db, event, event_date_uuid)
+    is_waitlisted = app_status == 'waitlist'
+
     application = EventApplication(
         institution_id=inst_uuid,
         event_id=event.id,
@@ -1319,7 +1286,7 @@ async def submit_application(
         note=data.note,
         marketing_consent=bool(data.marketing_consent),
         total_amount=0 if is_free else event.price,
-        variable_symbol=None if is_free else vs,
+        variable_symbol=vs,
         status=app_status,
         payment_status="not_required" if is_free else "unpaid",
         payment_method=chosen_method,
@@ -15,7 +15,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func, and_, or_
+from sqlalchemy import select, update, delete, func, and_, or_, tuple_
 import csv
 import io
 
@@ -375,88 +375,65 @@ async def get_feedback_statistics(
     if not check_admin_or_edukator(current_user):
         raise HTTPException(status_code=403, detail="Nemáte oprávnění")
     
-    base_query = (
-        select(Feedback)
+    # One scan for every figure: the () set gives the totals, the other two
+    # sets the rating distribution and the per-program breakdown.
+    rating_grouped = func.grouping(Feedback.overall_rating)
+    program_grouped = func.grouping(Feedback.program_id)
+    stats_query = (
+        select(
+            rating_grouped.label("rating_grouped"),
+            program_grouped.label("program_grouped"),
+            Feedback.overall_rating,
+            Feedback.program_id,
+            Program.name_cs,
+            func.count(Feedback.id).label("responses"),
+            func.avg(Feedback.overall_rating).label("avg_rating"),
+            func.count(Feedback.id).filter(Feedback.would_recommend == True).label("recommended"),
+            func.count(Feedback.id).filter(Feedback.would_recommend.isnot(None)).label("recommend_answered"),
+        )
         .join(Reservation, Feedback.reservation_id == Reservation.id)
+        .outerjoin(Program, Feedback.program_id == Program.id)
         .where(
             Feedback.institution_id == current_user['institution_id'],
             Feedback.status == 'submitted'
         )
+        .group_by(func.grouping_sets(
+            tuple_(),
+            tuple_(Feedback.overall_rating),
+            tuple_(Feedback.program_id, Program.name_cs),
+        ))
     )
     
     if program_id:
-        base_query = base_query.where(Feedback.program_id == program_id)
+        stats_query = stats_query.where(Feedback.program_id == program_id)
     
     if date_from:
-        base_query = base_query.where(Reservation.date >= date_from)
+        stats_query = stats_query.where(Reservation.date >= date_from)
     
     if date_to:
-        base_query = base_query.where(Reservation.date <= date_to)
-    
-    # Total count
-    count_result = await db.execute(
-        select(func.count(Feedback.id)).select_from(base_query.subquery())
-    )
-    total_feedbacks = count_result.scalar() or 0
+        stats_query = stats_query.where(Reservation.date <= date_to)
     
-    # Average rating
-    avg_result = await db.execute(
-        select(func.avg(Feedback.overall_rating))
-        .select_from(base_query.where(Feedback.overall_rating.isnot(None)).subquery())
-    )
-    average_rating = avg_result.scalar()
-    
-    # Recommendation rate
-    rec_result = await db.execute(
-        select(
-            func.count(Feedback.id).filter(Feedback.would_recommend == True),
-            func.count(Feedback.id).filter(Feedback.would_recommend.isnot(None))
-        ).select_from(base_query.subquery())
-    )
-    rec_row = rec_result.one()
+    total_feedbacks = 0
+    average_rating = None
     recommendation_rate = None
-    if rec_row[1] and rec_row[1] > 0:
-        recommendation_rate = round((rec_row[0] / rec_row[1]) * 100, 1)
-    
-    # By rating distribution
     by_rating = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    rating_dist_result = await db.execute(
-        select(Feedback.overall_rating, func.count(Feedback.id))
-        .where(
-            Feedback.institution_id == current_user['institution_id'],
-            Feedback.status == 'submitted',
-            Feedback.overall_rating.isnot(None)
-        )
-        .group_by(Feedback.overall_rating)
-    )
-    for rating, count in rating_dist_result.all():
-        if rating in by_rating:
-            by_rating[rating] = count
-    
-    # By program
-    by_program_result = await db.execute(
-        select(
-            Program.name_cs,
-            func.count(Feedback.id),
-            func.avg(Feedback.overall_rating)
-        )
-        .join(Feedback, Feedback.program_id == Program.id)
-        .where(
-            Feedback.institution_id == current_user['institution_id'],
-            Feedback.status == 'submitted'
-        )
-        .group_by(Program.id, Program.name_cs)
-        .order_by(func.count(Feedback.id).desc())
-        .limit(10)
-    )
-    by_program = [
-        {
-            "program_name": name,
-            "count": count,
-            "avg_rating": round(avg, 2) if avg else None
-        }
-        for name, count, avg in by_program_result.all()
-    ]
+    by_program = []
+    for row in (await db.execute(stats_query)).all():
+        if row.rating_grouped and row.program_grouped:
+            total_feedbacks = row.responses
+            average_rating = row.avg_rating
+            if row.recommend_answered:
+                recommendation_rate = round((row.recommended / row.recommend_answered) * 100, 1)
+        elif not row.rating_grouped:
+            if row.overall_rating in by_rating:
+                by_rating[row.overall_rating] = row.responses
+        elif row.program_id is not None and row.name_cs is not None:
+            by_program.append({
+                "program_name": row.name_cs,
+                "count": row.responses,
+                "avg_rating": round(row.avg_rating, 2) if row.avg_rating else None
+            })
+    by_program = sorted(by_program, key=lambda item: -item["count"])[:10]
     
     return FeedbackStatistics(
         total_feedbacks=total_feedbacks,
@@ -623,8 +600,10 @@ async def submit_public_feedback(
     db: AsyncSession = Depends(get_db)
 ):
     """Submit feedback via public form."""
+    # Row lock: a double submit waits here and then sees status 'submitted',
+    # so the response is counted into feedback_program_stats only once.
     result = await db.execute(
-        select(Feedback).where(Feedback.token == token)
+        select(Feedback).where(Feedback.token == token).with_for_update()
     )
     feedback = result.scalar_one_or_none()
     
@@ -645,6 +624,8 @@ async def submit_public_feedback(
     feedback.status = 'submitted'
     feedback.submitted_at = datetime.now(timezone.utc)
     
+    from services.feedback_stats import record_feedback_response
+    await record_feedback_response(db, feedback)
     await db.commit()
     
     return {"message": "Děkujeme za vaši zpětnou vazbu!"}
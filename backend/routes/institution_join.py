@@ -28,7 +28,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from core.security import get_current_user, get_current_user_optional, hash_password
 from database.supabase import get_db
 from database.models import Institution, InstitutionJoinRequest, User
-from database.supabase_repositories import UserRepositorySupabase
+from database.supabase_repositories import UserRepositorySupabase, user_by_email
 from services.institution_duplicate_service import (
     find_duplicate_institutions, match_to_dict,
 )
@@ -151,9 +151,7 @@ async def submit_join_request(
     email = payload.email.strip().lower()
 
     # 2. If the e-mail is already a member of this institution → friendly msg
-    existing_user = (await db.execute(
-        select(User).where(User.email == email)
-    )).scalar_one_or_none()
+    existing_user = (await db.execute(user_by_email(email))).scalar_one_or_none()
     if existing_user and str(existing_user.institution_id) == str(institution_id) and not existing_user.deleted_at:
         raise HTTPException(
             status_code=409,
@@ -266,9 +264,7 @@ async def approve_join_request(
     )).scalar_one()
 
     # Either reactivate/reassign existing user, OR create a fresh invite
-    existing_user = (await db.execute(
-        select(User).where(User.email == req.email)
-    )).scalar_one_or_none()
+    existing_user = (await db.execute(user_by_email(req.email))).scalar_one_or_none()
 
     temp_password: Optional[str] = None
     if existing_user:
@@ -8,11 +8,12 @@ import json
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
 from pydantic import BaseModel, Field
 from sqlalchemy import select, and_, func, desc, text, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.pagination import decode_cursor, encode_cursor
 from core.security import get_current_user
 from database.supabase import get_db
 from database.models import (
@@ -22,13 +23,16 @@ from database.models import (
 )
 from services.mailing_service import (
     resolve_recipients, DEFAULT_TEMPLATES, get_default_signature,
-    send_campaign_emails,
+    send_campaign_emails, insert_campaign_recipients,
 )
 from services.plan_service import require_feature
 from services.usage_service import track_usage
 from services.feature_flags import is_feature_enabled
 from services.email_service import EmailService
 from services.resend_delivery import delivery_status_label
+from services.email_deliverability import (
+    deliverability_summary, ledger_row_to_stats, list_problematic, repeatedly_failing_contact_ids,
+)
 
 
 CONTACTS_FEATURE_KEY = "contacts_module"
@@ -167,101 +171,17 @@ async def list_campaigns(
 async def get_delivery_health(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
 ):
-    """Aggregate delivery failures per email across all campaigns."""
+    """Delivery failures per email across all campaigns, read from the deliverability ledger."""
     institution_id = current_user["institution_id"]
 
-    result = await db.execute(
-        select(
-            MailingCampaignRecipient.email,
-            MailingCampaignRecipient.school_name,
-            MailingCampaignRecipient.contact_name,
-            MailingCampaignRecipient.contact_id,
-            MailingCampaignRecipient.school_id,
-            MailingCampaignRecipient.status,
-            MailingCampaignRecipient.failure_reason,
-            MailingCampaignRecipient.sent_at,
-            MailingCampaignRecipient.delivery_status,
-            MailingCampaignRecipient.delivery_event_at,
-            MailingCampaign.name.label("campaign_name"),
-        )
-        .join(MailingCampaign, MailingCampaignRecipient.campaign_id == MailingCampaign.id)
-        .where(MailingCampaign.institution_id == institution_id)
-        .order_by(MailingCampaignRecipient.email)
-    )
-    rows = result.all()
-
-    email_stats = {}
-    for row in rows:
-        email = row.email
-        if email not in email_stats:
-            email_stats[email] = {
-                "email": email,
-                "school_name": row.school_name,
-                "contact_name": row.contact_name,
-                "contact_id": str(row.contact_id) if row.contact_id else None,
-                "school_id": str(row.school_id) if row.school_id else None,
-                "total_sends": 0,
-                "successful": 0,
-                "failed": 0,
-                "last_failure_reason": None,
-                "last_sent_at": None,
-                "last_delivery_status": None,
-                "last_delivery_label": None,
-                "last_delivery_event_at": None,
-                "campaigns": [],
-            }
-        stats = email_stats[email]
-        stats["total_sends"] += 1
-        delivery_status = row.delivery_status or row.status or "unknown"
-        delivery_failed = delivery_status in {
-            "bounced_hard",
-            "failed",
-            "complained",
-            "suppressed",
-            "unsubscribed",
-        } or row.status == "failed"
-        delivery_success = delivery_status in {"delivered", "opened", "clicked"} or (
-            row.status == "sent" and delivery_status in {"sent", "unknown"}
-        )
-        if delivery_success:
-            stats["successful"] += 1
-            if row.sent_at:
-                stats["last_sent_at"] = row.sent_at.isoformat()
-        elif delivery_failed:
-            stats["failed"] += 1
-            stats["last_failure_reason"] = row.failure_reason or delivery_status_label(delivery_status)
-        stats["last_delivery_status"] = delivery_status
-        stats["last_delivery_label"] = delivery_status_label(delivery_status)
-        if row.delivery_event_at:
-            stats["last_delivery_event_at"] = row.delivery_event_at.isoformat()
-        stats["campaigns"].append({
-            "name": row.campaign_name,
-            "status": row.status,
-            "delivery_status": delivery_status,
-            "delivery_status_label": delivery_status_label(delivery_status),
-            "delivery_event_at": row.delivery_event_at.isoformat() if row.delivery_event_at else None,
-            "failure_reason": row.failure_reason,
-        })
-
-    problematic = []
-    healthy = []
-    for stats in email_stats.values():
-        failure_rate = stats["failed"] / stats["total_sends"] if stats["total_sends"] > 0 else 0
-        stats["failure_rate"] = round(failure_rate * 100, 1)
-        if stats["failed"] >= 2:
-            stats["recommendation"] = "invalid"
-            stats["recommendation_label"] = "Neplatný kontakt — doporučeno smazat"
-            problematic.append(stats)
-        elif stats["failed"] >= 1:
-            stats["recommendation"] = "warning"
-            stats["recommendation_label"] = "Potenciální problém — sledujte"
-            problematic.append(stats)
-        else:
-            stats["recommendation"] = "ok"
-            healthy.append(stats)
-
-    problematic.sort(key=lambda x: x["failed"], reverse=True)
+    after = decode_cursor(cursor, (int, str))
+    rows = await list_problematic(db, institution_id, limit, after)
+    problematic = [ledger_row_to_stats(row) for row in rows]
+    summary = await deliverability_summary(db, institution_id)
+    problematic_count = summary["invalid"] + summary["warning"]
 
     already_invalid_count = (await db.execute(
         text("""
@@ -290,7 +210,10 @@ async def get_delivery_health(
 
     return {
         "problematic_contacts": problematic,
-        "healthy_count": len(healthy),
+        "next_cursor": (
+            encode_cursor([rows[-1]["failed"], rows[-1]["email_norm"]]) if len(rows) == limit else None
+        ),
+        "healthy_count": summary["tracked"] - problematic_count,
         "already_invalid_count": already_invalid_count,
         "already_invalid": [
             {
@@ -303,10 +226,10 @@ async def get_delivery_health(
             for c in already_invalid
         ],
         "summary": {
-            "total_emails_tracked": len(email_stats),
-            "problematic": len(problematic),
-            "recommended_invalid": sum(1 for p in problematic if p["recommendation"] == "invalid"),
-            "recommended_warning": sum(1 for p in problematic if p["recommendation"] == "warning"),
+            "total_emails_tracked": summary["tracked"],
+            "problematic": problematic_count,
+            "recommended_invalid": summary["invalid"],
+            "recommended_warning": summary["warning"],
         },
     }
 
@@ -323,8 +246,7 @@ async def flag_invalid_contacts(
     flagged = 0
 
     if auto:
-        health = await get_delivery_health(current_user, db)
-        to_flag = [p["contact_id"] for p in health["problematic_contacts"] if p["recommendation"] == "invalid" and p.get("contact_id")]
+        to_flag = await repeatedly_failing_contact_ids(db, institution_id)
     elif contact_ids:
         to_flag = contact_ids
     else:
@@ -830,33 +752,7 @@ async def _finalize_program_recipients(db, campaign, institution_id, program_ids
     campaign.programs_snapshot = programs_snapshot
     campaign.total_recipients = len(recipients)
 
-    for r in recipients:
-        recipient = MailingCampaignRecipient(
-            campaign_id=campaign.id,
-            school_id=uuid.UUID(r["school_id"]) if r.get("school_id") else None,
-            contact_id=uuid.UUID(r["contact_id"]) if r.get("contact_id") else None,
-            email=r["email"],
-            school_name=r.get("school_name"),
-            contact_name=r.get("contact_name"),
-            status="pending",
-            matching_reason={
-                "selection_mode": campaign.recipient_mode,
-                "matched_segments": r.get("matched_segments", []),
-                "manual_override": "manual" in r.get("matched_segments", []),
-            },
-        )
-        db.add(recipient)
-        await db.flush()
-        relevant_pids = r.get("relevant_program_ids", program_ids)
-        for rpid in relevant_pids:
-            p = programs_map.get(rpid)
-            if p:
-                db.add(MailingRecipientProgram(
-                    recipient_id=recipient.id,
-                    program_id=uuid.UUID(rpid),
-                    program_name=p.name_cs,
-                    program_target_groups=p.target_groups or [],
-                ))
+    await insert_campaign_recipients(db, campaign.id, campaign.recipient_mode, recipients, program_ids)
     return len(recipients)
 
 
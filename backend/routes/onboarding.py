@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, func
 
+from core.response_cache import invalidate_public_cache
 from core.security import get_current_user
 from database.supabase import get_db
 from database.models import Institution, Program
@@ -61,4 +62,5 @@ async def complete_onboarding(
         .values(onboarding_completed=True)
     )
     await db.commit()
+    await invalidate_public_cache(db, f"institution:{institution_id}")
     return {"message": "Onboarding dokončen"}
@@ -21,6 +21,7 @@ from services.plan_service import (
     get_plan_hierarchy, compute_plan_diff,
 )
 from services.billing_service import create_billing_order
+from services.institution_context import institution_context
 
 router = APIRouter(prefix="/plan", tags=["Plan Management"])
 logger = logging.getLogger(__name__)
@@ -41,16 +42,8 @@ class AdminPlanChange(BaseModel):
 # ---- Static routes (before /{dynamic}) ----
 
 @router.get("/status")
-async def get_plan_status(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
+async def get_plan_status(inst: dict = Depends(institution_context)):
     """Current plan status, features, and limits."""
-    inst_repo = InstitutionRepositorySupabase(db)
-    inst = await inst_repo.find_by_id(current_user["institution_id"])
-    if not inst:
-        raise HTTPException(status_code=404, detail="Instituce nenalezena")
-
     plan = inst.get("plan", "free")
     plan_status = inst.get("plan_status", "active")
     plan_updated = inst.get("plan_updated_at")
@@ -82,16 +75,13 @@ async def get_available_plans():
 async def get_plan_usage(
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    inst: dict = Depends(institution_context),
 ):
     """Soft-limit usage snapshot (programs + this-month bookings vs plan limits).
 
     SOFT only — never blocks. Drives the dashboard usage meters and upgrade
     banners. Hard enforcement is deferred until after the pilot phase.
     """
-    inst_repo = InstitutionRepositorySupabase(db)
-    inst = await inst_repo.find_by_id(current_user["institution_id"])
-    if not inst:
-        raise HTTPException(status_code=404, detail="Instituce nenalezena")
     from services.usage_service import get_plan_quota_usage
     return await get_plan_quota_usage(
         db, current_user["institution_id"],
@@ -113,15 +103,9 @@ async def get_plan_diff(
 @router.get("/check-feature/{feature_key}")
 async def check_feature(
     feature_key: str,
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    inst: dict = Depends(institution_context),
 ):
     """Check if current institution has access to a specific feature."""
-    inst_repo = InstitutionRepositorySupabase(db)
-    inst = await inst_repo.find_by_id(current_user["institution_id"])
-    if not inst:
-        raise HTTPException(status_code=404, detail="Instituce nenalezena")
-
     plan = inst.get("plan", "free")
     plan_status = inst.get("plan_status", "active")
     access = has_feature_access(plan, plan_status, feature_key)
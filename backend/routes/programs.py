@@ -9,11 +9,11 @@ from pydantic import BaseModel
 from fastapi import APIRouter, HTTPException, Depends, Query, Request, UploadFile, File
 from fastapi.responses import JSONResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from models.schemas import ProgramCreate, Program
 from core.security import get_current_user
+from core.rate_limit import limiter as _pub_limiter
+from core.response_cache import cached_response
 from database.supabase import get_db
 from database.supabase_repositories import (
     ProgramRepositorySupabase, 
@@ -26,7 +26,6 @@ from core.permissions import ensure_role, PROGRAM_EDIT_ROLES
 
 router = APIRouter(prefix="/programs", tags=["Programs"])
 logger = logging.getLogger(__name__)
-_pub_limiter = Limiter(key_func=get_remote_address)
 
 
 class ArchiveRequest(BaseModel):
@@ -67,6 +66,8 @@ async def get_programs(
 
 @router.get("/public/{institution_id}")
 @_pub_limiter.limit("30/minute")
+@cached_response("public_programs", ttl=60, stale_ttl=300,
+                 tags=lambda kw: [f"institution:{kw['institution_id']}"])
 async def get_public_programs(
     institution_id: str,
     request: Request,
@@ -433,16 +434,23 @@ async def get_archive_report(
     total_teachers = sum(b.get("actual_teachers") or b.get("num_teachers", 0) for b in program_bookings)
     unique_schools = len(set(b.get("school_name", "") for b in program_bookings if b.get("school_name")))
     
-    # Get feedback (if exists)
+    # Feedback totals from the per-program aggregate; only the latest
+    # submitted responses are loaded, for the quotes.
     from database.models import Feedback
     from sqlalchemy import select
+    from services.feedback_stats import program_feedback_summary, summarize
     try:
+        feedback_summary = await program_feedback_summary(db, program_id)
         fb_result = await db.execute(
-            select(Feedback).where(Feedback.program_id == program_id)
+            select(Feedback)
+            .where(Feedback.program_id == program_id, Feedback.status == 'submitted')
+            .order_by(Feedback.submitted_at.desc())
+            .limit(50)
         )
         from database.supabase_repositories import to_dict
         feedbacks = [to_dict(f) for f in fb_result.scalars().all()]
     except Exception:
+        feedback_summary = summarize(None)
         feedbacks = []
     
     # Get dates range
@@ -499,8 +507,9 @@ async def get_archive_report(
             "date_range": date_range,
         },
         "schools": schools_summary,
-        "feedback_count": len(feedbacks),
-        "feedbacks": feedbacks[:50],
+        "feedback_count": feedback_summary["responses"],
+        "feedback_summary": feedback_summary,
+        "feedbacks": feedbacks,
         "bookings": [
             {
                 "date": b.get("date"),
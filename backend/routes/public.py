@@ -10,22 +10,18 @@ from pydantic import BaseModel, EmailStr
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from core.rate_limit import limiter, hit_shared_limit
+from core.response_cache import cached_response
 from database.supabase import get_db
 from database.supabase_repositories import InstitutionRepositorySupabase
 from services.email_service import EmailService
 
 router = APIRouter(prefix="/public", tags=["Public"])
 logger = logging.getLogger(__name__)
-limiter = Limiter(key_func=get_remote_address)
-
-# In-process IP throttle for the prefill endpoint (defense-in-depth on top of
-# the response-shape protection). Process-local; sufficient for single-worker.
-import time as _time
-import threading as _threading
-_prefill_calls: dict[str, list[float]] = {}
-_prefill_lock = _threading.Lock()
+
+# IP throttle for the prefill endpoint (defense-in-depth on top of the
+# response-shape protection). Keyed by the X-Forwarded-For first hop and kept
+# in the shared rate-limit storage, so it holds across workers and replicas.
 PREFILL_WINDOW_SEC = 60
 # Security audit P2 #4: tightened from 20 to 6/min to slow PII enumeration of
 # the public prefill endpoint (a legitimate user only needs a single lookup of
@@ -41,19 +37,11 @@ def _prefill_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def _prefill_check_rate(ip: str) -> bool:
+async def _prefill_check_rate(ip: str) -> bool:
     """Return True if the request is within rate limit; False if it should be 429."""
-    now = _time.monotonic()
-    cutoff = now - PREFILL_WINDOW_SEC
-    with _prefill_lock:
-        bucket = _prefill_calls.get(ip, [])
-        bucket = [t for t in bucket if t >= cutoff]
-        if len(bucket) >= PREFILL_MAX_PER_WINDOW:
-            _prefill_calls[ip] = bucket
-            return False
-        bucket.append(now)
-        _prefill_calls[ip] = bucket
-    return True
+    return await hit_shared_limit(
+        f"{PREFILL_MAX_PER_WINDOW}/{PREFILL_WINDOW_SEC} seconds", "prefill", ip
+    )
 
 
 # Admin email for contact form submissions
@@ -120,10 +108,10 @@ async def get_prefill_for_email(
     NEVER return reservation IDs, dates, or program/institution IDs.
 
     Always returns 200 with `found=false` for unknown e-mails to avoid
-    enumeration. Defense-in-depth: in-process IP rate-limit (20/min/IP)
+    enumeration. Defense-in-depth: shared IP rate-limit (6/min/IP)
     enforces the cap regardless of slowapi middleware availability.
     """
-    if not _prefill_check_rate(_prefill_client_ip(request)):
+    if not await _prefill_check_rate(_prefill_client_ip(request)):
         raise HTTPException(
             status_code=429,
             detail="Příliš mnoho požadavků. Zkuste to prosím za chvíli.",
@@ -171,6 +159,7 @@ async def get_prefill_for_email(
 
 @router.get("/stats")
 @limiter.limit("30/minute")
+@cached_response("public_stats", ttl=300, stale_ttl=900)
 async def get_public_stats(request: Request, db: AsyncSession = Depends(get_db)):
     """Public statistics for social proof on marketing pages.
 
@@ -241,6 +230,8 @@ async def get_public_stats(request: Request, db: AsyncSession = Depends(get_db))
 
 @router.get("/institutions/{institution_id}")
 @limiter.limit("30/minute")
+@cached_response("public_institution", ttl=120, stale_ttl=600,
+                 tags=lambda kw: [f"institution:{kw['institution_id']}"])
 async def get_public_institution_info(institution_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Get public institution information for booking pages.
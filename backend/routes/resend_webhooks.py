@@ -2,6 +2,10 @@
 
 The signature is verified against the unchanged request body. Only the minimum
 delivery metadata needed for audit and suppression is persisted.
+
+Verified events are staged in ``resend_webhook_inbox`` and acknowledged right
+away; the scheduler applies them in batches
+(services/resend_delivery.process_delivery_inbox).
 """
 from __future__ import annotations
 
@@ -15,7 +19,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from svix.webhooks import Webhook, WebhookVerificationError
 
 from database.supabase import get_db
-from services.resend_delivery import apply_delivery_update, delivery_update_from_payload
+from services.resend_delivery import (
+    apply_delivery_update, delivery_update_from_payload, enqueue_delivery_event,
+)
 
 
 router = APIRouter(prefix="/resend", tags=["Resend"])
@@ -46,73 +52,12 @@ async def resend_webhook(request: Request, db: AsyncSession = Depends(get_db)):
     delivery_update = delivery_update_from_payload(payload)
     if not delivery_update:
         return {"ok": True, "ignored": True}
-    event_type = delivery_update["event_type"]
-
-    svix_id = headers["svix-id"]
-    if (await db.execute(
-        select(ResendWebhookEvent.id).where(ResendWebhookEvent.svix_id == svix_id)
-    )).scalar_one_or_none():
-        return {"ok": True, "duplicate": True}
-
-    status = delivery_update["status"]
-    provider_email_id = delivery_update["provider_email_id"]
-    recipient_email = delivery_update["recipient_email"]
-    event_at = delivery_update["event_at"]
-    reason = delivery_update["reason"]
-
-    db.add(ResendWebhookEvent(
-        svix_id=svix_id,
-        event_type=event_type,
-        provider_email_id=provider_email_id,
-        recipient_email=recipient_email,
-        event_at=event_at,
-    ))
-
-    matched = []
-    if provider_email_id:
-        matched = list((await db.execute(
-            select(MailingCampaignRecipient, MailingCampaign.institution_id)
-            .join(MailingCampaign, MailingCampaignRecipient.campaign_id == MailingCampaign.id)
-            .where(MailingCampaignRecipient.email_provider_id == provider_email_id)
-        )).all())
-
-    for recipient, institution_id in matched:
-        if recipient.delivery_event_at and recipient.delivery_event_at > event_at:
-            continue
-        recipient.delivery_status = status
-        recipient.delivery_event_at = event_at
-        if status in {"bounced_hard", "failed", "complained", "suppressed"}:
-            recipient.failure_reason = reason or status
 
-        email = (recipient.email or recipient_email or "").strip().lower()
-        if not email:
-            continue
-
-        central_contacts = list((await db.execute(
-            select(Contact).where(and_(
-                Contact.institution_id == institution_id,
-                func.lower(Contact.email) == email,
-            ))
-        )).scalars().all())
-        school_contacts = list((await db.execute(
-            select(SchoolContact).where(and_(
-                SchoolContact.institution_id == institution_id,
-                func.lower(SchoolContact.email) == email,
-            ))
-        )).scalars().all())
-
-        for contact in [*central_contacts, *school_contacts]:
-            if contact.deliverability_updated_at and contact.deliverability_updated_at > event_at:
-                continue
-            contact.deliverability_status = status
-            contact.deliverability_reason = reason
-            contact.deliverability_updated_at = event_at
-
-        if status in PERMANENT_SUPPRESSION:
-            for contact in school_contacts:
-                contact.last_email_bounced = status == "bounced_hard"
-                contact.status = "invalid"
-                contact.email_validation_error = reason or status
-
-    await db.commit()
-    return {"ok": True, "matched_recipients": len(matched), "status": status}
+    try:
+        await enqueue_delivery_event(db, headers["svix-id"], raw_body.decode("utf-8"))
+    except Exception as e:
+        # Staging unavailable: apply inline rather than lose the event
+        logger.error(f"Resend webhook staging failed, applying inline: {e}")
+        await db.rollback()
+        return await apply_delivery_update(db, delivery_update, headers["svix-id"])
+    return {"ok": True, "queued": True}
@@ -13,14 +13,16 @@ from typing import List, Optional
 from datetime import datetime, timezone
 from pydantic import BaseModel, EmailStr, Field
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query, BackgroundTasks
 from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, bindparam
 
 from models.schemas import School, PropagationRequest
 from core.security import get_current_user
+from core.pagination import decode_cursor, encode_cursor, parse_datetime, parse_uuid
 from services.plan_service import require_feature
+from services import school_import
 from database.supabase import get_db
 from database.supabase_repositories import (
     SchoolRepositorySupabase,
@@ -49,6 +51,21 @@ COLUMN_MAPPING = {
 # Predefined tags
 PREDEFINED_TAGS = ['MŠ', 'ZŠ', 'SŠ', 'VOŠ', 'VŠ', 'Gymnázium', 'ZUŠ', 'DDM', 'Jiné']
 
+# Directory sort orders: key expressions (all ASC or all DESC, unique via id),
+# their cursor parsers and the direction. Served by the idx_schools_dir_*
+# partial indexes (alembic 0f1a2b3c4d5e).
+SCHOOL_SORTS = {
+    'name': (["s.name", "s.id"], [str, parse_uuid], "ASC"),
+    'city': (["COALESCE(s.city, '')", "s.name", "s.id"], [str, str, parse_uuid], "ASC"),
+    'newest': (["s.created_at", "s.id"], [parse_datetime, parse_uuid], "DESC"),
+    'bookings': (["COALESCE(s.booking_count, 0)", "s.id"], [int, parse_uuid], "DESC"),
+}
+
+# Accent-folded search documents; must match the idx_*_search_trgm index
+# expressions (alembic 0f1a2b3c4d5e).
+SCHOOL_SEARCH_DOCUMENT = "public.catalog_unaccent(s.name || ' ' || COALESCE(s.city, '') || ' ' || COALESCE(s.email, ''))"
+CONTACT_SEARCH_DOCUMENT = "public.catalog_unaccent(sc.email || ' ' || COALESCE(sc.name, ''))"
+
 # Common email domain typos and their corrections
 EMAIL_TYPO_CORRECTIONS = {
     'gmial.com': 'gmail.com',
@@ -81,6 +98,19 @@ class ImportResult(BaseModel):
     error_details: List[dict]
 
 
+class ImportJobStatus(BaseModel):
+    job_id: str
+    status: str
+    phase: Optional[str] = None
+    total_rows: int = 0
+    processed_records: int = 0
+    total_records: int = 0
+    progress: int = 0
+    error_count: int = 0
+    failure_reason: Optional[str] = None
+    result: Optional[ImportResult] = None
+
+
 class SchoolContactCreate(BaseModel):
     email: str
     name: Optional[str] = None
@@ -159,6 +189,11 @@ def validate_email(email: str) -> tuple[bool, Optional[str]]:
     return is_valid, None
 
 
+def email_suggestion(email: str) -> Optional[str]:
+    """Typo correction stored in ``school_contacts.suggested_correction``."""
+    return validate_email(email)[1]
+
+
 def parse_tags(tag_string: str) -> List[str]:
     """Parse tags from string (comma or semicolon separated)."""
     if not tag_string:
@@ -186,15 +221,17 @@ def parse_excel_file(file_content: bytes, filename: str) -> tuple[List[dict], Li
     errors = []
     
     try:
-        wb = openpyxl.load_workbook(io.BytesIO(file_content), data_only=True)
+        # read_only streams rows instead of building the whole sheet in memory
+        wb = openpyxl.load_workbook(io.BytesIO(file_content), data_only=True, read_only=True)
         ws = wb.active
+        sheet_rows = ws.iter_rows(values_only=True)
         
         # Get headers from first row
         headers = []
-        for cell in ws[1]:
-            if cell.value:
-                normalized = normalize_column_name(str(cell.value))
-                headers.append(normalized if normalized else str(cell.value).lower())
+        for value in next(sheet_rows, None) or ():
+            if value:
+                normalized = normalize_column_name(str(value))
+                headers.append(normalized if normalized else str(value).lower())
             else:
                 headers.append(None)
         
@@ -210,7 +247,7 @@ def parse_excel_file(file_content: bytes, filename: str) -> tuple[List[dict], Li
             return rows, errors
         
         # Parse data rows
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
+        for row_idx, row in enumerate(sheet_rows, start=2):
             if not any(row):
                 continue
             
@@ -440,13 +477,15 @@ async def migrate_existing_contacts(
         
         for school in schools_to_migrate:
             await db.execute(text("""
-                INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, status)
-                VALUES (:id, :school_id, :inst_id, :email, :name, :phone, TRUE, 'active')
+                INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, status,
+                                             suggested_correction)
+                VALUES (:id, :school_id, :inst_id, :email, :name, :phone, TRUE, 'active', :suggested)
             """), {
                 "id": str(uuid.uuid4()),
                 "school_id": str(school[0]),
                 "inst_id": str(school[1]),
                 "email": school[2],
+                "suggested": email_suggestion(school[2]),
                 "name": school[3] or '',
                 "phone": school[4] or ''
             })
@@ -1051,6 +1090,65 @@ async def get_campaign_contacts(
 
 # ============ Schools API ============
 
+def _like_pattern(value: str) -> str:
+    escaped = value.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _school_to_dict(s, all_contacts: List[dict], include_archived_contacts: bool, archived: bool) -> dict:
+    school_id = str(s["id"])
+    contacts = (
+        all_contacts
+        if include_archived_contacts
+        else [
+            contact
+            for contact in all_contacts
+            if not (contact.get("status") or "").startswith("archived")
+        ]
+    )
+
+    # If no contacts, create one from legacy fields
+    if not all_contacts and s["legacy_email"]:
+        contacts = [{
+            "id": None,
+            "school_id": school_id,
+            "email": s["legacy_email"],
+            "name": s["legacy_contact"],
+            "phone": s["legacy_phone"],
+            "status": "active",
+            "is_primary": True,
+            "email_validated": False,
+            "suggested_correction": None,
+            "created_at": None
+        }]
+
+    tags = s["tags"] if s["tags"] else []
+    if isinstance(tags, str):
+        try:
+            tags = json_lib.loads(tags)
+        except:
+            tags = []
+
+    return {
+        "id": school_id,
+        "name": s["name"],
+        "city": s["city"],
+        "address": s["address"],
+        "notes": s["notes"],
+        "tags": tags,
+        "source": s["source"] or "organic",
+        "booking_count": s["booking_count"] or 0,
+        "contacts": contacts,
+        "invalid_contacts_count": len([c for c in contacts if c.get("status") == "invalid"]),
+        "is_archived": archived,
+        "created_at": s["created_at"].isoformat() if s["created_at"] else None,
+        # Legacy fields for backward compatibility
+        "email": contacts[0]["email"] if contacts else s["legacy_email"],
+        "contact_person": contacts[0]["name"] if contacts else s["legacy_contact"],
+        "phone": contacts[0]["phone"] if contacts else s["legacy_phone"],
+    }
+
+
 @router.get("")
 async def get_schools(
     source: Optional[str] = None,
@@ -1058,144 +1156,131 @@ async def get_schools(
     has_invalid: Optional[bool] = None,
     archived: bool = False,
     include_archived_contacts: bool = False,
+    search: Optional[str] = Query(None, description="Název, město nebo e-mail / jméno kontaktu"),
+    sort: str = Query("name", description="name | city | newest | bookings"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all schools with their contacts."""
-    inst_id = current_user["institution_id"]
-    
-    # Build query
-    query = """
-        SELECT 
-            s.id, s.name, s.city, s.address, s.notes, s.tags, s.source, 
-            s.booking_count, s.created_at, s.email as legacy_email, 
-            s.contact_person as legacy_contact, s.phone as legacy_phone
-        FROM schools s
-        WHERE s.institution_id = :inst_id
+    """Get schools with their contacts.
+
+    With `limit` the directory is keyset paginated and the response is
+    `{items, total, next_cursor}`; pass `next_cursor` back as `cursor`.
+    Without `limit` the full list is returned as before.
     """
+    inst_id = current_user["institution_id"]
+    if sort not in SCHOOL_SORTS:
+        raise HTTPException(status_code=400, detail="Neplatné řazení")
+    key_sql, key_parsers, direction = SCHOOL_SORTS[sort]
+
+    where = ["s.institution_id = :inst_id"]
     params = {"inst_id": inst_id}
 
     if archived:
-        query += " AND s.deleted_at IS NOT NULL"
+        where.append("s.deleted_at IS NOT NULL")
     else:
-        query += " AND s.deleted_at IS NULL"
-    
+        where.append("s.deleted_at IS NULL")
+
     if source and source != 'all':
-        query += " AND s.source = :source"
+        where.append("s.source = :source")
         params["source"] = source
-    
+
     if tag and tag != 'all':
         # Use CAST instead of :: to avoid parameter parsing issues
-        query += " AND s.tags @> CAST(:tag AS jsonb)"
+        where.append("s.tags @> CAST(:tag AS jsonb)")
         params["tag"] = json_lib.dumps([tag])
-    
-    query += " ORDER BY s.name ASC"
-    
-    result = await db.execute(text(query), params)
-    schools_raw = result.fetchall()
-    
-    # Get all contacts for these schools
-    school_ids = [str(s[0]) for s in schools_raw]
+
+    if has_invalid is not None:
+        where.append(
+            ("" if has_invalid else "NOT ")
+            + "EXISTS (SELECT 1 FROM school_contacts ic WHERE ic.school_id = s.id AND ic.status = 'invalid')"
+        )
+
+    if search and search.strip():
+        where.append(f"""(
+            {SCHOOL_SEARCH_DOCUMENT} LIKE public.catalog_unaccent(:search)
+            OR s.id IN (
+                SELECT sc.school_id FROM school_contacts sc
+                WHERE sc.institution_id = :inst_id AND {CONTACT_SEARCH_DOCUMENT} LIKE public.catalog_unaccent(:search)
+            )
+        )""")
+        params["search"] = _like_pattern(search)
+
+    # The total ignores the cursor; keep a copy of the plain filters for it.
+    filter_where = list(where)
+    filter_params = dict(params)
+
+    after = decode_cursor(cursor, key_parsers)
+    if after is not None:
+        comparison = ">" if direction == "ASC" else "<"
+        where.append(
+            f"({', '.join(key_sql)}) {comparison} ({', '.join(f':c{i}' for i in range(len(after)))})"
+        )
+        params.update({f"c{i}": v for i, v in enumerate(after)})
+
+    query = f"""
+        SELECT
+            s.id, s.name, s.city, s.address, s.notes, s.tags, s.source,
+            s.booking_count, s.created_at, s.email as legacy_email,
+            s.contact_person as legacy_contact, s.phone as legacy_phone
+        FROM schools s
+        WHERE {" AND ".join(where)}
+        ORDER BY {", ".join(f"{k} {direction}" for k in key_sql)}
+    """
+    if limit:
+        query += " LIMIT :limit"
+        params["limit"] = limit
+
+    schools_raw = (await db.execute(text(query), params)).mappings().all()
+
+    # Contacts for this page only; = ANY keeps idx_school_contacts_school usable.
     contacts_map = {}
-    
-    if school_ids:
-        # Parametrized IN clause — safe against SQL injection
-        id_params = {f"sid_{i}": sid for i, sid in enumerate(school_ids)}
-        id_placeholders = ", ".join(f":sid_{i}" for i in range(len(school_ids)))
-        contacts_result = await db.execute(text(f"""
-            SELECT id, school_id, email, name, phone, status, is_primary, email_validated, created_at
+    if schools_raw:
+        contacts_result = await db.execute(text("""
+            SELECT id, school_id, email, name, phone, status, is_primary, email_validated,
+                   suggested_correction, created_at
             FROM school_contacts
-            WHERE school_id::text IN ({id_placeholders})
+            WHERE school_id = ANY(CAST(:school_ids AS uuid[]))
             ORDER BY is_primary DESC, created_at ASC
-        """), id_params)
-        
-        for c in contacts_result.fetchall():
-            school_id = str(c[1])
-            if school_id not in contacts_map:
-                contacts_map[school_id] = []
-            
-            # Check for email typo suggestion
-            _, suggested = validate_email(c[2])
-            
-            contacts_map[school_id].append({
-                "id": str(c[0]),
+        """), {"school_ids": [str(s["id"]) for s in schools_raw]})
+
+        for c in contacts_result.mappings().all():
+            school_id = str(c["school_id"])
+            contacts_map.setdefault(school_id, []).append({
+                "id": str(c["id"]),
                 "school_id": school_id,
-                "email": c[2],
-                "name": c[3],
-                "phone": c[4],
-                "status": c[5],
-                "is_primary": c[6],
-                "email_validated": c[7] or False,
-                "suggested_correction": suggested,
-                "created_at": c[8].isoformat() if c[8] else None
+                "email": c["email"],
+                "name": c["name"],
+                "phone": c["phone"],
+                "status": c["status"],
+                "is_primary": c["is_primary"],
+                "email_validated": c["email_validated"] or False,
+                "suggested_correction": c["suggested_correction"],
+                "created_at": c["created_at"].isoformat() if c["created_at"] else None
             })
-    
-    # Build response
-    schools = []
-    for s in schools_raw:
-        school_id = str(s[0])
-        all_contacts = contacts_map.get(school_id, [])
-        contacts = (
-            all_contacts
-            if include_archived_contacts
-            else [
-                contact
-                for contact in all_contacts
-                if not (contact.get("status") or "").startswith("archived")
-            ]
-        )
-        
-        # If no contacts, create one from legacy fields
-        if not all_contacts and s[9]:  # legacy_email exists (index 9)
-            contacts = [{
-                "id": None,
-                "school_id": school_id,
-                "email": s[9],
-                "name": s[10],  # legacy_contact
-                "phone": s[11],  # legacy_phone
-                "status": "active",
-                "is_primary": True,
-                "email_validated": False,
-                "suggested_correction": None,
-                "created_at": None
-            }]
-        
-        tags = s[5] if s[5] else []
-        if isinstance(tags, str):
-            try:
-                tags = json_lib.loads(tags)
-            except:
-                tags = []
-        
-        invalid_count = len([c for c in contacts if c.get("status") == "invalid"])
-        
-        # Filter by has_invalid if specified
-        if has_invalid is not None:
-            if has_invalid and invalid_count == 0:
-                continue
-            if not has_invalid and invalid_count > 0:
-                continue
-        
-        schools.append({
-            "id": school_id,
-            "name": s[1],
-            "city": s[2],
-            "address": s[3],
-            "notes": s[4],
-            "tags": tags,
-            "source": s[6] or "organic",
-            "booking_count": s[7] or 0,
-            "contacts": contacts,
-            "invalid_contacts_count": invalid_count,
-            "is_archived": archived,
-            "created_at": s[8].isoformat() if s[8] else None,
-            # Legacy fields for backward compatibility
-            "email": contacts[0]["email"] if contacts else s[9],
-            "contact_person": contacts[0]["name"] if contacts else s[10],
-            "phone": contacts[0]["phone"] if contacts else s[11],
-        })
-    
-    return schools
+
+    schools = [
+        _school_to_dict(s, contacts_map.get(str(s["id"]), []), include_archived_contacts, archived)
+        for s in schools_raw
+    ]
+    if not limit:
+        return schools
+
+    total = (await db.execute(
+        text(f"SELECT COUNT(*) FROM schools s WHERE {' AND '.join(filter_where)}"), filter_params
+    )).scalar() or 0
+    next_cursor = None
+    if len(schools_raw) == limit:
+        last = schools_raw[-1]
+        sort_values = {
+            "name": [last["name"], last["id"]],
+            "city": [last["city"] or "", last["name"], last["id"]],
+            "newest": [last["created_at"], last["id"]],
+            "bookings": [last["booking_count"] or 0, last["id"]],
+        }
+        next_cursor = encode_cursor(sort_values[sort])
+    return {"items": schools, "total": int(total), "next_cursor": next_cursor}
 
 
 @router.get("/{school_id}")
@@ -1288,8 +1373,8 @@ async def add_contact(
     # Check for duplicate email in institution
     existing = await db.execute(text("""
         SELECT id FROM school_contacts 
-        WHERE email = :email AND institution_id = :inst_id
-    """), {"email": contact.email.lower(), "inst_id": current_user["institution_id"]})
+        WHERE lower(email) = :email AND institution_id = :inst_id
+    """), {"email": contact.email.strip().lower(), "inst_id": current_user["institution_id"]})
     
     if existing.fetchone():
         raise HTTPException(status_code=400, detail="Email již existuje v jiné škole")
@@ -1304,9 +1389,11 @@ async def add_contact(
     # Insert contact
     contact_id = str(uuid.uuid4())
     await db.execute(text("""
-        INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, notes, status)
-        VALUES (:id, :school_id, :inst_id, :email, :name, :phone, :is_primary, :notes, 'active')
+        INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, notes, status,
+                                     suggested_correction)
+        VALUES (:id, :school_id, :inst_id, :email, :name, :phone, :is_primary, :notes, 'active', :suggested)
     """), {
+        "suggested": suggested,
         "id": contact_id,
         "school_id": school_id,
         "inst_id": current_user["institution_id"],
@@ -1349,11 +1436,13 @@ async def update_contact(
     params = {"contact_id": contact_id, "updated": datetime.now(timezone.utc)}
     
     if contact.email is not None:
-        is_valid, _ = validate_email(contact.email)
+        is_valid, suggested = validate_email(contact.email)
         if not is_valid:
             raise HTTPException(status_code=400, detail="Neplatný formát emailu")
         updates.append("email = :email")
         params["email"] = contact.email.lower()
+        updates.append("suggested_correction = :suggested")
+        params["suggested"] = suggested
     
     if contact.name is not None:
         updates.append("name = :name")
@@ -1442,7 +1531,7 @@ async def fix_contact_email(
     # Check if corrected email already exists
     existing = await db.execute(text("""
         SELECT id FROM school_contacts 
-        WHERE email = :email AND institution_id = :inst_id AND id != :contact_id
+        WHERE lower(email) = :email AND institution_id = :inst_id AND id != :contact_id
     """), {"email": suggested, "inst_id": current_user["institution_id"], "contact_id": contact_id})
     
     if existing.fetchone():
@@ -1450,7 +1539,7 @@ async def fix_contact_email(
     
     await db.execute(text("""
         UPDATE school_contacts 
-        SET email = :email, status = 'active', updated_at = :updated
+        SET email = :email, status = 'active', suggested_correction = NULL, updated_at = :updated
         WHERE id = :contact_id
     """), {"email": suggested, "contact_id": contact_id, "updated": datetime.now(timezone.utc)})
     
@@ -1490,8 +1579,9 @@ async def update_school_tags(
     return {"message": "Tagy aktualizovány", "tags": tags}
 
 
-@router.post("/import", response_model=ImportResult)
+@router.post("/import", response_model=ImportJobStatus, status_code=202)
 async def import_schools(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     update_existing: bool = False,
     current_user: dict = Depends(get_current_user),
@@ -1503,6 +1593,9 @@ async def import_schools(
     Deduplication logic:
     - School: unique by (name + city)
     - Contact: unique by email across institution
+    
+    The file is processed as a background job; poll
+    ``GET /schools/import/{job_id}`` for progress and the result.
     """
     content = await file.read()
     if len(content) > MAX_FILE_SIZE:
@@ -1512,150 +1605,74 @@ async def import_schools(
     if not any(filename.endswith(ext) for ext in ['.xlsx', '.xls', '.csv']):
         raise HTTPException(status_code=400, detail="Nepodporovaný formát souboru")
     
-    # Parse file
-    if filename.endswith('.csv'):
-        rows, errors = parse_csv_file(content, filename)
-    else:
-        rows, errors = parse_excel_file(content, filename)
-    
-    if not rows and errors:
-        return ImportResult(
-            success=False, total_rows=0, imported=0, updated=0, skipped=0,
-            errors=len(errors), duplicates=0, new_schools=0, new_contacts=0,
-            error_details=errors[:100]
-        )
-    
     inst_id = current_user["institution_id"]
-    
-    # Get existing schools (by name + city)
-    existing_schools_result = await db.execute(text("""
-        SELECT id, name, city FROM schools 
-        WHERE institution_id = :inst_id AND deleted_at IS NULL
-    """), {"inst_id": inst_id})
-    
-    existing_schools = {}
-    for row in existing_schools_result.fetchall():
-        key = get_school_key(row[1], row[2])
-        existing_schools[key] = str(row[0])
-    
-    # Get existing emails
-    existing_emails_result = await db.execute(text("""
-        SELECT email FROM school_contacts WHERE institution_id = :inst_id
-    """), {"inst_id": inst_id})
-    existing_emails = {row[0].lower() for row in existing_emails_result.fetchall()}
-    
-    # Also check legacy emails
-    legacy_emails_result = await db.execute(text("""
-        SELECT email FROM schools WHERE institution_id = :inst_id AND email IS NOT NULL
-    """), {"inst_id": inst_id})
-    existing_emails.update({row[0].lower() for row in legacy_emails_result.fetchall() if row[0]})
-    
-    # Process rows
-    new_schools = 0
-    new_contacts = 0
-    updated = 0
-    duplicates = 0
-    
-    # Group rows by school
-    school_data = {}
-    for row in rows:
-        school_key = get_school_key(row['school_name'], row['city'])
-        
-        if school_key not in school_data:
-            school_data[school_key] = {
-                'name': row['school_name'],
-                'city': row['city'],
-                'notes': row.get('notes', ''),
-                'tags': row.get('tags', []),
-                'contacts': []
-            }
-        
-        # Add contact if email not duplicate
-        email = row['email'].lower()
-        if email not in existing_emails:
-            school_data[school_key]['contacts'].append({
-                'email': email,
-                'name': row.get('contact_name', ''),
-                'phone': row.get('phone', ''),
-                'suggestion': row.get('email_suggestion')
-            })
-            existing_emails.add(email)  # Track within import
-        else:
-            duplicates += 1
-    
-    # Insert/update schools and contacts
-    for school_key, data in school_data.items():
-        school_id = existing_schools.get(school_key)
-        
-        if not school_id:
-            # Create new school
-            school_id = str(uuid.uuid4())
-            await db.execute(text("""
-                INSERT INTO schools (id, institution_id, name, city, notes, tags, source, booking_count, created_at, updated_at)
-                VALUES (:id, :inst_id, :name, :city, :notes, :tags, 'import', 0, :created, :updated)
-            """), {
-                "id": school_id,
-                "inst_id": inst_id,
-                "name": data['name'],
-                "city": data['city'],
-                "notes": data['notes'],
-                "tags": json_lib.dumps(data['tags']),
-                "created": datetime.now(timezone.utc),
-                "updated": datetime.now(timezone.utc)
-            })
-            existing_schools[school_key] = school_id
-            new_schools += 1
-        elif update_existing:
-            # Update school tags/notes
-            await db.execute(text("""
-                UPDATE schools SET 
-                    tags = COALESCE(tags, '[]'::jsonb) || :new_tags::jsonb,
-                    updated_at = :updated
-                WHERE id = :id
-            """), {
-                "id": school_id,
-                "new_tags": json_lib.dumps(data['tags']),
-                "updated": datetime.now(timezone.utc)
-            })
-            updated += 1
-        
-        # Add contacts
-        is_first = True
-        for contact in data['contacts']:
-            contact_id = str(uuid.uuid4())
-            await db.execute(text("""
-                INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, status)
-                VALUES (:id, :school_id, :inst_id, :email, :name, :phone, :is_primary, 'active')
-            """), {
-                "id": contact_id,
-                "school_id": school_id,
-                "inst_id": inst_id,
-                "email": contact['email'],
-                "name": contact['name'],
-                "phone": contact['phone'],
-                "is_primary": is_first  # First contact is primary
-            })
-            new_contacts += 1
-            is_first = False
-    
-    await db.commit()
-    
-    logger.info(f"Import completed: {new_schools} schools, {new_contacts} contacts, {duplicates} duplicates")
-    
-    return ImportResult(
-        success=new_schools > 0 or new_contacts > 0,
-        total_rows=len(rows),
-        imported=new_schools + new_contacts,
-        updated=updated,
-        skipped=0,
-        errors=len(errors),
-        duplicates=duplicates,
-        new_schools=new_schools,
-        new_contacts=new_contacts,
-        error_details=errors[:100]
+    job_id = await school_import.create_import_job(
+        db, inst_id, current_user.get("user_id"), file.filename, update_existing,
+    )
+    if job_id is None:
+        raise HTTPException(status_code=409, detail="Import už probíhá, počkejte na jeho dokončení")
+    background_tasks.add_task(
+        school_import.run_school_import, job_id, inst_id, content, filename, update_existing,
+    )
+    return ImportJobStatus(job_id=job_id, status="queued")
+
+
+@router.get("/import/{job_id}", response_model=ImportJobStatus)
+async def get_import_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress and (once finished) the result of a school import."""
+    job = await _get_import_job(db, current_user["institution_id"], job_id)
+    total = job["total_records"] or 0
+    return ImportJobStatus(
+        job_id=str(job["id"]),
+        status=job["status"],
+        phase=job["phase"],
+        total_rows=job["total_rows"],
+        processed_records=job["processed_records"],
+        total_records=total,
+        progress=100 if job["status"] == "done" else (
+            round(job["processed_records"] * 100 / total) if total else 0
+        ),
+        error_count=job["error_count"],
+        failure_reason=job["failure_reason"],
+        result=ImportResult(**job["result"]) if job["result"] else None,
     )
 
 
+@router.get("/import/{job_id}/errors")
+async def download_import_errors(
+    job_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full row-level error report of an import as CSV."""
+    job = await _get_import_job(db, current_user["institution_id"], job_id)
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=';')
+    writer.writerow(["Řádek", "Chyba"])
+    for error in job["error_report"] or []:
+        writer.writerow([error.get("row"), error.get("error")])
+    return Response(
+        content=output.getvalue().encode('utf-8-sig'),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": "attachment; filename=import_chyby.csv"},
+    )
+
+
+async def _get_import_job(db: AsyncSession, inst_id: str, job_id: str) -> dict:
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Import nenalezen")
+    job = await school_import.get_import_job(db, inst_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import nenalezen")
+    return job
+
+
 @router.post("/send-propagation")
 async def send_propagation(
     request: PropagationRequest,
@@ -3,7 +3,7 @@ Statistics routes with real data from database.
 Provides data for charts, reports, and CSV export.
 """
 import logging
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
@@ -15,7 +15,7 @@ import io
 
 from core.security import get_current_user
 from database.supabase import get_db
-from database.models import Reservation, Program, Institution
+from database.models import Reservation, Program, Institution, parse_visit_date
 from database.supabase_repositories import InstitutionRepositorySupabase
 from services.plan_service import require_feature
 from services.usage_service import track_usage
@@ -213,15 +213,15 @@ async def get_statistics(
         date_start, date_end = get_month_dates()
         period_label = f"{CZECH_MONTHS[date_start.month]} {date_start.year}"
     
-    # Convert dates to string format for comparison with date column
+    # Period bounds as YYYY-MM-DD (labels, filenames and visit_date filters)
     start_str = date_start.strftime("%Y-%m-%d")
     end_str = date_end.strftime("%Y-%m-%d")
     
     # Base query filter
     base_filter = and_(
         Reservation.institution_id == institution_id,
-        Reservation.date >= start_str,
-        Reservation.date <= end_str,
+        Reservation.visit_date >= parse_visit_date(start_str),
+        Reservation.visit_date <= parse_visit_date(end_str),
         Reservation.deleted_at.is_(None)
     )
     
@@ -274,8 +274,8 @@ async def get_statistics(
                 func.coalesce(func.sum(Reservation.num_teachers), 0).label("teachers"),
             ).where(and_(
                 Reservation.institution_id == institution_id,
-                Reservation.date >= month_start,
-                Reservation.date <= month_end,
+                Reservation.visit_date >= parse_visit_date(month_start),
+                Reservation.visit_date <= parse_visit_date(month_end),
                 Reservation.deleted_at.is_(None),
                 Reservation.status != "cancelled"
             ))
@@ -327,8 +327,8 @@ async def get_statistics(
         )
         .where(and_(
             Reservation.institution_id == institution_id,
-            Reservation.date >= start_str,
-            Reservation.date <= end_str,
+            Reservation.visit_date >= parse_visit_date(start_str),
+            Reservation.visit_date <= parse_visit_date(end_str),
             Reservation.deleted_at.is_(None)
         ))
         .group_by(Reservation.status)
@@ -443,11 +443,11 @@ async def export_statistics_csv(
             .join(Program, Reservation.program_id == Program.id)
             .where(and_(
                 Reservation.institution_id == institution_id,
-                Reservation.date >= start_str,
-                Reservation.date <= end_str,
+                Reservation.visit_date >= parse_visit_date(start_str),
+                Reservation.visit_date <= parse_visit_date(end_str),
                 Reservation.deleted_at.is_(None)
             ))
-            .order_by(Reservation.date)
+            .order_by(Reservation.visit_date, Reservation.time_block)
         )
         
         writer = csv.writer(output, delimiter=';')
@@ -497,8 +497,8 @@ async def export_statistics_csv(
                     func.coalesce(func.sum(Reservation.num_teachers), 0).label("teachers"),
                 ).where(and_(
                     Reservation.institution_id == institution_id,
-                    Reservation.date >= month_start,
-                    Reservation.date <= month_end,
+                    Reservation.visit_date >= parse_visit_date(month_start),
+                    Reservation.visit_date <= parse_visit_date(month_end),
                     Reservation.deleted_at.is_(None),
                     Reservation.status != "cancelled"
                 ))
@@ -536,8 +536,8 @@ async def export_statistics_csv(
             .join(Program, Reservation.program_id == Program.id)
             .where(and_(
                 Reservation.institution_id == institution_id,
-                Reservation.date >= start_str,
-                Reservation.date <= end_str,
+                Reservation.visit_date >= parse_visit_date(start_str),
+                Reservation.visit_date <= parse_visit_date(end_str),
                 Reservation.deleted_at.is_(None),
                 Reservation.status != "cancelled"
             ))
@@ -609,8 +609,8 @@ async def get_bookings_over_time(
             select(func.count(Reservation.id))
             .where(and_(
                 Reservation.institution_id == institution_id,
-                Reservation.date >= month_start,
-                Reservation.date <= month_end,
+                Reservation.visit_date >= parse_visit_date(month_start),
+                Reservation.visit_date <= parse_visit_date(month_end),
                 Reservation.deleted_at.is_(None),
                 Reservation.status != "cancelled"
             ))
@@ -646,8 +646,8 @@ async def get_popular_programs(
         .join(Program, Reservation.program_id == Program.id)
         .where(and_(
             Reservation.institution_id == institution_id,
-            Reservation.date >= start_date,
-            Reservation.date <= end_date,
+            Reservation.visit_date >= parse_visit_date(start_date),
+            Reservation.visit_date <= parse_visit_date(end_date),
             Reservation.deleted_at.is_(None),
             Reservation.status != "cancelled"
         ))
@@ -685,19 +685,19 @@ async def get_heatmap(
 
     from calendar import monthrange
     _, last_day = monthrange(y, m)
-    start = f"{y}-{m:02d}-01"
-    end = f"{y}-{m:02d}-{last_day}"
+    start = date(y, m, 1)
+    end = date(y, m, last_day)
 
     result = await db.execute(
         sql_text("""
             SELECT
-                EXTRACT(DOW FROM r.date::date) as dow,
+                EXTRACT(DOW FROM r.visit_date) as dow,
                 r.time_block,
                 COUNT(r.id) as cnt
             FROM reservations r
             WHERE r.institution_id = :inst_id
-              AND r.date >= :start_date
-              AND r.date <= :end_date
+              AND r.visit_date >= :start_date
+              AND r.visit_date <= :end_date
               AND r.deleted_at IS NULL
               AND r.status != 'cancelled'
             GROUP BY dow, r.time_block
@@ -742,18 +742,19 @@ async def get_trends(
         result = await db.execute(
             sql_text("""
                 SELECT
-                    EXTRACT(MONTH FROM r.date::date) as m,
+                    EXTRACT(MONTH FROM r.visit_date) as m,
                     COUNT(r.id) as cnt,
                     COALESCE(SUM(r.num_students), 0) as students
                 FROM reservations r
                 WHERE r.institution_id = :inst_id
-                  AND EXTRACT(YEAR FROM r.date::date) = :yr
+                  AND r.visit_date >= :year_start
+                  AND r.visit_date < :next_year
                   AND r.deleted_at IS NULL
                   AND r.status != 'cancelled'
                 GROUP BY m
                 ORDER BY m
             """),
-            {"inst_id": institution_id, "yr": yr},
+            {"inst_id": institution_id, "year_start": date(yr, 1, 1), "next_year": date(yr + 1, 1, 1)},
         )
         rows = result.fetchall()
         month_map = {int(r.m): {"bookings": r.cnt, "students": int(r.students)} for r in rows}
@@ -798,8 +799,8 @@ async def get_top_schools(
 
     from calendar import monthrange
     _, last_day = monthrange(y, m)
-    start = f"{y}-{m:02d}-01"
-    end = f"{y}-{m:02d}-{last_day}"
+    start = date(y, m, 1)
+    end = date(y, m, last_day)
 
     result = await db.execute(
         sql_text("""
@@ -811,8 +812,8 @@ async def get_top_schools(
                 COALESCE(SUM(r.num_teachers), 0) as total_teachers
             FROM reservations r
             WHERE r.institution_id = :inst_id
-              AND r.date >= :start_date
-              AND r.date <= :end_date
+              AND r.visit_date >= :start_date
+              AND r.visit_date <= :end_date
               AND r.deleted_at IS NULL
               AND r.status != 'cancelled'
             GROUP BY r.school_name, r.contact_email
@@ -856,16 +857,16 @@ async def get_conversion_rate(
 
     from calendar import monthrange
     _, last_day = monthrange(y, m)
-    start = f"{y}-{m:02d}-01"
-    end = f"{y}-{m:02d}-{last_day}"
+    start = date(y, m, 1)
+    end = date(y, m, last_day)
 
     result = await db.execute(
         sql_text("""
             SELECT r.status, COUNT(r.id) as cnt
             FROM reservations r
             WHERE r.institution_id = :inst_id
-              AND r.date >= :start_date
-              AND r.date <= :end_date
+              AND r.visit_date >= :start_date
+              AND r.visit_date <= :end_date
               AND r.deleted_at IS NULL
             GROUP BY r.status
         """),
@@ -20,7 +20,9 @@ from database.models import (
     MailingCampaign, WaitlistEntry, BillingOrder, UsageMetric, AuditLog,
     FeatureFlag, InstitutionJoinRequest,
 )
-from database.supabase_repositories import InstitutionRepositorySupabase
+from database.supabase_repositories import InstitutionRepositorySupabase, user_by_email
+from core.response_cache import invalidate_public_cache
+from services.institution_context import FEATURE_FLAGS_TAG
 from services.plan_service import PLAN_LIMITS, PLAN_LABELS
 from services.billing_service import create_billing_order, confirm_billing_order
 from services.usage_service import get_institution_usage
@@ -548,6 +550,7 @@ async def delete_institution(
     )
 
     await db.commit()
+    await invalidate_public_cache(db, f"institution:{institution_id}", "catalog")
 
     logger.warning(
         f"Superadmin DELETED institution {institution_id} ({inst.name}) by {current_user['email']}. Reason: {data.reason or 'n/a'}"
@@ -963,6 +966,7 @@ async def update_feature_flag(
         details={"key": key, "before": before, "after": {"enabled": flag.enabled, "allowed": list(flag.allowed_institution_ids)}},
     )
     await db.commit()
+    await invalidate_public_cache(db, FEATURE_FLAGS_TAG)
     return {
         "key": flag.key,
         "enabled": flag.enabled,
@@ -990,7 +994,7 @@ async def reset_user_password(
     from core.security import hash_password
     if len(data.new_password) < 8:
         raise HTTPException(status_code=400, detail="Heslo musí mít alespoň 8 znaků")
-    result = await db.execute(select(User).where(User.email == data.email))
+    result = await db.execute(user_by_email(data.email))
     user = result.scalar_one_or_none()
     created = False
     if not user:
@@ -22,7 +22,7 @@ PATCH  /api/teacher/me              — update name/school_name/phone
 GET    /api/teacher/favorites       — list favourite programs (with program data)
 POST   /api/teacher/favorites       — add favourite (idempotent)
 DELETE /api/teacher/favorites/{program_id} — remove favourite
-GET    /api/teacher/bookings        — list reservations matching teacher email
+GET    /api/teacher/bookings        — reservations matching teacher email (cursor paginated)
 """
 import uuid
 import logging
@@ -31,13 +31,14 @@ from typing import Optional, List
 
 import bcrypt
 import jwt as pyjwt
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, Field, field_validator
-from sqlalchemy import select, and_, or_, delete as sa_delete
+from sqlalchemy import select, and_, or_, func, tuple_, delete as sa_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import JWT_SECRET, JWT_ALGORITHM
+from core.pagination import decode_cursor, encode_cursor, parse_uuid
 from core.security import decode_jwt_token
 from database.supabase import get_db
 from database.models import (
@@ -414,19 +415,39 @@ async def remove_favorite(
 async def list_bookings(
     teacher: TeacherAccount = Depends(get_current_teacher),
     db: AsyncSession = Depends(get_db),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    upcoming: bool = Query(False, description="Only visits from today on, soonest first"),
 ):
-    """All reservations whose contact_email matches the teacher's email — newest first."""
+    """Reservations whose contact_email matches the teacher's email, across all
+    institutions — newest visit first, or the upcoming ones soonest first.
+
+    Keyset paginated on (date, time_block, id) over
+    idx_reservations_lower_contact_visit, so a page costs the same however
+    large `reservations` grows. Returns ``{items, next_cursor}``.
+    """
+    after = decode_cursor(cursor, (str, str, parse_uuid))
+    key = tuple_(Reservation.date, Reservation.time_block, Reservation.id)
     q = (
         select(Reservation, Program, Institution)
         .join(Program, Reservation.program_id == Program.id)
         .join(Institution, Reservation.institution_id == Institution.id)
-        .where(Reservation.contact_email == teacher.email)
-        .order_by(Reservation.date.desc(), Reservation.time_block.desc())
+        .where(func.lower(Reservation.contact_email) == teacher.email.lower())
     )
-    res = await db.execute(q)
-    out: List[dict] = []
-    for r, program, institution in res.all():
-        out.append({
+    if upcoming:
+        q = q.where(Reservation.date >= datetime.now(timezone.utc).date().isoformat())
+        if after:
+            q = q.where(key > tuple_(*after))
+        q = q.order_by(Reservation.date, Reservation.time_block, Reservation.id)
+    else:
+        if after:
+            q = q.where(key < tuple_(*after))
+        q = q.order_by(Reservation.date.desc(), Reservation.time_block.desc(), Reservation.id.desc())
+    res = await db.execute(q.limit(limit))
+    rows = res.all()
+    items: List[dict] = []
+    for r, program, institution in rows:
+        items.append({
             "id": str(r.id),
             "date": r.date,
             "time_block": r.time_block,
@@ -441,4 +462,8 @@ async def list_bookings(
             "num_teachers": r.num_teachers,
             "created_at": r.created_at.isoformat() if r.created_at else None,
         })
-    return out
+    last = rows[-1][0] if rows else None
+    return {
+        "items": items,
+        "next_cursor": encode_cursor([last.date, last.time_block, last.id]) if len(rows) == limit else None,
+    }
@@ -49,6 +49,8 @@ class WaitlistStatusUpdate(BaseModel):
 def _to_dict(obj) -> dict:
     result = {}
     for c in obj.__table__.columns:
+        if c.computed is not None:  # requested_range: derived, matching only
+            continue
         value = getattr(obj, c.name)
         if isinstance(value, uuid.UUID):
             value = str(value)
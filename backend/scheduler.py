@@ -3,25 +3,43 @@ Feedback Scheduler - APScheduler integration for automatic feedback emails.
 
 Sends feedback request emails 1 working day after a completed reservation.
 Working days = Monday-Friday (skips weekends).
+
+Where the jobs run is controlled by ``SCHEDULER_MODE``:
+- ``embedded`` (default): the web process starts the scheduler itself
+  (only safe with a single uvicorn worker / replica).
+- ``leader``: every process campaigns for a Postgres advisory lock and only
+  the current holder runs the jobs; the others stand by and take over when
+  the leader's session dies.
+- ``off``: web processes never run jobs; start ``python scheduler.py`` as a
+  separate process instead.
 """
+import asyncio
+import hashlib
 import os
+import re
 import logging
+import uuid
 from datetime import datetime, timedelta, timezone
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from sqlalchemy import select, and_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.supabase import AsyncSessionLocal
 from database.models import Reservation, Feedback, Institution, Program, EmailLog
 from routes.feedback import generate_feedback_token
 from services.email_service import EmailService
+from services.working_days import subtract_working_days  # noqa: F401  (scripts/test_visit_reminder.py)
 
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler = AsyncIOScheduler()
 
+# Feedback emails per Resend batch call and per commit of their sent marks
+FEEDBACK_SEND_CHUNK = 50
+
 _EMAIL_RE = None
 
 
@@ -33,16 +51,6 @@ def _valid_email(email: str) -> bool:
     return bool(email and _EMAIL_RE.match(email.strip()))
 
 
-def subtract_working_days(d, n: int):
-    """Return the date that is ``n`` working days (Mon–Fri) before ``d``."""
-    cur = d
-    while n > 0:
-        cur -= timedelta(days=1)
-        if cur.weekday() < 5:  # Mon-Fri
-            n -= 1
-    return cur
-
-
 def get_next_working_day(from_date: datetime) -> datetime:
     """
     Get the next working day (skip weekends).
@@ -112,78 +120,52 @@ async def process_completed_reservations():
             logger.error(f"Error auto-completing reservations: {e}")
     
     # --- Step 2: Send feedback emails for newly completed reservations ---
+    # claim (commit) → render → batch send → mark sent + commit per chunk
     async with AsyncSessionLocal() as db:
         try:
             today = datetime.now(timezone.utc)
             
-            # Find all completed reservations without feedback
-            # We need to check reservations from recent days and filter by working day logic
-            
             # Get reservations from the last 7 days that are completed/confirmed
             week_ago = (today - timedelta(days=7)).strftime("%Y-%m-%d")
             
             result = await db.execute(
-                select(Reservation, Institution, Program)
-                .join(Institution, Reservation.institution_id == Institution.id)
-                .join(Program, Reservation.program_id == Program.id)
+                select(Reservation)
                 .outerjoin(Feedback, Reservation.id == Feedback.reservation_id)
                 .where(
                     and_(
                         Reservation.date >= week_ago,
                         Reservation.date < today.strftime("%Y-%m-%d"),
                         Reservation.status.in_(['confirmed', 'completed']),
+                        Reservation.program_id.isnot(None),
                         Feedback.id == None  # No feedback created yet
                     )
                 )
             )
+            # Only 1 working day after the visit
+            due = [r for r in result.scalars().all() if is_working_day_after(r.date, today)]
             
-            rows = result.all()
+            claimed = await claim_feedback_requests(db, due)
+            if claimed:
+                logger.info(f"Claimed {claimed} feedback requests.")
             
-            sent_count = 0
-            for reservation, institution, program in rows:
-                # Check if this is 1 working day after the reservation
-                if not is_working_day_after(reservation.date, today):
-                    continue
-                
-                logger.info(f"Processing reservation {reservation.id} for feedback...")
-                
-                try:
-                    # Create feedback entry
-                    token = generate_feedback_token()
-                    feedback = Feedback(
-                        institution_id=reservation.institution_id,
-                        reservation_id=reservation.id,
-                        program_id=reservation.program_id,
-                        token=token,
-                        status='pending'
-                    )
-                    db.add(feedback)
-                    await db.flush()
-                    
-                    # Send feedback email
-                    feedback_url = f"{os.getenv('FRONTEND_URL', 'https://www.budezivo.cz')}/feedback/{token}"
-                    
-                    email_sent = await send_feedback_request_email(
-                        recipient_email=reservation.contact_email,
-                        recipient_name=reservation.contact_name,
-                        institution_name=institution.name,
-                        program_name=program.name_cs,
-                        reservation_date=reservation.date,
-                        feedback_url=feedback_url
+            # Claimed requests not sent yet: this run's claims plus any left
+            # by an interrupted or failed earlier run (same 7-day window).
+            result = await db.execute(
+                select(Feedback, Reservation, Institution.name, Program.name_cs)
+                .join(Reservation, Feedback.reservation_id == Reservation.id)
+                .join(Institution, Feedback.institution_id == Institution.id)
+                .join(Program, Feedback.program_id == Program.id)
+                .where(
+                    and_(
+                        Feedback.status == 'pending',
+                        Feedback.email_sent_at == None,
+                        Reservation.date >= week_ago,
                     )
-                    
-                    if email_sent:
-                        feedback.email_sent_at = datetime.now(timezone.utc)
-                        sent_count += 1
-                        logger.info(f"Feedback email sent for reservation {reservation.id}")
-                    else:
-                        logger.warning(f"Failed to send feedback email for reservation {reservation.id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing reservation {reservation.id}: {e}")
-                    continue
-            
-            await db.commit()
+                )
+            )
+            sent_count = await dispatch_feedback_emails(
+                db, result.all(), "feedback_request", Feedback.email_sent_at
+            )
             logger.info(f"Feedback scheduler job completed. Sent {sent_count} emails.")
             
         except Exception as e:
@@ -191,43 +173,102 @@ async def process_completed_reservations():
             await db.rollback()
 
 
-async def send_feedback_request_email(
-    recipient_email: str,
-    recipient_name: str,
-    institution_name: str,
-    program_name: str,
-    reservation_date: str,
-    feedback_url: str
-) -> bool:
-    """Send feedback request email using the centralised template system."""
-    try:
-        try:
-            date_obj = datetime.strptime(reservation_date, "%Y-%m-%d")
-            formatted_date = date_obj.strftime("%d. %m. %Y")
-        except Exception:
-            formatted_date = reservation_date
-
-        from templates.emails import get_template
-        template_result = get_template("feedback_request", {
-            "recipient_name": recipient_name,
-            "institution_name": institution_name,
-            "program_name": program_name,
-            "formatted_date": formatted_date,
-            "feedback_url": feedback_url,
-        })
+async def claim_feedback_requests(db: AsyncSession, reservations) -> int:
+    """Insert the pending feedback rows of ``reservations`` in one statement
+    and commit. ``reservation_id`` is unique, so a reservation is claimed
+    once however often the job runs. Returns the number of new rows.
+    """
+    if not reservations:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "institution_id": r.institution_id,
+            "reservation_id": r.id,
+            "program_id": r.program_id,
+            "token": generate_feedback_token(),
+            "status": "pending",
+            "answers": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for r in reservations
+    ]
+    result = await db.execute(
+        pg_insert(Feedback).values(rows)
+        .on_conflict_do_nothing(index_elements=[Feedback.reservation_id])
+        .returning(Feedback.id)
+    )
+    claimed = len(result.all())
+    await db.commit()
+    return claimed
 
-        result = await EmailService.send_email(
-            to_email=recipient_email,
-            subject=template_result["subject"],
-            html_content=template_result["html"],
-            text_content=template_result.get("text"),
-            add_gdpr_footer=False,
-        )
-        return result.get("status") == "sent"
 
-    except Exception as e:
-        logger.error(f"Failed to send feedback email: {e}")
-        return False
+def render_feedback_email(template_name: str, reservation, institution_name: str,
+                          program_name: str, token: str) -> dict:
+    """EmailService.send_batch message for a feedback request / reminder."""
+    try:
+        date_obj = datetime.strptime(reservation.date, "%Y-%m-%d")
+        formatted_date = date_obj.strftime("%d. %m. %Y")
+    except Exception:
+        formatted_date = reservation.date
+
+    from templates.emails import get_template
+    template_result = get_template(template_name, {
+        "recipient_name": reservation.contact_name,
+        "institution_name": institution_name,
+        "program_name": program_name,
+        "formatted_date": formatted_date,
+        "feedback_url": f"{os.getenv('FRONTEND_URL', 'https://www.budezivo.cz')}/feedback/{token}",
+    })
+    return {
+        "to_email": reservation.contact_email,
+        "subject": template_result["subject"],
+        "html_content": template_result["html"],
+        "text_content": template_result.get("text"),
+        "add_gdpr_footer": False,
+    }
+
+
+async def dispatch_feedback_emails(db: AsyncSession, rows, template_name: str, sent_column) -> int:
+    """Send feedback emails for ``(feedback, reservation, institution name,
+    program name)`` rows through the Resend batch API, FEEDBACK_SEND_CHUNK at
+    a time. After each chunk ``sent_column`` is set on the delivered rows and
+    committed, so an interrupted run re-sends at most one chunk.
+    Returns the number of sent emails.
+    """
+    items = []
+    for feedback, reservation, institution_name, program_name in rows:
+        if not _valid_email(reservation.contact_email or ""):
+            logger.warning(f"Skipping feedback {feedback.id}: invalid contact email")
+            continue
+        try:
+            message = render_feedback_email(
+                template_name, reservation, institution_name, program_name, feedback.token
+            )
+        except Exception as e:
+            logger.error(f"Failed to render {template_name} for feedback {feedback.id}: {e}")
+            continue
+        items.append((feedback.id, message))
+
+    sent_count = 0
+    for start in range(0, len(items), FEEDBACK_SEND_CHUNK):
+        chunk = items[start:start + FEEDBACK_SEND_CHUNK]
+        results = await EmailService.send_batch([message for _, message in chunk])
+        sent_ids = [fid for (fid, _), res in zip(chunk, results) if res.get("status") == "sent"]
+        for (fid, _), res in zip(chunk, results):
+            if res.get("status") != "sent":
+                logger.warning(f"Failed to send {template_name} for feedback {fid}: {res.get('error')}")
+        if sent_ids:
+            await db.execute(
+                update(Feedback)
+                .where(Feedback.id.in_(sent_ids))
+                .values({sent_column: datetime.now(timezone.utc)})
+            )
+            await db.commit()
+        sent_count += len(sent_ids)
+    return sent_count
 
 
 async def process_feedback_reminders():
@@ -245,7 +286,7 @@ async def process_feedback_reminders():
             
             # Find pending feedbacks where email was sent ~7 days ago and no reminder was sent
             result = await db.execute(
-                select(Feedback, Reservation, Institution, Program)
+                select(Feedback, Reservation, Institution.name, Program.name_cs)
                 .join(Reservation, Feedback.reservation_id == Reservation.id)
                 .join(Institution, Feedback.institution_id == Institution.id)
                 .join(Program, Feedback.program_id == Program.id)
@@ -259,37 +300,9 @@ async def process_feedback_reminders():
                     )
                 )
             )
-            
-            rows = result.all()
-            
-            sent_count = 0
-            for feedback, reservation, institution, program in rows:
-                logger.info(f"Sending reminder for feedback {feedback.id}...")
-                
-                try:
-                    feedback_url = f"{os.getenv('FRONTEND_URL', 'https://www.budezivo.cz')}/feedback/{feedback.token}"
-                    
-                    email_sent = await send_feedback_reminder_email(
-                        recipient_email=reservation.contact_email,
-                        recipient_name=reservation.contact_name,
-                        institution_name=institution.name,
-                        program_name=program.name_cs,
-                        reservation_date=reservation.date,
-                        feedback_url=feedback_url
-                    )
-                    
-                    if email_sent:
-                        feedback.reminder_sent_at = datetime.now(timezone.utc)
-                        sent_count += 1
-                        logger.info(f"Reminder email sent for feedback {feedback.id}")
-                    else:
-                        logger.warning(f"Failed to send reminder email for feedback {feedback.id}")
-                    
-                except Exception as e:
-                    logger.error(f"Error sending reminder for feedback {feedback.id}: {e}")
-                    continue
-            
-            await db.commit()
+            sent_count = await dispatch_feedback_emails(
+                db, result.all(), "feedback_reminder", Feedback.reminder_sent_at
+            )
             logger.info(f"Feedback reminder job completed. Sent {sent_count} reminder emails.")
             
         except Exception as e:
@@ -297,45 +310,6 @@ async def process_feedback_reminders():
             await db.rollback()
 
 
-async def send_feedback_reminder_email(
-    recipient_email: str,
-    recipient_name: str,
-    institution_name: str,
-    program_name: str,
-    reservation_date: str,
-    feedback_url: str
-) -> bool:
-    """Send feedback reminder email using the centralised template system."""
-    try:
-        try:
-            date_obj = datetime.strptime(reservation_date, "%Y-%m-%d")
-            formatted_date = date_obj.strftime("%d. %m. %Y")
-        except Exception:
-            formatted_date = reservation_date
-
-        from templates.emails import get_template
-        template_result = get_template("feedback_reminder", {
-            "recipient_name": recipient_name,
-            "institution_name": institution_name,
-            "program_name": program_name,
-            "formatted_date": formatted_date,
-            "feedback_url": feedback_url,
-        })
-
-        result = await EmailService.send_email(
-            to_email=recipient_email,
-            subject=template_result["subject"],
-            html_content=template_result["html"],
-            text_content=template_result.get("text"),
-            add_gdpr_footer=False,
-        )
-        return result.get("status") == "sent"
-
-    except Exception as e:
-        logger.error(f"Failed to send feedback reminder email: {e}")
-        return False
-
-
 RETENTION_DAYS = {
     "1year": 365,
     "2years": 730,
@@ -435,6 +409,11 @@ async def process_auto_archive_programs():
                 count += 1
             
             await db.commit()
+            if count:
+                from core.response_cache import invalidate_public_cache
+                await invalidate_public_cache(
+                    db, "catalog", *{f"institution:{p.institution_id}" for p in expired_programs}
+                )
             logger.info(f"Auto-archive: {count} programs archived.")
         except Exception as e:
             logger.error(f"Auto-archive job failed: {e}")
@@ -509,19 +488,125 @@ async def process_plan_expiration():
                     logger.info(f"Plan expired: inst {inst.id} (was {inst.plan})")
 
             await db.commit()
+            if expired:
+                from core.response_cache import invalidate_public_cache
+                await invalidate_public_cache(db, *{f"institution:{inst.id}" for inst in expired})
             logger.info(f"Plan expiration scheduler: {renewed} renewed, {expired_count} expired")
         except Exception as e:
             logger.error(f"Plan expiration job failed: {e}")
             await db.rollback()
 
 
+# Event payment reminders: concurrent sends, and applications per commit
+EVENT_REMINDER_CONCURRENCY = int(os.getenv("EVENT_PAYMENT_REMINDER_CONCURRENCY", "5"))
+EVENT_REMINDER_CHUNK = 50
+_PAYMENT_SLOTS = ("applicant_name", "variable_symbol")
+_PAYMENT_SLOT_RE = re.compile(r"\[\[(" + "|".join(_PAYMENT_SLOTS) + r")\]\]")
+
+
+def render_event_payment_template(row, has_applicant_name: bool, has_variable_symbol: bool) -> dict:
+    """event_payment_reminder rendered once per event date, payment method and
+    amount, with ``[[slot]]`` markers for the per-application fields.
+    """
+    from templates.emails import get_template
+    return get_template("event_payment_reminder", {
+        "event_name": row.event_name,
+        "applicant_name": "[[applicant_name]]" if has_applicant_name else "",
+        "institution_name": row.institution_name,
+        "date_label": row.start_datetime.strftime("%d.%m.%Y %H:%M") if row.start_datetime else None,
+        "price": row.total_amount,
+        "currency": "CZK",
+        "variable_symbol": "[[variable_symbol]]" if has_variable_symbol else None,
+        "payment_method": row.payment_method,
+        "account_number": row.account_number,
+        "bank_code": row.bank_code,
+        "account_name": row.account_name,
+    })
+
+
+def fill_event_payment_reminder(template: dict, values: dict) -> dict:
+    """Fill the per-application markers; HTML parts get escaped values like the template's own."""
+    import html as _html
+    text_values = {slot: str(values.get(slot) or "") for slot in _PAYMENT_SLOTS}
+    html_values = {slot: _html.escape(value) for slot, value in text_values.items()}
+    return {
+        part: _PAYMENT_SLOT_RE.sub(
+            lambda m: (html_values if part == "html" else text_values)[m.group(1)], content
+        ) if content else content
+        for part, content in template.items()
+    }
+
+
+async def send_event_payment_reminders(db: AsyncSession, rows, now: datetime) -> int:
+    """Send payment reminders for the rows of process_event_payment_reminders.
+
+    At most EVENT_REMINDER_CONCURRENCY sends run at once; after every
+    EVENT_REMINDER_CHUNK applications the delivered ones get
+    payment_reminder_sent_at and are committed, so an interrupted run
+    re-sends at most one chunk. Returns the number of sent reminders.
+    """
+    semaphore = asyncio.Semaphore(EVENT_REMINDER_CONCURRENCY)
+    templates = {}
+
+    async def _send(app_id, message):
+        async with semaphore:
+            try:
+                result = await EmailService.send_email(**message)
+            except Exception as e:
+                logger.error(f"Payment reminder failed for application {app_id}: {type(e).__name__}")
+                return None
+        return app_id if result.get("status") == "sent" else None
+
+    items = []
+    for row in rows:
+        email = (row.applicant_email or "").strip()
+        if not _valid_email(email):
+            continue
+        key = (row.event_date_id, row.payment_method, row.total_amount,
+               bool(row.applicant_name), bool(row.variable_symbol))
+        try:
+            if key not in templates:
+                templates[key] = render_event_payment_template(row, key[3], key[4])
+        except Exception as e:
+            logger.error(f"Failed to render payment reminder for application {row.id}: {e}")
+            continue
+        tpl = fill_event_payment_reminder(templates[key], {
+            "applicant_name": row.applicant_name,
+            "variable_symbol": row.variable_symbol,
+        })
+        items.append((row.id, {
+            "to_email": email,
+            "subject": tpl["subject"],
+            "html_content": tpl["html"],
+            "text_content": tpl.get("text"),
+            "add_gdpr_footer": False,
+            "reply_to": row.institution_email,
+        }))
+
+    sent_count = 0
+    for start in range(0, len(items), EVENT_REMINDER_CHUNK):
+        chunk = items[start:start + EVENT_REMINDER_CHUNK]
+        results = await asyncio.gather(*(_send(app_id, message) for app_id, message in chunk))
+        sent_ids = [app_id for app_id in results if app_id]
+        if sent_ids:
+            from database.models import EventApplication
+            await db.execute(
+                update(EventApplication)
+                .where(EventApplication.id.in_(sent_ids))
+                .values(payment_reminder_sent_at=now)
+            )
+            await db.commit()
+        sent_count += len(sent_ids)
+    return sent_count
+
+
 async def process_event_payment_reminders():
     """Send a gentle payment reminder for QR/cash event applications that are
     still unpaid and whose event date is within EVENT_PAYMENT_REMINDER_DAYS days.
 
-    Sent at most once per application (payment_reminder_sent_at guard).
+    Sent at most once per application (payment_reminder_sent_at guard). The
+    institution's payment settings come with the applications in one query.
     """
-    import re as _re
     from database.models import EventApplication, EventDate, Event, InstitutionPaymentSettings
 
     days = int(os.getenv("EVENT_PAYMENT_REMINDER_DAYS", "3"))
@@ -533,10 +618,29 @@ async def process_event_payment_reminders():
             window_end = now + timedelta(days=days)
 
             rows = (await db.execute(
-                select(EventApplication, EventDate, Event, Institution)
+                select(
+                    EventApplication.id,
+                    EventApplication.event_date_id,
+                    EventApplication.applicant_email,
+                    EventApplication.applicant_name,
+                    EventApplication.total_amount,
+                    EventApplication.variable_symbol,
+                    EventApplication.payment_method,
+                    EventDate.start_datetime,
+                    Event.name.label("event_name"),
+                    Institution.name.label("institution_name"),
+                    Institution.email.label("institution_email"),
+                    InstitutionPaymentSettings.account_number,
+                    InstitutionPaymentSettings.bank_code,
+                    InstitutionPaymentSettings.account_name,
+                )
                 .join(EventDate, EventApplication.event_date_id == EventDate.id)
                 .join(Event, EventApplication.event_id == Event.id)
                 .join(Institution, EventApplication.institution_id == Institution.id)
+                .outerjoin(
+                    InstitutionPaymentSettings,
+                    InstitutionPaymentSettings.institution_id == EventApplication.institution_id,
+                )
                 .where(and_(
                     EventApplication.payment_method.in_(['qr', 'cash']),
                     EventApplication.payment_status.in_(['unpaid', 'pending']),
@@ -546,128 +650,107 @@ async def process_event_payment_reminders():
                     EventDate.start_datetime >= now,
                     EventDate.start_datetime <= window_end,
                 ))
+                .order_by(EventDate.start_datetime)
             )).all()
 
-            sent = 0
-            ps_cache = {}
-            for app, ed, event, inst in rows:
-                email = (app.applicant_email or "").strip()
-                if not email or not _re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", email):
-                    continue
-                iid = app.institution_id
-                if iid not in ps_cache:
-                    ps_cache[iid] = (await db.execute(
-                        select(InstitutionPaymentSettings).where(
-                            InstitutionPaymentSettings.institution_id == iid
-                        )
-                    )).scalar_one_or_none()
-                ps = ps_cache[iid]
-                date_label = ed.start_datetime.strftime("%d.%m.%Y %H:%M") if ed.start_datetime else None
-                try:
-                    from templates.emails import get_template
-                    tpl = get_template("event_payment_reminder", {
-                        "event_name": event.name,
-                        "applicant_name": app.applicant_name or "",
-                        "institution_name": inst.name,
-                        "date_label": date_label,
-                        "price": app.total_amount or 0,
-                        "currency": "CZK",
-                        "variable_symbol": app.variable_symbol,
-                        "payment_method": app.payment_method,
-                        "account_number": ps.account_number if ps else None,
-                        "bank_code": ps.bank_code if ps else None,
-                        "account_name": ps.account_name if ps else None,
-                    })
-                    res = await EmailService.send_email(
-                        to_email=email,
-                        subject=tpl["subject"],
-                        html_content=tpl["html"],
-                        text_content=tpl.get("text"),
-                        add_gdpr_footer=False,
-                        reply_to=getattr(inst, "email", None),
-                    )
-                    if res.get("status") == "sent":
-                        app.payment_reminder_sent_at = now
-                        sent += 1
-                except Exception as e:
-                    logger.error(f"Payment reminder failed for application {app.id}: {type(e).__name__}")
-                    continue
-
-            await db.commit()
-            logger.info(f"Event payment reminder job completed. Sent {sent} reminders.")
+            sent = await send_event_payment_reminders(db, rows, now)
+            logger.info(f"Event payment reminder job completed. Sent {sent} of {len(rows)} reminders.")
         except Exception as e:
             logger.error(f"Event payment reminder job failed: {e}")
             await db.rollback()
 
 
+# Visit reminders: working days before the visit, and how far ahead to look
+VISIT_REMINDER_WORKING_DAYS = 2
+VISIT_REMINDER_HORIZON_DAYS = 10
+_REMINDER_SLOTS = ("teacher_name", "reservation_date", "reservation_time")
+_REMINDER_SLOT_RE = re.compile(r"\[\[(" + "|".join(_REMINDER_SLOTS) + r")\]\]")
+
+
+def render_visit_reminder_template(institution_name: str, institution_address: str, program_name: str) -> dict:
+    """reservation_reminder_teacher rendered once per institution + program,
+    with ``[[slot]]`` markers for the per-reservation fields.
+    """
+    from templates.emails import get_template
+    return get_template("reservation_reminder_teacher", {
+        **{slot: f"[[{slot}]]" for slot in _REMINDER_SLOTS},
+        "program_name": program_name,
+        "institution_name": institution_name,
+        "institution_address": institution_address or "",
+    })
+
+
+def fill_visit_reminder(template: dict, values: dict) -> dict:
+    """Fill the per-reservation ``[[slot]]`` markers (single pass)."""
+    return {
+        part: _REMINDER_SLOT_RE.sub(lambda m: str(values.get(m.group(1)) or ""), content) if content else content
+        for part, content in template.items()
+    }
+
+
 async def process_visit_reminders():
     """Send 'visit reminder' to the booking contact 2 working days before the visit.
 
-    - Working days = Mon–Fri (weekends skipped; public holidays not considered yet).
+    - Working days = Mon–Fri without Czech public holidays (services/working_days).
     - Only for active reservations (pending/confirmed); never cancelled/rejected/completed/deleted.
     - Sent at most once (visit_reminder_sent_at guard); failures never mark it as sent.
-    - Gated per institution by notification_settings.customer.visit_reminder (default False).
+    - Gated per institution by notification_settings.customer.visit_reminder and
+      per program by send_email_notification — both in the SQL predicate.
+    - The due visit dates are computed once per run, so only reservations that
+      get a reminder today are read; the template is rendered once per
+      institution + program.
     - Every attempt is written to email_logs.
     """
+    from services.notification_preferences import customer_notification_sql
+    from services.working_days import ensure_public_holidays, load_holidays, remind_visit_dates
     logger.info("Running visit reminder scheduler job...")
     async with AsyncSessionLocal() as db:
         try:
             now = datetime.now(timezone.utc)
             today = now.date()
-            today_str = today.strftime("%Y-%m-%d")
-            horizon_str = (today + timedelta(days=10)).strftime("%Y-%m-%d")
+            horizon = today + timedelta(days=VISIT_REMINDER_HORIZON_DAYS)
+
+            await ensure_public_holidays(db, {today.year - 1, today.year, horizon.year})
+            holidays = await load_holidays(db, today - timedelta(days=31), horizon)
+            due_dates = remind_visit_dates(
+                today, VISIT_REMINDER_WORKING_DAYS, VISIT_REMINDER_HORIZON_DAYS, holidays
+            )
 
             rows = (await db.execute(
-                select(Reservation, Institution, Program)
+                select(
+                    Reservation,
+                    Institution.name, Institution.address, Institution.email,
+                    Program.name_cs,
+                )
                 .join(Institution, Reservation.institution_id == Institution.id)
                 .join(Program, Reservation.program_id == Program.id)
                 .where(and_(
+                    Reservation.visit_date.in_(due_dates),
                     Reservation.status.in_(['pending', 'confirmed']),
-                    Reservation.date >= today_str,
-                    Reservation.date <= horizon_str,
                     Reservation.visit_reminder_sent_at.is_(None),
                     Reservation.deleted_at.is_(None),
+                    customer_notification_sql(Institution.notification_settings, "visit_reminder"),
+                    # Program-level opt-out also applies to customer emails
+                    Program.send_email_notification.isnot(False),
                 ))
-            )).all()
+            )).all() if due_dates else []
 
+            templates = {}
             sent = 0
-            for res, inst, prog in rows:
-                from services.notification_preferences import normalize_notifications
-                ns = normalize_notifications(inst.notification_settings)
-                if not ns["customer"]["visit_reminder"]:
-                    continue
-                # Program-level opt-out also applies to customer emails
-                if prog.send_email_notification is False:
-                    continue
-                try:
-                    visit_date = datetime.strptime(res.date, "%Y-%m-%d").date()
-                except Exception:
-                    continue
-                remind_date = subtract_working_days(visit_date, 2)
-                if today < remind_date:
-                    continue  # too early
-                if today >= visit_date:
-                    continue  # safety: never on/after the visit day
-
+            for res, inst_name, inst_address, inst_email, program_name in rows:
                 email = (res.contact_email or "").strip()
                 if not _valid_email(email):
                     res.visit_reminder_error = "chybí nebo neplatná e-mailová adresa"
                     res.visit_reminder_last_attempt_at = now
                     continue
 
-                try:
-                    date_label = visit_date.strftime("%d. %m. %Y")
-                except Exception:
-                    date_label = res.date
-
-                from templates.emails import get_template
-                tpl = get_template("reservation_reminder_teacher", {
-                    "teacher_name": res.contact_name or "",
-                    "program_name": prog.name_cs,
-                    "reservation_date": date_label,
-                    "reservation_time": res.time_block or "",
-                    "institution_name": inst.name,
-                    "institution_address": inst.address or "",
+                key = (res.institution_id, res.program_id)
+                if key not in templates:
+                    templates[key] = render_visit_reminder_template(inst_name, inst_address, program_name)
+                tpl = fill_visit_reminder(templates[key], {
+                    "teacher_name": res.contact_name,
+                    "reservation_date": res.visit_date.strftime("%d. %m. %Y"),
+                    "reservation_time": res.time_block,
                 })
 
                 log = EmailLog(
@@ -687,7 +770,7 @@ async def process_visit_reminders():
                         html_content=tpl["html"],
                         text_content=tpl.get("text"),
                         add_gdpr_footer=False,
-                        reply_to=getattr(inst, "email", None),
+                        reply_to=inst_email,
                     )
                     if result.get("status") == "sent":
                         res.visit_reminder_sent_at = now
@@ -707,12 +790,97 @@ async def process_visit_reminders():
                     log.error_message = str(e)[:500]
 
             await db.commit()
-            logger.info(f"Visit reminder job completed. Sent {sent} reminders.")
+            logger.info(
+                f"Visit reminder job completed. Sent {sent} reminders "
+                f"({len(rows)} due for {len(due_dates)} visit date(s))."
+            )
         except Exception as e:
             logger.error(f"Visit reminder job failed: {e}")
             await db.rollback()
 
 
+async def process_program_popularity_reconcile():
+    """Recount catalog popularity counters (trigger-maintained) to repair drift."""
+    from services.catalog_popularity import reconcile_program_popularity
+    async with AsyncSessionLocal() as db:
+        try:
+            fixed = await reconcile_program_popularity(db)
+            if fixed:
+                logger.info(f"Program popularity reconciled: {fixed} counter(s) corrected")
+        except Exception as e:
+            logger.error(f"Program popularity reconcile failed: {e}")
+            await db.rollback()
+
+
+async def process_booking_usage_reconcile():
+    """Recount this and last month's booking usage counters (trigger-maintained)."""
+    from services.usage_service import reconcile_booking_usage
+    async with AsyncSessionLocal() as db:
+        try:
+            fixed = await reconcile_booking_usage(db)
+            if fixed:
+                logger.info(f"Booking usage reconciled: {fixed} counter(s) corrected")
+        except Exception as e:
+            logger.error(f"Booking usage reconcile failed: {e}")
+            await db.rollback()
+
+
+async def process_event_seats_reconcile():
+    """Recount event seat counters (trigger-maintained) for upcoming dates."""
+    from services.event_seats import reconcile_event_seats
+    async with AsyncSessionLocal() as db:
+        try:
+            fixed = await reconcile_event_seats(db)
+            if fixed:
+                logger.info(f"Event seats reconciled: {fixed} counter(s) corrected")
+        except Exception as e:
+            logger.error(f"Event seats reconcile failed: {e}")
+            await db.rollback()
+
+
+async def process_feedback_stats_reconcile():
+    """Rebuild the per-program feedback aggregate (updated on submit)."""
+    from services.feedback_stats import reconcile_feedback_program_stats
+    async with AsyncSessionLocal() as db:
+        try:
+            fixed = await reconcile_feedback_program_stats(db)
+            if fixed:
+                logger.info(f"Feedback program stats reconciled: {fixed} row(s) corrected")
+        except Exception as e:
+            logger.error(f"Feedback program stats reconcile failed: {e}")
+            await db.rollback()
+
+
+async def process_page_view_rollup(nightly: bool = False):
+    """Refresh today's page-view rollup, or (nightly) re-roll the last few days."""
+    from services.page_views import nightly_rollup_days, rollup_page_views, today_utc
+    async with AsyncSessionLocal() as db:
+        try:
+            days = nightly_rollup_days() if nightly else [today_utc()]
+            await rollup_page_views(db, days)
+        except Exception as e:
+            logger.error(f"Page view rollup failed: {e}")
+            await db.rollback()
+
+
+async def process_resend_delivery_inbox():
+    """Apply staged Resend webhook events in batches (multi-instance safe: SKIP LOCKED)."""
+    from services.resend_delivery import INBOX_BATCH_SIZE, process_delivery_inbox
+    total = 0
+    async with AsyncSessionLocal() as db:
+        try:
+            # Bounded per run so a backlog cannot monopolise the job
+            for _ in range(20):
+                claimed = await process_delivery_inbox(db)
+                total += claimed
+                if claimed < INBOX_BATCH_SIZE:
+                    break
+        except Exception as e:
+            logger.error(f"Resend delivery inbox processing failed: {e}")
+    if total:
+        logger.info(f"Resend delivery inbox: applied {total} event(s)")
+
+
 async def process_scheduled_campaigns():
     """Send scheduled mailing campaigns whose time has come (Section 7).
 
@@ -825,6 +993,52 @@ def start_scheduler():
         misfire_grace_time=3600
     )
 
+    # Catalog popularity counters: nightly reconciliation at 2:30 AM UTC
+    scheduler.add_job(
+        process_program_popularity_reconcile,
+        CronTrigger(hour=2, minute=30),
+        id='program_popularity_reconcile',
+        replace_existing=True,
+        misfire_grace_time=3600
+    )
+
+    # Monthly booking usage counters: nightly reconciliation at 2:40 AM UTC
+    scheduler.add_job(
+        process_booking_usage_reconcile,
+        CronTrigger(hour=2, minute=40),
+        id='booking_usage_reconcile',
+        replace_existing=True,
+        misfire_grace_time=3600
+    )
+
+    # Event seat counters: nightly reconciliation at 2:50 AM UTC
+    scheduler.add_job(
+        process_event_seats_reconcile,
+        CronTrigger(hour=2, minute=50),
+        id='event_seats_reconcile',
+        replace_existing=True,
+        misfire_grace_time=3600
+    )
+
+    # Feedback aggregate: nightly rebuild at 3:15 AM UTC (after the GDPR cleanup)
+    scheduler.add_job(
+        process_feedback_stats_reconcile,
+        CronTrigger(hour=3, minute=15),
+        id='feedback_stats_reconcile',
+        replace_existing=True,
+        misfire_grace_time=3600
+    )
+
+    # Page-view rollups: nightly re-roll of the last days at 0:15 AM UTC
+    scheduler.add_job(
+        process_page_view_rollup,
+        CronTrigger(hour=0, minute=15),
+        kwargs={'nightly': True},
+        id='page_view_rollup_nightly',
+        replace_existing=True,
+        misfire_grace_time=3600
+    )
+
     # Scheduled campaign sender: check every minute (idempotent, multi-instance safe)
     from apscheduler.triggers.interval import IntervalTrigger as _Interval
     scheduler.add_job(
@@ -835,6 +1049,28 @@ def start_scheduler():
         misfire_grace_time=300
     )
     
+    # Today's page-view rollup: refresh every 10 minutes
+    scheduler.add_job(
+        process_page_view_rollup,
+        _Interval(minutes=10),
+        id='page_view_rollup_today',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=300
+    )
+
+    # Resend delivery webhooks staged by the route: apply every 5 seconds
+    scheduler.add_job(
+        process_resend_delivery_inbox,
+        _Interval(seconds=5),
+        id='resend_delivery_inbox',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=60
+    )
+
     # Outlook calendar sync — every 5 minutes
     from apscheduler.triggers.interval import IntervalTrigger
     async def _run_outlook_sync():
@@ -883,6 +1119,15 @@ def start_scheduler():
                 await session.execute(
                     delete(RefreshToken).where(RefreshToken.expires_at < now)
                 )
+                # Prune finished rate-limit windows (shared limiter storage)
+                from sqlalchemy import text as _sqltext
+                await session.execute(
+                    _sqltext("DELETE FROM rate_limit_counters WHERE expires_at < now()")
+                )
+                # Applied Resend webhook events (audit stays in resend_webhook_events)
+                await session.execute(
+                    _sqltext("DELETE FROM resend_webhook_inbox WHERE processed_at < now() - interval '7 days'")
+                )
                 await session.commit()
                 logger.info("Auth token cleanup completed")
         except Exception as e:
@@ -905,3 +1150,141 @@ def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
         logger.info("Feedback scheduler stopped")
+
+
+# ============ Multi-worker mode ============
+
+SCHEDULER_MODES = ("embedded", "leader", "off")
+LEADER_RETRY_SECONDS = 30
+# Deterministic int64 key for pg_advisory_lock (same scheme as collision_service).
+LEADER_LOCK_KEY = int(hashlib.sha256(b"budezivo:scheduler-leader").hexdigest()[:15], 16)
+
+_leader_task = None
+
+
+def resolve_scheduler_mode(value) -> str:
+    """Normalise SCHEDULER_MODE; unknown values fall back to ``embedded``."""
+    mode = (value or "embedded").strip().lower()
+    if mode not in SCHEDULER_MODES:
+        logger.warning(f"Unknown SCHEDULER_MODE={value!r}, using 'embedded'")
+        return "embedded"
+    return mode
+
+
+def leader_lock_dsn(value=None):
+    """SCHEDULER_LOCK_DATABASE_URL if it can hold the leader lock, else None.
+
+    Session-level advisory locks need a real session, see
+    core.config.session_database_url.
+    """
+    from core.config import session_database_url
+    return session_database_url(value)
+
+
+async def _connect_lock_session():
+    """Open a dedicated session for the leader lock (SCHEDULER_LOCK_DATABASE_URL)."""
+    import asyncpg
+    dsn = leader_lock_dsn()
+    if dsn is None:
+        raise RuntimeError("SCHEDULER_LOCK_DATABASE_URL is missing or points at the transaction pooler")
+    return await asyncpg.connect(dsn, statement_cache_size=0)
+
+
+async def run_leader_election(
+    connect=_connect_lock_session,
+    on_elected=None,
+    on_demoted=None,
+    retry_seconds: float = LEADER_RETRY_SECONDS,
+):
+    """Campaign for the scheduler leadership until cancelled.
+
+    The lock is held for as long as the dedicated session lives; a heartbeat
+    query detects a dropped session, after which jobs stop and the process
+    goes back to campaigning. Postgres releases the lock of a dead session,
+    so a standby takes over within ``retry_seconds``.
+    """
+    on_elected = on_elected or start_scheduler
+    on_demoted = on_demoted or stop_scheduler
+    while True:
+        conn = None
+        leader = False
+        try:
+            conn = await connect()
+            leader = bool(await conn.fetchval("SELECT pg_try_advisory_lock($1)", LEADER_LOCK_KEY))
+            if leader:
+                logger.info("Scheduler leadership acquired")
+                on_elected()
+                while True:
+                    await asyncio.sleep(retry_seconds)
+                    await conn.fetchval("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Scheduler leader session lost: {type(e).__name__}")
+        finally:
+            if leader:
+                on_demoted()
+                logger.info("Scheduler leadership released")
+            if conn is not None:
+                try:
+                    await conn.close()
+                except Exception:
+                    pass
+        await asyncio.sleep(retry_seconds)
+
+
+def start_scheduler_for_process():
+    """Start jobs in a web process according to SCHEDULER_MODE."""
+    global _leader_task
+    mode = resolve_scheduler_mode(os.getenv("SCHEDULER_MODE"))
+    if mode == "off":
+        logger.info("Scheduler disabled in this process (SCHEDULER_MODE=off)")
+    elif mode == "leader":
+        if leader_lock_dsn() is None:
+            # Two "leaders" would send every scheduled email twice; run no jobs instead.
+            logger.error(
+                "SCHEDULER_MODE=leader needs SCHEDULER_LOCK_DATABASE_URL (direct or session "
+                "pooler connection, not port 6543); scheduler NOT started in this process"
+            )
+            return
+        if _leader_task is None or _leader_task.done():
+            _leader_task = asyncio.get_running_loop().create_task(run_leader_election())
+        logger.info("Scheduler leader election started")
+    else:
+        start_scheduler()
+
+
+async def stop_scheduler_for_process():
+    """Stop jobs and give up the leader lock (if held)."""
+    global _leader_task
+    if _leader_task is not None:
+        _leader_task.cancel()
+        try:
+            await _leader_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _leader_task = None
+    stop_scheduler()
+
+
+async def _run_standalone():
+    """Entry point for a dedicated scheduler process (``python scheduler.py``)."""
+    if resolve_scheduler_mode(os.getenv("SCHEDULER_MODE")) == "leader":
+        # Several scheduler replicas: one runs, the rest are hot standbys.
+        if leader_lock_dsn() is None:
+            raise SystemExit(
+                "SCHEDULER_MODE=leader needs SCHEDULER_LOCK_DATABASE_URL "
+                "(direct or session pooler connection, not port 6543)"
+            )
+        await run_leader_election()
+    else:
+        start_scheduler()
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(_run_standalone())
@@ -0,0 +1,170 @@
+"""Measure the per-request overhead of the WAF middleware.
+
+Compares the current pure-ASGI WAF (single compiled matcher with literal
+prefilter) against the previous implementation (BaseHTTPMiddleware, 13
+regexes run one after another, body read via ``request.body()``). Requests
+are driven straight through the ASGI interface, so the numbers contain only
+middleware + a trivial endpoint, no network or server.
+
+    cd backend && python scripts/bench_waf.py [--requests 5000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from middleware import waf  # noqa: E402
+
+
+_LEGACY_PATTERNS = [(threat, re.compile(pattern, re.IGNORECASE)) for _, threat, pattern in waf._RULES]
+
+
+def _legacy_check(value: str):
+    for threat, pat in _LEGACY_PATTERNS:
+        if pat.search(value):
+            return threat
+    return None
+
+
+class LegacyWAFMiddleware(BaseHTTPMiddleware):
+    """The pre-rewrite middleware, kept here only as the benchmark baseline."""
+
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        for exempt in waf._EXEMPT_PATHS:
+            if path.startswith(exempt):
+                return await call_next(request)
+        for _, value in request.query_params.items():
+            if _legacy_check(value):
+                return JSONResponse(status_code=403, content={"detail": waf._BLOCKED_DETAIL})
+        for segment in path.split("/"):
+            if len(segment) > 4 and _legacy_check(segment):
+                return JSONResponse(status_code=403, content={"detail": waf._BLOCKED_DETAIL})
+        if request.method in ("POST", "PUT", "PATCH"):
+            content_type = request.headers.get("content-type", "")
+            content_length = int(request.headers.get("content-length", "0") or "0")
+            if "application/json" in content_type and 0 < content_length <= 10240:
+                body = await request.body()
+                if _legacy_check(body.decode("utf-8", errors="ignore")):
+                    return JSONResponse(status_code=403, content={"detail": waf._BLOCKED_DETAIL})
+        return await call_next(request)
+
+
+async def _endpoint(request: Request):
+    if request.method == "POST":
+        await request.body()
+    return JSONResponse({"ok": True})
+
+
+def _app(middleware=None):
+    app = Starlette(routes=[Route("/api/{rest:path}", _endpoint, methods=["GET", "POST"])])
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+SAMPLE_BODY = json.dumps({
+    "program_id": "6f1d2c3a-8a4b-4f1e-9f00-0c1d2e3f4a5b",
+    "date": "2026-11-12",
+    "time_block": "09:00-10:30",
+    "school_name": "Základní škola Komenského, Plzeň",
+    "contact_name": "Jana Nováková",
+    "contact_email": "jana.novakova@zs-komenskeho.cz",
+    "num_students": 24,
+    "special_requirements": "Třída s jedním vozíčkářem, prosíme o bezbariérový vstup. " * 20,
+}).encode()
+
+SCENARIOS = {
+    "GET catalog query": ("GET", "/api/public/catalog/6f1d2c3a-8a4b-4f1e-9f00-0c1d2e3f4a5b",
+                          b"city=Plze%C5%88&age=zs1&category=v%C3%BDtvarn%C3%A9&sort=popular", b""),
+    f"POST JSON {len(SAMPLE_BODY)} B": ("POST", "/api/bookings/public", b"", SAMPLE_BODY),
+}
+
+
+async def _call(app, method, path, query, body):
+    headers = [(b"host", b"bench")]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query, "headers": headers, "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def _measure(app, scenario, requests: int) -> float:
+    for _ in range(200):  # warm-up
+        await _call(app, *scenario)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _call(app, *scenario)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def _matcher_timing(values, repeat: int):
+    rows = []
+    for name, check in (("legacy sequential", _legacy_check), ("compiled + prefilter", waf._check_value)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for value in values:
+                check(value)
+        rows.append((name, (time.perf_counter() - start) / (repeat * len(values)) * 1e6))
+    return rows
+
+
+async def main(requests: int) -> None:
+    apps = {
+        "no WAF": _app(),
+        "legacy WAF": _app(LegacyWAFMiddleware),
+        "ASGI WAF": _app(waf.WAFMiddleware),
+    }
+    print(f"Per-request time over {requests} requests (µs)")
+    for label, scenario in SCENARIOS.items():
+        times = {name: await _measure(app, scenario, requests) for name, app in apps.items()}
+        base = times["no WAF"]
+        print(f"\n{label}")
+        for name, value in times.items():
+            overhead = "" if name == "no WAF" else f"  (+{value - base:.1f} µs overhead)"
+            print(f"  {name:<12} {value:8.1f}{overhead}")
+
+    print("\nMatcher only, per value (µs)")
+    values = ["Plzeň", "zs1", "6f1d2c3a-8a4b-4f1e-9f00-0c1d2e3f4a5b", SAMPLE_BODY.decode()]
+    for name, value in _matcher_timing(values, max(1, requests // 5)):
+        print(f"  {name:<22} {value:8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,211 @@
+"""Flash-crowd load test for event registration seat claims.
+
+Seeds one event with a single date of limited capacity, then lets N
+applicants (default 500) apply at the same moment. Each applicant runs the
+registration write path of POST /events/public/{id}/apply in its own session:
+variable symbol from the sequence, seat claim, insert, commit. Afterwards the
+report checks that
+
+- no more applications got a seat than the capacity allows;
+- ``event_dates.seats_taken`` equals the recount of occupying applications;
+- every variable symbol is unique;
+- cancelling seats through a status change frees them in the counter.
+
+Guards: APP_ENV=test and TEST_DATABASE_URL (see scripts.safety).
+
+    cd backend && APP_ENV=test TEST_DATABASE_URL=... \\
+        python scripts/load_event_registration.py [--applicants 500] [--capacity 40]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+try:
+    from scripts.safety import asyncpg_url, configure_sqlalchemy_test_database, require_test_database_url
+    from scripts.regression_core_seed import IDS
+except ModuleNotFoundError:
+    from safety import asyncpg_url, configure_sqlalchemy_test_database, require_test_database_url
+    from regression_core_seed import IDS
+
+SCRIPT = "load_event_registration.py"
+EVENT_NAME = "Load test – flash crowd"
+
+
+async def seed_event(conn, institution_id: str, capacity: int, price: float) -> dict:
+    event_id, date_id = uuid.uuid4(), uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    await conn.execute(
+        """
+        INSERT INTO events (id, institution_id, name, type, capacity, price, currency, is_active,
+                            is_archived, form_fields, created_at, updated_at)
+        VALUES ($1, $2, $3, 'event', $4, $5, 'CZK', true, false, '[]', $6, $6)
+        """,
+        event_id, uuid.UUID(institution_id), EVENT_NAME, capacity, price, now,
+    )
+    await conn.execute(
+        """
+        INSERT INTO event_dates (id, event_id, start_datetime, end_datetime, created_at)
+        VALUES ($1, $2, $3, $4, $5)
+        """,
+        date_id, event_id, now + timedelta(days=30), now + timedelta(days=30, hours=2), now,
+    )
+    return {"event_id": event_id, "date_id": date_id}
+
+
+async def cleanup(conn) -> None:
+    await conn.execute("DELETE FROM events WHERE name = $1", EVENT_NAME)
+
+
+async def apply(session_factory, event, date_id, index: int) -> tuple[str, str, float]:
+    """One applicant: the write path of routes.events.submit_application."""
+    from database.models import EventApplication
+    from routes.events import _resolve_application_status
+    from services.event_seats import next_variable_symbol
+
+    started = time.perf_counter()
+    async with session_factory() as db:
+        vs = await next_variable_symbol(db)
+        status = await _resolve_application_status(db, event, date_id)
+        db.add(EventApplication(
+            institution_id=event.institution_id,
+            event_id=event.id,
+            event_date_id=date_id,
+            applicant_data={},
+            applicant_email=f"load-{index}@example.test",
+            applicant_name=f"Zájemce {index}",
+            total_amount=event.price,
+            variable_symbol=vs,
+            status=status,
+            payment_status="unpaid",
+            payment_method="qr",
+        ))
+        await db.commit()
+    return status, vs, time.perf_counter() - started
+
+
+async def collect_report(applicants: int, capacity: int, cancel: int) -> dict:
+    db_url = require_test_database_url(SCRIPT)
+    os.environ.setdefault("DB_POOL_SIZE", "40")
+    os.environ.setdefault("DB_MAX_OVERFLOW", "10")
+
+    import asyncpg
+
+    conn = await asyncpg.connect(asyncpg_url(db_url), statement_cache_size=0)
+    try:
+        await cleanup(conn)
+        fixture = await seed_event(conn, IDS["institution"], capacity, price=150.0)
+    finally:
+        await conn.close()
+
+    configure_sqlalchemy_test_database(SCRIPT)
+    from sqlalchemy import func, select, update
+
+    from database.models import Event, EventApplication, EventDate
+    from database.supabase import AsyncSessionLocal, engine
+    from services.event_seats import OCCUPYING_STATUSES
+
+    try:
+        async with AsyncSessionLocal() as db:
+            event = (await db.execute(select(Event).where(Event.id == fixture["event_id"]))).scalar_one()
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            apply(AsyncSessionLocal, event, fixture["date_id"], i) for i in range(applicants)
+        ))
+        elapsed = time.perf_counter() - started
+
+        async def seats() -> tuple[int, int]:
+            async with AsyncSessionLocal() as db:
+                counter = (await db.execute(
+                    select(EventDate.seats_taken).where(EventDate.id == fixture["date_id"])
+                )).scalar_one()
+                recount = (await db.execute(
+                    select(func.count(EventApplication.id)).where(
+                        EventApplication.event_date_id == fixture["date_id"],
+                        EventApplication.status.in_(OCCUPYING_STATUSES),
+                    )
+                )).scalar_one()
+            return counter, recount
+
+        counter, recount = await seats()
+
+        async with AsyncSessionLocal() as db:
+            pending_ids = (await db.execute(
+                select(EventApplication.id).where(
+                    EventApplication.event_date_id == fixture["date_id"],
+                    EventApplication.status == "pending",
+                ).limit(cancel)
+            )).scalars().all()
+            await db.execute(
+                update(EventApplication).where(EventApplication.id.in_(pending_ids)).values(status="rejected")
+            )
+            await db.commit()
+        counter_after_cancel, recount_after_cancel = await seats()
+    finally:
+        if engine is not None:
+            await engine.dispose()
+        conn = await asyncpg.connect(asyncpg_url(db_url), statement_cache_size=0)
+        try:
+            await cleanup(conn)
+        finally:
+            await conn.close()
+
+    statuses = [status for status, _, _ in results]
+    latencies = sorted(latency for _, _, latency in results)
+    granted = statuses.count("pending")
+    checks = {
+        "capacity_never_exceeded": granted <= capacity and recount <= capacity,
+        "capacity_filled": granted == min(capacity, applicants),
+        "rest_waitlisted": statuses.count("waitlist") == applicants - granted,
+        "counter_matches_recount": counter == recount,
+        "variable_symbols_unique": len({vs for _, vs, _ in results}) == applicants,
+        "status_change_frees_seats": counter_after_cancel == recount_after_cancel == recount - len(pending_ids),
+    }
+    return {
+        "checks": checks,
+        "details": {
+            "applicants": applicants,
+            "capacity": capacity,
+            "granted": granted,
+            "seats_taken": counter,
+            "seats_taken_after_cancel": counter_after_cancel,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_s": round(applicants / elapsed, 1) if elapsed else None,
+            "latency_p50_ms": round(statistics.median(latencies) * 1000, 1),
+            "latency_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        },
+        "status": "ok" if all(checks.values()) else "attention_required",
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applicants", type=int, default=500)
+    parser.add_argument("--capacity", type=int, default=40)
+    parser.add_argument("--cancel", type=int, default=5, help="Seats to free by a status change afterwards.")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    report = await collect_report(args.applicants, args.capacity, args.cancel)
+    print(json.dumps(report, indent=2, sort_keys=True, default=str))
+    if report["status"] != "ok":
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
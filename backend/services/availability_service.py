@@ -17,6 +17,7 @@ from sqlalchemy import select, and_, func
 from database.models import (
     Program, Reservation, Room,
     LecturerAvailability, LecturerTimeOff, AvailabilityException,
+    reservation_is_active, reservation_on,
 )
 from services.collision_service import (
     parse_time_block, time_blocks_overlap,
@@ -122,8 +123,8 @@ async def _check_collision_layer(
     result = await db.execute(
         select(Reservation).where(and_(
             Reservation.institution_id == inst_uuid,
-            Reservation.date == date,
-            Reservation.status != 'cancelled'
+            reservation_on(date),
+            reservation_is_active(),
         ))
     )
     existing_reservations = result.scalars().all()
@@ -383,8 +384,8 @@ async def evaluate_lecturer_slots(
     result = await db.execute(
         select(Reservation).where(and_(
             Reservation.institution_id == inst_uuid,
-            Reservation.date == date,
-            Reservation.status != 'cancelled',
+            reservation_on(date),
+            reservation_is_active(),
             Reservation.assigned_lecturer_id == lect_uuid,
         ))
     )
@@ -0,0 +1,40 @@
+"""
+Program popularity counters for the public catalog ("popular" sort).
+
+`program_popularity` is maintained by a row trigger on `reservations`
+(alembic 6b7c8d9e0f1a); this module only holds the shared definition and the
+nightly reconciliation that repairs any drift (manual SQL fixes, restores).
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Reservation statuses that count towards popularity. Keep in sync with the
+# reservations_popularity_refresh() trigger function.
+POPULARITY_STATUSES = ('confirmed', 'pending_approval', 'done', 'approved')
+
+
+async def reconcile_program_popularity(db: AsyncSession) -> int:
+    """Recount every program from `reservations`; returns the number of corrected rows."""
+    result = await db.execute(
+        text(
+            """
+            INSERT INTO program_popularity (program_id, reservation_count, updated_at)
+            SELECT p.id,
+                   COUNT(r.id) FILTER (WHERE r.status = ANY(:statuses)),
+                   NOW()
+            FROM programs p
+            LEFT JOIN reservations r ON r.program_id = p.id
+            GROUP BY p.id
+            ON CONFLICT (program_id) DO UPDATE
+            SET reservation_count = EXCLUDED.reservation_count, updated_at = NOW()
+            WHERE program_popularity.reservation_count IS DISTINCT FROM EXCLUDED.reservation_count
+            """
+        ),
+        {"statuses": list(POPULARITY_STATUSES)},
+    )
+    await db.commit()
+    return result.rowcount or 0
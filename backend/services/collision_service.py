@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, text
 import uuid
 
-from database.models import Reservation, Program, Room
+from database.models import Reservation, Program, Room, reservation_is_active, reservation_on
 
 logger = logging.getLogger(__name__)
 
@@ -150,8 +150,8 @@ async def check_booking_collision(
         result = await db.execute(
             select(Reservation).where(and_(
                 Reservation.institution_id == inst_uuid,
-                Reservation.date == date,
-                Reservation.status != 'cancelled'
+                reservation_on(date),
+                reservation_is_active(),
             ))
         )
         existing = result.scalars().all()
@@ -178,8 +178,8 @@ async def check_booking_collision(
     result = await db.execute(
         select(Reservation).where(and_(
             Reservation.institution_id == inst_uuid,
-            Reservation.date == date,
-            Reservation.status != 'cancelled'
+            reservation_on(date),
+            reservation_is_active(),
         ))
     )
     existing = result.scalars().all()
@@ -346,8 +346,8 @@ async def check_lecturer_collision_for_assignment(
     result = await db.execute(
         select(Reservation).where(and_(
             Reservation.institution_id == inst_uuid,
-            Reservation.date == booking.date,
-            Reservation.status != 'cancelled',
+            reservation_on(booking.date),
+            reservation_is_active(),
             Reservation.id != book_uuid,  # Exclude the booking we're assigning to
         ))
     )
@@ -695,8 +695,8 @@ async def count_available_qualified_lecturers(
     res_q = await db.execute(
         select(Reservation).where(and_(
             Reservation.institution_id == inst_uuid,
-            Reservation.date == date_str,
-            Reservation.status != 'cancelled',
+            reservation_on(date_str),
+            reservation_is_active(),
         ))
     )
     occupied: set = set()
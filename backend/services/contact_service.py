@@ -15,7 +15,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_, func, literal_column, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import (
@@ -353,40 +353,120 @@ async def _upsert(
 
 # ── Query helpers (used by routes/contacts.py) ────────────────────────────
 
-async def list_contacts_for_institution(
-    db: AsyncSession,
+# Deliverability filter groups for the Contacts UI; anything else is matched
+# as a literal status.
+UNDELIVERABLE_STATUSES = ('bounced_hard', 'complained', 'suppressed', 'unsubscribed', 'failed')
+DELIVERABILITY_GROUPS = {
+    'problem': UNDELIVERABLE_STATUSES,
+    'warning': ('bounced_soft',),
+    'ok': ('delivered',),
+    'unknown': ('unknown',),
+}
+
+# Listing order is "most recent activity first, never-active last". The
+# sentinel turns NULLS LAST into a plain DESC key so pages can be keyset
+# based; it must match idx_contacts_inst_activity (alembic 1a2b3c4d5e6f).
+NO_ACTIVITY = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ACTIVITY_KEY = func.coalesce(
+    Contact.last_activity_at, literal_column("'1970-01-01 00:00:00+00'::timestamptz")
+)
+
+
+def contact_filters(
     institution_id: uuid.UUID,
     *,
     type_filter: Optional[str] = None,
     source_filter: Optional[str] = None,
     consent_filter: Optional[str] = None,  # 'yes' | 'no' | 'unknown' | None
+    deliverability_filter: Optional[str] = None,  # DELIVERABILITY_GROUPS key or a status
     search: Optional[str] = None,
-    limit: int = 500,
-) -> list[Contact]:
-    q = select(Contact).where(Contact.institution_id == institution_id)
+) -> list:
+    """WHERE clauses shared by the list, its count and the CSV export."""
+    where = [Contact.institution_id == institution_id]
     if type_filter and type_filter != 'all':
-        q = q.where(Contact.type == type_filter)
+        where.append(Contact.type == type_filter)
     if source_filter and source_filter != 'all':
-        q = q.where(Contact.primary_source == source_filter)
+        where.append(Contact.primary_source == source_filter)
     if consent_filter == 'yes':
-        q = q.where(Contact.marketing_consent.is_(True))
+        where.append(Contact.marketing_consent.is_(True))
     elif consent_filter == 'no':
-        q = q.where(Contact.marketing_consent.is_(False))
+        where.append(Contact.marketing_consent.is_(False))
     elif consent_filter == 'unknown':
-        q = q.where(Contact.marketing_consent.is_(None))
+        where.append(Contact.marketing_consent.is_(None))
+    if deliverability_filter and deliverability_filter != 'all':
+        statuses = DELIVERABILITY_GROUPS.get(deliverability_filter, (deliverability_filter,))
+        where.append(Contact.deliverability_status.in_(statuses))
     if search:
         s = f"%{search.strip().lower()}%"
-        q = q.where(or_(
+        where.append(or_(
             func.lower(Contact.email).like(s),
             func.lower(func.coalesce(Contact.first_name, '')).like(s),
             func.lower(func.coalesce(Contact.last_name, '')).like(s),
             func.lower(func.coalesce(Contact.phone, '')).like(s),
             func.lower(func.coalesce(Contact.school_name, '')).like(s),
         ))
-    q = q.order_by(Contact.last_activity_at.desc().nullslast(), Contact.created_at.desc()).limit(limit)
+    return where
+
+
+def contact_sort_key(contact: Contact) -> tuple:
+    """Keyset position of a listed contact (matches the ORDER BY)."""
+    return (contact.last_activity_at or NO_ACTIVITY, contact.created_at, contact.id)
+
+
+async def list_contacts_for_institution(
+    db: AsyncSession,
+    institution_id: uuid.UUID,
+    *,
+    type_filter: Optional[str] = None,
+    source_filter: Optional[str] = None,
+    consent_filter: Optional[str] = None,  # 'yes' | 'no' | 'unknown' | None
+    deliverability_filter: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = 500,
+    after: Optional[tuple] = None,  # contact_sort_key of the previous page's last row
+) -> list[Contact]:
+    where = contact_filters(
+        institution_id, type_filter=type_filter, source_filter=source_filter,
+        consent_filter=consent_filter, deliverability_filter=deliverability_filter, search=search,
+    )
+    if after is not None:
+        where.append(tuple_(ACTIVITY_KEY, Contact.created_at, Contact.id) < tuple_(*after))
+    q = (
+        select(Contact)
+        .where(*where)
+        .order_by(ACTIVITY_KEY.desc(), Contact.created_at.desc(), Contact.id.desc())
+        .limit(limit)
+    )
     return list((await db.execute(q)).scalars().all())
 
 
+async def count_contacts(db: AsyncSession, where: list, cap: int) -> tuple[int, bool]:
+    """Count matching contacts, stopping at ``cap``.
+
+    Returns ``(count, exact)``; past the cap the UI shows "cap+" rather than
+    scanning every row of a large institution for each page.
+    """
+    capped = select(Contact.id).where(*where).limit(cap + 1).subquery()
+    count = (await db.execute(select(func.count()).select_from(capped))).scalar() or 0
+    return min(count, cap), count <= cap
+
+
+async def contact_facets(db: AsyncSession, institution_id: uuid.UUID) -> dict:
+    """All header-strip counters in one scan of the institution's contacts."""
+    row = (await db.execute(
+        select(
+            func.count().label('total'),
+            func.count().filter(Contact.marketing_consent.is_(True)).label('with_consent'),
+            func.count().filter(Contact.marketing_consent.is_(False)).label('without_consent'),
+            func.count().filter(Contact.marketing_consent.is_(None)).label('unknown_consent'),
+            func.count().filter(Contact.type.in_(['pedagog', 'skola'])).label('schools'),
+            func.count().filter(Contact.type.in_(['rodic', 'verejnost'])).label('public'),
+            func.count().filter(Contact.deliverability_status.in_(UNDELIVERABLE_STATUSES)).label('undeliverable'),
+        ).where(Contact.institution_id == institution_id)
+    )).mappings().one()
+    return {key: int(value or 0) for key, value in row.items()}
+
+
 async def list_links_for_contact(
     db: AsyncSession,
     contact_id: uuid.UUID,
@@ -0,0 +1,273 @@
+"""
+Per-email deliverability ledger (`email_deliverability`, alembic 7c8d9e0f1a2b).
+
+One row per (institution, normalised email) with send / success / failure
+counters and the latest delivery status. The campaign sender records each
+send and the Resend webhook records status changes, both as deltas, so the
+delivery-health panel and the auto-flagging of invalid contacts read a few
+indexed rows instead of folding the whole campaign recipient history.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.resend_delivery import delivery_status_label
+
+logger = logging.getLogger(__name__)
+
+SUCCESS_DELIVERY_STATUSES = {"delivered", "opened", "clicked"}
+FAILED_DELIVERY_STATUSES = {"bounced_hard", "failed", "complained", "suppressed", "unsubscribed"}
+ATTEMPTED_RECIPIENT_STATUSES = {"sent", "failed"}
+
+# Recommendation thresholds (failures per email)
+INVALID_AFTER_FAILURES = 2
+WARNING_AFTER_FAILURES = 1
+
+AUTO_FLAG_BATCH_SIZE = 500
+
+
+def normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def recipient_outcome(status: Optional[str], delivery_status: Optional[str]) -> Optional[str]:
+    """Classify one campaign recipient row as 'successful', 'failed' or None (undecided)."""
+    effective = delivery_status or status or "unknown"
+    if effective in SUCCESS_DELIVERY_STATUSES or (status == "sent" and effective in {"sent", "unknown"}):
+        return "successful"
+    if effective in FAILED_DELIVERY_STATUSES or status == "failed":
+        return "failed"
+    return None
+
+
+def outcome_change(
+    institution_id,
+    recipient,
+    before: Optional[str],
+    *,
+    new_send: bool,
+    event_at: Optional[datetime] = None,
+) -> Optional[Dict[str, Any]]:
+    """Ledger delta for a recipient whose outcome went from ``before`` to its current one."""
+    email_norm = normalize_email(recipient.email)
+    if not email_norm:
+        return None
+    after = recipient_outcome(recipient.status, recipient.delivery_status)
+    if not new_send and after == before:
+        return None
+    delivery_status = recipient.delivery_status
+    last_status = delivery_status if delivery_status and delivery_status != "unknown" else recipient.status
+    return {
+        "institution_id": institution_id,
+        "email_norm": email_norm,
+        "email": recipient.email,
+        "contact_id": recipient.contact_id,
+        "school_id": recipient.school_id,
+        "school_name": recipient.school_name,
+        "contact_name": recipient.contact_name,
+        "sends": 1 if new_send else 0,
+        "successful": (after == "successful") - (before == "successful"),
+        "failed": (after == "failed") - (before == "failed"),
+        "last_status": last_status,
+        "failure_status": last_status if after == "failed" else None,
+        "failure_reason": recipient.failure_reason if after == "failed" else None,
+        "sent_at": recipient.sent_at if after == "successful" else None,
+        "event_at": event_at or recipient.delivery_event_at or recipient.sent_at,
+    }
+
+
+_UPSERT_SQL = text("""
+    INSERT INTO email_deliverability AS d (
+        institution_id, email_norm, email, contact_id, school_id, school_name, contact_name,
+        total_sends, successful, failed, last_status, last_failure_status, last_failure_reason,
+        last_sent_at, last_event_at, updated_at
+    ) VALUES (
+        :institution_id, :email_norm, :email, :contact_id, :school_id, :school_name, :contact_name,
+        :sends, GREATEST(:successful, 0), GREATEST(:failed, 0), :last_status, :failure_status, :failure_reason,
+        :sent_at, :event_at, NOW()
+    )
+    ON CONFLICT (institution_id, email_norm) DO UPDATE SET
+        email = EXCLUDED.email,
+        contact_id = COALESCE(EXCLUDED.contact_id, d.contact_id),
+        school_id = COALESCE(EXCLUDED.school_id, d.school_id),
+        school_name = COALESCE(EXCLUDED.school_name, d.school_name),
+        contact_name = COALESCE(EXCLUDED.contact_name, d.contact_name),
+        total_sends = d.total_sends + EXCLUDED.total_sends,
+        successful = GREATEST(d.successful + :successful, 0),
+        failed = GREATEST(d.failed + :failed, 0),
+        last_status = CASE
+            WHEN d.last_event_at IS NULL OR EXCLUDED.last_event_at IS NULL
+                 OR EXCLUDED.last_event_at >= d.last_event_at
+            THEN EXCLUDED.last_status ELSE d.last_status END,
+        last_failure_status = COALESCE(EXCLUDED.last_failure_status, d.last_failure_status),
+        last_failure_reason = CASE WHEN EXCLUDED.last_failure_status IS NOT NULL
+            THEN EXCLUDED.last_failure_reason ELSE d.last_failure_reason END,
+        last_sent_at = GREATEST(d.last_sent_at, EXCLUDED.last_sent_at),
+        last_event_at = GREATEST(d.last_event_at, EXCLUDED.last_event_at),
+        updated_at = NOW()
+""")
+
+
+async def record_outcomes(db: AsyncSession, changes: Iterable[Optional[Dict[str, Any]]]) -> int:
+    """Apply ledger deltas in one batched statement, inside the caller's transaction.
+
+    Runs in a savepoint: a ledger problem is logged and must never undo the
+    campaign / webhook bookkeeping it accompanies.
+    """
+    rows = [c for c in changes if c]
+    if not rows:
+        return 0
+    try:
+        async with db.begin_nested():
+            await db.execute(_UPSERT_SQL, rows)
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"Deliverability ledger update skipped ({len(rows)} rows): {e}")
+        return 0
+    return len(rows)
+
+
+def recommendation(failed: int) -> Tuple[str, Optional[str]]:
+    if failed >= INVALID_AFTER_FAILURES:
+        return "invalid", "Neplatný kontakt — doporučeno smazat"
+    if failed >= WARNING_AFTER_FAILURES:
+        return "warning", "Potenciální problém — sledujte"
+    return "ok", None
+
+
+def ledger_row_to_stats(row) -> Dict[str, Any]:
+    """Ledger row → delivery-health entry (same keys the admin panel already uses)."""
+    total = row["total_sends"] or 0
+    failed = row["failed"] or 0
+    rec, rec_label = recommendation(failed)
+    last_status = row["last_status"] or "unknown"
+    stats = {
+        "email": row["email"],
+        "school_name": row["school_name"],
+        "contact_name": row["contact_name"],
+        "contact_id": str(row["contact_id"]) if row["contact_id"] else None,
+        "school_id": str(row["school_id"]) if row["school_id"] else None,
+        "total_sends": total,
+        "successful": row["successful"] or 0,
+        "failed": failed,
+        "failure_rate": round(failed / total * 100, 1) if total else 0,
+        "last_failure_reason": (
+            row["last_failure_reason"] or delivery_status_label(row["last_failure_status"])
+            if row["last_failure_status"] else None
+        ),
+        "last_sent_at": row["last_sent_at"].isoformat() if row["last_sent_at"] else None,
+        "last_delivery_status": last_status,
+        "last_delivery_label": delivery_status_label(last_status),
+        "last_delivery_event_at": row["last_event_at"].isoformat() if row["last_event_at"] else None,
+        "recommendation": rec,
+    }
+    if rec_label:
+        stats["recommendation_label"] = rec_label
+    return stats
+
+
+async def deliverability_summary(db: AsyncSession, institution_id) -> Dict[str, int]:
+    row = (await db.execute(
+        text("""
+            SELECT
+                COUNT(*) AS tracked,
+                COUNT(*) FILTER (WHERE failed >= :invalid) AS invalid,
+                COUNT(*) FILTER (WHERE failed >= :warning AND failed < :invalid) AS warning
+            FROM email_deliverability
+            WHERE institution_id = :institution_id
+        """),
+        {"institution_id": institution_id, "invalid": INVALID_AFTER_FAILURES, "warning": WARNING_AFTER_FAILURES},
+    )).mappings().one()
+    return {"tracked": row["tracked"] or 0, "invalid": row["invalid"] or 0, "warning": row["warning"] or 0}
+
+
+async def list_problematic(
+    db: AsyncSession,
+    institution_id,
+    limit: int,
+    after: Optional[List[Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Emails with at least one failure, most failures first; keyset on (failed DESC, email_norm)."""
+    params: Dict[str, Any] = {"institution_id": institution_id, "limit": limit}
+    keyset = ""
+    if after:
+        keyset = "AND (failed < :after_failed OR (failed = :after_failed AND email_norm > :after_email))"
+        params.update(after_failed=after[0], after_email=after[1])
+    rows = (await db.execute(
+        text(f"""
+            SELECT *
+            FROM email_deliverability
+            WHERE institution_id = :institution_id AND failed > 0 {keyset}
+            ORDER BY failed DESC, email_norm
+            LIMIT :limit
+        """),
+        params,
+    )).mappings().all()
+    return [dict(r) for r in rows]
+
+
+async def _repeated_failure_batches(db: AsyncSession, institution_id, batch_size: int):
+    """Ledger rows with a linked contact and >= INVALID_AFTER_FAILURES failures, in keyset batches."""
+    last_email = ""
+    while True:
+        batch = (await db.execute(
+            text("""
+                SELECT email_norm, contact_id, failed
+                FROM email_deliverability
+                WHERE institution_id = :institution_id
+                  AND failed >= :invalid
+                  AND contact_id IS NOT NULL
+                  AND email_norm > :last_email
+                ORDER BY email_norm
+                LIMIT :batch_size
+            """),
+            {"institution_id": institution_id, "invalid": INVALID_AFTER_FAILURES,
+             "last_email": last_email, "batch_size": batch_size},
+        )).mappings().all()
+        if batch:
+            yield batch
+        if len(batch) < batch_size:
+            return
+        last_email = batch[-1]["email_norm"]
+
+
+async def repeatedly_failing_contact_ids(db: AsyncSession, institution_id) -> List[str]:
+    contact_ids: List[str] = []
+    async for batch in _repeated_failure_batches(db, institution_id, AUTO_FLAG_BATCH_SIZE):
+        contact_ids.extend(str(r["contact_id"]) for r in batch)
+    return contact_ids
+
+
+async def auto_flag_failed_contacts(db: AsyncSession, institution_id, batch_size: int = AUTO_FLAG_BATCH_SIZE) -> int:
+    """Mark active school contacts with repeated delivery failures as 'invalid'.
+
+    Walks the ledger in keyset batches so large institutions never load all
+    candidates at once. Archived contacts stay archived.
+    """
+    flagged = 0
+    async for batch in _repeated_failure_batches(db, institution_id, batch_size):
+        result = await db.execute(
+            text("""
+                UPDATE school_contacts sc
+                SET status = 'invalid',
+                    email_validation_error = 'Opakovaně neúspěšné doručení (' || c.failed || 'x)'
+                FROM (
+                    SELECT UNNEST(CAST(:contact_ids AS uuid[])) AS contact_id,
+                           UNNEST(CAST(:failures AS int[])) AS failed
+                ) c
+                WHERE sc.id = c.contact_id
+                  AND sc.institution_id = :institution_id
+                  AND sc.status = 'active'
+            """),
+            {
+                "institution_id": institution_id,
+                "contact_ids": [str(r["contact_id"]) for r in batch],
+                "failures": [int(r["failed"]) for r in batch],
+            },
+        )
+        flagged += result.rowcount or 0
+    if flagged:
+        await db.commit()
+    return flagged
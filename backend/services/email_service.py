@@ -27,6 +27,9 @@ from templates.emails import get_template, get_available_templates
 
 logger = logging.getLogger(__name__)
 
+# Resend accepts at most 100 messages per batch request.
+RESEND_BATCH_SIZE = 100
+
 
 def _init_resend():
     """Initialize Resend API key at runtime."""
@@ -166,6 +169,49 @@ class EmailService:
         # Initialize Resend API key at runtime (ensures it's set before sending)
         _init_resend()
         
+        params, actual_recipient = cls._build_params(
+            to_email, subject, html_content, text_content=text_content, from_email=from_email,
+            add_gdpr_footer=add_gdpr_footer, reply_to=reply_to, tags=tags, attachments=attachments,
+        )
+        
+        try:
+            # Run sync SDK in thread to keep FastAPI non-blocking
+            email_result = await asyncio.to_thread(resend.Emails.send, params)
+            
+            email_id = email_result.get("id") if isinstance(email_result, dict) else getattr(email_result, 'id', None)
+            
+            logger.info(f"Email sent successfully to {actual_recipient}, ID: {email_id}")
+            
+            return {
+                "status": "sent",
+                "message": f"Email sent to {actual_recipient}",
+                "email_id": email_id,
+                "original_recipient": to_email,
+                "actual_recipient": actual_recipient,
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to send email to {actual_recipient}: {str(e)}")
+            return {
+                "status": "failed",
+                "message": f"Failed to send email: {str(e)}",
+                "error": str(e)
+            }
+    
+    @classmethod
+    def _build_params(
+        cls,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        from_email: Optional[str] = None,
+        add_gdpr_footer: bool = True,
+        reply_to: Optional[str] = None,
+        tags: Optional[List[Dict[str, str]]] = None,
+        attachments: Optional[List[Dict[str, Any]]] = None,
+    ) -> tuple:
+        """Resend params for one message (dev redirect, GDPR footer) + the actual recipient."""
         # Development mode - redirect to dev email
         actual_recipient = get_dev_recipient(to_email)
         if is_development() and actual_recipient != to_email:
@@ -202,29 +248,54 @@ class EmailService:
         if attachments:
             params["attachments"] = attachments
         
-        try:
-            # Run sync SDK in thread to keep FastAPI non-blocking
-            email_result = await asyncio.to_thread(resend.Emails.send, params)
-            
-            email_id = email_result.get("id") if isinstance(email_result, dict) else getattr(email_result, 'id', None)
-            
-            logger.info(f"Email sent successfully to {actual_recipient}, ID: {email_id}")
-            
-            return {
-                "status": "sent",
-                "message": f"Email sent to {actual_recipient}",
-                "email_id": email_id,
-                "original_recipient": to_email,
-                "actual_recipient": actual_recipient,
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {actual_recipient}: {str(e)}")
-            return {
-                "status": "failed",
-                "message": f"Failed to send email: {str(e)}",
-                "error": str(e)
-            }
+        return params, actual_recipient
+    
+    @classmethod
+    async def send_batch(cls, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send many emails through the Resend batch endpoint (100 per API call).
+        
+        ``messages`` are ``send_email`` keyword arguments (to_email, subject,
+        html_content, ...; no attachments). Returns one result per message, in
+        order, shaped like ``send_email``'s.
+        """
+        if not messages:
+            return []
+        if not cls.is_configured():
+            logger.warning("Email service not configured - RESEND_API_KEY missing")
+            return [{
+                "status": "skipped",
+                "message": "Email service not configured",
+                "error": "RESEND_API_KEY not set"
+            } for _ in messages]
+        
+        _init_resend()
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(messages), RESEND_BATCH_SIZE):
+            chunk = messages[start:start + RESEND_BATCH_SIZE]
+            built = [cls._build_params(**message) for message in chunk]
+            try:
+                response = await asyncio.to_thread(resend.Batch.send, [params for params, _ in built])
+                data = response.get("data") if isinstance(response, dict) else getattr(response, "data", None)
+                ids = [(item.get("id") if isinstance(item, dict) else getattr(item, "id", None)) for item in data or []]
+                ids += [None] * (len(built) - len(ids))
+                for (_, actual_recipient), message, email_id in zip(built, chunk, ids):
+                    results.append({
+                        "status": "sent",
+                        "message": f"Email sent to {actual_recipient}",
+                        "email_id": email_id,
+                        "original_recipient": message["to_email"],
+                        "actual_recipient": actual_recipient,
+                    })
+                logger.info(f"Batch of {len(built)} emails sent")
+            except Exception as e:
+                logger.error(f"Failed to send batch of {len(built)} emails: {str(e)}")
+                results.extend({
+                    "status": "failed",
+                    "message": f"Failed to send email: {str(e)}",
+                    "error": str(e)
+                } for _ in built)
+        return results
     
     @classmethod
     async def send_transactional_email(
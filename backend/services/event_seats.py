@@ -0,0 +1,154 @@
+"""
+Seat inventory for event registrations.
+
+``event_dates.seats_taken`` (and ``events.seats_taken`` for applications
+without a date) count the seat-occupying applications. A new application
+claims its seat with one conditional ``UPDATE ... RETURNING``: concurrent
+applicants for the same date queue on that row's lock only until the
+claiming transaction commits, and the check cannot overbook. Status changes,
+date moves and deletes are applied by a row trigger on event_applications
+(alembic 5e6f7a8b9c0d); this module also holds the nightly recount.
+"""
+import hashlib
+import hmac
+import logging
+import uuid
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Application statuses that occupy a real capacity seat (waitlist + rejected
+# do NOT). Keep in sync with the event_applications_seats_refresh() trigger.
+OCCUPYING_STATUSES = ('pending', 'approved')
+
+# Capacity <= 0 / None means unlimited; the seat is still counted.
+_CLAIM_DATE_SEAT = text(
+    """
+    UPDATE event_dates ed SET seats_taken = ed.seats_taken + 1
+    FROM events e
+    WHERE ed.id = :date_id AND e.id = ed.event_id
+      AND (COALESCE(ed.capacity_override, e.capacity, 0) <= 0
+           OR ed.seats_taken < COALESCE(ed.capacity_override, e.capacity))
+    RETURNING ed.seats_taken
+    """
+)
+_CLAIM_EVENT_SEAT = text(
+    """
+    UPDATE events SET seats_taken = seats_taken + 1
+    WHERE id = :event_id
+      AND (COALESCE(capacity, 0) <= 0 OR seats_taken < capacity)
+    RETURNING seats_taken
+    """
+)
+
+
+async def claim_seat(db: AsyncSession, event_id, event_date_id: Optional[uuid.UUID]) -> bool:
+    """Take one seat for a new occupying application; False when full.
+
+    The counter row stays locked until the caller commits, so call this as the
+    last step before inserting the application and committing.
+    """
+    if event_date_id:
+        result = await db.execute(_CLAIM_DATE_SEAT, {"date_id": event_date_id})
+    else:
+        result = await db.execute(_CLAIM_EVENT_SEAT, {"event_id": event_id})
+    return result.scalar_one_or_none() is not None
+
+
+# Variable symbols are 9 digits: 100000000 + a value in [0, 30000²).
+_VS_BASE = 100_000_000
+_VS_HALF = 30_000
+_VS_ROUNDS = 4
+
+_NEXT_VS = text(
+    "SELECT nextval('event_application_vs_seq'), k.secret, k.issued_below "
+    "FROM event_application_vs_key k WHERE k.id = 1"
+)
+
+
+def _permute(value: int, secret: str) -> int:
+    """Keyed Feistel permutation of the 9-digit range (a bijection on it)."""
+    left, right = divmod(value - _VS_BASE, _VS_HALF)
+    key = secret.encode()
+    for round_no in range(_VS_ROUNDS):
+        digest = hmac.new(key, f"{round_no}:{right}".encode(), hashlib.sha256).digest()
+        left, right = right, (left + int.from_bytes(digest[:8], "big")) % _VS_HALF
+    return _VS_BASE + left * _VS_HALF + right
+
+
+def scramble_variable_symbol(value: int, secret: str, issued_below: int) -> int:
+    """Map a sequence value to its symbol, never below ``issued_below``.
+
+    Symbols issued before the permutation were the raw sequence values below
+    ``issued_below``; cycle-walking keeps the mapping a bijection on the rest.
+    """
+    symbol = _permute(value, secret)
+    while symbol < issued_below:
+        symbol = _permute(symbol, secret)
+    return symbol
+
+
+async def next_variable_symbol(db: AsyncSession) -> str:
+    """Next variable symbol (9 digits) from ``event_application_vs_seq``.
+
+    Globally unique, so no per-institution collision lookups are needed; the
+    legacy random symbols are 10 digits and cannot clash with it. The
+    sequence value is permuted with the key in ``event_application_vs_key``
+    so symbols cannot be enumerated from one another.
+    """
+    value, secret, issued_below = (await db.execute(_NEXT_VS)).one()
+    return str(scramble_variable_symbol(value, secret, issued_below))
+
+
+async def reconcile_event_seats(db: AsyncSession) -> int:
+    """Recount upcoming dates and dateless events; returns the corrected rows.
+
+    The counter rows are locked first: a claim holds its row lock until the
+    application is committed, so the recount never misses an in-flight seat.
+    """
+    statuses = {"statuses": list(OCCUPYING_STATUSES)}
+    await db.execute(text(
+        "SELECT id FROM event_dates WHERE start_datetime >= NOW() ORDER BY id FOR UPDATE"
+    ))
+    dates = await db.execute(
+        text(
+            """
+            UPDATE event_dates ed SET seats_taken = counts.taken
+            FROM (
+                SELECT d.id, COUNT(a.id) AS taken
+                FROM event_dates d
+                LEFT JOIN event_applications a
+                  ON a.event_date_id = d.id AND a.status = ANY(:statuses)
+                WHERE d.start_datetime >= NOW()
+                GROUP BY d.id
+            ) counts
+            WHERE ed.id = counts.id AND ed.seats_taken IS DISTINCT FROM counts.taken
+            """
+        ),
+        statuses,
+    )
+    await db.execute(text(
+        "SELECT id FROM events WHERE is_archived IS NOT TRUE ORDER BY id FOR UPDATE"
+    ))
+    events = await db.execute(
+        text(
+            """
+            UPDATE events ev SET seats_taken = counts.taken
+            FROM (
+                SELECT e.id, COUNT(a.id) AS taken
+                FROM events e
+                LEFT JOIN event_applications a
+                  ON a.event_id = e.id AND a.event_date_id IS NULL AND a.status = ANY(:statuses)
+                WHERE e.is_archived IS NOT TRUE
+                GROUP BY e.id
+            ) counts
+            WHERE ev.id = counts.id AND ev.seats_taken IS DISTINCT FROM counts.taken
+            """
+        ),
+        statuses,
+    )
+    await db.commit()
+    return (dates.rowcount or 0) + (events.rowcount or 0)
@@ -1,22 +1,21 @@
 """
 Feature flag service for pilot features.
+
+Flags are read from the short-TTL cache in services.institution_context;
+PUT /superadmin/feature-flags/{key} invalidates it.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from database.models import FeatureFlag
+
+from services.institution_context import load_feature_flags
 
 
 async def is_feature_enabled(db: AsyncSession, key: str, institution_id: str) -> bool:
     """Check if a feature is enabled for a given institution."""
-    result = await db.execute(
-        select(FeatureFlag).where(FeatureFlag.key == key)
-    )
-    flag = result.scalar_one_or_none()
+    flag = (await load_feature_flags(db)).get(key)
     if not flag:
         return False
     # Global enable check
-    if flag.enabled:
+    if flag["enabled"]:
         return True
     # Whitelist check
-    allowed = flag.allowed_institution_ids or []
-    return institution_id in allowed
+    return str(institution_id) in flag["allowed_institution_ids"]
@@ -0,0 +1,138 @@
+"""
+Per-program feedback aggregate (``feedback_program_stats``).
+
+A submitted response is added in the submitting transaction
+(``record_feedback_response``); the nightly rebuild recounts every program
+from ``feedbacks`` so deletions (GDPR cleanup, program removal) and manual
+fixes cannot leave it drifting. The program archive report reads it via
+``program_feedback_summary``.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Feedback, FeedbackProgramStats
+
+logger = logging.getLogger(__name__)
+
+_RATING_COLUMNS = ('rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5')
+
+
+async def record_feedback_response(db: AsyncSession, feedback: Feedback) -> None:
+    """Add one submitted response to its program's aggregate (caller commits)."""
+    if not feedback.program_id:
+        return
+    rating = feedback.overall_rating
+    increments = {
+        'responses': 1,
+        'rating_count': int(rating is not None),
+        'rating_sum': rating or 0,
+        'recommend_yes': int(feedback.would_recommend is True),
+        'recommend_answered': int(feedback.would_recommend is not None),
+    }
+    for star, column in enumerate(_RATING_COLUMNS, start=1):
+        increments[column] = int(rating == star)
+
+    table = FeedbackProgramStats.__table__
+    now = datetime.now(timezone.utc)
+    stmt = insert(table).values(
+        program_id=feedback.program_id,
+        institution_id=feedback.institution_id,
+        last_submitted_at=feedback.submitted_at,
+        updated_at=now,
+        **increments,
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.program_id],
+        set_={
+            **{column: table.c[column] + stmt.excluded[column] for column in increments},
+            'last_submitted_at': stmt.excluded.last_submitted_at,
+            'updated_at': now,
+        },
+    ))
+
+
+async def reconcile_feedback_program_stats(db: AsyncSession) -> int:
+    """Rebuild the aggregate from submitted feedback; returns the number of changed rows."""
+    deleted = await db.execute(text(
+        """
+        DELETE FROM feedback_program_stats s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM feedbacks f WHERE f.program_id = s.program_id AND f.status = 'submitted'
+        )
+        """
+    ))
+    upserted = await db.execute(text(
+        """
+        INSERT INTO feedback_program_stats AS s (
+            program_id, institution_id, responses, rating_count, rating_sum,
+            rating_1, rating_2, rating_3, rating_4, rating_5,
+            recommend_yes, recommend_answered, last_submitted_at, updated_at
+        )
+        SELECT f.program_id, p.institution_id, count(*),
+               count(f.overall_rating), COALESCE(sum(f.overall_rating), 0),
+               count(*) FILTER (WHERE f.overall_rating = 1),
+               count(*) FILTER (WHERE f.overall_rating = 2),
+               count(*) FILTER (WHERE f.overall_rating = 3),
+               count(*) FILTER (WHERE f.overall_rating = 4),
+               count(*) FILTER (WHERE f.overall_rating = 5),
+               count(*) FILTER (WHERE f.would_recommend),
+               count(f.would_recommend),
+               max(f.submitted_at), NOW()
+        FROM feedbacks f
+        JOIN programs p ON p.id = f.program_id
+        WHERE f.status = 'submitted'
+        GROUP BY f.program_id, p.institution_id
+        ON CONFLICT (program_id) DO UPDATE
+        SET institution_id = EXCLUDED.institution_id,
+            responses = EXCLUDED.responses,
+            rating_count = EXCLUDED.rating_count,
+            rating_sum = EXCLUDED.rating_sum,
+            rating_1 = EXCLUDED.rating_1,
+            rating_2 = EXCLUDED.rating_2,
+            rating_3 = EXCLUDED.rating_3,
+            rating_4 = EXCLUDED.rating_4,
+            rating_5 = EXCLUDED.rating_5,
+            recommend_yes = EXCLUDED.recommend_yes,
+            recommend_answered = EXCLUDED.recommend_answered,
+            last_submitted_at = EXCLUDED.last_submitted_at,
+            updated_at = NOW()
+        WHERE (s.institution_id, s.responses, s.rating_count, s.rating_sum,
+               s.rating_1, s.rating_2, s.rating_3, s.rating_4, s.rating_5,
+               s.recommend_yes, s.recommend_answered, s.last_submitted_at)
+              IS DISTINCT FROM
+              (EXCLUDED.institution_id, EXCLUDED.responses, EXCLUDED.rating_count, EXCLUDED.rating_sum,
+               EXCLUDED.rating_1, EXCLUDED.rating_2, EXCLUDED.rating_3, EXCLUDED.rating_4, EXCLUDED.rating_5,
+               EXCLUDED.recommend_yes, EXCLUDED.recommend_answered, EXCLUDED.last_submitted_at)
+        """
+    ))
+    await db.commit()
+    return (deleted.rowcount or 0) + (upserted.rowcount or 0)
+
+
+def summarize(stats: Optional[FeedbackProgramStats]) -> dict:
+    """Report-ready summary of one aggregate row (zeros when there is none)."""
+    if stats is None:
+        return {"responses": 0, "average_rating": None, "recommendation_rate": None,
+                "by_rating": {star: 0 for star in range(1, 6)}}
+    return {
+        "responses": stats.responses,
+        "average_rating": round(stats.rating_sum / stats.rating_count, 2) if stats.rating_count else None,
+        "recommendation_rate": (
+            round(stats.recommend_yes / stats.recommend_answered * 100, 1) if stats.recommend_answered else None
+        ),
+        "by_rating": {star: getattr(stats, column) for star, column in enumerate(_RATING_COLUMNS, start=1)},
+    }
+
+
+async def program_feedback_summary(db: AsyncSession, program_id) -> dict:
+    """Summary of a program's submitted feedback, read from the aggregate."""
+    stats = (await db.execute(
+        select(FeedbackProgramStats).where(FeedbackProgramStats.program_id == uuid.UUID(str(program_id)))
+    )).scalar_one_or_none()
+    return summarize(stats)
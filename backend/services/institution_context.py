@@ -0,0 +1,122 @@
+"""
+Institution context cache for plan gating and pilot feature flags.
+
+``require_feature`` and ``is_feature_enabled`` run on most admin requests and
+used to load the full institution row / a ``feature_flags`` row every time.
+They now read through two short-TTL, per-process caches:
+
+- the institution row (``to_dict``) per institution id;
+- the whole (small) ``feature_flags`` table.
+
+Within one request the ``institution_context`` dependency is resolved once
+(FastAPI caches dependencies per request), so the guard and the handler share
+it. Entries are dropped on ``institution:<id>`` / ``feature_flags`` tags
+through core.response_cache, i.e. on every InstitutionRepositorySupabase
+update and — with ``RESPONSE_CACHE_SYNC=postgres`` — in every worker; the TTL
+bounds staleness otherwise.
+"""
+import copy
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.response_cache import on_invalidate
+from core.security import get_current_user
+from database.models import FeatureFlag
+from database.supabase import get_db
+from database.supabase_repositories import InstitutionRepositorySupabase
+
+logger = logging.getLogger(__name__)
+
+INSTITUTION_CONTEXT_TTL = float(os.environ.get("INSTITUTION_CONTEXT_TTL", "30"))
+FEATURE_FLAGS_TAG = "feature_flags"
+
+
+class _TtlCache:
+    """Tiny TTL map; an invalidation during a load discards that load's result."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._epoch = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def begin(self) -> int:
+        return self._epoch
+
+    def store(self, key: str, value: Any, epoch: int) -> None:
+        if self.ttl > 0 and epoch == self._epoch:
+            self._entries[key] = (time.monotonic(), value)
+
+    def drop(self, key: Optional[str] = None) -> None:
+        self._epoch += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+
+_institutions = _TtlCache(INSTITUTION_CONTEXT_TTL)
+_flags = _TtlCache(INSTITUTION_CONTEXT_TTL)
+
+
+@on_invalidate
+def _on_invalidate(tags: tuple) -> None:
+    if not tags:
+        _institutions.drop()
+        _flags.drop()
+        return
+    for tag in tags:
+        if tag.startswith("institution:"):
+            _institutions.drop(tag.split(":", 1)[1])
+        elif tag == FEATURE_FLAGS_TAG:
+            _flags.drop()
+
+
+async def load_institution(db: AsyncSession, institution_id: str) -> Optional[dict]:
+    """Institution row as a dict (shared cached object — do not mutate)."""
+    key = str(institution_id)
+    inst = _institutions.get(key)
+    if inst is None:
+        epoch = _institutions.begin()
+        inst = await InstitutionRepositorySupabase(db).find_by_id(key)
+        if inst is not None:
+            _institutions.store(key, inst, epoch)
+    return inst
+
+
+async def institution_context(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """FastAPI dependency: the current user's institution, once per request."""
+    inst = await load_institution(db, current_user["institution_id"])
+    if not inst:
+        raise HTTPException(status_code=404, detail="Instituce nenalezena")
+    return copy.deepcopy(inst)
+
+
+async def load_feature_flags(db: AsyncSession) -> Dict[str, dict]:
+    """key → {"enabled", "allowed_institution_ids"} for every flag."""
+    flags = _flags.get(FEATURE_FLAGS_TAG)
+    if flags is None:
+        epoch = _flags.begin()
+        result = await db.execute(
+            select(FeatureFlag.key, FeatureFlag.enabled, FeatureFlag.allowed_institution_ids)
+        )
+        flags = {
+            row.key: {"enabled": bool(row.enabled), "allowed_institution_ids": frozenset(row.allowed_institution_ids or [])}
+            for row in result.all()
+        }
+        _flags.store(FEATURE_FLAGS_TAG, flags, epoch)
+    return flags
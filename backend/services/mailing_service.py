@@ -1,6 +1,7 @@
 """
 Mailing Campaign Service — relevance engine, recipient resolution, background sending.
 """
+import json
 import logging
 import html
 import uuid
@@ -15,6 +16,9 @@ from database.models import (
     MailingCampaign, MailingCampaignProgram,
     MailingCampaignRecipient, MailingRecipientProgram, MarketingSubscription,
 )
+from services.email_deliverability import (
+    ATTEMPTED_RECIPIENT_STATUSES, auto_flag_failed_contacts, outcome_change, record_outcomes,
+)
 from services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
@@ -113,6 +117,37 @@ TARGET_GROUP_TO_SCHOOL_TAGS = {
     "all":       [],  # matches everyone
 }
 
+# Relevance is evaluated on bitmasks over the target-group vocabulary: a
+# school's mask has the bit of every target group whose expected tags it
+# carries, a program's mask the bits of its target groups, and the match is
+# their AND. Both vocabularies are fixed, so they are built once at import.
+SEGMENT_BITS = {tg: 1 << i for i, tg in enumerate(TARGET_GROUP_TO_SCHOOL_TAGS)}
+_TAG_SEGMENTS: Dict[str, int] = {}
+for _tg, _tags in TARGET_GROUP_TO_SCHOOL_TAGS.items():
+    for _tag in _tags:
+        _TAG_SEGMENTS[_tag.upper()] = _TAG_SEGMENTS.get(_tag.upper(), 0) | SEGMENT_BITS[_tg]
+
+
+def school_segment_mask(school_tags: list) -> int:
+    """Bitmask of the target groups a school with these tags belongs to."""
+    mask = 0
+    for tag in school_tags or []:
+        if isinstance(tag, str):
+            mask |= _TAG_SEGMENTS.get(tag.upper(), 0)
+    return mask
+
+
+def program_segment_mask(program_target_groups: list) -> int:
+    mask = 0
+    for tg in program_target_groups or []:
+        mask |= SEGMENT_BITS.get(tg, 0)
+    return mask
+
+
+def segments_in_mask(mask: int) -> list:
+    """Target groups set in ``mask``, in vocabulary order."""
+    return [tg for tg, bit in SEGMENT_BITS.items() if mask & bit]
+
 
 def compute_relevance(program_target_groups: list, school_tags: list) -> list:
     """Return list of matched segments between a program and a school.
@@ -122,17 +157,47 @@ def compute_relevance(program_target_groups: list, school_tags: list) -> list:
         return []
     if "all" in program_target_groups:
         return ["all"]
-    if not school_tags:
+    matched = program_segment_mask(program_target_groups) & school_segment_mask(school_tags)
+    if not matched:
         return []
+    return list(dict.fromkeys(tg for tg in program_target_groups if SEGMENT_BITS.get(tg, 0) & matched))
+
 
-    matched = []
-    school_tags_upper = [t.upper() for t in school_tags]
-    for tg in program_target_groups:
-        expected_tags = TARGET_GROUP_TO_SCHOOL_TAGS.get(tg, [])
-        for et in expected_tags:
-            if et.upper() in school_tags_upper and tg not in matched:
-                matched.append(tg)
-    return matched
+class _RelevanceMatrix:
+    """Relevance of every school to the selected programs.
+
+    Schools share a handful of tag combinations, so the program loop runs
+    once per distinct school mask rather than once per school.
+    """
+
+    def __init__(self, programs):
+        self.programs = [
+            (str(p.id), program_segment_mask(p.target_groups), "all" in (p.target_groups or []))
+            for p in programs
+        ]
+        self._by_tags: Dict[tuple, int] = {}
+        self._by_mask: Dict[int, tuple] = {}
+
+    def match(self, school_tags: list) -> tuple:
+        """``(relevant_program_ids, matched_segments)`` for one school."""
+        key = tuple(t for t in school_tags if isinstance(t, str))
+        mask = self._by_tags.get(key)
+        if mask is None:
+            mask = self._by_tags[key] = school_segment_mask(key)
+        result = self._by_mask.get(mask)
+        if result is None:
+            program_ids, segments, matches_all = [], 0, False
+            for program_id, program_mask, targets_all in self.programs:
+                if targets_all:
+                    program_ids.append(program_id)
+                    matches_all = True
+                elif program_mask & mask:
+                    program_ids.append(program_id)
+                    segments |= program_mask & mask
+            result = self._by_mask[mask] = (
+                program_ids, (["all"] if matches_all else []) + segments_in_mask(segments),
+            )
+        return result
 
 
 async def resolve_recipients(
@@ -156,16 +221,18 @@ async def resolve_recipients(
     )
     programs = result.scalars().all()
 
-    # Fetch all active schools with contacts
+    # Fetch all active schools (only the columns the preview needs)
     result = await db.execute(
-        select(School).where(
+        select(
+            School.id, School.name, School.city, School.tags, School.email, School.contact_person,
+        ).where(
             and_(
                 School.institution_id == institution_id,
                 School.deleted_at.is_(None),
             )
         )
     )
-    schools = result.scalars().all()
+    schools = result.all()
 
     # Fetch only the columns needed for recipient preview. Loading the full
     # SchoolContact ORM row also selects newer deliverability columns, which can
@@ -186,10 +253,11 @@ async def resolve_recipients(
     # Build contact map: school_id → [contacts]
     contact_map = {}
     for c in contacts:
-        sid = str(c["school_id"])
-        if sid not in contact_map:
-            contact_map[sid] = []
-        contact_map[sid].append(c)
+        contact_map.setdefault(str(c["school_id"]), []).append(c)
+
+    manual = set(manual_school_ids or [])
+    all_program_ids = [str(p.id) for p in programs]
+    relevance = _RelevanceMatrix(programs)
 
     warnings = []
     school_results = []
@@ -203,10 +271,10 @@ async def resolve_recipients(
 
         # Use school-level email as fallback
         if not school_contacts and school.email:
-            school_contacts = [type('FakeContact', (), {
-                'id': None, 'email': school.email,
-                'name': school.contact_person or school.name,
-            })()]
+            school_contacts = [{
+                "id": None, "email": school.email,
+                "name": school.contact_person or school.name,
+            }]
 
         if not school_contacts:
             no_contacts_count += 1
@@ -214,12 +282,12 @@ async def resolve_recipients(
 
         # Determine relevance per program
         if recipient_mode == 'all':
-            relevant_program_ids = [str(p.id) for p in programs]
+            relevant_program_ids = all_program_ids
             matched_segments = ["all"]
             is_relevant = True
         elif recipient_mode == 'manual':
-            if manual_school_ids and school_id in manual_school_ids:
-                relevant_program_ids = [str(p.id) for p in programs]
+            if school_id in manual:
+                relevant_program_ids = all_program_ids
                 matched_segments = ["manual"]
                 is_relevant = True
             else:
@@ -228,21 +296,13 @@ async def resolve_recipients(
                 matched_segments = []
         else:
             # relevant_only or relevant_plus_manual
-            relevant_program_ids = []
-            matched_segments = []
-            for p in programs:
-                tg = p.target_groups or []
-                match = compute_relevance(tg, school_tags)
-                if match:
-                    relevant_program_ids.append(str(p.id))
-                    matched_segments.extend(match)
-            matched_segments = list(set(matched_segments))
+            relevant_program_ids, matched_segments = relevance.match(school_tags)
             is_relevant = len(relevant_program_ids) > 0
 
             # For relevant_plus_manual, also include manually selected
             if not is_relevant and recipient_mode == 'relevant_plus_manual':
-                if manual_school_ids and school_id in manual_school_ids:
-                    relevant_program_ids = [str(p.id) for p in programs]
+                if school_id in manual:
+                    relevant_program_ids = all_program_ids
                     matched_segments = ["manual"]
                     is_relevant = True
 
@@ -285,6 +345,66 @@ async def resolve_recipients(
     }
 
 
+_INSERT_RECIPIENTS_SQL = """
+    WITH rows AS (
+        SELECT gen_random_uuid() AS id, u.*
+        FROM UNNEST(
+            CAST(:school_ids AS uuid[]), CAST(:contact_ids AS uuid[]), CAST(:emails AS text[]),
+            CAST(:school_names AS text[]), CAST(:contact_names AS text[]),
+            CAST(:reasons AS text[]), CAST(:program_ids AS text[])
+        ) AS u(school_id, contact_id, email, school_name, contact_name, matching_reason, program_ids)
+    ), recipients AS (
+        INSERT INTO mailing_campaign_recipients (
+            id, campaign_id, school_id, contact_id, email, school_name, contact_name,
+            status, delivery_status, matching_reason, created_at
+        )
+        SELECT id, CAST(:campaign_id AS uuid), school_id, contact_id, email, school_name, contact_name,
+               'pending', 'unknown', CAST(matching_reason AS json), NOW()
+        FROM rows
+    )
+    INSERT INTO mailing_recipient_programs (id, recipient_id, program_id, program_name, program_target_groups)
+    SELECT gen_random_uuid(), r.id, p.id, p.name_cs, COALESCE(p.target_groups, '[]'::json)
+    FROM rows r
+    CROSS JOIN LATERAL unnest(string_to_array(r.program_ids, ',')::uuid[]) AS rp(program_id)
+    JOIN programs p ON p.id = rp.program_id
+"""
+
+
+async def insert_campaign_recipients(
+    db: AsyncSession,
+    campaign_id,
+    recipient_mode: str,
+    recipients: List[Dict[str, Any]],
+    program_ids: List[str],
+) -> None:
+    """Write resolved recipients and their per-recipient program snapshots.
+
+    One statement for both tables: recipient ids are generated in the
+    database and the recipient's program list is expanded there, so a
+    campaign to tens of thousands of contacts is a single round trip.
+    """
+    reasons: Dict[tuple, str] = {}
+    params = {k: [] for k in (
+        "school_ids", "contact_ids", "emails", "school_names", "contact_names", "reasons", "program_ids",
+    )}
+    for r in recipients:
+        segments = tuple(r.get("matched_segments", []))
+        if segments not in reasons:
+            reasons[segments] = json.dumps({
+                "selection_mode": recipient_mode,
+                "matched_segments": list(segments),
+                "manual_override": "manual" in segments,
+            }, ensure_ascii=False)
+        params["school_ids"].append(r.get("school_id"))
+        params["contact_ids"].append(r.get("contact_id"))
+        params["emails"].append(r["email"])
+        params["school_names"].append(r.get("school_name"))
+        params["contact_names"].append(r.get("contact_name"))
+        params["reasons"].append(reasons[segments])
+        params["program_ids"].append(",".join(r.get("relevant_program_ids", program_ids)))
+    await db.execute(text(_INSERT_RECIPIENTS_SQL), {**params, "campaign_id": campaign_id})
+
+
 # ---- Default Czech templates by audience ----
 
 DEFAULT_TEMPLATES = {
@@ -449,6 +569,12 @@ async def send_campaign_emails(campaign_id: str):
             if campaign.status == "failed":
                 campaign.failure_reason = "Odeslání se nezdařilo u všech příjemců."
 
+            # Per-email ledger for delivery health (one batched upsert, same transaction)
+            await record_outcomes(db, (
+                outcome_change(campaign.institution_id, r, None, new_send=True)
+                for r in recipients if r.status in ATTEMPTED_RECIPIENT_STATUSES
+            ))
+
             await db.commit()
             logger.info(f"Campaign {campaign_id} sending complete: {sent} sent, {failed} failed")
 
@@ -606,51 +732,10 @@ def _format_target_groups(tg: list) -> str:
 
 
 async def _auto_flag_failed_contacts(db, institution_id):
-    """Auto-flag school contacts with >=2 delivery failures as 'invalid'."""
-    from database.models import SchoolContact
+    """Auto-flag school contacts with >=2 delivery failures as 'invalid' (from the deliverability ledger)."""
     try:
-        # Find emails with multiple failures across campaigns
-        result = await db.execute(
-            select(
-                MailingCampaignRecipient.email,
-                MailingCampaignRecipient.contact_id,
-                func.count().label('fail_count'),
-            )
-            .join(MailingCampaign, MailingCampaignRecipient.campaign_id == MailingCampaign.id)
-            .where(
-                and_(
-                    MailingCampaign.institution_id == institution_id,
-                    MailingCampaignRecipient.status == 'failed',
-                    MailingCampaignRecipient.contact_id.isnot(None),
-                )
-            )
-            .group_by(MailingCampaignRecipient.email, MailingCampaignRecipient.contact_id)
-            .having(func.count() >= 2)
-        )
-        repeated_failures = result.all()
-
-        flagged = 0
-        for row in repeated_failures:
-            contact_id = row.contact_id
-            if contact_id:
-                contact_result = await db.execute(
-                    select(SchoolContact).where(
-                        and_(
-                            SchoolContact.id == contact_id,
-                            # Archived contacts must stay archived even when an
-                            # old campaign later reports another delivery failure.
-                            SchoolContact.status == 'active',
-                        )
-                    )
-                )
-                contact = contact_result.scalar_one_or_none()
-                if contact:
-                    contact.status = 'invalid'
-                    contact.email_validation_error = f'Opakovaně neúspěšné doručení ({row.fail_count}x)'
-                    flagged += 1
-
+        flagged = await auto_flag_failed_contacts(db, institution_id)
         if flagged > 0:
-            await db.commit()
             logger.info(f"Auto-flagged {flagged} contacts as invalid for institution {institution_id}")
     except Exception as e:
         logger.error(f"Auto-flag contacts error: {e}")
@@ -3,6 +3,8 @@
 Keep defaults and legacy-data normalization outside the routes so every email
 producer makes the same decision as the Settings UI.
 """
+from sqlalchemy import case, cast, func, literal
+from sqlalchemy.dialects.postgresql import JSONB
 
 CUSTOMER_NOTIF_KEYS = {
     "reservation_created": True,
@@ -59,3 +61,22 @@ def normalize_notifications(stored: dict | None) -> dict:
     # never be disabled by stale or manually edited JSON.
     customer["event_registration_received"] = True
     return {"customer": customer, "admin": admin}
+
+
+def customer_notification_sql(settings_column, key: str):
+    """SQL twin of ``normalize_notifications(settings)["customer"][key]``.
+
+    For JSON predicates in batch jobs: a stored boolean wins, anything else
+    falls back to the canonical default. Keys with legacy aliases or forced
+    values (``reservation_confirmed``, ``event_registration_received``) are not
+    supported here. Works on ``json`` and ``jsonb`` columns alike: the model
+    maps ``notification_settings`` as JSON, but databases built from the
+    Supabase schema keep it as JSONB.
+    """
+    if key not in CUSTOMER_NOTIF_KEYS or key in ("reservation_confirmed", "event_registration_received"):
+        raise ValueError(f"No SQL form for customer notification {key!r}")
+    value = settings_column["customer"][key]
+    return case(
+        (func.jsonb_typeof(cast(value, JSONB)) == "boolean", value.as_boolean()),
+        else_=literal(CUSTOMER_NOTIF_KEYS[key]),
+    )
@@ -0,0 +1,104 @@
+"""
+Page-view ingestion buffer and daily rollups.
+
+POST /analytics/pageview only appends the row to an in-process ring buffer;
+each web worker flushes its buffer with one multi-row INSERT every few
+seconds (and on shutdown), so a page load no longer costs a pooled
+connection and a commit. When the database is unreachable the buffer keeps
+the newest ``PAGEVIEW_BUFFER_SIZE`` rows and drops the oldest.
+
+The superadmin stats read ``page_view_daily`` / ``page_view_daily_paths``
+only. ``public.rollup_page_views(day)`` (alembic 8b9c0d1e2f3a) rebuilds a day
+from ``page_views``; the scheduler refreshes today every 10 minutes and
+re-rolls the last few days nightly.
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import PageView
+
+logger = logging.getLogger(__name__)
+
+PAGEVIEW_BUFFER_SIZE = int(os.environ.get("PAGEVIEW_BUFFER_SIZE", "10000"))
+PAGEVIEW_FLUSH_SECONDS = float(os.environ.get("PAGEVIEW_FLUSH_SECONDS", "5"))
+# Days re-rolled by the nightly job (yesterday and before), so a missed night
+# or rows flushed after midnight are picked up.
+ROLLUP_NIGHTLY_DAYS = 3
+
+_buffer: deque = deque(maxlen=PAGEVIEW_BUFFER_SIZE)
+
+
+def enqueue_pageview(row: dict) -> None:
+    """Buffer one page_views row (column → value, ``created_at`` included)."""
+    _buffer.append(row)
+
+
+def buffered_count() -> int:
+    return len(_buffer)
+
+
+async def flush_pageviews(db: AsyncSession) -> int:
+    """Insert everything buffered so far in one multi-row INSERT.
+
+    On failure the rows go back to the front of the buffer (as far as it has
+    room) and the next flush retries them. Returns the number of rows written.
+    """
+    rows = []
+    while _buffer:
+        rows.append(_buffer.popleft())
+    if not rows:
+        return 0
+    try:
+        await db.execute(insert(PageView), rows)
+        await db.commit()
+    except Exception as e:
+        logger.warning(f"Page view flush of {len(rows)} rows failed: {e}")
+        await db.rollback()
+        room = PAGEVIEW_BUFFER_SIZE - len(_buffer)
+        _buffer.extendleft(reversed(rows[-room:] if room > 0 else []))
+        return 0
+    return len(rows)
+
+
+async def run_pageview_flusher(interval: Optional[float] = None):
+    """Flush the buffer every ``interval`` seconds until cancelled, then once more."""
+    from database.supabase import AsyncSessionLocal
+    interval = PAGEVIEW_FLUSH_SECONDS if interval is None else interval
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            if _buffer:
+                async with AsyncSessionLocal() as db:
+                    await flush_pageviews(db)
+    except asyncio.CancelledError:
+        if _buffer:
+            async with AsyncSessionLocal() as db:
+                written = await flush_pageviews(db)
+            logger.info(f"Page view buffer flushed on shutdown: {written} rows")
+        raise
+
+
+async def rollup_page_views(db: AsyncSession, days: Iterable[date]) -> int:
+    """Rebuild the daily rollups of ``days``. Returns the number of days rolled."""
+    rolled = 0
+    for day in days:
+        await db.execute(text("SELECT public.rollup_page_views(:day)"), {"day": day})
+        rolled += 1
+    await db.commit()
+    return rolled
+
+
+def today_utc() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def nightly_rollup_days(today: Optional[date] = None) -> list:
+    today = today or today_utc()
+    return [today - timedelta(days=offset) for offset in range(1, ROLLUP_NIGHTLY_DAYS + 1)]
@@ -0,0 +1,193 @@
+"""
+Payment status for the public payment return page.
+
+The page polls GET /event-payments/by-ref/{refId} while the applicant waits
+for the gateway webhook. A lookup is one joined query (payment, application,
+event, event date, institution) and its result is kept per ref for
+``PAYMENT_STATUS_TTL`` seconds in a per-process cache.
+
+State changes (initiate, Comgate webhook, mock completion) drop the entry
+through the ``event_payment:<application_id>`` tag of core.response_cache —
+in every worker with ``RESPONSE_CACHE_SYNC=postgres`` — and wake the
+requests long-polling that ref (``wait_for_payment_change``). Without the
+broadcast a waiter in another worker simply times out and re-reads.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Dict, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.response_cache import on_invalidate
+from database.models import EventApplication, EventPayment, Event, EventDate, Institution
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STATUS_TTL = float(os.environ.get("PAYMENT_STATUS_TTL", "2"))
+PAYMENT_STATUS_MAX_WAIT = 25
+PAYMENT_STATUS_MAX_ENTRIES = 2000
+FINAL_PAYMENT_STATUSES = frozenset({"paid", "failed"})
+_TAG_PREFIX = "event_payment:"
+
+# ref -> (stored_at, payload); an invalidation during a load discards its result
+_entries: Dict[str, tuple] = {}
+_waiters: Dict[str, Set[asyncio.Event]] = {}
+# Versions: every invalidation takes the next _counter value and records it for
+# its ref; a full drop (or an overfull map) raises _floor for every ref instead.
+_counter = 0
+_floor = 0
+_changed: Dict[str, int] = {}
+
+
+def payment_status_tag(application_id) -> str:
+    return f"{_TAG_PREFIX}{application_id}"
+
+
+def _drop(ref: Optional[str] = None) -> None:
+    global _counter, _floor
+    _counter += 1
+    refs = list(_waiters) if ref is None else [ref]
+    if ref is None:
+        _entries.clear()
+    else:
+        _entries.pop(ref, None)
+        _changed[ref] = _counter
+    if ref is None or len(_changed) > PAYMENT_STATUS_MAX_ENTRIES:
+        _floor = _counter
+        _changed.clear()
+    for key in refs:
+        for event in _waiters.pop(key, ()):
+            event.set()
+
+
+@on_invalidate
+def _on_invalidate(tags: tuple) -> None:
+    if not tags:
+        _drop()
+        return
+    for tag in tags:
+        if tag.startswith(_TAG_PREFIX):
+            _drop(tag[len(_TAG_PREFIX):])
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _mask_email(email: Optional[str]) -> Optional[str]:
+    """GDPR: partially mask an e-mail for public confirmation pages so a third
+    party who knows only the (unguessable) refId can't harvest the full address.
+    e.g. ``jan.novak@skola.cz`` -> ``ja***@skola.cz``."""
+    if not email or "@" not in email:
+        return email
+    local, _, domain = email.partition("@")
+    if len(local) <= 2:
+        masked_local = local[0] + "***"
+    else:
+        masked_local = local[:2] + "***"
+    return f"{masked_local}@{domain}"
+
+
+async def _query_payment_status(db: AsyncSession, application_id: uuid.UUID) -> Optional[dict]:
+    row = (await db.execute(
+        select(
+            EventPayment.status, EventPayment.amount, EventPayment.currency, EventPayment.provider,
+            EventPayment.variable_symbol, EventPayment.institution_id, EventPayment.application_id,
+            EventPayment.paid_at,
+            EventApplication.id.label("app_id"),
+            EventApplication.status.label("application_status"),
+            EventApplication.payment_status.label("application_payment_status"),
+            EventApplication.applicant_name, EventApplication.applicant_email,
+            EventApplication.total_amount,
+            Event.id.label("event_id"), Event.name.label("event_name"), Event.image_url,
+            EventDate.start_datetime, EventDate.end_datetime,
+            Institution.name.label("institution_name"),
+        )
+        .outerjoin(EventApplication, EventApplication.id == EventPayment.application_id)
+        .outerjoin(Event, Event.id == EventApplication.event_id)
+        .outerjoin(EventDate, EventDate.id == EventApplication.event_date_id)
+        .outerjoin(Institution, Institution.id == EventPayment.institution_id)
+        .where(EventPayment.application_id == application_id)
+        .order_by(EventPayment.created_at.desc())
+        .limit(1)
+    )).first()
+    if row is None:
+        return None
+
+    has_app = row.app_id is not None
+    event_info = None
+    if row.event_id is not None:
+        event_info = {
+            "id": str(row.event_id),
+            "title": row.event_name,
+            "starts_at": _iso(row.start_datetime),
+            "ends_at": _iso(row.end_datetime),
+            "image_url": row.image_url,
+        }
+    return {
+        "payment_status": row.status,
+        "amount": row.amount,
+        "currency": row.currency,
+        "provider": row.provider,
+        "variable_symbol": row.variable_symbol,
+        "institution_id": str(row.institution_id),
+        "institution_name": row.institution_name,
+        "application_id": str(row.application_id),
+        "application_status": row.application_status if has_app else None,
+        "application_payment_status": row.application_payment_status if has_app else None,
+        "applicant_name": row.applicant_name if has_app else None,
+        "applicant_email": _mask_email(row.applicant_email) if has_app else None,
+        "total_amount": row.total_amount if has_app else None,
+        "paid_at": _iso(row.paid_at),
+        "event": event_info,
+    }
+
+
+async def load_payment_status(db: AsyncSession, application_id: uuid.UUID) -> Optional[dict]:
+    """Return-page payload for ``application_id`` (shared cached object — do not mutate)."""
+    ref = str(application_id)
+    entry = _entries.get(ref)
+    if entry is not None and time.monotonic() - entry[0] < PAYMENT_STATUS_TTL:
+        return entry[1]
+    version = payment_status_version(ref)
+    payload = await _query_payment_status(db, application_id)
+    if payload is not None and PAYMENT_STATUS_TTL > 0 and version == payment_status_version(ref):
+        now = time.monotonic()
+        if len(_entries) >= PAYMENT_STATUS_MAX_ENTRIES:
+            for key in [k for k, (stored_at, _) in _entries.items() if now - stored_at >= PAYMENT_STATUS_TTL]:
+                del _entries[key]
+        _entries[ref] = (now, payload)
+    return payload
+
+
+def payment_status_version(application_id) -> int:
+    """Bumped on every invalidation of ``application_id``; pass it to ``wait_for_payment_change``."""
+    return max(_floor, _changed.get(str(application_id), 0))
+
+
+async def wait_for_payment_change(application_id, timeout: float, since: Optional[int] = None) -> bool:
+    """Wait up to ``timeout`` s for an invalidation of ``application_id``; True if one came.
+
+    With ``since`` (its ``payment_status_version()`` taken before the read) an
+    invalidation of this ref that happened in between returns immediately.
+    """
+    ref = str(application_id)
+    if since is not None and since != payment_status_version(ref):
+        return True
+    event = asyncio.Event()
+    _waiters.setdefault(ref, set()).add(event)
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        waiters = _waiters.get(ref)
+        if waiters is not None:
+            waiters.discard(event)
+            if not waiters:
+                _waiters.pop(ref, None)
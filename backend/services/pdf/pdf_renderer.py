@@ -154,6 +154,18 @@ def _format_feedback_quote(fb: dict) -> Optional[dict]:
     }
 
 
+def _feedback_summary_line(summary: dict) -> Optional[str]:
+    """One-line summary of the aggregated feedback, or None without ratings."""
+    parts = []
+    if summary.get("average_rating") is not None:
+        parts.append(f"Průměrné hodnocení {summary['average_rating']:.1f} / 5".replace(".", ","))
+    if summary.get("recommendation_rate") is not None:
+        parts.append(f"doporučuje {summary['recommendation_rate']:.0f} %")
+    if not parts:
+        return None
+    return " · ".join(parts) + f" (odpovědí: {fmt_int(summary.get('responses') or 0)})"
+
+
 # ─────────────────────────────────────────────────────────────────────
 # Public entry point
 # ─────────────────────────────────────────────────────────────────────
@@ -173,7 +185,10 @@ def render_program_report(data: dict, custom_text: Optional[str] = None) -> byte
     bookings = data.get("bookings", []) or []
     feedbacks = data.get("feedbacks", []) or []
     fotografie = data.get("fotografie", []) or []
-    feedback_count = int(data.get("feedback_count") or len(feedbacks))
+    # Totals come from the feedback_program_stats aggregate; ``feedbacks`` only
+    # carries the latest responses for the quotes.
+    feedback_summary = data.get("feedback_summary", {}) or {}
+    feedback_count = int(feedback_summary.get("responses") or data.get("feedback_count") or len(feedbacks))
 
     main_image, gallery_images = _collect_photo_paths(prog, fotografie)
 
@@ -327,9 +342,13 @@ def render_program_report(data: dict, custom_text: Optional[str] = None) -> byte
     # ── Section 8: Zpětná vazba ──
     quotes = [_format_feedback_quote(fb) for fb in feedbacks]
     quotes = [q for q in quotes if q]
-    if quotes:
+    summary_line = _feedback_summary_line(feedback_summary)
+    if quotes or summary_line:
         story.append(section_header("Sekce 08", "Zpětná vazba pedagogů"))
         story.append(Spacer(0, 2 * mm))
+        if summary_line:
+            story.append(Paragraph(summary_line, styles["BodyMuted"]))
+            story.append(Spacer(0, 3 * mm))
         for i, q in enumerate(quotes[:6]):
             story.append(quote_card(q["text"], rating=q.get("rating")))
             if i < len(quotes[:6]) - 1:
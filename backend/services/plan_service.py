@@ -206,19 +206,10 @@ def require_feature(feature_key: str):
             _guard = Depends(require_feature("mailing")),
         ):
     """
-    from core.security import get_current_user
-    from database.supabase import get_db
-    from database.supabase_repositories import InstitutionRepositorySupabase
-
-    async def _check(
-        current_user: dict = Depends(get_current_user),
-        db=Depends(get_db),
-    ):
-        inst_repo = InstitutionRepositorySupabase(db)
-        inst = await inst_repo.find_by_id(current_user["institution_id"])
-        if not inst:
-            raise HTTPException(status_code=404, detail="Instituce nenalezena")
+    from services.institution_context import institution_context
 
+    # Shares the per-request (and short-TTL cached) institution with the handler
+    async def _check(inst: dict = Depends(institution_context)):
         plan = inst.get("plan", "free")
         plan_status = inst.get("plan_status", "active")
 
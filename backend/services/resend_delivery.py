@@ -1,8 +1,22 @@
-"""Pure Resend delivery-event normalization helpers."""
+"""Resend delivery-event normalization and batched persistence.
+
+The webhook route only verifies the Svix signature and stages the raw event in
+``resend_webhook_inbox``; ``process_delivery_inbox`` (scheduler, every few
+seconds) claims staged events in batches and applies them with set-based
+updates via ``apply_delivery_updates``.
+"""
 from __future__ import annotations
 
+import json
+import logging
 from datetime import datetime, timezone
 
+logger = logging.getLogger(__name__)
+
+# Inbox batch applier
+INBOX_BATCH_SIZE = 500
+INBOX_MAX_ATTEMPTS = 5
+
 
 STATUS_BY_EVENT = {
     "email.delivered": "delivered",
@@ -88,87 +102,248 @@ def delivery_update_from_payload(payload: dict) -> dict | None:
     }
 
 
-async def apply_delivery_update(db, delivery_update: dict, svix_id: str) -> dict:
-    """Persist a normalized Resend delivery update and update contact health.
+def _contact_updates_sql(table: str) -> str:
+    return f"""
+        UPDATE {table} t
+        SET deliverability_status = u.status,
+            deliverability_reason = u.reason,
+            deliverability_updated_at = u.event_at,
+            updated_at = NOW()
+        FROM UNNEST(
+            CAST(:institution_ids AS uuid[]), CAST(:emails AS text[]), CAST(:statuses AS text[]),
+            CAST(:reasons AS text[]), CAST(:event_ats AS timestamptz[])
+        ) AS u(institution_id, email, status, reason, event_at)
+        WHERE t.institution_id = u.institution_id
+          AND lower(t.email) = u.email
+          AND (t.deliverability_updated_at IS NULL OR t.deliverability_updated_at <= u.event_at)
+    """
 
-    Kept separate from the FastAPI route so an isolated regression database can
-    exercise the same persistence path without needing a signed external webhook.
+
+_SUPPRESS_SCHOOL_CONTACTS_SQL = """
+    UPDATE school_contacts t
+    SET last_email_bounced = (u.status = 'bounced_hard'),
+        status = 'invalid',
+        email_validation_error = COALESCE(u.reason, u.status),
+        updated_at = NOW()
+    FROM UNNEST(
+        CAST(:institution_ids AS uuid[]), CAST(:emails AS text[]), CAST(:statuses AS text[]),
+        CAST(:reasons AS text[]), CAST(:event_ats AS timestamptz[])
+    ) AS u(institution_id, email, status, reason, event_at)
+    WHERE t.institution_id = u.institution_id
+      AND lower(t.email) = u.email
+"""
+
+
+def _unnest_params(touches: dict) -> dict:
+    keys = list(touches)
+    return {
+        "institution_ids": [str(k[0]) for k in keys],
+        "emails": [k[1] for k in keys],
+        "statuses": [touches[k]["status"] for k in keys],
+        "reasons": [touches[k]["reason"] for k in keys],
+        "event_ats": [touches[k]["event_at"] for k in keys],
+    }
+
+
+async def apply_delivery_updates(db, events: list) -> dict:
+    """Apply normalized delivery updates ``[(svix_id, update), ...]`` in one pass.
+
+    Events already seen (by svix id) are skipped. Recipients are loaded with a
+    single query; contact health is folded to the latest event per
+    (institution, email) and written with one UPDATE per table, matched through
+    the ``lower(email)`` indexes. Does not commit.
     """
-    from sqlalchemy import and_, func, select
-
-    from database.models import (
-        Contact,
-        MailingCampaign,
-        MailingCampaignRecipient,
-        ResendWebhookEvent,
-        SchoolContact,
-    )
+    from sqlalchemy import select, text
 
-    event_type = delivery_update["event_type"]
-    if (await db.execute(
-        select(ResendWebhookEvent.id).where(ResendWebhookEvent.svix_id == svix_id)
-    )).scalar_one_or_none():
-        return {"ok": True, "duplicate": True}
+    from database.models import MailingCampaign, MailingCampaignRecipient, ResendWebhookEvent
+    from services.email_deliverability import outcome_change, record_outcomes, recipient_outcome
+
+    unique = {}
+    for svix_id, update in events:
+        unique.setdefault(svix_id, update)
+    seen = set()
+    if unique:
+        seen = set((await db.execute(
+            select(ResendWebhookEvent.svix_id).where(ResendWebhookEvent.svix_id.in_(list(unique)))
+        )).scalars().all())
+    fresh = [(svix_id, update) for svix_id, update in unique.items() if svix_id not in seen]
+    duplicates = len(events) - len(fresh)
+    if not fresh:
+        return {"applied": 0, "duplicates": duplicates, "matched_recipients": 0}
 
-    status = delivery_update["status"]
-    provider_email_id = delivery_update["provider_email_id"]
-    recipient_email = delivery_update["recipient_email"]
-    event_at = delivery_update["event_at"]
-    reason = delivery_update["reason"]
+    db.add_all([
+        ResendWebhookEvent(
+            svix_id=svix_id,
+            event_type=update["event_type"],
+            provider_email_id=update["provider_email_id"],
+            recipient_email=update["recipient_email"],
+            event_at=update["event_at"],
+        )
+        for svix_id, update in fresh
+    ])
 
-    db.add(ResendWebhookEvent(
-        svix_id=svix_id,
-        event_type=event_type,
-        provider_email_id=provider_email_id,
-        recipient_email=recipient_email,
-        event_at=event_at,
-    ))
+    by_provider = {}
+    for _, update in sorted(fresh, key=lambda item: item[1]["event_at"]):
+        if update["provider_email_id"]:
+            by_provider.setdefault(update["provider_email_id"], []).append(update)
 
     matched = []
-    if provider_email_id:
+    if by_provider:
         matched = list((await db.execute(
             select(MailingCampaignRecipient, MailingCampaign.institution_id)
             .join(MailingCampaign, MailingCampaignRecipient.campaign_id == MailingCampaign.id)
-            .where(MailingCampaignRecipient.email_provider_id == provider_email_id)
+            .where(MailingCampaignRecipient.email_provider_id.in_(list(by_provider)))
         )).all())
 
+    latest = {}       # (institution_id, email) -> newest applied event
+    suppressions = {}  # (institution_id, email) -> newest permanent suppression
+    ledger_changes = []
     for recipient, institution_id in matched:
-        if recipient.delivery_event_at and recipient.delivery_event_at > event_at:
-            continue
-        recipient.delivery_status = status
-        recipient.delivery_event_at = event_at
-        if status in {"bounced_hard", "failed", "complained", "suppressed"}:
-            recipient.failure_reason = reason or status
-
-        email = (recipient.email or recipient_email or "").strip().lower()
-        if not email:
-            continue
-
-        central_contacts = list((await db.execute(
-            select(Contact).where(and_(
-                Contact.institution_id == institution_id,
-                func.lower(Contact.email) == email,
-            ))
-        )).scalars().all())
-        school_contacts = list((await db.execute(
-            select(SchoolContact).where(and_(
-                SchoolContact.institution_id == institution_id,
-                func.lower(SchoolContact.email) == email,
-            ))
-        )).scalars().all())
+        before = recipient_outcome(recipient.status, recipient.delivery_status)
+        applied_at = None
+        for update in by_provider[recipient.email_provider_id]:
+            status, event_at, reason = update["status"], update["event_at"], update["reason"]
+            if recipient.delivery_event_at and recipient.delivery_event_at > event_at:
+                continue
+            recipient.delivery_status = status
+            recipient.delivery_event_at = event_at
+            if status in {"bounced_hard", "failed", "complained", "suppressed"}:
+                recipient.failure_reason = reason or status
+            applied_at = event_at
 
-        for contact in [*central_contacts, *school_contacts]:
-            if contact.deliverability_updated_at and contact.deliverability_updated_at > event_at:
+            email = (recipient.email or update["recipient_email"] or "").strip().lower()
+            if not email:
                 continue
-            contact.deliverability_status = status
-            contact.deliverability_reason = reason
-            contact.deliverability_updated_at = event_at
+            key = (institution_id, email)
+            touch = {"status": status, "reason": reason, "event_at": event_at}
+            if key not in latest or latest[key]["event_at"] <= event_at:
+                latest[key] = touch
+            if status in PERMANENT_SUPPRESSION and (key not in suppressions or suppressions[key]["event_at"] <= event_at):
+                suppressions[key] = touch
+        if applied_at is not None:
+            ledger_changes.append(outcome_change(institution_id, recipient, before, new_send=False, event_at=applied_at))
+
+    await db.flush()
+    if latest:
+        params = _unnest_params(latest)
+        await db.execute(text(_contact_updates_sql("contacts")), params)
+        await db.execute(text(_contact_updates_sql("school_contacts")), params)
+    if suppressions:
+        await db.execute(text(_SUPPRESS_SCHOOL_CONTACTS_SQL), _unnest_params(suppressions))
+
+    await record_outcomes(db, ledger_changes)
+    return {"applied": len(fresh), "duplicates": duplicates, "matched_recipients": len(matched)}
 
-        if status in PERMANENT_SUPPRESSION:
-            for contact in school_contacts:
-                contact.last_email_bounced = status == "bounced_hard"
-                contact.status = "invalid"
-                contact.email_validation_error = reason or status
 
+async def apply_delivery_update(db, delivery_update: dict, svix_id: str) -> dict:
+    """Persist a single normalized Resend delivery update and commit.
+
+    Kept separate from the FastAPI route so an isolated regression database can
+    exercise the same persistence path without needing a signed external webhook.
+    """
+    result = await apply_delivery_updates(db, [(svix_id, delivery_update)])
+    if result["duplicates"]:
+        return {"ok": True, "duplicate": True}
+    await db.commit()
+    return {"ok": True, "matched_recipients": result["matched_recipients"], "status": delivery_update["status"]}
+
+
+async def enqueue_delivery_event(db, svix_id: str, raw_body: str) -> None:
+    """Stage a verified webhook body; Svix retries of the same message are ignored."""
+    from sqlalchemy import text
+
+    await db.execute(
+        text("""
+            INSERT INTO resend_webhook_inbox (svix_id, payload)
+            VALUES (:svix_id, CAST(:payload AS jsonb))
+            ON CONFLICT (svix_id) DO NOTHING
+        """),
+        {"svix_id": svix_id, "payload": raw_body},
+    )
+    await db.commit()
+
+
+async def _apply_inbox_rows(db, rows) -> None:
+    events = []
+    for row in rows:
+        payload = row["payload"]
+        update = delivery_update_from_payload(json.loads(payload) if isinstance(payload, str) else payload)
+        if update:
+            events.append((row["svix_id"], update))
+    await apply_delivery_updates(db, events)
+
+
+async def process_delivery_inbox(db, batch_size: int = INBOX_BATCH_SIZE) -> int:
+    """Claim one batch of staged webhook events and apply it. Returns the batch size.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED`` so concurrent appliers
+    never share events. When the batch as a whole fails, its rows are
+    re-applied one by one, each in its own savepoint: the good ones are
+    marked processed and only the failing ones count an attempt and keep
+    their last error. A row is retried up to INBOX_MAX_ATTEMPTS times, then
+    left in the inbox for inspection.
+    """
+    from sqlalchemy import text
+
+    rows = (await db.execute(
+        text("""
+            SELECT id, svix_id, payload
+            FROM resend_webhook_inbox
+            WHERE processed_at IS NULL AND attempts < :max_attempts
+            ORDER BY id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        """),
+        {"max_attempts": INBOX_MAX_ATTEMPTS, "batch_size": batch_size},
+    )).mappings().all()
+    if not rows:
+        await db.rollback()
+        return 0
+
+    mark_processed = text(
+        "UPDATE resend_webhook_inbox SET processed_at = NOW(), attempts = attempts + 1 WHERE id = ANY(:ids)"
+    )
+    ids = [row["id"] for row in rows]
+    try:
+        await _apply_inbox_rows(db, rows)
+        await db.execute(mark_processed, {"ids": ids})
+        await db.commit()
+        return len(rows)
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"Resend inbox batch of {len(ids)} failed, applying rows one by one: {e}")
+
+    # The rollback released the row locks; re-claim whatever nobody else took meanwhile.
+    rows = (await db.execute(
+        text("""
+            SELECT id, svix_id, payload
+            FROM resend_webhook_inbox
+            WHERE id = ANY(:ids) AND processed_at IS NULL
+            ORDER BY id
+            FOR UPDATE SKIP LOCKED
+        """),
+        {"ids": ids},
+    )).mappings().all()
+    done, failed = [], []
+    for row in rows:
+        try:
+            async with db.begin_nested():
+                await _apply_inbox_rows(db, [row])
+            done.append(row["id"])
+        except Exception as e:
+            failed.append((row["id"], str(e)[:500]))
+    if done:
+        await db.execute(mark_processed, {"ids": done})
+    if failed:
+        await db.execute(
+            text("""
+                UPDATE resend_webhook_inbox AS i
+                SET attempts = i.attempts + 1, last_error = f.error
+                FROM UNNEST(CAST(:ids AS bigint[]), CAST(:errors AS text[])) AS f(id, error)
+                WHERE i.id = f.id
+            """),
+            {"ids": [row_id for row_id, _ in failed], "errors": [error for _, error in failed]},
+        )
+        logger.error(f"Resend inbox: {len(failed)} of {len(rows)} events failed: {failed[0][1]}")
     await db.commit()
-    return {"ok": True, "matched_recipients": len(matched), "status": status}
+    return len(ids)
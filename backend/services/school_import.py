@@ -0,0 +1,332 @@
+"""
+Bulk school / contact import (POST /schools/import) as a background job.
+
+The upload is parsed off the event loop, deduplicated in memory against the
+institution's existing schools (name + city) and contact emails, and written
+in chunks: each chunk is COPY'd into a temporary staging table and merged with
+``INSERT ... SELECT ... ON CONFLICT``. Progress, the final counters and the
+row-level error report live in ``school_import_jobs`` (alembic 9e0f1a2b3c4d),
+so any worker can answer the progress endpoint.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+# A job that has not finished within this window is treated as abandoned
+# (e.g. the worker restarted) and no longer blocks a new import.
+STALE_JOB_AFTER = timedelta(hours=1)
+
+
+@dataclass
+class ImportPlan:
+    new_schools: List[Dict[str, Any]] = field(default_factory=list)
+    updated_schools: List[Dict[str, Any]] = field(default_factory=list)
+    contacts: List[Dict[str, Any]] = field(default_factory=list)
+    duplicates: int = 0
+
+
+def plan_import(
+    rows: List[dict],
+    existing_schools: Dict[str, str],
+    existing_emails: Set[str],
+    update_existing: bool,
+) -> ImportPlan:
+    """Group parsed rows by school and drop emails that already exist.
+
+    School identity is ``get_school_key(name, city)``; contact identity is the
+    lower-cased email across the whole institution (including the legacy
+    ``schools.email`` column). The first new contact of each school is primary.
+    """
+    from routes.schools import get_school_key
+
+    plan = ImportPlan()
+    emails = set(existing_emails)
+    schools: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        key = get_school_key(row["school_name"], row["city"])
+        school = schools.get(key)
+        if school is None:
+            school = schools[key] = {
+                "id": existing_schools.get(key),
+                "name": row["school_name"],
+                "city": row["city"],
+                "notes": row.get("notes", ""),
+                "tags": row.get("tags", []),
+                "has_contacts": False,
+            }
+            if school["id"] is None:
+                school["id"] = str(uuid.uuid4())
+                plan.new_schools.append(school)
+            elif update_existing:
+                plan.updated_schools.append(school)
+
+        email = row["email"].lower()
+        if email in emails:
+            plan.duplicates += 1
+            continue
+        emails.add(email)
+        plan.contacts.append({
+            "school_id": school["id"],
+            "email": email,
+            "name": row.get("contact_name", ""),
+            "phone": row.get("phone", ""),
+            "is_primary": not school["has_contacts"],
+        })
+        school["has_contacts"] = True
+    return plan
+
+
+def parse_import_file(content: bytes, filename: str):
+    """Blocking parse; run through ``asyncio.to_thread``."""
+    from routes.schools import parse_csv_file, parse_excel_file
+
+    if filename.lower().endswith(".csv"):
+        return parse_csv_file(content, filename)
+    return parse_excel_file(content, filename)
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _asyncpg_connection(db: AsyncSession):
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+
+async def _create_staging_tables(db: AsyncSession) -> None:
+    await db.execute(text("""
+        CREATE TEMP TABLE import_schools_stage (
+            id uuid, name text, city text, notes text, tags text
+        ) ON COMMIT DROP
+    """))
+    await db.execute(text("""
+        CREATE TEMP TABLE import_contacts_stage (
+            id uuid, school_id uuid, email text, name text, phone text, is_primary boolean,
+            suggested_correction text
+        ) ON COMMIT DROP
+    """))
+
+
+async def _copy_new_schools(db: AsyncSession, inst_id: str, schools: List[dict]) -> int:
+    await db.execute(text("TRUNCATE import_schools_stage"))
+    conn = await _asyncpg_connection(db)
+    await conn.copy_records_to_table(
+        "import_schools_stage",
+        records=[
+            (uuid.UUID(s["id"]), s["name"], s["city"], s["notes"], json.dumps(s["tags"], ensure_ascii=False))
+            for s in schools
+        ],
+        columns=["id", "name", "city", "notes", "tags"],
+    )
+    result = await db.execute(text("""
+        INSERT INTO schools (id, institution_id, name, city, notes, tags, source, booking_count, created_at, updated_at)
+        SELECT s.id, :inst_id, s.name, s.city, s.notes, s.tags::jsonb, 'import', 0, NOW(), NOW()
+        FROM import_schools_stage s
+        ON CONFLICT (id) DO NOTHING
+    """), {"inst_id": inst_id})
+    return result.rowcount or 0
+
+
+async def _merge_school_tags(db: AsyncSession, inst_id: str, schools: List[dict]) -> int:
+    result = await db.execute(text("""
+        UPDATE schools t
+        SET tags = COALESCE(t.tags::jsonb, '[]'::jsonb) || u.tags::jsonb,
+            updated_at = NOW()
+        FROM UNNEST(CAST(:ids AS uuid[]), CAST(:tags AS text[])) AS u(id, tags)
+        WHERE t.id = u.id AND t.institution_id = :inst_id
+    """), {
+        "inst_id": inst_id,
+        "ids": [s["id"] for s in schools],
+        "tags": [json.dumps(s["tags"], ensure_ascii=False) for s in schools],
+    })
+    return result.rowcount or 0
+
+
+async def _copy_contacts(db: AsyncSession, inst_id: str, contacts: List[dict]) -> int:
+    from routes.schools import email_suggestion
+
+    await db.execute(text("TRUNCATE import_contacts_stage"))
+    conn = await _asyncpg_connection(db)
+    await conn.copy_records_to_table(
+        "import_contacts_stage",
+        records=[
+            (uuid.uuid4(), uuid.UUID(c["school_id"]), c["email"], c["name"], c["phone"], c["is_primary"],
+             email_suggestion(c["email"]))
+            for c in contacts
+        ],
+        columns=["id", "school_id", "email", "name", "phone", "is_primary", "suggested_correction"],
+    )
+    # Emails are unique per institution only by convention; the NOT EXISTS
+    # keeps a contact added meanwhile (e.g. via the admin UI) from doubling.
+    result = await db.execute(text("""
+        INSERT INTO school_contacts (id, school_id, institution_id, email, name, phone, is_primary, status,
+                                     deliverability_status, suggested_correction, created_at, updated_at)
+        SELECT c.id, c.school_id, :inst_id, c.email, c.name, c.phone, c.is_primary, 'active',
+               'unknown', c.suggested_correction, NOW(), NOW()
+        FROM import_contacts_stage c
+        WHERE NOT EXISTS (
+            SELECT 1 FROM school_contacts x
+            WHERE x.institution_id = :inst_id AND lower(x.email) = c.email
+        )
+        ON CONFLICT (id) DO NOTHING
+    """), {"inst_id": inst_id})
+    return result.rowcount or 0
+
+
+async def _update_job(job_id: str, **values) -> None:
+    """Write job state in its own short transaction, visible while the import runs."""
+    from database.supabase import AsyncSessionLocal
+
+    assignments = ", ".join(
+        f"{key} = CAST(:{key} AS jsonb)" if key in ("error_report", "result") else f"{key} = :{key}"
+        for key in values
+    )
+    params = {k: json.dumps(v, ensure_ascii=False) if k in ("error_report", "result") else v for k, v in values.items()}
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text(f"UPDATE school_import_jobs SET {assignments}, updated_at = NOW() WHERE id = :job_id"),
+            {**params, "job_id": job_id},
+        )
+        await db.commit()
+
+
+async def active_import_job(db: AsyncSession, inst_id: str) -> Optional[str]:
+    row = (await db.execute(text("""
+        SELECT id FROM school_import_jobs
+        WHERE institution_id = :inst_id
+          AND status IN ('queued', 'running')
+          AND updated_at > :fresh_after
+        ORDER BY created_at DESC
+        LIMIT 1
+    """), {"inst_id": inst_id, "fresh_after": datetime.now(timezone.utc) - STALE_JOB_AFTER})).first()
+    return str(row[0]) if row else None
+
+
+def _import_lock_key(inst_id: str) -> int:
+    """Deterministic int64 advisory lock key per institution (same scheme as collision_service)."""
+    h = hashlib.sha256(f"school_import:{inst_id}".encode()).hexdigest()
+    return int(h[:15], 16)
+
+
+async def create_import_job(
+    db: AsyncSession, inst_id: str, user_id: Optional[str], filename: str, update_existing: bool,
+) -> Optional[str]:
+    """Queue an import job; None if the institution already has one in progress.
+
+    The active-job check and the insert run under a transaction-level advisory
+    lock per institution, so two parallel uploads cannot both pass the check.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _import_lock_key(inst_id)})
+    if await active_import_job(db, inst_id):
+        await db.rollback()
+        return None
+    job_id = str(uuid.uuid4())
+    await db.execute(text("""
+        INSERT INTO school_import_jobs (id, institution_id, created_by, filename, update_existing, status)
+        VALUES (:id, :inst_id, :user_id, :filename, :update_existing, 'queued')
+    """), {
+        "id": job_id, "inst_id": inst_id, "user_id": user_id,
+        "filename": filename, "update_existing": update_existing,
+    })
+    await db.commit()
+    return job_id
+
+
+async def get_import_job(db: AsyncSession, inst_id: str, job_id: str) -> Optional[dict]:
+    row = (await db.execute(text("""
+        SELECT * FROM school_import_jobs WHERE id = CAST(:job_id AS uuid) AND institution_id = :inst_id
+    """), {"job_id": job_id, "inst_id": inst_id})).mappings().first()
+    return dict(row) if row else None
+
+
+async def run_school_import(job_id: str, inst_id: str, content: bytes, filename: str, update_existing: bool):
+    """Background job body: parse, dedupe, COPY + merge in chunks, record the outcome.
+
+    All data is written in one transaction, so a failed import leaves nothing
+    behind; progress is reported from a separate session after every chunk.
+    """
+    from database.supabase import AsyncSessionLocal
+    from routes.schools import get_school_key
+
+    try:
+        await _update_job(job_id, status="running", phase="parsing")
+        rows, errors = await asyncio.to_thread(parse_import_file, content, filename)
+        del content
+
+        async with AsyncSessionLocal() as db:
+            existing_schools = {}
+            for school_id, name, city in (await db.execute(text("""
+                SELECT id, name, city FROM schools
+                WHERE institution_id = :inst_id AND deleted_at IS NULL
+            """), {"inst_id": inst_id})).all():
+                existing_schools[get_school_key(name, city)] = str(school_id)
+            existing_emails = {
+                email.lower() for (email,) in (await db.execute(text("""
+                    SELECT email FROM school_contacts WHERE institution_id = :inst_id
+                    UNION
+                    SELECT email FROM schools WHERE institution_id = :inst_id AND email IS NOT NULL
+                """), {"inst_id": inst_id})).all() if email
+            }
+
+            plan = plan_import(rows, existing_schools, existing_emails, update_existing)
+            total = len(plan.new_schools) + len(plan.updated_schools) + len(plan.contacts)
+            await _update_job(
+                job_id, phase="writing", total_rows=len(rows), total_records=total,
+                processed_records=0, error_count=len(errors), error_report=errors,
+            )
+
+            await _create_staging_tables(db)
+            processed = 0
+            written = {"new_schools": 0, "updated": 0, "new_contacts": 0}
+            steps = (
+                ("new_schools", plan.new_schools, _copy_new_schools),
+                ("updated", plan.updated_schools, _merge_school_tags),
+                ("new_contacts", plan.contacts, _copy_contacts),
+            )
+            for counter, items, write in steps:
+                for chunk in _chunks(items):
+                    written[counter] += await write(db, inst_id, chunk)
+                    processed += len(chunk)
+                    await _update_job(job_id, processed_records=processed)
+            await db.commit()
+
+        new_schools, new_contacts = written["new_schools"], written["new_contacts"]
+        result = {
+            "success": new_schools > 0 or new_contacts > 0,
+            "total_rows": len(rows),
+            "imported": new_schools + new_contacts,
+            "updated": written["updated"],
+            "skipped": len(plan.contacts) - new_contacts,
+            "errors": len(errors),
+            "duplicates": plan.duplicates,
+            "new_schools": new_schools,
+            "new_contacts": new_contacts,
+            "error_details": errors[:100],
+        }
+        await _update_job(job_id, status="done", phase="done", result=result,
+                          finished_at=datetime.now(timezone.utc))
+        logger.info(
+            f"Import {job_id} completed: {new_schools} schools, {new_contacts} contacts, "
+            f"{plan.duplicates} duplicates"
+        )
+    except Exception as e:
+        logger.error(f"Import {job_id} failed: {e}")
+        try:
+            await _update_job(job_id, status="failed", failure_reason=str(e)[:500],
+                              finished_at=datetime.now(timezone.utc))
+        except Exception:
+            pass
@@ -3,15 +3,20 @@ Usage metrics tracking — aggregated, institution-level, GDPR-safe.
 Tracks feature usage counts for product analytics.
 """
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from typing import Optional, Tuple
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import UsageMetric
+from database.models import InstitutionBookingUsage, UsageMetric
 
 logger = logging.getLogger(__name__)
 
+# Reservation status that does not count towards the monthly booking quota.
+# Keep in sync with the reservations_usage_refresh() trigger function.
+BOOKING_USAGE_EXCLUDED_STATUS = 'cancelled'
+
 
 async def track_usage(db: AsyncSession, institution_id: str, feature_key: str, metadata: dict = None):
     """Increment usage counter for a feature. Upsert pattern."""
@@ -99,7 +104,7 @@ async def get_plan_quota_usage(
     `enforced=False` documents that hard enforcement is intentionally deferred
     (architecture-ready: flip to True post-pilot to start blocking).
     """
-    from database.models import Program, Reservation
+    from database.models import Program
     from services.plan_service import get_plan_limits
 
     limits = get_plan_limits(plan, plan_status)
@@ -112,14 +117,7 @@ async def get_plan_quota_usage(
     )).scalar() or 0
 
     now = datetime.now(timezone.utc)
-    month_start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
-    bookings_used = (await db.execute(
-        select(func.count(Reservation.id)).where(and_(
-            Reservation.institution_id == institution_id,
-            Reservation.status != 'cancelled',
-            Reservation.created_at >= month_start,
-        ))
-    )).scalar() or 0
+    _, bookings_used = await get_month_booking_usage(db, institution_id, usage_month(now))
 
     return {
         "plan": plan,
@@ -129,3 +127,70 @@ async def get_plan_quota_usage(
         "programs": _quota_block(programs_used, limits.get("programs_limit", -1)),
         "bookings_month": _quota_block(bookings_used, limits.get("bookings_monthly_limit", -1)),
     }
+
+
+def usage_month(moment: Optional[datetime] = None) -> date:
+    """First day of the UTC month ``moment`` falls in: the counter key."""
+    moment = (moment or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+async def get_month_booking_usage(
+    db: AsyncSession, institution_id: str, month: Optional[date] = None
+) -> Tuple[int, int]:
+    """(bookings created, bookings not cancelled) in the given UTC month — one PK lookup."""
+    row = (await db.execute(
+        select(InstitutionBookingUsage.bookings_created, InstitutionBookingUsage.bookings_active)
+        .where(and_(
+            InstitutionBookingUsage.institution_id == institution_id,
+            InstitutionBookingUsage.month == (month or usage_month()),
+        ))
+    )).first()
+    return (row.bookings_created, row.bookings_active) if row else (0, 0)
+
+
+async def reconcile_booking_usage(db: AsyncSession, months: int = 2) -> int:
+    """Recount the last ``months`` UTC months from `reservations` (half-open
+    created_at range on idx_reservations_inst_created); returns the number of
+    corrected counter rows."""
+    current = usage_month()
+    index = current.year * 12 + current.month - 1 - (months - 1)
+    since = date(index // 12, index % 12 + 1, 1)
+    result = await db.execute(
+        text(
+            """
+            WITH counted AS (
+                SELECT r.institution_id,
+                       date_trunc('month', r.created_at AT TIME ZONE 'UTC')::date AS month,
+                       COUNT(*) AS bookings_created,
+                       COUNT(*) FILTER (WHERE r.status IS DISTINCT FROM :excluded) AS bookings_active
+                FROM reservations r
+                WHERE r.created_at >= :since_at
+                GROUP BY 1, 2
+            ), keys AS (
+                SELECT institution_id, month FROM institution_booking_usage WHERE month >= :since
+                UNION
+                SELECT institution_id, month FROM counted
+            )
+            INSERT INTO institution_booking_usage
+                (institution_id, month, bookings_created, bookings_active, updated_at)
+            SELECT k.institution_id, k.month,
+                   COALESCE(c.bookings_created, 0), COALESCE(c.bookings_active, 0), NOW()
+            FROM keys k
+            LEFT JOIN counted c ON c.institution_id = k.institution_id AND c.month = k.month
+            ON CONFLICT (institution_id, month) DO UPDATE
+            SET bookings_created = EXCLUDED.bookings_created,
+                bookings_active = EXCLUDED.bookings_active,
+                updated_at = NOW()
+            WHERE institution_booking_usage.bookings_created IS DISTINCT FROM EXCLUDED.bookings_created
+               OR institution_booking_usage.bookings_active IS DISTINCT FROM EXCLUDED.bookings_active
+            """
+        ),
+        {
+            "excluded": BOOKING_USAGE_EXCLUDED_STATUS,
+            "since": since,
+            "since_at": datetime(since.year, since.month, 1, tzinfo=timezone.utc),
+        },
+    )
+    await db.commit()
+    return result.rowcount or 0
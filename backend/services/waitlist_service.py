@@ -2,18 +2,87 @@
 Waitlist service — Phase 2: Semi-automatic matching.
 Hooks into: booking cancellation, slot creation, capacity changes.
 Finds matching waitlist entries and notifies candidates via email.
+
+Matching runs in SQL on ``waitlist_entries.requested_range`` (GiST index,
+alembic 7a8b9c0d1e2f). All slots freed by one action — e.g. a bulk
+cancellation — are matched in one query and the candidates are emailed in
+one Resend batch.
 """
 import uuid
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, update
+from sqlalchemy import select, text, update
 
-from database.models import WaitlistEntry, Program
+from database.models import WaitlistEntry, Program, parse_visit_date
 
 logger = logging.getLogger(__name__)
 
+# (program_id, date "YYYY-MM-DD", time_block "09:00-10:30")
+FreedSlot = Tuple[str, str, str]
+
+# Active entries whose requested day / span contains a freed slot and whose
+# preferred time of day fits its start hour (unknown hour → no time filter).
+# Each entry is matched once, to the first slot it fits.
+_MATCH_SLOTS_SQL = text(
+    """
+    SELECT DISTINCT ON (w.id) w.id, w.email, w.teacher_name, w.program_id, s.idx
+    FROM unnest(CAST(:program_ids AS uuid[]), CAST(:dates AS date[]), CAST(:hours AS integer[]))
+         WITH ORDINALITY AS s(program_id, slot_date, hour, idx)
+    JOIN waitlist_entries w
+      ON w.program_id = s.program_id
+     AND w.requested_range @> s.slot_date
+     AND w.status = 'active'
+    WHERE s.hour IS NULL
+       OR CASE w.preferred_time_of_day
+              WHEN 'morning' THEN s.hour < 12
+              WHEN 'midday' THEN s.hour >= 11 AND s.hour < 14
+              WHEN 'afternoon' THEN s.hour >= 12
+              ELSE true
+          END
+    ORDER BY w.id, s.idx
+    """
+)
+
+
+def _slot_time(time_block: str) -> str:
+    return time_block.split('-')[0] if time_block and '-' in time_block else ''
+
+
+def _slot_hour(slot_time: str) -> Optional[int]:
+    try:
+        return int(slot_time.split(':')[0]) if slot_time else None
+    except ValueError:
+        return None
+
+
+async def find_matches_for_slots(db: AsyncSession, slots: List[FreedSlot]) -> List[Tuple[object, int]]:
+    """
+    Find active waitlist entries for freed slots, in one query.
+    Checks: specific_date match OR date_range containing the slot date, then
+    the preferred time of day. Returns ``(entry row, index into slots)``.
+    """
+    program_ids, dates, hours, positions = [], [], [], []
+    for position, (program_id, slot_date, time_block) in enumerate(slots):
+        day = parse_visit_date(slot_date)
+        if not program_id or day is None:
+            continue
+        program_ids.append(str(program_id))
+        dates.append(day)
+        hours.append(_slot_hour(_slot_time(time_block)))
+        positions.append(position)
+    if not program_ids:
+        return []
+
+    result = await db.execute(
+        _MATCH_SLOTS_SQL, {"program_ids": program_ids, "dates": dates, "hours": hours}
+    )
+    matches = [(row, positions[row.idx - 1]) for row in result.all()]
+    if matches:
+        logger.info(f"Waitlist match: {len(matches)} entries for {len(program_ids)} freed slot(s)")
+    return matches
+
 
 async def find_matching_entries(
     db: AsyncSession,
@@ -21,129 +90,102 @@ async def find_matching_entries(
     slot_date: str,
     slot_time: Optional[str] = None,
 ) -> List:
+    """Active waitlist entries matching one freed slot (``slot_time`` "HH:MM")."""
+    time_block = f"{slot_time}-" if slot_time else ''
+    return [entry for entry, _ in await find_matches_for_slots(db, [(program_id, slot_date, time_block)])]
+
+
+def _candidate_email(entry, program_name: str, slot_date: str, slot_time: str) -> dict:
+    html = f"""
+    <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; max-width: 600px; margin: 0 auto;">
+        <div style="background: #1E293B; padding: 24px; border-radius: 8px 8px 0 0;">
+            <h1 style="color: white; margin: 0; font-size: 20px;">Uvolnil se termín!</h1>
+        </div>
+        <div style="padding: 24px; background: white; border: 1px solid #E2E8F0; border-top: none; border-radius: 0 0 8px 8px;">
+            <p style="color: #475569; font-size: 15px;">
+                Dobrý den, {entry.teacher_name},
+            </p>
+            <p style="color: #475569; font-size: 15px;">
+                uvolnil se termín programu <strong>{program_name}</strong>, o který jste projevili zájem.
+            </p>
+            <div style="background: #F0FDF4; border: 1px solid #BBF7D0; border-radius: 8px; padding: 16px; margin: 16px 0;">
+                <p style="margin: 4px 0; color: #166534; font-size: 14px;">
+                    <strong>Program:</strong> {program_name}
+                </p>
+                <p style="margin: 4px 0; color: #166534; font-size: 14px;">
+                    <strong>Datum:</strong> {slot_date}
+                </p>
+                {f'<p style="margin: 4px 0; color: #166534; font-size: 14px;"><strong>Čas:</strong> {slot_time}</p>' if slot_time else ''}
+            </div>
+            <p style="color: #475569; font-size: 15px;">
+                Doporučujeme co nejdříve provést rezervaci, než termín obsadí někdo jiný.
+            </p>
+            <hr style="border: none; border-top: 1px solid #E2E8F0; margin: 20px 0;">
+            <p style="color: #94A3B8; font-size: 12px; text-align: center;">
+                Odesláno systémem Budeživo.cz
+            </p>
+        </div>
+    </div>
     """
-    Find active waitlist entries matching a newly freed slot.
-    Checks: specific_date match OR date_range containing the slot date.
-    """
-    prog_uuid = uuid.UUID(program_id)
-    
-    result = await db.execute(
-        select(WaitlistEntry).where(and_(
-            WaitlistEntry.program_id == prog_uuid,
-            WaitlistEntry.status == 'active',
-        ))
-    )
-    all_entries = result.scalars().all()
-    
-    matches = []
-    for entry in all_entries:
-        matched = False
-        
-        if entry.request_type == 'specific_date':
-            if entry.requested_date == slot_date:
-                matched = True
-        elif entry.request_type == 'date_range':
-            if entry.range_start_date and entry.range_end_date:
-                if entry.range_start_date <= slot_date <= entry.range_end_date:
-                    matched = True
-        
-        if matched and slot_time and entry.preferred_time_of_day != 'any':
-            # Filter by preferred time of day
-            try:
-                hour = int(slot_time.split(':')[0])
-                pref = entry.preferred_time_of_day
-                if pref == 'morning' and hour >= 12:
-                    matched = False
-                elif pref == 'midday' and (hour < 11 or hour >= 14):
-                    matched = False
-                elif pref == 'afternoon' and hour < 12:
-                    matched = False
-            except (ValueError, IndexError):
-                pass
-        
-        if matched:
-            matches.append(entry)
-    
-    if matches:
-        logger.info(f"Waitlist match: {len(matches)} entries for program {program_id} on {slot_date}")
-    
-    return matches
+    return {
+        "to_email": entry.email,
+        "subject": f"Uvolnil se termín: {program_name}",
+        "html_content": html,
+    }
 
 
 async def notify_candidates(
     db: AsyncSession,
-    entries: List,
-    slot_info: dict,
-    program_name: str = '',
+    matches: List[Tuple[object, int]],
+    slots: List[FreedSlot],
 ) -> int:
     """
-    Send email notifications to matching waitlist candidates.
-    Updates their status to 'contacted'.
+    Email matched candidates in one batch and set them to 'contacted'.
     Returns number of notified candidates.
     """
-    notified = 0
-    
-    for entry in entries:
-        try:
-            from services.email_service import EmailService
-            
-            slot_date = slot_info.get('date', '')
-            slot_time = slot_info.get('time', '')
-            
-            subject = f"Uvolnil se termín: {program_name}"
-            html = f"""
-            <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; max-width: 600px; margin: 0 auto;">
-                <div style="background: #1E293B; padding: 24px; border-radius: 8px 8px 0 0;">
-                    <h1 style="color: white; margin: 0; font-size: 20px;">Uvolnil se termín!</h1>
-                </div>
-                <div style="padding: 24px; background: white; border: 1px solid #E2E8F0; border-top: none; border-radius: 0 0 8px 8px;">
-                    <p style="color: #475569; font-size: 15px;">
-                        Dobrý den, {entry.teacher_name},
-                    </p>
-                    <p style="color: #475569; font-size: 15px;">
-                        uvolnil se termín programu <strong>{program_name}</strong>, o který jste projevili zájem.
-                    </p>
-                    <div style="background: #F0FDF4; border: 1px solid #BBF7D0; border-radius: 8px; padding: 16px; margin: 16px 0;">
-                        <p style="margin: 4px 0; color: #166534; font-size: 14px;">
-                            <strong>Program:</strong> {program_name}
-                        </p>
-                        <p style="margin: 4px 0; color: #166534; font-size: 14px;">
-                            <strong>Datum:</strong> {slot_date}
-                        </p>
-                        {f'<p style="margin: 4px 0; color: #166534; font-size: 14px;"><strong>Čas:</strong> {slot_time}</p>' if slot_time else ''}
-                    </div>
-                    <p style="color: #475569; font-size: 15px;">
-                        Doporučujeme co nejdříve provést rezervaci, než termín obsadí někdo jiný.
-                    </p>
-                    <hr style="border: none; border-top: 1px solid #E2E8F0; margin: 20px 0;">
-                    <p style="color: #94A3B8; font-size: 12px; text-align: center;">
-                        Odesláno systémem Budeživo.cz
-                    </p>
-                </div>
-            </div>
-            """
-            
-            if EmailService.is_configured():
-                await EmailService.send_email(
-                    to_email=entry.email,
-                    subject=subject,
-                    html_content=html,
-                )
-            
-            # Update status to 'contacted'
-            entry.status = 'contacted'
-            entry.updated_at = datetime.now(timezone.utc)
-            notified += 1
-            
-            logger.info(f"Waitlist notify: {entry.email} for {program_name} on {slot_date}")
-            
-        except Exception as e:
-            logger.warning(f"Waitlist notify failed for {entry.email}: {e}")
-    
-    if notified > 0:
+    if not matches:
+        return 0
+    from services.email_service import EmailService
+
+    program_ids = {uuid.UUID(str(entry.program_id)) for entry, _ in matches}
+    names = dict((await db.execute(
+        select(Program.id, Program.name_cs).where(Program.id.in_(program_ids))
+    )).all())
+
+    messages = []
+    for entry, position in matches:
+        _, slot_date, time_block = slots[position]
+        program_name = names.get(uuid.UUID(str(entry.program_id))) or 'Program'
+        messages.append(_candidate_email(entry, program_name, slot_date, _slot_time(time_block)))
+    results = await EmailService.send_batch(messages)
+
+    notified_ids = []
+    for (entry, _), result in zip(matches, results):
+        if result.get("status") == "failed":
+            logger.warning(f"Waitlist notify failed for {entry.email}: {result.get('error')}")
+        else:
+            notified_ids.append(entry.id)
+    if notified_ids:
+        await db.execute(
+            update(WaitlistEntry)
+            .where(WaitlistEntry.id.in_(notified_ids), WaitlistEntry.status == 'active')
+            .values(status='contacted', updated_at=datetime.now(timezone.utc))
+        )
         await db.commit()
-    
-    return notified
+    return len(notified_ids)
+
+
+async def on_slots_freed(db: AsyncSession, slots: Iterable[FreedSlot], reason: str = 'slot_freed') -> int:
+    """
+    Hook: match and notify candidates for every slot freed by one action.
+    Returns number of matched entries.
+    """
+    slots = list(slots)
+    matches = await find_matches_for_slots(db, slots)
+    if matches:
+        notified = await notify_candidates(db, matches, slots)
+        logger.info(f"Waitlist hook ({reason}): notified {notified} candidates for {len(slots)} freed slot(s)")
+    return len(matches)
 
 
 async def on_booking_cancelled(
@@ -157,25 +199,7 @@ async def on_booking_cancelled(
     Hook: Called when a booking is cancelled.
     Finds matching waitlist entries and notifies them.
     """
-    # Get program name
-    prog_result = await db.execute(
-        select(Program.name_cs).where(Program.id == uuid.UUID(program_id))
-    )
-    program_name = prog_result.scalar_one_or_none() or 'Program'
-    
-    slot_time = time_block.split('-')[0] if time_block and '-' in time_block else ''
-    
-    matches = await find_matching_entries(db, program_id, date, slot_time)
-    
-    if matches:
-        notified = await notify_candidates(
-            db, matches,
-            {'date': date, 'time': slot_time},
-            program_name,
-        )
-        logger.info(f"Waitlist hook (booking_cancelled): notified {notified} candidates for {program_name} on {date}")
-    
-    return len(matches)
+    return await on_slots_freed(db, [(program_id, date, time_block)], reason='booking_cancelled')
 
 
 async def on_slot_freed(
@@ -187,21 +211,4 @@ async def on_slot_freed(
     """
     Hook: Called when a time slot becomes available (e.g., exception removed, capacity changed).
     """
-    prog_result = await db.execute(
-        select(Program.name_cs).where(Program.id == uuid.UUID(program_id))
-    )
-    program_name = prog_result.scalar_one_or_none() or 'Program'
-    
-    slot_time = time_block.split('-')[0] if time_block and '-' in time_block else ''
-    
-    matches = await find_matching_entries(db, program_id, date, slot_time)
-    
-    if matches:
-        notified = await notify_candidates(
-            db, matches,
-            {'date': date, 'time': slot_time},
-            program_name,
-        )
-        logger.info(f"Waitlist hook (slot_freed): notified {notified} candidates for {program_name} on {date}")
-    
-    return len(matches)
+    return await on_slots_freed(db, [(program_id, date, time_block)])
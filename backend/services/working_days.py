@@ -0,0 +1,102 @@
+"""
+Working-day calendar: Mon–Fri minus the Czech public holidays.
+
+Holidays live in ``public_holidays`` (alembic a0b1c2d3e4f5) so one-off days
+can be added by hand; the statutory ones (zákon č. 245/2000 Sb.) are
+computed here and inserted for the years a job needs (``ensure_public_holidays``).
+"""
+import logging
+from datetime import date, timedelta
+from typing import Dict, FrozenSet, Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import PublicHoliday
+
+logger = logging.getLogger(__name__)
+
+_FIXED_HOLIDAYS = (
+    (1, 1, "Den obnovy samostatného českého státu, Nový rok"),
+    (5, 1, "Svátek práce"),
+    (5, 8, "Den vítězství"),
+    (7, 5, "Den slovanských věrozvěstů Cyrila a Metoděje"),
+    (7, 6, "Den upálení mistra Jana Husa"),
+    (9, 28, "Den české státnosti"),
+    (10, 28, "Den vzniku samostatného československého státu"),
+    (11, 17, "Den boje za svobodu a demokracii a Mezinárodní den studentstva"),
+    (12, 24, "Štědrý den"),
+    (12, 25, "1. svátek vánoční"),
+    (12, 26, "2. svátek vánoční"),
+)
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def czech_public_holidays(year: int) -> Dict[date, str]:
+    """Statutory Czech public holidays of ``year``."""
+    holidays = {date(year, month, day): name for month, day, name in _FIXED_HOLIDAYS}
+    easter = easter_sunday(year)
+    holidays[easter - timedelta(days=2)] = "Velký pátek"
+    holidays[easter + timedelta(days=1)] = "Velikonoční pondělí"
+    return holidays
+
+
+async def ensure_public_holidays(db: AsyncSession, years: Iterable[int]) -> None:
+    """Insert the statutory holidays of ``years`` that are missing (caller commits)."""
+    rows = [
+        {"day": day, "name": name}
+        for year in sorted(set(years))
+        for day, name in czech_public_holidays(year).items()
+    ]
+    if rows:
+        await db.execute(insert(PublicHoliday).values(rows).on_conflict_do_nothing(index_elements=["day"]))
+
+
+async def load_holidays(db: AsyncSession, start: date, end: date) -> FrozenSet[date]:
+    """Holidays in ``[start, end]`` from ``public_holidays``."""
+    result = await db.execute(
+        select(PublicHoliday.day).where(PublicHoliday.day >= start, PublicHoliday.day <= end)
+    )
+    return frozenset(result.scalars().all())
+
+
+def is_working_day(d: date, holidays: FrozenSet[date] = frozenset()) -> bool:
+    return d.weekday() < 5 and d not in holidays
+
+
+def subtract_working_days(d, n: int, holidays: FrozenSet[date] = frozenset()):
+    """Return the date that is ``n`` working days (Mon–Fri, not a holiday) before ``d``."""
+    cur = d
+    while n > 0:
+        cur -= timedelta(days=1)
+        if is_working_day(cur, holidays):
+            n -= 1
+    return cur
+
+
+def remind_visit_dates(today: date, working_days_before: int, horizon_days: int,
+                       holidays: FrozenSet[date] = frozenset()) -> List[date]:
+    """Visit dates in ``(today, today + horizon_days]`` whose reminder is due:
+    the day ``working_days_before`` working days ahead of the visit is today
+    or already past (a missed run catches up before the visit).
+    """
+    return [
+        visit
+        for visit in (today + timedelta(days=offset) for offset in range(1, horizon_days + 1))
+        if subtract_working_days(visit, working_days_before, holidays) <= today
+    ]
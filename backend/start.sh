@@ -21,5 +21,33 @@ echo "Running Alembic migrations..."
 alembic upgrade head
 echo "Alembic migrations complete."
 
+# Workers: WEB_CONCURRENCY (default 1). With more than one worker the
+# in-process scheduler must not run in every worker, so default to leader
+# election unless SCHEDULER_MODE is set explicitly (see scheduler.py). The
+# leader lock needs SCHEDULER_LOCK_DATABASE_URL (session connection; the
+# transaction pooler in DATABASE_URL cannot hold it).
+WORKERS=${WEB_CONCURRENCY:-1}
+if [ "$WORKERS" -gt 1 ]; then
+  if [ -z "${SCHEDULER_MODE:-}" ]; then
+    if [ -z "${SCHEDULER_LOCK_DATABASE_URL:-}" ]; then
+      echo "ERROR: WEB_CONCURRENCY=$WORKERS needs SCHEDULER_LOCK_DATABASE_URL for scheduler leader election,"
+      echo "       or an explicit SCHEDULER_MODE (e.g. 'off' with a separate 'python scheduler.py' service)."
+      exit 1
+    fi
+    export SCHEDULER_MODE=leader
+  fi
+  # Public response cache lives per worker; broadcast invalidations via pg_notify.
+  # LISTEN needs the session connection of SCHEDULER_LOCK_DATABASE_URL.
+  if [ -n "${SCHEDULER_LOCK_DATABASE_URL:-}" ]; then
+    export RESPONSE_CACHE_SYNC=${RESPONSE_CACHE_SYNC:-postgres}
+  elif [ -z "${RESPONSE_CACHE_SYNC:-}" ]; then
+    echo "WARNING: SCHEDULER_LOCK_DATABASE_URL is not set; cached public pages are invalidated per worker only."
+  fi
+  if [ -z "${RATE_LIMIT_STORAGE_URI:-}" ]; then
+    echo "WARNING: RATE_LIMIT_STORAGE_URI is not set; rate limits are per worker."
+  fi
+fi
+echo "Workers: $WORKERS (scheduler mode: ${SCHEDULER_MODE:-embedded})"
+
 # Start uvicorn
-exec uvicorn main:app --host 0.0.0.0 --port "$PORT" --workers 1
+exec uvicorn main:app --host 0.0.0.0 --port "$PORT" --workers "$WORKERS"
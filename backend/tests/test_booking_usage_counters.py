@@ -0,0 +1,91 @@
+import os
+import unittest
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+
+from database.supabase_repositories import BookingRepositorySupabase
+from services import usage_service
+
+INST = "11111111-1111-4111-8111-111111111111"
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class _Result:
+    def __init__(self, row=None, scalar=None, rowcount=0):
+        self._row, self._scalar, self.rowcount = row, scalar, rowcount
+
+    def first(self):
+        return self._row
+
+    def scalar(self):
+        return self._scalar
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        return self.results.pop(0)
+
+    async def commit(self):
+        self.commits += 1
+
+
+class BookingUsageReadTests(unittest.IsolatedAsyncioTestCase):
+    async def test_dashboard_month_count_is_a_counter_lookup(self):
+        db = _FakeDb(_Result(scalar=42))
+        self.assertEqual(await BookingRepositorySupabase(db).count_month(INST, "2026-10"), 42)
+
+        sql = _sql(db.statements[0][0])
+        self.assertIn("FROM institution_booking_usage", sql)
+        self.assertIn("institution_booking_usage.month = '2026-10-01'", sql)
+        self.assertNotIn("to_char", sql)
+
+    async def test_quota_uses_the_not_cancelled_counter(self):
+        db = _FakeDb(_Result(scalar=3), _Result(row=SimpleNamespace(bookings_created=9, bookings_active=7)))
+        usage = await usage_service.get_plan_quota_usage(db, INST, "free")
+
+        self.assertEqual(usage["bookings_month"]["used"], 7)
+        self.assertEqual(len(db.statements), 2)
+        self.assertNotIn("FROM reservations", _sql(db.statements[1][0]))
+
+    async def test_missing_counter_row_means_no_bookings(self):
+        db = _FakeDb(_Result(row=None))
+        self.assertEqual(await usage_service.get_month_booking_usage(db, INST, date(2026, 1, 1)), (0, 0))
+
+
+class BookingUsageKeyTests(unittest.TestCase):
+    def test_month_key_is_the_utc_month(self):
+        utc_month_end = datetime(2026, 10, 31, 23, 30, tzinfo=timezone.utc)
+        self.assertEqual(usage_service.usage_month(utc_month_end), date(2026, 10, 1))
+
+
+class BookingUsageReconcileTests(unittest.IsolatedAsyncioTestCase):
+    async def test_reconcile_recounts_a_half_open_range_across_the_year_boundary(self):
+        db = _FakeDb(_Result(rowcount=2))
+        with mock.patch.object(usage_service, "usage_month", return_value=date(2026, 1, 1)):
+            fixed = await usage_service.reconcile_booking_usage(db)
+
+        sql, params = db.statements[0]
+        self.assertEqual(fixed, 2)
+        self.assertIn("r.created_at >= :since_at", str(sql))
+        self.assertEqual(params["since"], date(2025, 12, 1))
+        self.assertEqual(params["since_at"], datetime(2025, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(params["excluded"], "cancelled")
+        self.assertEqual(db.commits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import inspect
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from fastapi import HTTPException
+
+from core.pagination import decode_cursor, encode_cursor, parse_datetime, parse_uuid
+from routes import catalog
+
+
+class _FakeResult:
+    def __init__(self, rows=(), scalar=0):
+        self._rows = rows
+        self._scalar = scalar
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def scalar(self):
+        return self._scalar
+
+
+class _FakeDb:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, stmt, params=None):
+        self.calls.append((str(stmt), dict(params or {})))
+        return _FakeResult()
+
+
+class CursorCodecTests(unittest.TestCase):
+    def test_round_trip_keeps_types(self):
+        created = datetime(2026, 10, 19, 8, 30, tzinfo=timezone.utc)
+        pid = uuid.uuid4()
+        cursor = encode_cursor([7, created, pid])
+        self.assertNotIn("=", cursor)
+        self.assertEqual(
+            decode_cursor(cursor, [int, parse_datetime, parse_uuid]),
+            [7, created, pid],
+        )
+
+    def test_missing_cursor_is_first_page(self):
+        self.assertIsNone(decode_cursor(None, [int]))
+        self.assertIsNone(decode_cursor("", [int]))
+
+    def test_malformed_cursor_is_400(self):
+        for bad in ("garbage", encode_cursor([1]), encode_cursor(["x", "y"])):
+            with self.assertRaises(HTTPException) as ctx:
+                decode_cursor(bad, [int, parse_uuid])
+            self.assertEqual(ctx.exception.status_code, 400)
+
+
+class CatalogListQueryTests(unittest.IsolatedAsyncioTestCase):
+    async def _list(self, **kwargs):
+        db = _FakeDb()
+        params = dict(city=None, age=None, category=None, q=None, sort="popular",
+                      limit=2, offset=0, cursor=None)
+        params.update(kwargs)
+        body = await inspect.unwrap(catalog.list_catalog)(request=None, db=db, **params)
+        return db.calls[0], db.calls[1], body
+
+    async def test_popular_sort_reads_materialised_counters(self):
+        (sql, _), _, body = await self._list()
+        self.assertIn("LEFT JOIN program_popularity pp", sql)
+        self.assertNotIn("GROUP BY", sql)
+        self.assertIn("COALESCE(pp.reservation_count, 0) DESC, p.created_at DESC, p.id DESC", sql)
+        self.assertIsNone(body["next_cursor"])
+
+    async def test_cursor_becomes_keyset_condition_but_not_total_filter(self):
+        created = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        pid = uuid.uuid4()
+        cursor = encode_cursor([created, pid])
+        (sql, params), (count_sql, count_params), _ = await self._list(sort="newest", cursor=cursor, offset=40)
+        self.assertIn("(p.created_at, p.id) < (:c0, :c1)", sql)
+        self.assertEqual((params["c0"], params["c1"], params["offset"]), (created, pid, 0))
+        self.assertNotIn(":c0", count_sql)
+        self.assertNotIn("c0", count_params)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import inspect
+import os
+import unittest
+import uuid
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from routes import catalog
+from routes.catalog import SEARCH_MAX_TERMS, _prefix_tsquery
+
+# The route without the rate limiter and response cache
+_list_catalog = inspect.unwrap(catalog.list_catalog)
+
+
+class _Result:
+    def scalar(self):
+        return 0
+
+    def fetchall(self):
+        return []
+
+
+class _FakeDb:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return _Result()
+
+
+class CatalogPrefixTsqueryTests(unittest.TestCase):
+    def test_words_become_prefix_terms(self):
+        self.assertEqual(_prefix_tsquery("Výtvarná  dílna"), "výtvarná:* & dílna:*")
+
+    def test_tsquery_operators_are_stripped(self):
+        self.assertEqual(_prefix_tsquery("grafika & !(x | y):*"), "grafika:* & x:* & y:*")
+        self.assertEqual(_prefix_tsquery("'; DROP TABLE programs; --"), "drop:* & table:* & programs:*")
+
+    def test_empty_or_symbol_only_input_has_no_query(self):
+        self.assertIsNone(_prefix_tsquery(None))
+        self.assertIsNone(_prefix_tsquery("   "))
+        self.assertIsNone(_prefix_tsquery("&|!__"))
+
+    def test_number_of_terms_is_capped(self):
+        query = _prefix_tsquery(" ".join(f"slovo{i}" for i in range(20)))
+        self.assertEqual(query.count(":*"), SEARCH_MAX_TERMS)
+
+
+class CatalogSearchQueryTests(unittest.IsolatedAsyncioTestCase):
+    async def test_free_text_filters_on_the_vector_and_ranks_by_relevance(self):
+        db = _FakeDb()
+        await _list_catalog(
+            request=None, db=db, city=None, age=None, category=None, q="Výtvarná dílna",
+            sort="popular", limit=20, offset=0, cursor=None,
+        )
+
+        sql, params = db.statements[0]
+        self.assertIn("p.search_vector @@ to_tsquery('public.cs_unaccent', :tsq)", sql)
+        self.assertIn("public.catalog_unaccent(:q) <% public.catalog_unaccent(p.name_cs)", sql)
+        self.assertIn("ts_rank(p.search_vector, to_tsquery('public.cs_unaccent', :tsq))", sql)
+        self.assertRegex(sql, r"ORDER BY \(\(ts_rank\(.*\)::real DESC, p\.created_at DESC, p\.id DESC")
+        self.assertEqual((params["tsq"], params["q"]), ("výtvarná:* & dílna:*", "Výtvarná dílna"))
+        # The total uses the same search filter
+        count_sql, count_params = db.statements[1]
+        self.assertIn("p.search_vector @@", count_sql)
+        self.assertEqual(count_params["tsq"], params["tsq"])
+
+    async def test_without_free_text_there_is_no_rank(self):
+        db = _FakeDb()
+        await _list_catalog(
+            request=None, db=db, city=None, age=None, category=None, q="  &| ",
+            sort="popular", limit=20, offset=0, cursor=None,
+        )
+        sql, params = db.statements[0]
+        self.assertNotIn("search_vector", sql)
+        self.assertIn("NULL::real AS search_rank", sql)
+        self.assertNotIn("tsq", params)
+
+
+@unittest.skipUnless(os.getenv("EXPLAIN_DATABASE_URL"), "EXPLAIN_DATABASE_URL points at a migrated database")
+class CatalogSearchDatabaseTests(unittest.IsolatedAsyncioTestCase):
+    """Run the catalog search against a real, migrated database (rolled back)."""
+
+    async def asyncSetUp(self):
+        from sqlalchemy import text
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+        url = os.environ["EXPLAIN_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://", 1)
+        self.engine = create_async_engine(url, connect_args={"statement_cache_size": 0})
+        self.conn = await self.engine.connect()
+        self.trans = await self.conn.begin()
+        self.db = AsyncSession(bind=self.conn)
+
+        self.token = f"zz{uuid.uuid4().hex[:10]}"
+        inst = uuid.uuid4()
+        await self.db.execute(text(
+            "INSERT INTO institutions (id, name, type, country, plan, programs_limit, bookings_monthly_limit,"
+            " created_at, updated_at) VALUES (:id, 'Galerie Test', 'gallery', 'CZ', 'free', 10, 100, now(), now())"
+        ), {"id": inst})
+        self.programs = {}
+        for key, name, description in (
+            ("name", f"Výtvarná dílna {self.token}", "Malujeme temperou."),
+            ("description", "Hudební odpoledne", f"Program {self.token} pro celou třídu."),
+            ("other", "Keramika", "Točíme na kruhu."),
+        ):
+            program = uuid.uuid4()
+            self.programs[key] = str(program)
+            await self.db.execute(text(
+                "INSERT INTO programs (id, institution_id, name_cs, description_cs, duration, age_group,"
+                " min_capacity, max_capacity, target_group, status, is_published, is_in_catalog,"
+                " created_at, updated_at)"
+                " VALUES (:id, :inst, :name, :description, 60, 'zs1', 1, 30, 'schools', 'active', TRUE, TRUE,"
+                " now(), now())"
+            ), {"id": program, "inst": inst, "name": name, "description": description})
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        await self.trans.rollback()
+        await self.conn.close()
+        await self.engine.dispose()
+
+    async def _search(self, q):
+        result = await _list_catalog(
+            request=None, db=self.db, city=None, age=None, category=None, q=q,
+            sort="popular", limit=20, offset=0, cursor=None,
+        )
+        return [item["id"] for item in result["items"]]
+
+    async def test_name_match_ranks_above_description_match(self):
+        self.assertEqual(await self._search(self.token), [self.programs["name"], self.programs["description"]])
+
+    async def test_accent_insensitive_prefix_terms_must_all_match(self):
+        self.assertEqual(await self._search(f"vytvar {self.token}"), [self.programs["name"]])
+        self.assertEqual(await self._search(f"keramika {self.token}"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
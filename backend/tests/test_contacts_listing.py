@@ -0,0 +1,119 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+
+from core.pagination import decode_cursor, parse_datetime, parse_uuid
+from routes import contacts as contacts_routes
+from services import contact_service
+
+INST = uuid.UUID("11111111-1111-4111-8111-111111111111")
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class _Result:
+    def __init__(self, rows=(), scalar=None, mapping=None):
+        self._rows, self._scalar, self._mapping = list(rows), scalar, mapping
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._scalar
+
+    def mappings(self):
+        return self
+
+    def one(self):
+        return self._mapping
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+
+def _contact(**extra):
+    values = dict(
+        id=uuid.uuid4(), first_name="Jana", last_name=None, email="jana@zs.cz", phone=None, type="pedagog",
+        primary_source=None, school_name=None, school_type=None, marketing_consent=True,
+        marketing_consent_at=None, note=None, created_at=datetime(2026, 9, 1, tzinfo=timezone.utc),
+        last_activity_at=None, deliverability_status="bounced_hard", deliverability_reason=None,
+        deliverability_updated_at=None,
+    )
+    values.update(extra)
+    return SimpleNamespace(**values)
+
+
+class ContactFacetTests(unittest.IsolatedAsyncioTestCase):
+    async def test_all_stats_come_from_one_filtered_aggregate(self):
+        counts = dict(total=9, with_consent=4, without_consent=3, unknown_consent=2,
+                      schools=5, public=1, undeliverable=2)
+        db = _FakeDb(_Result(mapping=counts))
+        stats = await contacts_routes.contacts_stats(db=db, current_user={"institution_id": str(INST)}, _guard=None)
+
+        self.assertEqual(stats.model_dump(), counts)
+        self.assertEqual(len(db.statements), 1)
+        sql = _sql(db.statements[0])
+        self.assertEqual(sql.count("FILTER (WHERE"), 6)
+        self.assertIn("contacts.deliverability_status IN", sql)
+
+
+class ContactListingTests(unittest.IsolatedAsyncioTestCase):
+    async def _list(self, db, **kwargs):
+        params = dict(type=None, source=None, consent=None, deliverability=None, search=None,
+                      limit=2, cursor=None)
+        params.update(kwargs)
+        return await contacts_routes.list_contacts(
+            db=db, current_user={"institution_id": str(INST)}, _guard=None, **params,
+        )
+
+    async def test_deliverability_is_filtered_in_sql_and_counted_with_a_cap(self):
+        active = _contact(last_activity_at=datetime(2026, 10, 1, tzinfo=timezone.utc))
+        never = _contact()
+        db = _FakeDb(_Result([active, never]), _Result(scalar=10001))
+        page = await self._list(db, deliverability="problem")
+
+        list_sql = _sql(db.statements[0])
+        self.assertIn("contacts.deliverability_status IN", list_sql)
+        self.assertIn("ORDER BY coalesce(contacts.last_activity_at, '1970-01-01 00:00:00+00'::timestamptz) DESC", list_sql)
+        self.assertIn("LIMIT", _sql(db.statements[1]))
+        self.assertEqual((page.total, page.total_exact), (contacts_routes.CONTACTS_COUNT_CAP, False))
+        self.assertEqual(
+            decode_cursor(page.next_cursor, (parse_datetime, parse_datetime, parse_uuid)),
+            [contact_service.NO_ACTIVITY, never.created_at, never.id],
+        )
+
+    async def test_next_page_continues_after_the_cursor_without_recounting(self):
+        first = await self._list(_FakeDb(_Result([_contact(), _contact()]), _Result(scalar=3)))
+        db = _FakeDb(_Result([_contact()]))
+        page = await self._list(db, cursor=first.next_cursor)
+
+        self.assertEqual(len(db.statements), 1)
+        self.assertIn(
+            "(coalesce(contacts.last_activity_at, '1970-01-01 00:00:00+00'::timestamptz), "
+            "contacts.created_at, contacts.id) < (",
+            _sql(db.statements[0]),
+        )
+        self.assertIsNone(page.next_cursor)
+        self.assertIsNone(page.total)
+
+
+if __name__ == "__main__":
+    unittest.main()
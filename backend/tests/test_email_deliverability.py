@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from services import email_deliverability as ed
+
+
+def _recipient(**overrides):
+    values = {
+        "email": " Skola@Example.cz ",
+        "contact_id": None,
+        "school_id": None,
+        "school_name": "ZŠ Komenského",
+        "contact_name": "Jana",
+        "status": "sent",
+        "delivery_status": "unknown",
+        "failure_reason": None,
+        "sent_at": datetime(2026, 10, 1, tzinfo=timezone.utc),
+        "delivery_event_at": None,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class RecipientOutcomeTests(unittest.TestCase):
+    def test_classification_matches_delivery_health_rules(self):
+        cases = [
+            (("sent", "unknown"), "successful"),
+            (("sent", "delivered"), "successful"),
+            (("sent", "opened"), "successful"),
+            (("sent", "bounced_hard"), "failed"),
+            (("sent", "complained"), "failed"),
+            (("sent", "bounced_soft"), None),
+            (("failed", "unknown"), "failed"),
+            (("pending", "unknown"), None),
+            (("skipped", "unknown"), None),
+        ]
+        for (status, delivery_status), expected in cases:
+            with self.subTest(status=status, delivery_status=delivery_status):
+                self.assertEqual(ed.recipient_outcome(status, delivery_status), expected)
+
+
+class OutcomeChangeTests(unittest.TestCase):
+    def test_new_send_counts_once_with_normalised_key(self):
+        change = ed.outcome_change("inst", _recipient(), None, new_send=True)
+        self.assertEqual(change["email_norm"], "skola@example.cz")
+        self.assertEqual((change["sends"], change["successful"], change["failed"]), (1, 1, 0))
+        self.assertEqual(change["last_status"], "sent")
+
+    def test_bounce_after_send_moves_success_to_failure(self):
+        recipient = _recipient(delivery_status="bounced_hard", failure_reason="Mailbox does not exist")
+        change = ed.outcome_change("inst", recipient, "successful", new_send=False)
+        self.assertEqual((change["sends"], change["successful"], change["failed"]), (0, -1, 1))
+        self.assertEqual(change["failure_status"], "bounced_hard")
+        self.assertEqual(change["failure_reason"], "Mailbox does not exist")
+
+    def test_unchanged_outcome_is_not_written(self):
+        recipient = _recipient(delivery_status="opened")
+        self.assertIsNone(ed.outcome_change("inst", recipient, "successful", new_send=False))
+        self.assertIsNone(ed.outcome_change("inst", _recipient(email="  "), None, new_send=True))
+
+
+class LedgerRowTests(unittest.TestCase):
+    def _row(self, failed, **overrides):
+        row = {
+            "email": "skola@example.cz", "school_name": "ZŠ", "contact_name": None,
+            "contact_id": None, "school_id": None, "total_sends": 4, "successful": 4 - failed,
+            "failed": failed, "last_status": "bounced_hard", "last_failure_status": "bounced_hard",
+            "last_failure_reason": None, "last_sent_at": None, "last_event_at": None,
+        }
+        row.update(overrides)
+        return row
+
+    def test_recommendation_thresholds_and_labels(self):
+        invalid = ed.ledger_row_to_stats(self._row(2))
+        warning = ed.ledger_row_to_stats(self._row(1, last_failure_reason="SMTP 550"))
+        self.assertEqual(invalid["recommendation"], "invalid")
+        self.assertEqual(invalid["failure_rate"], 50.0)
+        self.assertEqual(invalid["last_failure_reason"], "Nedoručeno")
+        self.assertEqual(warning["recommendation"], "warning")
+        self.assertEqual(warning["last_failure_reason"], "SMTP 550")
+        self.assertEqual(ed.ledger_row_to_stats(self._row(0, last_failure_status=None))["recommendation"], "ok")
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _FakeDb:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return _FakeResult(self.pages.pop(0) if self.pages else [])
+
+
+class ProblematicPageTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cursor_continues_after_last_failed_and_email(self):
+        db = _FakeDb([[]])
+        await ed.list_problematic(db, "inst", 50, [3, "b@x.cz"])
+        sql, params = db.statements[0]
+        self.assertIn("ORDER BY failed DESC, email_norm", sql)
+        self.assertIn("failed < :after_failed OR (failed = :after_failed AND email_norm > :after_email)", sql)
+        self.assertEqual((params["after_failed"], params["after_email"], params["limit"]), (3, "b@x.cz", 50))
+
+    async def test_contact_ids_are_read_in_keyset_batches(self):
+        full = [{"email_norm": f"{i}@x.cz", "contact_id": f"c{i}", "failed": 2} for i in range(ed.AUTO_FLAG_BATCH_SIZE)]
+        db = _FakeDb([full, [{"email_norm": "z@x.cz", "contact_id": "cz", "failed": 3}]])
+        ids = await ed.repeatedly_failing_contact_ids(db, "inst")
+        self.assertEqual(len(ids), ed.AUTO_FLAG_BATCH_SIZE + 1)
+        self.assertEqual(db.statements[1][1]["last_email"], full[-1]["email_norm"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import unittest
+import uuid
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects import postgresql
+
+from database import models
+from database.supabase_repositories import user_by_email
+
+INST = uuid.UUID("00000000-0000-0000-0000-000000000037")
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _index_expressions(table):
+    return {
+        index.name: [getattr(expr, "name", None) or str(expr) for expr in index.expressions]
+        for index in table.indexes
+    }
+
+
+class UserEmailLookupTests(unittest.TestCase):
+    def test_lookup_matches_the_lower_email_index(self):
+        sql = _sql(user_by_email("  Reditel@ZS-Alfa.cz "))
+        self.assertIn("lower(users.email) = 'reditel@zs-alfa.cz'", sql)
+        self.assertIn("ORDER BY users.email = 'Reditel@ZS-Alfa.cz' DESC", sql)
+        self.assertIn("LIMIT 1", sql)
+        self.assertEqual(_index_expressions(models.User.__table__)["idx_users_lower_email"], ["lower(email)"])
+
+
+class LowerEmailIndexTests(unittest.TestCase):
+    def test_models_declare_the_migrated_expression_indexes(self):
+        expected = {
+            models.School.__table__: ("idx_schools_inst_lower_email", ["institution_id", "lower(email)"]),
+            models.MarketingSubscription.__table__: (
+                "idx_marketing_subscription_inst_lower_email", ["institution_id", "lower(email)"],
+            ),
+            models.Reservation.__table__: (
+                "idx_reservations_lower_contact_email", ["lower(contact_email)", "created_at DESC"],
+            ),
+        }
+        for table, (name, expressions) in expected.items():
+            with self.subTest(index=name):
+                self.assertEqual(_index_expressions(table)[name], expressions)
+
+
+
+@unittest.skipUnless(os.getenv("EXPLAIN_DATABASE_URL"), "EXPLAIN_DATABASE_URL points at a migrated database")
+class LowerEmailPlanTests(unittest.IsolatedAsyncioTestCase):
+    """EXPLAIN the case-insensitive email lookups against a real, migrated database.
+
+    Each plan runs in a rolled-back transaction that first gives one institution
+    a few thousand rows and analyzes them; on an empty institution the planner
+    rightly prefers the plain institution_id indexes.
+    """
+
+    async def _seed(self, conn):
+        await conn.execute(
+            "INSERT INTO institutions (id, name, type, country, plan, programs_limit, bookings_monthly_limit,"
+            " created_at, updated_at) VALUES ($1, 'Galerie Test', 'gallery', 'CZ', 'free', 10, 100, now(), now())"
+            " ON CONFLICT (id) DO NOTHING",
+            INST,
+        )
+        await conn.execute(
+            "INSERT INTO schools (id, institution_id, name, email, created_at, updated_at)"
+            " SELECT gen_random_uuid(), $1, 'Škola ' || g, 'skola' || g || '@zs.cz', now(), now()"
+            " FROM generate_series(1, 3000) AS g",
+            INST,
+        )
+        for table in ("contacts", "marketing_subscriptions"):
+            await conn.execute(
+                f"INSERT INTO {table} (institution_id, email)"
+                " SELECT $1, 'ucitel' || g || '@zs.cz' FROM generate_series(1, 3000) AS g",
+                INST,
+            )
+        await conn.execute("ANALYZE schools, contacts, marketing_subscriptions")
+
+    async def _plan(self, statement) -> str:
+        import asyncpg
+
+        conn = await asyncpg.connect(os.environ["EXPLAIN_DATABASE_URL"], statement_cache_size=0)
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            await self._seed(conn)
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            rows = await conn.fetch("EXPLAIN " + _sql(statement))
+        finally:
+            await transaction.rollback()
+            await conn.close()
+        return "\n".join(row[0] for row in rows)
+
+    async def test_user_lookup_uses_the_lower_email_index(self):
+        plan = await self._plan(user_by_email("Reditel@ZS-Alfa.cz"))
+        self.assertIn("idx_users_lower_email", plan)
+
+    async def test_legacy_school_email_lookup_uses_the_index(self):
+        plan = await self._plan(select(models.School).where(and_(
+            models.School.institution_id == INST,
+            func.lower(models.School.email) == "skola17@zs.cz",
+        )).limit(1))
+        self.assertIn("idx_schools_inst_lower_email", plan)
+
+    async def test_contact_dedup_lookup_uses_the_index(self):
+        plan = await self._plan(select(models.Contact).where(and_(
+            models.Contact.institution_id == INST,
+            func.lower(models.Contact.email) == "ucitel17@zs.cz",
+        )))
+        self.assertIn("idx_contacts_inst_lower_email", plan)
+
+    async def test_marketing_subscription_lookup_uses_the_index(self):
+        plan = await self._plan(select(models.MarketingSubscription).where(and_(
+            models.MarketingSubscription.institution_id == INST,
+            func.lower(models.MarketingSubscription.email) == "ucitel17@zs.cz",
+        )))
+        self.assertIn("idx_marketing_subscription_inst_lower_email", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
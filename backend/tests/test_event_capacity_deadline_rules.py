@@ -2,11 +2,9 @@ import asyncio
 import os
 import sys
 import unittest
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import patch
 
 os.environ.setdefault("JWT_SECRET", "test-secret-for-event-rule-tests")
 
@@ -15,59 +13,7 @@ if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
 from routes import events
-
-
-class Column:
-    def __init__(self, name):
-        self.name = name
-
-    def __eq__(self, other):
-        return ("eq", self.name, other)
-
-    def is_(self, other):
-        return ("is", self.name, other)
-
-    def in_(self, values):
-        return ("in", self.name, tuple(values))
-
-
-class FakeEventDateModel:
-    id = Column("event_dates.id")
-
-
-class FakeEventApplicationModel:
-    id = Column("event_applications.id")
-    event_id = Column("event_applications.event_id")
-    event_date_id = Column("event_applications.event_date_id")
-    status = Column("event_applications.status")
-
-
-class FakeFunc:
-    @staticmethod
-    def count(value):
-        return ("count", value)
-
-
-@dataclass
-class Query:
-    kind: object
-    condition: object = None
-
-    def where(self, condition):
-        self.condition = condition
-        return self
-
-
-def fake_select(kind):
-    return Query(kind)
-
-
-def fake_and_(*conditions):
-    return ("and", conditions)
-
-
-def fake_text(sql):
-    return ("text", sql)
+from services import event_seats
 
 
 class Result:
@@ -77,7 +23,10 @@ class Result:
     def scalar_one_or_none(self):
         return self.value
 
-    def scalar(self):
+    def scalar_one(self):
+        return self.value
+
+    def one(self):
         return self.value
 
 
@@ -87,7 +36,7 @@ class FakeDB:
         self.queries = []
 
     async def execute(self, query, params=None):
-        self.queries.append((query, params))
+        self.queries.append((" ".join(str(query).split()), params))
         if self.responses:
             return Result(self.responses.pop(0))
         return Result(None)
@@ -98,48 +47,63 @@ def run(coro):
 
 
 class EventCapacityAndDeadlineTests(unittest.TestCase):
-    def patch_events(self):
-        return patch.multiple(
-            events,
-            EventDate=FakeEventDateModel,
-            EventApplication=FakeEventApplicationModel,
-            select=fake_select,
-            and_=fake_and_,
-            func=FakeFunc,
-            text=fake_text,
-        )
-
-    def test_unlimited_capacity_stays_pending_without_lock(self):
-        event = SimpleNamespace(id="event-1", capacity=None)
-        db = FakeDB([])
+    def test_free_date_seat_is_claimed_in_one_conditional_update(self):
+        event = SimpleNamespace(id="event-1", capacity=1)
+        db = FakeDB([3])
 
-        with self.patch_events():
-            status = run(events._resolve_application_status(db, event, None))
+        status = run(events._resolve_application_status(db, event, "date-1"))
 
         self.assertEqual(status, "pending")
-        self.assertEqual(db.queries, [])
+        self.assertEqual(len(db.queries), 1)
+        sql, params = db.queries[0]
+        self.assertIn("UPDATE event_dates ed SET seats_taken = ed.seats_taken + 1", sql)
+        self.assertIn("ed.seats_taken < COALESCE(ed.capacity_override, e.capacity)", sql)
+        self.assertIn("RETURNING", sql)
+        self.assertEqual(params, {"date_id": "date-1"})
 
     def test_full_capacity_goes_to_waitlist(self):
         event = SimpleNamespace(id="event-1", capacity=1)
-        db = FakeDB([None, 1])
+        db = FakeDB([None])
 
-        with self.patch_events():
-            status = run(events._resolve_application_status(db, event, None))
+        status = run(events._resolve_application_status(db, event, None))
 
         self.assertEqual(status, "waitlist")
-        self.assertEqual(db.queries[0][0][0], "text")
-        self.assertEqual(db.queries[1][0].kind[0], "count")
-
-    def test_available_date_override_capacity_stays_pending(self):
-        event = SimpleNamespace(id="event-1", capacity=1)
-        event_date = SimpleNamespace(capacity_override=2)
-        db = FakeDB([event_date, None, 1])
-
-        with self.patch_events():
-            status = run(events._resolve_application_status(db, event, "date-1"))
+        sql, params = db.queries[0]
+        self.assertIn("UPDATE events SET seats_taken = seats_taken + 1", sql)
+        self.assertEqual(params, {"event_id": "event-1"})
+
+    def test_unlimited_capacity_always_gets_a_seat(self):
+        # Capacity <= 0 / None (event or date override) never blocks the claim.
+        self.assertIn("COALESCE(capacity, 0) <= 0 OR", " ".join(str(event_seats._CLAIM_EVENT_SEAT).split()))
+        self.assertIn(
+            "COALESCE(ed.capacity_override, e.capacity, 0) <= 0 OR",
+            " ".join(str(event_seats._CLAIM_DATE_SEAT).split()),
+        )
 
-        self.assertEqual(status, "pending")
-        self.assertEqual(db.queries[0][0].kind, FakeEventDateModel)
+    def test_variable_symbol_comes_from_the_sequence(self):
+        db = FakeDB([(100000042, "key", 100000000)])
+
+        vs = run(event_seats.next_variable_symbol(db))
+        self.assertEqual(vs, str(event_seats.scramble_variable_symbol(100000042, "key", 100000000)))
+        self.assertEqual(len(vs), 9)
+        self.assertIn("nextval('event_application_vs_seq')", db.queries[0][0])
+        self.assertIn("FROM event_application_vs_key", db.queries[0][0])
+
+    def test_consecutive_applications_do_not_get_adjacent_symbols(self):
+        issued_below = 100000500
+        values = range(issued_below, issued_below + 2000)
+        symbols = [event_seats.scramble_variable_symbol(v, "secret-key", issued_below) for v in values]
+
+        self.assertEqual(len(set(symbols)), len(symbols))
+        self.assertTrue(all(issued_below <= s <= 999_999_999 for s in symbols))
+        self.assertFalse(any(abs(a - b) <= 1 for a, b in zip(symbols, symbols[1:])))
+        self.assertNotEqual(symbols[0], event_seats.scramble_variable_symbol(issued_below, "other-key", issued_below))
+
+    def test_variable_symbol_permutation_is_a_bijection(self):
+        # 30000² values, split into halves; spot-check that the Feistel rounds
+        # do not fold two inputs together across a whole block of rows.
+        values = range(100_000_000, 100_000_000 + 3 * 30_000)
+        self.assertEqual(len({event_seats._permute(v, "k") for v in values}), len(values))
 
     def test_only_real_seat_statuses_occupy_capacity(self):
         self.assertEqual(events.OCCUPYING_STATUSES, ("pending", "approved"))
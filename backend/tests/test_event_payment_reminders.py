@@ -0,0 +1,100 @@
+import asyncio
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+
+import scheduler
+
+
+class _FakeDb:
+    def __init__(self):
+        self.statements = []
+        self.log = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        self.log.append("execute")
+
+    async def commit(self):
+        self.log.append("commit")
+
+
+def _row(event_date_id, email="rodic@example.cz", name="Petr <Novák>", vs="2026001", method="qr", amount=1500):
+    return SimpleNamespace(
+        id=uuid.uuid4(), event_date_id=event_date_id, applicant_email=email, applicant_name=name,
+        total_amount=amount, variable_symbol=vs, payment_method=method,
+        start_datetime=datetime(2026, 10, 22, 9, 0, tzinfo=timezone.utc), event_name="Podzimní tábor",
+        institution_name="Muzeum", institution_email="info@muzeum.cz",
+        account_number="123456789", bank_code="0100", account_name="Muzeum",
+    )
+
+
+class EventPaymentReminderTests(unittest.IsolatedAsyncioTestCase):
+    async def test_template_rendered_once_per_event_date_and_filled_per_application(self):
+        date_id = uuid.uuid4()
+        rows = [_row(date_id), _row(date_id, name="Eva", vs="2026002"), _row(date_id, email="neplatny")]
+        send = AsyncMock(return_value={"status": "sent"})
+        db = _FakeDb()
+        now = datetime.now(timezone.utc)
+
+        with patch.object(scheduler.EmailService, "send_email", send), \
+                patch.object(scheduler, "render_event_payment_template",
+                             wraps=scheduler.render_event_payment_template) as render:
+            sent = await scheduler.send_event_payment_reminders(db, rows, now)
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(render.call_count, 1)
+        first, second = (call.kwargs for call in send.await_args_list)
+        self.assertIn("Petr &lt;Novák&gt;", first["html_content"])
+        self.assertIn("Variabilní symbol: 2026001", first["text_content"])
+        self.assertIn("2026002", second["html_content"])
+        self.assertNotIn("[[", second["html_content"] + second["text_content"])
+        self.assertEqual(first["reply_to"], "info@muzeum.cz")
+        self.assertEqual(db.log, ["execute", "commit"])
+        compiled = db.statements[0].compile(dialect=postgresql.dialect())
+        self.assertIn("UPDATE event_applications SET payment_reminder_sent_at", str(compiled))
+        self.assertEqual(compiled.params["id_1"], [rows[0].id, rows[1].id])
+
+    async def test_sends_are_bounded_and_committed_per_chunk(self):
+        rows = [_row(uuid.uuid4()) for _ in range(5)]
+        running = peak = 0
+
+        async def send_email(**message):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return {"status": "sent"} if message["subject"] else {"status": "failed"}
+
+        db = _FakeDb()
+        with patch.object(scheduler, "EVENT_REMINDER_CONCURRENCY", 2), \
+                patch.object(scheduler, "EVENT_REMINDER_CHUNK", 2), \
+                patch.object(scheduler.EmailService, "send_email", AsyncMock(side_effect=send_email)):
+            sent = await scheduler.send_event_payment_reminders(db, rows, datetime.now(timezone.utc))
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(peak, 2)
+        self.assertEqual(db.log, ["execute", "commit"] * 3)
+
+    async def test_failed_sends_are_not_marked(self):
+        rows = [_row(uuid.uuid4()), _row(uuid.uuid4())]
+        send = AsyncMock(side_effect=[{"status": "failed", "error": "boom"}, RuntimeError("down")])
+        db = _FakeDb()
+
+        with patch.object(scheduler.EmailService, "send_email", send):
+            sent = await scheduler.send_event_payment_reminders(db, rows, datetime.now(timezone.utc))
+
+        self.assertEqual(sent, 0)
+        self.assertEqual(db.log, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
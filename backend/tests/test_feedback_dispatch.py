@@ -0,0 +1,98 @@
+import os
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+
+import scheduler
+from database.models import Feedback
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class _Result:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.log = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        self.log.append("execute")
+        return self.results.pop(0) if self.results else _Result()
+
+    async def commit(self):
+        self.log.append("commit")
+
+
+def _reservation(email="ucitel@zs.cz"):
+    return SimpleNamespace(
+        id=uuid.uuid4(), institution_id=uuid.uuid4(), program_id=uuid.uuid4(), date="2026-10-16",
+        contact_email=email, contact_name="Jana Učitelová",
+    )
+
+
+def _row(email="ucitel@zs.cz"):
+    feedback = SimpleNamespace(id=uuid.uuid4(), token=f"tok-{uuid.uuid4().hex[:8]}")
+    return feedback, _reservation(email), "Muzeum", "Dílna"
+
+
+class FeedbackDispatchTests(unittest.IsolatedAsyncioTestCase):
+    async def test_claim_inserts_all_rows_in_one_idempotent_statement_and_commits(self):
+        reservations = [_reservation(), _reservation()]
+        db = _FakeDb(_Result([(uuid.uuid4(),)]))
+
+        self.assertEqual(await scheduler.claim_feedback_requests(db, reservations), 1)
+
+        self.assertEqual(db.log, ["execute", "commit"])
+        sql = _sql(db.statements[0])
+        self.assertIn("INSERT INTO feedbacks", sql)
+        self.assertIn("ON CONFLICT (reservation_id) DO NOTHING", sql)
+        self.assertEqual(await scheduler.claim_feedback_requests(_FakeDb(), []), 0)
+
+    async def test_emails_go_out_in_batches_with_a_commit_per_chunk(self):
+        rows = [_row() for _ in range(5)] + [_row(email="neplatny-email")]
+        batch = AsyncMock(side_effect=lambda messages: [{"status": "sent"} for _ in messages])
+        db = _FakeDb()
+
+        with patch.object(scheduler, "FEEDBACK_SEND_CHUNK", 2), \
+                patch.object(scheduler.EmailService, "send_batch", batch):
+            sent = await scheduler.dispatch_feedback_emails(db, rows, "feedback_request", Feedback.email_sent_at)
+
+        self.assertEqual(sent, 5)
+        self.assertEqual([len(call.args[0]) for call in batch.await_args_list], [2, 2, 1])
+        self.assertEqual(db.log, ["execute", "commit"] * 3)
+        self.assertIn("UPDATE feedbacks SET email_sent_at", _sql(db.statements[0]))
+        message = batch.await_args_list[0].args[0][0]
+        self.assertIn(f"/feedback/{rows[0][0].token}", message["html_content"])
+        self.assertFalse(message["add_gdpr_footer"])
+
+    async def test_failed_sends_are_not_marked(self):
+        rows = [_row(), _row()]
+        batch = AsyncMock(return_value=[{"status": "sent"}, {"status": "failed", "error": "boom"}])
+        db = _FakeDb()
+
+        with patch.object(scheduler.EmailService, "send_batch", batch):
+            sent = await scheduler.dispatch_feedback_emails(db, rows, "feedback_reminder", Feedback.reminder_sent_at)
+
+        self.assertEqual(sent, 1)
+        params = db.statements[0].compile(dialect=postgresql.dialect()).params
+        self.assertEqual(params["id_1"], [rows[0][0].id])
+
+
+if __name__ == "__main__":
+    unittest.main()
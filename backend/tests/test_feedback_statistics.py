@@ -0,0 +1,145 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from database.models import Feedback, FeedbackProgramStats
+from routes import feedback as feedback_routes
+from services import feedback_stats
+from services.pdf.pdf_renderer import _feedback_summary_line
+
+INST = "11111111-1111-4111-8111-111111111111"
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0) if self.results else _Result([])
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _row(rating_grouped, program_grouped, responses, *, rating=None, program_id=None, name=None,
+         avg=None, recommended=0, answered=0):
+    return SimpleNamespace(
+        rating_grouped=rating_grouped, program_grouped=program_grouped, overall_rating=rating,
+        program_id=program_id, name_cs=name, responses=responses, avg_rating=avg,
+        recommended=recommended, recommend_answered=answered,
+    )
+
+
+class FeedbackStatisticsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_all_figures_come_from_one_grouping_sets_scan(self):
+        program = uuid.uuid4()
+        db = _FakeDb(_Result([
+            _row(1, 1, 6, avg=4.166, recommended=4, answered=5),
+            _row(0, 1, 4, rating=5),
+            _row(0, 1, 1, rating=3),
+            _row(0, 1, 1, rating=None),
+            _row(1, 0, 5, program_id=program, name="Dílna", avg=4.4),
+            _row(1, 0, 1, program_id=None),
+        ]))
+
+        stats = await feedback_routes.get_feedback_statistics(
+            program_id=str(program), date_from="2026-01-01", date_to=None, db=db,
+            current_user={"institution_id": INST, "role": "admin"},
+        )
+
+        self.assertEqual(len(db.statements), 1)
+        sql = _sql(db.statements[0])
+        self.assertIn("GROUPING SETS((), (feedbacks.overall_rating), (feedbacks.program_id, programs.name_cs))", sql)
+        self.assertIn("FILTER (WHERE feedbacks.would_recommend = true)", sql)
+        self.assertIn("feedbacks.program_id =", sql)
+        self.assertIn("reservations.date >=", sql)
+        self.assertEqual(stats.total_feedbacks, 6)
+        self.assertEqual(stats.average_rating, 4.17)
+        self.assertEqual(stats.recommendation_rate, 80.0)
+        self.assertEqual(stats.by_rating, {1: 0, 2: 0, 3: 1, 4: 0, 5: 4})
+        self.assertEqual(stats.by_program, [{"program_name": "Dílna", "count": 5, "avg_rating": 4.4}])
+
+
+class FeedbackProgramStatsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_submitted_response_is_added_to_its_program_aggregate(self):
+        feedback = Feedback(
+            institution_id=uuid.UUID(INST), program_id=uuid.uuid4(), overall_rating=4,
+            would_recommend=False, submitted_at=datetime.now(timezone.utc),
+        )
+        db = _FakeDb()
+        await feedback_stats.record_feedback_response(db, feedback)
+
+        statement = db.statements[0]
+        sql = _sql(statement)
+        self.assertIn("INSERT INTO feedback_program_stats", sql)
+        self.assertIn("ON CONFLICT (program_id) DO UPDATE SET responses = (feedback_program_stats.responses + excluded.responses)", sql)
+        params = statement.compile(dialect=postgresql.dialect()).params
+        self.assertEqual(
+            (params["responses"], params["rating_sum"], params["rating_4"], params["rating_5"],
+             params["recommend_yes"], params["recommend_answered"]),
+            (1, 4, 1, 0, 0, 1),
+        )
+
+    async def test_feedback_without_program_is_not_aggregated(self):
+        db = _FakeDb()
+        await feedback_stats.record_feedback_response(db, Feedback(institution_id=uuid.UUID(INST), overall_rating=5))
+        self.assertEqual(db.statements, [])
+
+    async def test_public_submit_counts_a_response_once(self):
+        feedback = Feedback(
+            institution_id=uuid.UUID(INST), program_id=uuid.uuid4(), token="tok", status="pending",
+        )
+        submission = feedback_routes.FeedbackSubmission(overall_rating=5, would_recommend=True)
+        db = _FakeDb(_Result([feedback]))
+        await feedback_routes.submit_public_feedback("tok", submission, db=db)
+
+        self.assertIn("FOR UPDATE", _sql(db.statements[0]))
+        self.assertIn("INSERT INTO feedback_program_stats", _sql(db.statements[1]))
+        self.assertEqual((feedback.status, db.commits), ("submitted", 1))
+
+        again = _FakeDb(_Result([feedback]))
+        with self.assertRaises(HTTPException) as ctx:
+            await feedback_routes.submit_public_feedback("tok", submission, db=again)
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual((len(again.statements), again.commits), (1, 0))
+
+    def test_report_summary_reads_the_aggregate(self):
+        stats = FeedbackProgramStats(
+            responses=4, rating_count=3, rating_sum=13, rating_1=0, rating_2=0, rating_3=0, rating_4=2,
+            rating_5=1, recommend_yes=3, recommend_answered=4,
+        )
+        summary = feedback_stats.summarize(stats)
+        self.assertEqual(summary["average_rating"], 4.33)
+        self.assertEqual(summary["recommendation_rate"], 75.0)
+        self.assertEqual(summary["by_rating"][4], 2)
+        self.assertEqual(_feedback_summary_line(summary), "Průměrné hodnocení 4,3 / 5 · doporučuje 75 % (odpovědí: 4)")
+        self.assertIsNone(_feedback_summary_line(feedback_stats.summarize(None)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import unittest
+import uuid
+from types import SimpleNamespace
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from core.response_cache import invalidate_public_cache
+from core.security import get_current_user
+from database.models import Institution
+from database.supabase import get_db
+from services import feature_flags, institution_context
+from services.plan_service import require_feature
+
+INST = "11111111-1111-4111-8111-111111111111"
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+
+class _FakeDb:
+    """Answers institution lookups with one row and flag loads with ``flags``."""
+
+    def __init__(self, plan="pro", flags=()):
+        self.plan = plan
+        self.flags = list(flags)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        if "FROM feature_flags" in self.statements[-1]:
+            return _Result(self.flags)
+        return _Result([Institution(id=uuid.UUID(INST), name="Muzeum", type="museum",
+                                    plan=self.plan, plan_status="active")])
+
+
+class InstitutionContextTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        institution_context._institutions.drop()
+        institution_context._flags.drop()
+
+    async def test_institution_is_cached_until_its_tag_is_invalidated(self):
+        db = _FakeDb()
+        first = await institution_context.load_institution(db, INST)
+        await institution_context.load_institution(db, INST)
+        self.assertEqual((first["plan"], len(db.statements)), ("pro", 1))
+
+        await invalidate_public_cache(None, "institution:other")
+        await institution_context.load_institution(db, INST)
+        self.assertEqual(len(db.statements), 1)
+
+        await invalidate_public_cache(None, f"institution:{INST}")
+        await institution_context.load_institution(db, INST)
+        self.assertEqual(len(db.statements), 2)
+
+    async def test_invalidation_during_a_load_discards_its_result(self):
+        db = _FakeDb()
+        epoch = institution_context._institutions.begin()
+        institution_context._institutions.drop(INST)
+        institution_context._institutions.store(INST, {"plan": "free"}, epoch)
+        await institution_context.load_institution(db, INST)
+        self.assertEqual(len(db.statements), 1)
+
+    async def test_flags_load_once_for_every_key_and_reload_after_an_update(self):
+        db = _FakeDb(flags=[
+            SimpleNamespace(key="events_module", enabled=False, allowed_institution_ids=[INST]),
+            SimpleNamespace(key="contacts_module", enabled=True, allowed_institution_ids=None),
+        ])
+        self.assertTrue(await feature_flags.is_feature_enabled(db, "events_module", INST))
+        self.assertFalse(await feature_flags.is_feature_enabled(db, "events_module", "someone-else"))
+        self.assertTrue(await feature_flags.is_feature_enabled(db, "contacts_module", INST))
+        self.assertFalse(await feature_flags.is_feature_enabled(db, "missing", INST))
+        self.assertEqual(len(db.statements), 1)
+
+        db.flags = []
+        await invalidate_public_cache(None, institution_context.FEATURE_FLAGS_TAG)
+        self.assertFalse(await feature_flags.is_feature_enabled(db, "contacts_module", INST))
+        self.assertEqual(len(db.statements), 2)
+
+
+class RequireFeatureTests(unittest.TestCase):
+    def setUp(self):
+        institution_context._institutions.drop()
+        self.db = _FakeDb(plan="start")
+        app = FastAPI()
+
+        @app.get("/gated")
+        async def gated(
+            inst: dict = Depends(institution_context.institution_context),
+            _guard=Depends(require_feature("basic_stats")),
+        ):
+            return {"plan": inst["plan"]}
+
+        @app.get("/pro-only", dependencies=[Depends(require_feature("mailing"))])
+        async def pro_only():
+            return {}
+
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_current_user] = lambda: {"institution_id": INST}
+        self.client = TestClient(app)
+
+    def test_guard_and_handler_share_one_lookup_per_request(self):
+        self.assertEqual(self.client.get("/gated").json(), {"plan": "start"})
+        self.assertEqual(len(self.db.statements), 1)
+        self.client.get("/gated")
+        self.assertEqual(len(self.db.statements), 1)
+
+    def test_missing_feature_is_still_rejected(self):
+        response = self.client.get("/pro-only")
+        self.assertEqual(response.status_code, 403)
+        self.assertIn("PRO", response.json()["detail"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import itertools
+import json
+import unittest
+import uuid
+from types import SimpleNamespace
+
+from services import mailing_service
+from services.mailing_service import TARGET_GROUP_TO_SCHOOL_TAGS, compute_relevance
+
+
+def _reference_relevance(program_target_groups, school_tags):
+    """The original per-pair implementation, kept as the oracle."""
+    if not program_target_groups:
+        return []
+    if "all" in program_target_groups:
+        return ["all"]
+    if not school_tags:
+        return []
+    matched = []
+    school_tags_upper = [t.upper() for t in school_tags]
+    for tg in program_target_groups:
+        for et in TARGET_GROUP_TO_SCHOOL_TAGS.get(tg, []):
+            if et.upper() in school_tags_upper and tg not in matched:
+                matched.append(tg)
+    return matched
+
+
+TAG_SETS = [[], ["ZŠ"], ["zš", "1. stupeň"], ["MŠ"], ["SŠ", "Gymnázium"], ["gymnázium"], ["DDM"], ["MŠ", "ZŠ"]]
+GROUP_SETS = [[], ["all"], ["adults"], ["ms_3_6"], ["zs1_7_12", "zs2_12_15"], ["ss_14_18", "gym_14_18"],
+              ["unknown"], ["zs2_12_15", "ms_3_6", "adults"]]
+
+
+class RelevanceMaskTests(unittest.TestCase):
+    def test_bitmask_relevance_matches_the_per_pair_rules(self):
+        for groups, tags in itertools.product(GROUP_SETS, TAG_SETS):
+            with self.subTest(groups=groups, tags=tags):
+                self.assertEqual(compute_relevance(groups, tags), _reference_relevance(groups, tags))
+
+    def test_matrix_evaluates_all_programs_per_distinct_tag_set(self):
+        programs = [SimpleNamespace(id=f"p{i}", target_groups=groups) for i, groups in enumerate(GROUP_SETS)]
+        matrix = mailing_service._RelevanceMatrix(programs)
+        for tags in TAG_SETS:
+            program_ids, segments = matrix.match(tags)
+            expected = [(p.id, compute_relevance(p.target_groups, tags)) for p in programs]
+            self.assertEqual(program_ids, [pid for pid, match in expected if match])
+            self.assertEqual(
+                sorted(segments),
+                sorted({segment for _, match in expected for segment in match}),
+            )
+        self.assertEqual(len(matrix._by_mask), 5)  # ZŠ variants, MŠ, SŠ/Gymnázium, MŠ+ZŠ, none
+
+
+class _FakeDb:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+
+
+class InsertRecipientsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_recipients_and_program_snapshots_go_out_in_one_statement(self):
+        school = str(uuid.uuid4())
+        recipients = [
+            {"school_id": school, "contact_id": None, "email": "a@zs.cz", "school_name": "ZŠ",
+             "contact_name": "A", "matched_segments": ["zs1_7_12"], "relevant_program_ids": ["p1", "p2"]},
+            {"school_id": school, "contact_id": str(uuid.uuid4()), "email": "b@zs.cz", "school_name": "ZŠ",
+             "contact_name": "B", "matched_segments": ["manual"]},
+        ]
+        db = _FakeDb()
+        await mailing_service.insert_campaign_recipients(db, "c1", "relevant_plus_manual", recipients, ["p1", "p2", "p3"])
+
+        self.assertEqual(len(db.statements), 1)
+        sql, params = db.statements[0]
+        self.assertIn("INSERT INTO mailing_campaign_recipients", sql)
+        self.assertIn("INSERT INTO mailing_recipient_programs", sql)
+        self.assertEqual(params["emails"], ["a@zs.cz", "b@zs.cz"])
+        self.assertEqual(params["program_ids"], ["p1,p2", "p1,p2,p3"])
+        self.assertEqual(json.loads(params["reasons"][1]), {
+            "selection_mode": "relevant_plus_manual", "matched_segments": ["manual"], "manual_override": True,
+        })
+        self.assertEqual(len({len(v) for k, v in params.items() if k != "campaign_id"}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from limits.storage import storage_from_string
+from slowapi.errors import RateLimitExceeded
+from starlette.requests import Request
+
+import scheduler
+from core import rate_limit
+from core.rate_limit import PostgresStorage
+from routes import auth, bookings, catalog, programs, public
+
+
+class _FakeLockSession:
+    def __init__(self, acquired, heartbeats_before_loss=0):
+        self.acquired = acquired
+        self.heartbeats_left = heartbeats_before_loss
+        self.closed = False
+
+    async def fetchval(self, query, *args):
+        if "pg_try_advisory_lock" in query:
+            return self.acquired
+        if self.heartbeats_left <= 0:
+            raise ConnectionError("session lost")
+        self.heartbeats_left -= 1
+        return 1
+
+    async def close(self):
+        self.closed = True
+
+
+class SharedRateLimitTests(unittest.TestCase):
+    def test_all_routers_share_one_limiter(self):
+        self.assertIs(auth.limiter, rate_limit.limiter)
+        self.assertIs(public.limiter, rate_limit.limiter)
+        self.assertIs(catalog.limiter, rate_limit.limiter)
+        self.assertIs(bookings._booking_limiter, rate_limit.limiter)
+        self.assertIs(programs._pub_limiter, rate_limit.limiter)
+
+    def test_postgres_uri_resolves_to_lazy_postgres_storage(self):
+        storage = storage_from_string("postgresql://user:pw@db.invalid:5432/app")
+        self.assertIsInstance(storage, PostgresStorage)
+        self.assertIsNone(storage._pool)
+
+    def test_only_postgres_storage_is_offloaded(self):
+        self.assertTrue(rate_limit.uses_blocking_storage("postgresql://user:pw@db.invalid:5432/app"))
+        self.assertFalse(rate_limit.uses_blocking_storage("memory://"))
+
+
+class OffloadedRateLimitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_prefill_throttle_uses_shared_storage(self):
+        ip = "203.0.113.77"
+        results = [await public._prefill_check_rate(ip) for _ in range(public.PREFILL_MAX_PER_WINDOW + 1)]
+        self.assertTrue(all(results[:-1]))
+        self.assertFalse(results[-1])
+        self.assertTrue(await public._prefill_check_rate("203.0.113.78"))
+
+    async def test_async_endpoint_limits_are_checked_off_the_event_loop(self):
+        limiter = rate_limit.OffloadingLimiter(key_func=lambda request: "k", storage_uri="memory://", offload=True)
+        check_threads = []
+        check = limiter._check_request_limit
+
+        def recording_check(*args):
+            check_threads.append(threading.current_thread().name)
+            return check(*args)
+
+        limiter._check_request_limit = recording_check
+
+        @limiter.limit("2/minute")
+        async def endpoint(request: Request):
+            return {"ok": True}
+
+        def request():
+            return Request({"type": "http", "method": "GET", "path": "/x", "headers": [], "query_string": b""})
+
+        self.assertEqual(await endpoint(request=request()), {"ok": True})
+        await endpoint(request=request())
+        with self.assertRaises(RateLimitExceeded):
+            await endpoint(request=request())
+        self.assertEqual(len(check_threads), 3)
+        self.assertTrue(all(name.startswith("rate-limit") for name in check_threads))
+
+
+class SchedulerModeTests(unittest.TestCase):
+    def test_mode_resolution(self):
+        self.assertEqual(scheduler.resolve_scheduler_mode(None), "embedded")
+        self.assertEqual(scheduler.resolve_scheduler_mode(" Leader "), "leader")
+        self.assertEqual(scheduler.resolve_scheduler_mode("off"), "off")
+        self.assertEqual(scheduler.resolve_scheduler_mode("both"), "embedded")
+
+    def test_lock_key_fits_bigint(self):
+        self.assertLess(scheduler.LEADER_LOCK_KEY, 2 ** 63)
+
+    def test_leader_lock_needs_a_session_connection(self):
+        direct = "postgresql://postgres:pw@db.testproject.supabase.co:5432/postgres"
+        session_pooler = "postgresql://postgres.testproject:pw@aws-1-eu-west-1.pooler.supabase.com:5432/postgres"
+        transaction_pooler = "postgresql://postgres.testproject:pw@aws-1-eu-west-1.pooler.supabase.com:6543/postgres"
+        self.assertEqual(scheduler.leader_lock_dsn(direct), direct)
+        self.assertEqual(scheduler.leader_lock_dsn(session_pooler), session_pooler)
+        self.assertIsNone(scheduler.leader_lock_dsn(transaction_pooler))
+        self.assertIsNone(scheduler.leader_lock_dsn(""))
+
+    def test_leader_mode_without_lock_url_runs_no_jobs(self):
+        env = {"SCHEDULER_MODE": "leader", "DATABASE_URL": "postgresql://u:pw@pooler.invalid:6543/app"}
+        with patch.dict(os.environ, env), patch.dict(os.environ, {"SCHEDULER_LOCK_DATABASE_URL": ""}), \
+                patch.object(scheduler, "start_scheduler") as start, \
+                self.assertLogs(scheduler.logger, "ERROR"):
+            scheduler.start_scheduler_for_process()
+        start.assert_not_called()
+        self.assertIsNone(scheduler._leader_task)
+
+
+class LeaderElectionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_standby_then_leader_then_demoted_on_session_loss(self):
+        sessions = [
+            _FakeLockSession(acquired=False),
+            _FakeLockSession(acquired=True, heartbeats_before_loss=1),
+        ]
+        events = []
+        elected_twice = asyncio.Event()
+
+        async def connect():
+            if not sessions:
+                elected_twice.set()
+                await asyncio.Event().wait()
+            return sessions.pop(0)
+
+        task = asyncio.create_task(scheduler.run_leader_election(
+            connect=connect,
+            on_elected=lambda: events.append("start"),
+            on_demoted=lambda: events.append("stop"),
+            retry_seconds=0,
+        ))
+        await asyncio.wait_for(elected_twice.wait(), timeout=2)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(events, ["start", "stop"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import unittest
+from datetime import timedelta
+from types import SimpleNamespace
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from routes import analytics
+from routes.analytics import PageViewIn
+from services import page_views
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _request(ip="203.0.113.7", user_agent="Mozilla/5.0"):
+    headers = [(b"user-agent", user_agent.encode()), (b"x-forwarded-for", ip.encode())]
+    return Request({"type": "http", "method": "POST", "path": "/api/analytics/pageview",
+                    "query_string": b"", "headers": headers})
+
+
+class _Result:
+    def __init__(self, rows=(), scalar=None):
+        self._rows = list(rows)
+        self._scalar = scalar
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._scalar
+
+    def __iter__(self):
+        return iter(self._rows)
+
+
+class _FakeDb:
+    def __init__(self, *results, fail=False):
+        self.results = list(results)
+        self.calls = []
+        self.fail = fail
+        self.commits = self.rollbacks = 0
+
+    async def execute(self, statement, params=None):
+        self.calls.append((statement, params))
+        if self.fail:
+            raise RuntimeError("db down")
+        return self.results.pop(0) if self.results else _Result()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class PageViewBufferTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        page_views._buffer.clear()
+        self.addCleanup(page_views._buffer.clear)
+
+    async def test_pageviews_are_buffered_and_flushed_in_one_insert(self):
+        for path in ("/", "/katalog", "/katalog"):
+            self.assertEqual(await analytics.record_pageview(PageViewIn(path=path), _request()), {"recorded": True})
+        await analytics.record_pageview(PageViewIn(path="/static/app.js"), _request())
+        self.assertEqual(page_views.buffered_count(), 3)
+
+        db = _FakeDb()
+        self.assertEqual(await page_views.flush_pageviews(db), 3)
+        statement, rows = db.calls[0]
+        self.assertEqual(len(db.calls), 1)
+        self.assertIn("INSERT INTO page_views", _sql(statement))
+        self.assertEqual([row["path"] for row in rows], ["/", "/katalog", "/katalog"])
+        self.assertEqual(len({row["session_id"] for row in rows}), 1)
+        self.assertEqual((db.commits, page_views.buffered_count()), (1, 0))
+
+    async def test_failed_flush_keeps_the_rows_for_the_next_one(self):
+        await analytics.record_pageview(PageViewIn(path="/"), _request())
+        db = _FakeDb(fail=True)
+        self.assertEqual(await page_views.flush_pageviews(db), 0)
+        self.assertEqual((db.rollbacks, page_views.buffered_count()), (1, 1))
+
+
+class PageViewStatsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_stats_are_summed_from_the_daily_rollups(self):
+        today = page_views.today_utc()
+        daily = [
+            SimpleNamespace(day=today - timedelta(days=20), views=50, unique_visitors=10),
+            SimpleNamespace(day=today - timedelta(days=6), views=30, unique_visitors=6),
+            SimpleNamespace(day=today - timedelta(days=1), views=0, unique_visitors=0),
+            SimpleNamespace(day=today, views=12, unique_visitors=4),
+        ]
+        top = [SimpleNamespace(path="/katalog", views=40)]
+        db = _FakeDb(_Result(daily), _Result(scalar=500), _Result(top))
+
+        stats = await analytics.get_stats(days=7, db=db, current_user={"email": "demo@budezivo.cz"})
+
+        sql = " ".join(_sql(statement) for statement, _ in db.calls)
+        self.assertNotIn("page_views.", sql)
+        self.assertIn("FROM page_view_daily_paths", sql)
+        self.assertEqual((stats.today_views, stats.views_7d, stats.views_30d), (12, 42, 92))
+        self.assertEqual((stats.unique_visitors_7d, stats.unique_visitors_30d), (10, 20))
+        self.assertEqual(stats.total_views, 500)
+        self.assertEqual([bucket.views for bucket in stats.daily], [30, 12])
+        self.assertEqual(stats.top_paths, [{"path": "/katalog", "views": 40}])
+
+    def test_nightly_rollup_re_rolls_the_days_before_today(self):
+        today = page_views.today_utc()
+        days = page_views.nightly_rollup_days(today)
+        self.assertEqual(days[0], today - timedelta(days=1))
+        self.assertNotIn(today, days)
+
+
+if __name__ == "__main__":
+    unittest.main()
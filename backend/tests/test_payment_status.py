@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+
+from core.response_cache import invalidate_public_cache
+from database.models import EventApplication
+from routes import event_payments, events
+from services import payment_status
+
+
+class _Result:
+    def __init__(self, row):
+        self._row = row
+
+    def first(self):
+        return self._row
+
+    def scalar_one_or_none(self):
+        return self._row
+
+
+class _FakeDb:
+    def __init__(self, *rows):
+        self.rows = list(rows)
+        self.statements = []
+        self.rollbacks = 0
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return _Result(self.rows.pop(0) if self.rows else None)
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _row(application_id, status="pending"):
+    return SimpleNamespace(
+        status=status, amount=1500, currency="CZK", provider="comgate", variable_symbol="2026001",
+        institution_id=uuid.uuid4(), application_id=application_id, paid_at=None,
+        app_id=application_id, application_status="pending", application_payment_status=status,
+        applicant_name="Petr Novák", applicant_email="petr.novak@skola.cz", total_amount=1500,
+        event_id=uuid.uuid4(), event_name="Podzimní tábor", image_url=None,
+        start_datetime=datetime(2026, 10, 22, 9, 0, tzinfo=timezone.utc), end_datetime=None,
+        institution_name="Muzeum",
+    )
+
+
+class PaymentStatusTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        payment_status._drop()
+
+    async def test_one_joined_query_then_served_from_cache(self):
+        ref = uuid.uuid4()
+        db = _FakeDb(_row(ref))
+
+        first = await event_payments.get_payment_by_ref(str(ref), wait=0, db=db)
+        second = await event_payments.get_payment_by_ref(str(ref), wait=0, db=db)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(db.statements), 1)
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        for table in ("event_applications", "events", "event_dates", "institutions"):
+            self.assertIn(f"LEFT OUTER JOIN {table}", sql)
+        self.assertEqual(first["applicant_email"], "pe***@skola.cz")
+        self.assertEqual(first["event"]["title"], "Podzimní tábor")
+        self.assertEqual(first["institution_name"], "Muzeum")
+
+    async def test_invalidation_drops_the_cached_status(self):
+        ref = uuid.uuid4()
+        db = _FakeDb(_row(ref), _row(ref, status="paid"))
+        await payment_status.load_payment_status(db, ref)
+
+        await invalidate_public_cache(None, payment_status.payment_status_tag(ref))
+
+        self.assertEqual((await payment_status.load_payment_status(db, ref))["payment_status"], "paid")
+        self.assertEqual(len(db.statements), 2)
+
+    async def test_admin_payment_status_change_drops_the_cached_status(self):
+        ref = uuid.uuid4()
+        inst = uuid.uuid4()
+        await payment_status.load_payment_status(_FakeDb(_row(ref)), ref)
+
+        application = EventApplication(
+            id=ref, institution_id=inst, event_id=uuid.uuid4(), status="pending", payment_status="pending",
+        )
+        user = {"institution_id": str(inst), "user_id": str(uuid.uuid4()), "role": "admin"}
+        admin_db = _FakeDb(application)
+        with mock.patch.object(events, "require_events_module", mock.AsyncMock()):
+            await events.update_application_status(
+                str(ref), events.ApplicationStatusUpdate(status="confirmed"), db=admin_db, current_user=user,
+            )
+        self.assertEqual(admin_db.commits, 1)
+
+        db = _FakeDb(_row(ref, status="pending"))
+        await payment_status.load_payment_status(db, ref)
+        self.assertEqual(len(db.statements), 1)
+
+    async def test_long_poll_returns_when_the_webhook_lands(self):
+        ref = uuid.uuid4()
+        db = _FakeDb(_row(ref), _row(ref, status="paid"))
+
+        async def webhook():
+            while not payment_status._waiters:
+                await asyncio.sleep(0)
+            await invalidate_public_cache(None, payment_status.payment_status_tag(ref))
+
+        hook = asyncio.ensure_future(webhook())
+        result = await asyncio.wait_for(event_payments.get_payment_by_ref(str(ref), wait=20, db=db), 5)
+        await hook
+
+        self.assertEqual(result["payment_status"], "paid")
+        self.assertEqual(db.rollbacks, 1)
+        self.assertEqual(payment_status._waiters, {})
+
+    async def test_other_refs_invalidations_do_not_wake_a_waiter(self):
+        ref, other = uuid.uuid4(), uuid.uuid4()
+        version = payment_status.payment_status_version(ref)
+
+        await invalidate_public_cache(None, payment_status.payment_status_tag(other))
+
+        self.assertEqual(payment_status.payment_status_version(ref), version)
+        self.assertFalse(await payment_status.wait_for_payment_change(ref, 0.01, since=version))
+        await invalidate_public_cache(None, payment_status.payment_status_tag(ref))
+        self.assertTrue(await payment_status.wait_for_payment_change(ref, 5, since=version))
+
+    async def test_lookup_by_variable_symbol_does_not_reveal_the_ref(self):
+        payment = SimpleNamespace(
+            status="pending", amount=1500, currency="CZK", provider="comgate", variable_symbol="412345678",
+            application_id=uuid.uuid4(), paid_at=None,
+        )
+        application = SimpleNamespace(status="pending", payment_status="pending")
+        by_vs = inspect.unwrap(event_payments.get_payment_by_vs)
+        result = await by_vs(None, str(uuid.uuid4()), "412345678", db=_FakeDb(payment, application))
+
+        self.assertEqual(result["payment_status"], "pending")
+        self.assertNotIn("application_id", result)
+        self.assertNotIn(str(payment.application_id), result.values())
+
+    async def test_long_poll_times_out_and_final_status_never_waits(self):
+        ref = uuid.uuid4()
+        self.assertFalse(await payment_status.wait_for_payment_change(ref, 0.01))
+        self.assertTrue(await payment_status.wait_for_payment_change(ref, 5, since=payment_status.payment_status_version(ref) - 1))
+
+        db = _FakeDb(_row(ref, status="paid"))
+        result = await event_payments.get_payment_by_ref(str(ref), wait=20, db=db)
+        self.assertEqual(result["payment_status"], "paid")
+        self.assertEqual(db.rollbacks, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+from starlette.requests import Request
+
+from core import response_cache as rc
+from database.models import EventDate
+from routes import events
+
+INST = "11111111-1111-4111-8111-111111111111"
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _request(path=f"/api/events/public/{INST}"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+    def scalars(self):
+        return self
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+
+class _Session:
+    """AsyncSessionLocal() stand-in: cached loads open their own session."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self.db
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _event(name, **extra):
+    values = dict(
+        id=uuid.uuid4(), name=name, type="event", description=None, capacity=10, price=0, currency="CZK",
+        image_url=None, form_fields=[], registration_deadline=None,
+    )
+    values.update(extra)
+    return SimpleNamespace(**values)
+
+
+def _date(event, days):
+    start = datetime.now(timezone.utc) + timedelta(days=days)
+    return EventDate(
+        id=uuid.uuid4(), event_id=event.id, start_datetime=start, end_datetime=start + timedelta(hours=2),
+        seats_taken=0,
+    )
+
+
+class PublicEventsListingTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        rc.response_cache.invalidate()
+        flags = patch.object(events, "is_feature_enabled", AsyncMock(return_value=True))
+        flags.start()
+        self.addCleanup(flags.stop)
+        sessions = patch("database.supabase.AsyncSessionLocal", lambda: _Session(self._db()))
+        sessions.start()
+        self.addCleanup(sessions.stop)
+
+    def _db(self):
+        camp, talk, past, prereg = _event("Tábor"), _event("Beseda"), _event("Minulá"), _event("Předzápis")
+        return _FakeDb(
+            _Result([(camp, True), (talk, True), (past, True), (prereg, False)]),
+            _Result([_date(camp, 3), _date(talk, 4), _date(camp, 10)]),
+            _Result([(camp.id, 7), (prereg.id, 2)]),
+        )
+
+    async def test_listing_takes_three_queries_whatever_the_event_count(self):
+        db = self._db()
+        out = await events.get_public_events.__wrapped__(institution_id=INST, request=_request(), db=db)
+
+        self.assertEqual(len(db.statements), 3)
+        self.assertIn("EXISTS (SELECT event_dates.id", _sql(db.statements[0]))
+        self.assertIn("event_dates.event_id IN", _sql(db.statements[1]))
+        self.assertIn("GROUP BY event_applications.event_id", _sql(db.statements[2]))
+
+        # The event whose only dates are past is hidden; dates stay per event.
+        self.assertEqual([e["name"] for e in out], ["Tábor", "Beseda", "Předzápis"])
+        self.assertEqual([len(e["dates"]) for e in out], [2, 1, 0])
+        self.assertEqual([e["applications_count"] for e in out], [7, 0, 2])
+        self.assertEqual([e["accepts_preregistration"] for e in out], [False, False, True])
+
+    async def test_response_is_cached_until_the_institutions_events_change(self):
+        first = await events.get_public_events(institution_id=INST, request=_request(), db=self._db())
+        cached = await events.get_public_events(institution_id=INST, request=_request(), db=_FakeDb())
+        self.assertEqual((first.headers["x-cache"], cached.headers["x-cache"]), ("MISS", "HIT"))
+
+        await rc.invalidate_public_cache(None, events._public_events_tag(INST.upper()))
+        reloaded = await events.get_public_events(institution_id=INST, request=_request(), db=self._db())
+        self.assertEqual(reloaded.headers["x-cache"], "MISS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import base64
+import json
+import os
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from svix.webhooks import Webhook
+
+from database.supabase import get_db
+from routes import resend_webhooks
+from services import resend_delivery
+
+SECRET = "whsec_" + base64.b64encode(b"test-secret-for-resend-webhooks").decode()
+
+
+class _FakeScalars:
+    def __init__(self, values):
+        self._values = values
+
+    def all(self):
+        return self._values
+
+
+class _FakeResult:
+    def __init__(self, values=()):
+        self._values = list(values)
+
+    def scalars(self):
+        return _FakeScalars(self._values)
+
+
+class _FakeDb:
+    def __init__(self, fail=False, seen=()):
+        self.fail = fail
+        self.seen = list(seen)
+        self.statements = []
+        self.added = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        if self.fail:
+            raise RuntimeError("relation resend_webhook_inbox does not exist")
+        self.statements.append((str(statement), params))
+        return _FakeResult(self.seen)
+
+    def add_all(self, items):
+        self.added.extend(items)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def _signed(payload: dict, msg_id="msg_1"):
+    body = json.dumps(payload)
+    timestamp = datetime.now(timezone.utc)
+    signature = Webhook(SECRET).sign(msg_id, timestamp, body)
+    headers = {
+        "svix-id": msg_id,
+        "svix-timestamp": str(int(timestamp.timestamp())),
+        "svix-signature": signature,
+        "content-type": "application/json",
+    }
+    return body, headers
+
+
+class ResendWebhookRouteTests(unittest.TestCase):
+    def setUp(self):
+        self.db = _FakeDb()
+        app = FastAPI()
+        app.include_router(resend_webhooks.router)
+        app.dependency_overrides[get_db] = lambda: self.db
+        self.client = TestClient(app)
+        env = mock.patch.dict(os.environ, {"RESEND_WEBHOOK_SECRET": SECRET})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_verified_delivery_event_is_staged_and_acknowledged(self):
+        body, headers = _signed({"type": "email.delivered", "data": {"email_id": "e1", "to": ["a@zs.cz"]}})
+        response = self.client.post("/resend/webhook", content=body, headers=headers)
+        self.assertEqual(response.json(), {"ok": True, "queued": True})
+        sql, params = self.db.statements[0]
+        self.assertIn("INSERT INTO resend_webhook_inbox", sql)
+        self.assertIn("ON CONFLICT (svix_id) DO NOTHING", sql)
+        self.assertEqual(params, {"svix_id": "msg_1", "payload": body})
+        self.assertEqual(self.db.commits, 1)
+
+    def test_unrelated_events_and_bad_signatures_are_not_staged(self):
+        body, headers = _signed({"type": "email.sent", "data": {}})
+        self.assertEqual(self.client.post("/resend/webhook", content=body, headers=headers).json(),
+                         {"ok": True, "ignored": True})
+        headers["svix-signature"] = "v1,bogus"
+        self.assertEqual(self.client.post("/resend/webhook", content=body, headers=headers).status_code, 400)
+        self.assertEqual(self.db.statements, [])
+
+    def test_staging_failure_falls_back_to_inline_apply(self):
+        self.db.fail = True
+        body, headers = _signed({"type": "email.bounced", "data": {"email_id": "e2", "to": ["b@zs.cz"]}})
+        with mock.patch.object(resend_webhooks, "apply_delivery_update",
+                               mock.AsyncMock(return_value={"ok": True, "matched_recipients": 0})) as inline:
+            response = self.client.post("/resend/webhook", content=body, headers=headers)
+        self.assertEqual(response.json()["matched_recipients"], 0)
+        self.assertEqual(inline.await_args.args[2], "msg_1")
+
+
+class BatchApplyTests(unittest.IsolatedAsyncioTestCase):
+    def _update(self, status="delivered"):
+        return resend_delivery.delivery_update_from_payload({
+            "type": f"email.{status}", "created_at": "2026-10-19T10:00:00Z",
+            "data": {"email_id": "e1", "to": ["a@zs.cz"]},
+        })
+
+    async def test_already_recorded_events_are_skipped(self):
+        db = _FakeDb(seen=["svix_1"])
+        result = await resend_delivery.apply_delivery_updates(db, [("svix_1", self._update())] * 2)
+        self.assertEqual(result, {"applied": 0, "duplicates": 2, "matched_recipients": 0})
+        self.assertEqual(db.added, [])
+        self.assertEqual(await resend_delivery.apply_delivery_update(db, self._update(), "svix_1"),
+                         {"ok": True, "duplicate": True})
+
+    def test_contact_fold_parameters_are_parallel_arrays(self):
+        at = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        params = resend_delivery._unnest_params({
+            ("inst-1", "a@zs.cz"): {"status": "bounced_hard", "reason": "No mailbox", "event_at": at},
+            ("inst-1", "b@zs.cz"): {"status": "delivered", "reason": None, "event_at": at},
+        })
+        self.assertEqual(params["emails"], ["a@zs.cz", "b@zs.cz"])
+        self.assertEqual(params["statuses"], ["bounced_hard", "delivered"])
+        self.assertEqual(len({len(v) for v in params.values()}), 1)
+
+
+
+class _InboxRows:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _Savepoint:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.db.savepoints.append("rollback" if exc_type else "release")
+        return False
+
+
+class _InboxDb:
+    def __init__(self, rows):
+        self.rows = rows
+        self.updates = []
+        self.savepoints = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        if "SELECT id, svix_id, payload" in sql:
+            ids = (params or {}).get("ids")
+            return _InboxRows([r for r in self.rows if ids is None or r["id"] in ids])
+        self.updates.append((sql, params))
+        return _InboxRows([])
+
+    def begin_nested(self):
+        return _Savepoint(self)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+        self.updates.clear()
+
+
+class InboxProcessingTests(unittest.IsolatedAsyncioTestCase):
+    def _row(self, row_id, payload):
+        return {"id": row_id, "svix_id": f"msg_{row_id}", "payload": payload}
+
+    async def test_one_bad_payload_does_not_hold_back_the_batch(self):
+        good = {"type": "email.delivered", "data": {"email_id": "e1", "to": ["a@zs.cz"]}}
+        db = _InboxDb([self._row(1, good), self._row(2, "{not json"), self._row(3, json.dumps(good))])
+        with mock.patch.object(resend_delivery, "apply_delivery_updates", mock.AsyncMock()) as apply:
+            claimed = await resend_delivery.process_delivery_inbox(db, batch_size=3)
+
+        self.assertEqual(claimed, 3)
+        self.assertEqual(db.rollbacks, 1)
+        self.assertEqual(db.savepoints, ["release", "rollback", "release"])
+        self.assertEqual([call.args[1][0][0] for call in apply.await_args_list], ["msg_1", "msg_3"])
+        (processed_sql, processed), (failed_sql, failed) = db.updates
+        self.assertIn("processed_at = NOW()", processed_sql)
+        self.assertEqual(processed, {"ids": [1, 3]})
+        self.assertIn("last_error = f.error", failed_sql)
+        self.assertEqual(failed["ids"], [2])
+        self.assertEqual(len(failed["errors"]), 1)
+        self.assertEqual(db.commits, 1)
+
+    async def test_healthy_batch_is_applied_in_one_go(self):
+        db = _InboxDb([self._row(1, {"type": "email.delivered", "data": {"email_id": "e1", "to": ["a@zs.cz"]}})])
+        with mock.patch.object(resend_delivery, "apply_delivery_updates", mock.AsyncMock()) as apply:
+            self.assertEqual(await resend_delivery.process_delivery_inbox(db), 1)
+        self.assertEqual(apply.await_count, 1)
+        self.assertEqual(db.savepoints, [])
+        self.assertEqual(db.updates[0][1], {"ids": [1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
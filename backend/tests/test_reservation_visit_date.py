@@ -0,0 +1,122 @@
+import os
+import unittest
+import uuid
+from datetime import date
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects import postgresql
+
+from database.models import Reservation, parse_visit_date, reservation_is_active, reservation_on
+from database.supabase_repositories import BookingRepositorySupabase
+from routes import statistics
+
+INST = "11111111-1111-4111-8111-111111111111"
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class _Result:
+    def scalar(self):
+        return 0
+
+    def fetchall(self):
+        return []
+
+
+class _FakeDb:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        return _Result()
+
+
+class VisitDateParsingTests(unittest.TestCase):
+    def test_text_dates_parse_like_the_generated_column(self):
+        self.assertEqual(parse_visit_date("2026-10-19"), date(2026, 10, 19))
+        self.assertEqual(parse_visit_date("2026-10-19T09:00:00"), date(2026, 10, 19))
+        self.assertIsNone(parse_visit_date("2026-02-30"))
+        self.assertIsNone(parse_visit_date(""))
+
+    def test_unparsable_day_matches_nothing_instead_of_null_rows(self):
+        self.assertEqual(_sql(reservation_on("2026-10-19")), "reservations.visit_date = '2026-10-19'")
+        self.assertEqual(_sql(reservation_on("zítra")), "false")
+
+    def test_active_predicate_matches_the_partial_index(self):
+        index = next(i for i in Reservation.__table__.indexes if i.name == "idx_reservations_inst_visit_date_active")
+        self.assertEqual(
+            str(index.dialect_options["postgresql"]["where"]),
+            _sql(reservation_is_active()).replace("reservations.", "").replace("!=", "<>"),
+        )
+
+
+class TypedColumnQueryTests(unittest.IsolatedAsyncioTestCase):
+    async def test_dashboard_counts_filter_on_visit_date(self):
+        db = _FakeDb()
+        repo = BookingRepositorySupabase(db)
+        await repo.count_today(INST, "2026-10-19")
+        await repo.count_upcoming(INST, "2026-10-19")
+
+        today_sql, upcoming_sql = (_sql(statement) for statement, _ in db.statements)
+        self.assertIn("reservations.visit_date = '2026-10-19'", today_sql)
+        self.assertIn("reservations.visit_date >= '2026-10-19'", upcoming_sql)
+        for sql in (today_sql, upcoming_sql):
+            self.assertIn("reservations.deleted_at IS NULL", sql)
+            self.assertNotIn("reservations.date ", sql)
+
+    async def test_statistics_pass_typed_bounds_without_casting(self):
+        db = _FakeDb()
+        await statistics.get_heatmap(current_user={"institution_id": INST}, db=db, year=2026, month=2, _guard=None)
+        await statistics.get_trends(current_user={"institution_id": INST}, db=db, year=2026, _guard=None)
+
+        heatmap_sql, heatmap_params = db.statements[0]
+        self.assertIn("r.visit_date >= :start_date", str(heatmap_sql))
+        self.assertEqual((heatmap_params["start_date"], heatmap_params["end_date"]), (date(2026, 2, 1), date(2026, 2, 28)))
+        for statement, _ in db.statements:
+            self.assertNotIn("::date", str(statement))
+        self.assertEqual(db.statements[1][1]["next_year"], date(2027, 1, 1))
+
+
+@unittest.skipUnless(os.getenv("EXPLAIN_DATABASE_URL"), "EXPLAIN_DATABASE_URL points at a migrated database")
+class VisitDatePlanTests(unittest.IsolatedAsyncioTestCase):
+    """EXPLAIN the hot reservation queries against a real, migrated database."""
+
+    async def _plan(self, statement) -> str:
+        import asyncpg
+
+        conn = await asyncpg.connect(os.environ["EXPLAIN_DATABASE_URL"], statement_cache_size=0)
+        try:
+            async with conn.transaction():
+                await conn.execute("SET LOCAL enable_seqscan = off")
+                rows = await conn.fetch("EXPLAIN " + _sql(statement))
+        finally:
+            await conn.close()
+        return "\n".join(row[0] for row in rows)
+
+    async def test_day_lookup_uses_the_partial_index(self):
+        inst = uuid.UUID(INST)
+        plan = await self._plan(select(Reservation.id).where(and_(
+            Reservation.institution_id == inst, reservation_on("2026-10-19"), reservation_is_active(),
+        )))
+        self.assertIn("idx_reservations_inst_visit_date_active", plan)
+
+    async def test_statistics_range_uses_the_visit_date_index(self):
+        inst = uuid.UUID(INST)
+        plan = await self._plan(
+            select(Reservation.status, func.count(Reservation.id)).where(and_(
+                Reservation.institution_id == inst,
+                Reservation.visit_date >= date(2026, 10, 1),
+                Reservation.visit_date <= date(2026, 10, 31),
+                Reservation.deleted_at.is_(None),
+            )).group_by(Reservation.status)
+        )
+        self.assertIn("idx_reservations_inst_visit_date", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from starlette.requests import Request
+
+from core import response_cache as rc
+from routes import catalog, programs, public
+
+
+def _request(path="/api/public/stats", query="", headers=None):
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({
+        "type": "http", "method": "GET", "path": path,
+        "query_string": query.encode(), "headers": raw_headers,
+    })
+
+
+class _Session:
+    """AsyncSessionLocal() stand-in: every cache load opens its own session."""
+
+    closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+
+class ResponseCacheTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        rc.response_cache.invalidate()
+        self.calls = 0
+        sessions = patch("database.supabase.AsyncSessionLocal", _Session)
+        sessions.start()
+        self.addCleanup(sessions.stop)
+
+    def _endpoint(self, ttl=60, stale_ttl=0, tags=None):
+        @rc.cached_response("test", ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+        async def endpoint(request, db=None, institution_id="i1"):
+            self.calls += 1
+            await asyncio.sleep(0)
+            return {"calls": self.calls}
+        return endpoint
+
+    async def test_hit_serves_stored_body_with_cdn_headers(self):
+        endpoint = self._endpoint()
+        first = await endpoint(request=_request())
+        second = await endpoint(request=_request())
+        self.assertEqual(self.calls, 1)
+        self.assertEqual((first.headers["x-cache"], second.headers["x-cache"]), ("MISS", "HIT"))
+        self.assertEqual(first.body, second.body)
+        self.assertTrue(second.headers["cache-control"].startswith("public, max-age="))
+        self.assertEqual(first.headers["etag"], second.headers["etag"])
+
+    async def test_matching_etag_returns_304(self):
+        endpoint = self._endpoint()
+        etag = (await endpoint(request=_request())).headers["etag"]
+        response = await endpoint(request=_request(headers={"If-None-Match": f"W/{etag}"}))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.body, b"")
+
+    async def test_query_string_is_part_of_the_key(self):
+        endpoint = self._endpoint()
+        await endpoint(request=_request(query="a=1&b=2"))
+        await endpoint(request=_request(query="b=2&a=1"))
+        await endpoint(request=_request(query="a=2"))
+        self.assertEqual(self.calls, 2)
+
+    async def test_concurrent_misses_are_coalesced(self):
+        endpoint = self._endpoint()
+        responses = await asyncio.gather(*[endpoint(request=_request()) for _ in range(10)])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({r.body for r in responses}, {responses[0].body})
+
+    async def test_stale_entry_is_served_while_revalidating(self):
+        endpoint = self._endpoint(ttl=60, stale_ttl=300)
+        await endpoint(request=_request())
+        rc.response_cache._entries[next(iter(rc.response_cache._entries))].stored_at -= 120
+
+        async def loader():
+            self.calls += 1
+            return {"calls": self.calls}
+
+        original = rc._background_loader
+        rc._background_loader = lambda func, args, kwargs: loader
+        try:
+            stale = await endpoint(request=_request())
+            await asyncio.sleep(0.01)
+        finally:
+            rc._background_loader = original
+        fresh = await endpoint(request=_request())
+        self.assertEqual(stale.headers["x-cache"], "STALE")
+        self.assertEqual(stale.body, b'{"calls":1}')
+        self.assertEqual((fresh.headers["x-cache"], fresh.body), ("HIT", b'{"calls":2}'))
+
+    async def test_invalidation_by_tag(self):
+        endpoint = self._endpoint(tags=lambda kw: [f"institution:{kw['institution_id']}"])
+        await endpoint(request=_request("/a"), institution_id="i1")
+        await endpoint(request=_request("/b"), institution_id="i2")
+        await rc.invalidate_public_cache(None, "institution:i1")
+        await endpoint(request=_request("/a"), institution_id="i1")
+        await endpoint(request=_request("/b"), institution_id="i2")
+        self.assertEqual(self.calls, 3)
+
+    async def test_load_racing_an_invalidation_is_not_stored(self):
+        started, gate = asyncio.Event(), asyncio.Event()
+
+        @rc.cached_response("test", ttl=60)
+        async def slow(request, db=None):
+            self.calls += 1
+            started.set()
+            await gate.wait()
+            return {"v": self.calls}
+
+        pending = asyncio.create_task(slow(request=_request()))
+        await started.wait()
+        rc.response_cache.invalidate("test")
+        gate.set()
+        await pending
+        await slow(request=_request())
+        self.assertEqual(self.calls, 2)
+
+    async def test_shared_miss_load_uses_its_own_session_and_survives_cancellation(self):
+        started, gate = asyncio.Event(), asyncio.Event()
+        sessions = []
+
+        class _RecordedSession(_Session):
+            async def __aenter__(self):
+                sessions.append(self)
+                return self
+
+        @rc.cached_response("test", ttl=60)
+        async def slow(request, db=None):
+            started.set()
+            await gate.wait()
+            return {"own_session": db is sessions[0] and not db.closed}
+
+        with patch("database.supabase.AsyncSessionLocal", _RecordedSession):
+            first = asyncio.create_task(slow(request=_request(), db="request-session"))
+            await started.wait()
+            second = asyncio.create_task(slow(request=_request(), db="other-request-session"))
+            await asyncio.sleep(0)
+            first.cancel()
+            gate.set()
+            response = await second
+
+        self.assertEqual(response.body, b'{"own_session":true}')
+        self.assertTrue(first.cancelled())
+        self.assertEqual(len(sessions), 1)
+        self.assertTrue(sessions[0].closed)
+
+    async def test_errors_are_not_cached(self):
+        @rc.cached_response("test", ttl=60)
+        async def failing(request, db=None):
+            self.calls += 1
+            raise ValueError("boom")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                await failing(request=_request())
+        self.assertEqual(self.calls, 2)
+
+
+class PublicEndpointsAreCachedTests(unittest.TestCase):
+    def test_public_read_endpoints_are_wrapped(self):
+        for endpoint in (
+            public.get_public_stats,
+            public.get_public_institution_info,
+            programs.get_public_programs,
+            catalog.list_catalog,
+            catalog.get_catalog_detail,
+        ):
+            # slowapi wrapper -> cache wrapper -> endpoint
+            cache_wrapper = endpoint.__wrapped__
+            self.assertEqual(cache_wrapper.__code__.co_filename, rc.__file__)
+
+
+
+class InvalidationListenerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_listener_needs_a_session_connection(self):
+        pooler = {"DATABASE_URL": "postgresql://u:pw@pooler.invalid:6543/app"}
+        for lock_url in ("", "postgresql://u:pw@pooler.invalid:6543/app"):
+            with self.subTest(lock_url=lock_url), patch.dict(os.environ, pooler), \
+                    patch.dict(os.environ, {"SCHEDULER_LOCK_DATABASE_URL": lock_url}), \
+                    patch("asyncpg.connect") as connect, self.assertLogs(rc.logger, "ERROR"):
+                await asyncio.wait_for(rc.listen_for_invalidations(retry_seconds=0), 1)
+            connect.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
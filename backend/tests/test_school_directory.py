@@ -0,0 +1,129 @@
+import os
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from fastapi import HTTPException
+
+from core.pagination import decode_cursor
+from routes import schools
+
+
+class _FakeResult:
+    def __init__(self, rows=(), scalar=None):
+        self._rows = list(rows)
+        self._scalar = scalar
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._scalar
+
+
+class _FakeDb:
+    def __init__(self, school_rows, contact_rows, total):
+        self.responses = [_FakeResult(school_rows), _FakeResult(contact_rows), _FakeResult(scalar=total)]
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return self.responses.pop(0)
+
+
+def _school(name, **extra):
+    row = {
+        "id": uuid.uuid4(), "name": name, "city": "Plzeň", "address": None, "notes": "", "tags": "[\"ZŠ\"]",
+        "source": "import", "booking_count": 3, "created_at": datetime(2026, 10, 1, tzinfo=timezone.utc),
+        "legacy_email": None, "legacy_contact": None, "legacy_phone": None,
+    }
+    row.update(extra)
+    return row
+
+
+def _contact(school, email, status="active", suggested=None):
+    return {
+        "id": uuid.uuid4(), "school_id": school["id"], "email": email, "name": "", "phone": "",
+        "status": status, "is_primary": True, "email_validated": False,
+        "suggested_correction": suggested, "created_at": None,
+    }
+
+
+class SchoolDirectoryTests(unittest.IsolatedAsyncioTestCase):
+    user = {"institution_id": str(uuid.uuid4())}
+
+    async def _page(self, db, **kwargs):
+        params = dict(
+            source=None, tag=None, has_invalid=None, archived=False, include_archived_contacts=False,
+            search=None, sort="name", limit=2, cursor=None,
+        )
+        params.update(kwargs)
+        return await schools.get_schools(current_user=self.user, db=db, **params)
+
+    async def test_page_fetches_contacts_with_one_uuid_array(self):
+        a, b = _school("ZŠ Alfa"), _school("ZŠ Beta", legacy_email="old@zs.cz")
+        db = _FakeDb(
+            [a, b],
+            [_contact(a, "info@gmial.com", suggested="info@gmail.com"), _contact(a, "x@zs.cz", "archived")],
+            total=7,
+        )
+        page = await self._page(db)
+
+        contacts_sql, contacts_params = db.statements[1]
+        self.assertIn("school_id = ANY(CAST(:school_ids AS uuid[]))", contacts_sql)
+        self.assertNotIn("::text", contacts_sql)
+        self.assertEqual(contacts_params, {"school_ids": [str(a["id"]), str(b["id"])]})
+
+        self.assertEqual(page["total"], 7)
+        alfa, beta = page["items"]
+        self.assertEqual([c["email"] for c in alfa["contacts"]], ["info@gmial.com"])
+        self.assertEqual(alfa["contacts"][0]["suggested_correction"], "info@gmail.com")
+        self.assertEqual(alfa["tags"], ["ZŠ"])
+        self.assertEqual(beta["email"], "old@zs.cz")
+        self.assertEqual(decode_cursor(page["next_cursor"], [str, schools.parse_uuid]), ["ZŠ Beta", b["id"]])
+
+    async def test_cursor_search_and_invalid_filter_are_pushed_into_sql(self):
+        first = await self._page(_FakeDb([_school("A"), _school("B")], [], total=3), sort="bookings")
+        db = _FakeDb([_school("C")], [], total=3)
+        page = await self._page(
+            db, sort="bookings", cursor=first["next_cursor"], search=" 50%_sleva ", has_invalid=True,
+        )
+
+        sql, params = db.statements[0]
+        self.assertIn("(COALESCE(s.booking_count, 0), s.id) < (:c0, :c1)", sql)
+        self.assertIn("ORDER BY COALESCE(s.booking_count, 0) DESC, s.id DESC", sql)
+        self.assertIn("ic.status = 'invalid'", sql)
+        self.assertEqual(params["search"], "%50\\%\\_sleva%")
+        self.assertEqual((params["c0"], params["limit"]), (3, 2))
+        # The total ignores the cursor but keeps the filters.
+        count_sql, count_params = db.statements[2]
+        self.assertNotIn(":c0", count_sql)
+        self.assertIn("search", count_params)
+        self.assertIsNone(page["next_cursor"])
+
+    async def test_without_limit_the_plain_list_is_returned(self):
+        db = _FakeDb([_school("A")], [], total=None)
+        result = await self._page(db, limit=None)
+        self.assertIsInstance(result, list)
+        self.assertEqual(len(db.statements), 2)
+        self.assertNotIn("LIMIT", db.statements[0][0])
+
+    async def test_unknown_sort_is_rejected(self):
+        with self.assertRaises(HTTPException) as ctx:
+            await self._page(_FakeDb([], [], 0), sort="random")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class EmailSuggestionTests(unittest.TestCase):
+    def test_typo_domains_get_a_stored_suggestion(self):
+        self.assertEqual(schools.email_suggestion("Reditel@Sezanm.cz "), "reditel@seznam.cz")
+        self.assertIsNone(schools.email_suggestion("reditel@seznam.cz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import io
+import os
+import unittest
+import uuid
+from unittest import mock
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from fastapi import BackgroundTasks, HTTPException, UploadFile
+
+from routes import schools
+from services import school_import
+
+
+def _row(name, city, email, **extra):
+    return {"school_name": name, "city": city, "email": email, **extra}
+
+
+class PlanImportTests(unittest.TestCase):
+    def test_groups_by_school_and_skips_known_emails(self):
+        existing_id = str(uuid.uuid4())
+        plan = school_import.plan_import(
+            [
+                _row("ZŠ Komenského", "Plzeň", "a@zs.cz"),
+                _row("zš komenského ", "plzeň", "b@zs.cz"),
+                _row("ZŠ Komenského", "Plzeň", "A@zs.cz"),
+                _row("MŠ Sluníčko", "Brno", "old@ms.cz"),
+                _row("Gymnázium", "Praha", "c@gym.cz", tags=["SŠ"]),
+            ],
+            existing_schools={schools.get_school_key("Gymnázium", "Praha"): existing_id},
+            existing_emails={"old@ms.cz"},
+            update_existing=True,
+        )
+        self.assertEqual([s["name"] for s in plan.new_schools], ["ZŠ Komenského", "MŠ Sluníčko"])
+        self.assertEqual([s["id"] for s in plan.updated_schools], [existing_id])
+        self.assertEqual(plan.duplicates, 2)
+        self.assertEqual(
+            [(c["email"], c["is_primary"]) for c in plan.contacts],
+            [("a@zs.cz", True), ("b@zs.cz", False), ("c@gym.cz", True)],
+        )
+        self.assertEqual(plan.contacts[2]["school_id"], existing_id)
+
+    def test_existing_schools_are_left_alone_without_update_flag(self):
+        plan = school_import.plan_import(
+            [_row("Gymnázium", "Praha", "c@gym.cz")],
+            existing_schools={schools.get_school_key("Gymnázium", "Praha"): "s1"},
+            existing_emails=set(),
+            update_existing=False,
+        )
+        self.assertEqual((plan.new_schools, plan.updated_schools), ([], []))
+        self.assertEqual(len(plan.contacts), 1)
+
+
+class ExcelParsingTests(unittest.TestCase):
+    def test_read_only_workbook_is_parsed_row_by_row(self):
+        import openpyxl
+
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(["Název školy", "Město", "Email", "Typ školy"])
+        ws.append(["ZŠ Komenského", "Plzeň", "Reditel@ZS.cz", "ZŠ; 1. stupeň"])
+        ws.append([None, None, None, None])
+        ws.append(["", "Plzeň", "x@zs.cz", None])
+        buffer = io.BytesIO()
+        wb.save(buffer)
+
+        rows, errors = schools.parse_excel_file(buffer.getvalue(), "skoly.xlsx")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["email"], "reditel@zs.cz")
+        self.assertEqual(rows[0]["tags"], ["ZŠ", "1. stupeň"])
+        self.assertEqual(errors, [{"row": 4, "error": "Řádek 4: Chybí název školy"}])
+
+
+class ImportRouteTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.user = {"institution_id": str(uuid.uuid4()), "user_id": str(uuid.uuid4())}
+
+    def _upload(self, name="skoly.csv", content=b"N\xc3\xa1zev \xc5\xa1koly;M\xc4\x9bsto;Email\n"):
+        return UploadFile(file=io.BytesIO(content), filename=name)
+
+    async def test_upload_is_queued_as_background_job(self):
+        tasks = BackgroundTasks()
+        with mock.patch.object(school_import, "create_import_job", mock.AsyncMock(return_value="job-1")) as create:
+            status = await schools.import_schools(
+                background_tasks=tasks, file=self._upload("Skoly.CSV"), update_existing=True,
+                current_user=self.user, db=None,
+            )
+        self.assertEqual((status.job_id, status.status), ("job-1", "queued"))
+        self.assertEqual(create.await_args.args[2], self.user["user_id"])
+        task = tasks.tasks[0]
+        self.assertIs(task.func, school_import.run_school_import)
+        self.assertEqual(task.args[0], "job-1")
+        self.assertEqual(task.args[3:], ("skoly.csv", True))
+
+    async def test_second_import_while_one_runs_is_rejected(self):
+        with mock.patch.object(school_import, "create_import_job", mock.AsyncMock(return_value=None)):
+            with self.assertRaises(HTTPException) as ctx:
+                await schools.import_schools(
+                    background_tasks=BackgroundTasks(), file=self._upload(), update_existing=False,
+                    current_user=self.user, db=None,
+                )
+        self.assertEqual(ctx.exception.status_code, 409)
+
+    async def test_job_check_and_insert_are_serialized_per_institution(self):
+        class _Db:
+            def __init__(self, active):
+                self.active = active
+                self.statements = []
+                self.commits = self.rollbacks = 0
+
+            async def execute(self, statement, params=None):
+                self.statements.append((str(statement), params))
+                row = ("job-0",) if self.active and "SELECT id FROM school_import_jobs" in str(statement) else None
+                return mock.Mock(first=mock.Mock(return_value=row))
+
+            async def commit(self):
+                self.commits += 1
+
+            async def rollback(self):
+                self.rollbacks += 1
+
+        inst_id = self.user["institution_id"]
+        free = _Db(active=False)
+        job_id = await school_import.create_import_job(free, inst_id, None, "skoly.csv", False)
+        lock_sql, lock_params = free.statements[0]
+        self.assertIn("pg_advisory_xact_lock", lock_sql)
+        self.assertEqual(lock_params, {"key": school_import._import_lock_key(inst_id)})
+        self.assertIn("INSERT INTO school_import_jobs", free.statements[2][0])
+        self.assertEqual((uuid.UUID(job_id).version, free.commits), (4, 1))
+
+        busy = _Db(active=True)
+        self.assertIsNone(await school_import.create_import_job(busy, inst_id, None, "skoly.csv", False))
+        self.assertEqual(len(busy.statements), 2)
+        self.assertEqual((busy.commits, busy.rollbacks), (0, 1))
+
+    async def test_progress_and_error_report(self):
+        job = {
+            "id": uuid.uuid4(), "status": "running", "phase": "writing", "total_rows": 10,
+            "processed_records": 5, "total_records": 20, "error_count": 1, "failure_reason": None,
+            "result": None, "error_report": [{"row": 3, "error": "Řádek 3: Chybí email"}],
+        }
+        with mock.patch.object(school_import, "get_import_job", mock.AsyncMock(return_value=job)):
+            status = await schools.get_import_status(str(job["id"]), current_user=self.user, db=None)
+            report = await schools.download_import_errors(str(job["id"]), current_user=self.user, db=None)
+        self.assertEqual((status.progress, status.phase), (25, "writing"))
+        self.assertEqual(report.body.decode("utf-8-sig").splitlines(), ["Řádek;Chyba", "3;Řádek 3: Chybí email"])
+
+        with self.assertRaises(HTTPException) as ctx:
+            await schools.get_import_status("not-a-uuid", current_user=self.user, db=None)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
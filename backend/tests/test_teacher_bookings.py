@@ -0,0 +1,84 @@
+import os
+import unittest
+import uuid
+from types import SimpleNamespace
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy.dialects import postgresql
+
+from core.pagination import decode_cursor, parse_uuid
+from routes import teacher as teacher_routes
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+
+def _row(date, time_block="09:00-10:30"):
+    reservation = SimpleNamespace(
+        id=uuid.uuid4(), date=date, time_block=time_block, status="confirmed", school_name="ZŠ Alfa",
+        num_students=20, num_teachers=2, created_at=None,
+    )
+    program = SimpleNamespace(id=uuid.uuid4(), name_cs="Program", image_url=None)
+    institution = SimpleNamespace(id=uuid.uuid4(), name="Muzeum")
+    return reservation, program, institution
+
+
+class TeacherBookingsTests(unittest.IsolatedAsyncioTestCase):
+    teacher = SimpleNamespace(email="ucitel@zs.cz")
+
+    async def _page(self, db, **kwargs):
+        params = dict(limit=2, cursor=None, upcoming=False)
+        params.update(kwargs)
+        return await teacher_routes.list_bookings(teacher=self.teacher, db=db, **params)
+
+    async def test_history_pages_on_the_normalised_email_index(self):
+        rows = [_row("2026-11-02"), _row("2026-10-01", "13:00-14:30")]
+        page = await self._page(_FakeDb(_Result(rows)))
+
+        self.assertEqual([item["date"] for item in page["items"]], ["2026-11-02", "2026-10-01"])
+        last = rows[-1][0]
+        self.assertEqual(
+            decode_cursor(page["next_cursor"], (str, str, parse_uuid)),
+            [last.date, last.time_block, last.id],
+        )
+
+        db = _FakeDb(_Result([_row("2026-09-01")]))
+        page = await self._page(db, cursor=page["next_cursor"])
+        sql = _sql(db.statements[0])
+        self.assertIn("lower(reservations.contact_email) =", sql)
+        self.assertIn("(reservations.date, reservations.time_block, reservations.id) < (", sql)
+        self.assertIn("ORDER BY reservations.date DESC, reservations.time_block DESC, reservations.id DESC", sql)
+        self.assertIsNone(page["next_cursor"])
+
+    async def test_upcoming_starts_today_soonest_first(self):
+        db = _FakeDb(_Result([_row("2026-12-01")]))
+        await self._page(db, upcoming=True)
+
+        sql = _sql(db.statements[0])
+        self.assertIn("reservations.date >=", sql)
+        self.assertIn("ORDER BY reservations.date, reservations.time_block, reservations.id", sql)
+        self.assertIn("LIMIT", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
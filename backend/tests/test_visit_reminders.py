@@ -0,0 +1,85 @@
+import os
+import unittest
+from datetime import date
+
+os.environ.setdefault("JWT_SECRET", "current-secret")
+
+from sqlalchemy import JSON, Column, Integer, MetaData, Table, select
+from sqlalchemy.dialects import postgresql
+
+import scheduler
+from database.models import Institution
+from services.notification_preferences import customer_notification_sql
+from services.working_days import (
+    czech_public_holidays, easter_sunday, remind_visit_dates, subtract_working_days,
+)
+
+
+class WorkingDayCalendarTests(unittest.TestCase):
+    def test_easter_holidays_move_with_easter(self):
+        self.assertEqual(easter_sunday(2026), date(2026, 4, 5))
+        self.assertEqual(easter_sunday(2027), date(2027, 3, 28))
+        holidays = czech_public_holidays(2026)
+        self.assertEqual(holidays[date(2026, 4, 3)], "Velký pátek")
+        self.assertEqual(holidays[date(2026, 4, 6)], "Velikonoční pondělí")
+        self.assertEqual(len(holidays), 13)
+
+    def test_holidays_are_not_working_days(self):
+        holidays = frozenset(czech_public_holidays(2026))
+        # Thu 29 Oct 2026 -> Wed 28 Oct is a holiday -> Tue 27, Mon 26
+        self.assertEqual(subtract_working_days(date(2026, 10, 29), 2), date(2026, 10, 27))
+        self.assertEqual(subtract_working_days(date(2026, 10, 29), 2, holidays), date(2026, 10, 26))
+
+    def test_remind_dates_cover_weekend_and_holiday(self):
+        holidays = frozenset(czech_public_holidays(2026))
+        # Fri 23 Oct: the weekend, Mon 26 and Tue 27 are due; Wed 28 and Thu 29
+        # (holiday in between) are reminded on Mon 26
+        self.assertEqual(
+            remind_visit_dates(date(2026, 10, 23), 2, 10, holidays),
+            [date(2026, 10, 24), date(2026, 10, 25), date(2026, 10, 26), date(2026, 10, 27)],
+        )
+        # Mon 19 Oct: Tue 20 was due on Fri (catch-up), Wed 21 is due today
+        self.assertEqual(remind_visit_dates(date(2026, 10, 19), 2, 10, holidays),
+                         [date(2026, 10, 20), date(2026, 10, 21)])
+
+
+class VisitReminderQueryTests(unittest.TestCase):
+    def test_institution_opt_in_is_a_sql_predicate(self):
+        predicate = customer_notification_sql(Institution.notification_settings, "visit_reminder")
+        compiled = select(Institution.id).where(predicate).compile(dialect=postgresql.dialect())
+        self.assertIn("jsonb_typeof(CAST(((institutions.notification_settings ->", str(compiled))
+        self.assertEqual(
+            (compiled.params["notification_settings_1"], compiled.params["param_1"], compiled.params["param_2"]),
+            ("customer", "visit_reminder", True),
+        )
+        with self.assertRaises(ValueError):
+            customer_notification_sql(Institution.notification_settings, "reservation_confirmed")
+
+    def test_opt_in_predicate_works_on_json_and_jsonb_columns(self):
+        # The model maps notification_settings as JSON; the Supabase schema created it as JSONB.
+        for column_type in (JSON, postgresql.JSONB):
+            with self.subTest(column_type=column_type.__name__):
+                table = Table("institutions", MetaData(), Column("id", Integer),
+                              Column("notification_settings", column_type))
+                sql = str(select(table.c.id).where(
+                    customer_notification_sql(table.c.notification_settings, "visit_reminder")
+                ).compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+                self.assertIn("WHEN (jsonb_typeof(CAST(", sql)
+                self.assertIn("'visit_reminder'", sql)
+                self.assertIn("AS JSONB)) = 'boolean')", sql)
+                self.assertNotIn(" json_typeof(", sql)
+                self.assertIn("->> 'visit_reminder' AS BOOLEAN)", sql)
+
+    def test_template_is_rendered_once_and_filled_per_reservation(self):
+        template = scheduler.render_visit_reminder_template("Muzeum", "Náměstí 1", "Dílna")
+        self.assertIn("[[teacher_name]]", template["html"])
+        filled = scheduler.fill_visit_reminder(template, {
+            "teacher_name": "Jana Učitelová", "reservation_date": "21. 10. 2026", "reservation_time": None,
+        })
+        self.assertIn("Jana Učitelová", filled["html"])
+        self.assertIn("21. 10. 2026", filled["subject"] + filled["html"])
+        self.assertNotIn("[[", filled["html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
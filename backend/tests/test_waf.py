@@ -0,0 +1,101 @@
+import json
+import re
+import unittest
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from middleware import waf
+
+
+_SEQUENTIAL = [(threat, re.compile(pattern, re.IGNORECASE)) for _, threat, pattern in waf._RULES]
+
+
+def _sequential_check(value):
+    for threat, pattern in _SEQUENTIAL:
+        if pattern.search(value):
+            return threat
+    return None
+
+
+async def _echo(request: Request):
+    body = await request.body()
+    return JSONResponse({"len": len(body), "body": body.decode("utf-8", errors="ignore")})
+
+
+def _client():
+    app = Starlette(routes=[Route("/api/{rest:path}", _echo, methods=["GET", "POST", "PUT"])])
+    app.add_middleware(waf.WAFMiddleware)
+    return TestClient(app)
+
+
+class WafMatcherTests(unittest.TestCase):
+    CORPUS = [
+        "Plzeň", "Základní škola Komenského", "2026-11-12", "jana@zs.cz", "O'Brien",
+        "rock'n'roll", "a -- b", "x; y", "0x1234", "evaluation", "onboarding",
+        "1' OR '1'='1", "x UNION ALL SELECT password", "foo; DROP TABLE users ",
+        "'; truncate x", "sleep (5)", "0xDEADBEEFCAFE", "<SCRIPT>alert(1)", "<script src=x>",
+        "JavaScript :alert(1)", "<img onerror =x>", "<iframe>", "<object data=x>",
+        "eval(atob('x'))", "document.cookie", "uniON\tselect",
+        # characters re.IGNORECASE folds onto ASCII letters
+        "<ſcript>", "javascrİpt:x", "javascrıpt:x", "Kxx", "1' KOR '1'='1",
+        "document.Kookie", "ſleep(1)",
+    ]
+
+    def test_combined_matcher_agrees_with_individual_rules(self):
+        for value in self.CORPUS:
+            with self.subTest(value=value):
+                self.assertEqual(waf._check_value(value), _sequential_check(value))
+
+    def test_threat_types(self):
+        self.assertEqual(waf._check_value("x UNION SELECT 1"), "sql_injection")
+        self.assertEqual(waf._check_value("<script>"), "xss")
+        self.assertIsNone(waf._check_value("Výtvarná dílna – grafika"))
+
+
+class WafMiddlewareTests(unittest.TestCase):
+    def setUp(self):
+        self.client = _client()
+
+    def test_clean_json_body_is_replayed_to_the_app(self):
+        payload = {"school_name": "ZŠ Komenského", "note": "ž" * 500}
+        response = self.client.post("/api/bookings/public", json=payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.json()["body"]), payload)
+
+    def test_malicious_body_query_and_path_are_blocked(self):
+        blocked = [
+            self.client.post("/api/bookings/public", json={"note": "<script>alert(1)</script>"}),
+            self.client.get("/api/public/catalog", params={"q": "x' OR '1'='1"}),
+            self.client.get("/api/public/catalog?q=ok&q=1%20UNION%20SELECT%20x"),
+            self.client.get("/api/public/javascript:alert(1)"),
+        ]
+        for response in blocked:
+            self.assertEqual(response.status_code, 403)
+            self.assertEqual(response.json()["detail"], "Požadavek zablokován bezpečnostním filtrem")
+
+    def test_chunked_body_is_inspected(self):
+        def chunks():
+            yield b'{"note": "<scr'
+            yield b'ipt>"}'
+
+        response = self.client.post(
+            "/api/bookings/public", content=chunks(), headers={"content-type": "application/json"},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_large_and_exempt_bodies_pass_through_unchanged(self):
+        big = {"note": "<script>" + "x" * waf.MAX_INSPECTED_BODY}
+        response = self.client.post("/api/bookings/public", json=big)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.json()["body"]), big)
+
+        response = self.client.put("/api/email-templates/x", json={"html": "<script>"})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import uuid
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from services import email_service
+from services import waitlist_service as ws
+from services.email_service import EmailService
+
+PROGRAM = "fcf60c6a-03e6-416a-985f-6d30b6c05197"
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = list(rows)
+
+    def all(self):
+        return self._rows
+
+
+class _FakeDb:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.calls.append((statement, params))
+        return self.results.pop(0) if self.results else _Result([])
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _match(email, idx):
+    return SimpleNamespace(id=uuid.uuid4(), email=email, teacher_name="Učitel", program_id=PROGRAM, idx=idx)
+
+
+class WaitlistMatchingTests(unittest.IsolatedAsyncioTestCase):
+    async def test_all_freed_slots_are_matched_in_one_query(self):
+        slots = [
+            (PROGRAM, "2026-11-05", "09:00-10:30"),
+            (PROGRAM, "neplatné", ""),
+            (PROGRAM, "2026-11-06", ""),
+        ]
+        db = _FakeDb(_Result([_match("a@zs.cz", 1), _match("b@zs.cz", 2)]))
+
+        matches = await ws.find_matches_for_slots(db, slots)
+
+        self.assertEqual(len(db.calls), 1)
+        sql, params = db.calls[0]
+        self.assertIn("w.requested_range @> s.slot_date", str(sql))
+        self.assertEqual(params["dates"], [date(2026, 11, 5), date(2026, 11, 6)])
+        self.assertEqual(params["hours"], [9, None])
+        # Row ordinality points past the skipped, unparsable slot.
+        self.assertEqual([position for _, position in matches], [0, 2])
+
+    async def test_no_query_without_a_parsable_slot(self):
+        db = _FakeDb()
+        self.assertEqual(await ws.find_matches_for_slots(db, [(PROGRAM, "", "")]), [])
+        self.assertEqual(db.calls, [])
+
+    async def test_candidates_get_one_batch_and_one_status_update(self):
+        slots = [(PROGRAM, "2026-11-05", "09:00-10:30"), (PROGRAM, "2026-11-06", "13:00-14:30")]
+        sent, failed = _match("a@zs.cz", 1), _match("b@zs.cz", 2)
+        db = _FakeDb(_Result([sent, failed]), _Result([(uuid.UUID(PROGRAM), "Dílna")]))
+        batch = AsyncMock(return_value=[{"status": "sent"}, {"status": "failed", "error": "boom"}])
+
+        with patch.object(EmailService, "send_batch", batch):
+            self.assertEqual(await ws.on_slots_freed(db, slots), 2)
+
+        messages = batch.await_args.args[0]
+        self.assertEqual([m["to_email"] for m in messages], ["a@zs.cz", "b@zs.cz"])
+        self.assertEqual(messages[0]["subject"], "Uvolnil se termín: Dílna")
+        self.assertIn("13:00", messages[1]["html_content"])
+        # match query, program names, one UPDATE for the delivered candidates
+        self.assertEqual(len(db.calls), 3)
+        update_sql = str(db.calls[2][0])
+        self.assertIn("UPDATE waitlist_entries SET status", update_sql)
+        self.assertEqual(db.commits, 1)
+
+
+class EmailSendBatchTests(unittest.IsolatedAsyncioTestCase):
+    async def test_messages_are_sent_in_chunks_of_the_resend_batch_limit(self):
+        messages = [
+            {"to_email": f"u{i}@zs.cz", "subject": "Předmět", "html_content": "<p>x</p>"} for i in range(150)
+        ]
+        calls = []
+
+        def batch_send(params):
+            calls.append(params)
+            return {"data": [{"id": f"id-{len(calls)}-{i}"} for i in range(len(params))]}
+
+        with patch.object(EmailService, "is_configured", return_value=True), \
+                patch.object(email_service, "_init_resend"), \
+                patch.object(email_service.resend.Batch, "send", side_effect=batch_send):
+            results = await EmailService.send_batch(messages)
+
+        self.assertEqual([len(chunk) for chunk in calls], [100, 50])
+        self.assertEqual(len(results), 150)
+        self.assertEqual({r["status"] for r in results}, {"sent"})
+        self.assertEqual(results[120]["email_id"], "id-2-20")
+
+    async def test_unconfigured_service_skips_every_message(self):
+        with patch.object(EmailService, "is_configured", return_value=False):
+            results = await EmailService.send_batch([{"to_email": "a@zs.cz", "subject": "s", "html_content": ""}])
+        self.assertEqual([r["status"] for r in results], ["skipped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
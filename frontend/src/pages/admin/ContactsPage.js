@@ -101,21 +101,30 @@ const ContactsPage = () => {
   const [deliverabilityFilter, setDeliverabilityFilter] = useState('all');
   const [selectedId, setSelectedId] = useState(null);
   const [showAdd, setShowAdd] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [listTotal, setListTotal] = useState({ total: 0, exact: true });
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const listParams = () => {
+    const params = new URLSearchParams();
+    if (typeFilter !== 'all') params.set('type', typeFilter);
+    if (sourceFilter !== 'all') params.set('source', sourceFilter);
+    if (consentFilter !== 'all') params.set('consent', consentFilter);
+    if (deliverabilityFilter !== 'all') params.set('deliverability', deliverabilityFilter);
+    if (searchQuery.trim()) params.set('search', searchQuery.trim());
+    return params;
+  };
 
   const fetchAll = useCallback(async () => {
     setLoading(true);
     try {
-      const params = new URLSearchParams();
-      if (typeFilter !== 'all') params.set('type', typeFilter);
-      if (sourceFilter !== 'all') params.set('source', sourceFilter);
-      if (consentFilter !== 'all') params.set('consent', consentFilter);
-      if (deliverabilityFilter !== 'all') params.set('deliverability', deliverabilityFilter);
-      if (searchQuery.trim()) params.set('search', searchQuery.trim());
       const [list, st] = await Promise.all([
-        axios.get(`${API}/contacts?${params.toString()}`),
+        axios.get(`${API}/contacts?${listParams().toString()}`),
         axios.get(`${API}/contacts/stats`),
       ]);
-      setContacts(list.data || []);
+      setContacts(list.data?.items || []);
+      setNextCursor(list.data?.next_cursor || null);
+      setListTotal({ total: list.data?.total || 0, exact: list.data?.total_exact !== false });
       setStats(st.data || stats);
     } catch (err) {
       toast.error('Nepodařilo se načíst kontakty');
@@ -126,6 +135,21 @@ const ContactsPage = () => {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [typeFilter, sourceFilter, consentFilter, deliverabilityFilter, searchQuery]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const params = listParams();
+      params.set('cursor', nextCursor);
+      const res = await axios.get(`${API}/contacts?${params.toString()}`);
+      setContacts(prev => [...prev, ...(res.data?.items || [])]);
+      setNextCursor(res.data?.next_cursor || null);
+    } catch (err) {
+      toast.error('Nepodařilo se načíst další kontakty');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     // Debounce search input slightly
     const t = setTimeout(fetchAll, 250);
@@ -138,6 +162,7 @@ const ContactsPage = () => {
       if (typeFilter !== 'all') params.set('type', typeFilter);
       if (sourceFilter !== 'all') params.set('source', sourceFilter);
       if (consentFilter !== 'all') params.set('consent', consentFilter);
+      if (deliverabilityFilter !== 'all') params.set('deliverability', deliverabilityFilter);
       if (searchQuery.trim()) params.set('search', searchQuery.trim());
       const res = await axios.get(`${API}/contacts/export.csv?${params.toString()}`, {
         responseType: 'blob',
@@ -276,7 +301,7 @@ const ContactsPage = () => {
             </div>
           </div>
           <p className="text-xs text-slate-400 mt-2.5" data-testid="contacts-result-count">
-            Zobrazeno {contacts.length} z {stats.total}
+            Zobrazeno {contacts.length} z {listTotal.total}{listTotal.exact ? '' : '+'}
           </p>
         </Card>
 
@@ -337,6 +362,13 @@ const ContactsPage = () => {
               </tbody>
             </table>
           </div>
+          {!loading && nextCursor && (
+            <div className="border-t border-slate-100 px-4 py-3 text-center">
+              <Button variant="ghost" size="sm" onClick={loadMore} disabled={loadingMore} data-testid="contacts-load-more">
+                {loadingMore ? 'Načítám…' : 'Načíst další'}
+              </Button>
+            </div>
+          )}
         </Card>
       </div>
 
@@ -233,6 +233,7 @@ const DeliveryHealthPanel = () => {
   const [loading, setLoading] = useState(false);
   const [expanded, setExpanded] = useState(false);
   const [flagging, setFlagging] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchHealth = async () => {
     setLoading(true);
@@ -243,6 +244,21 @@ const DeliveryHealthPanel = () => {
     finally { setLoading(false); }
   };
 
+  const loadMoreProblematic = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await axios.get(`${API}/mailings/delivery-health`, {
+        params: { cursor: health.next_cursor },
+        withCredentials: true,
+      });
+      setHealth(prev => ({
+        ...res.data,
+        problematic_contacts: [...prev.problematic_contacts, ...res.data.problematic_contacts],
+      }));
+    } catch { toast.error('Nepodařilo se načíst další kontakty'); }
+    finally { setLoadingMore(false); }
+  };
+
   useEffect(() => { fetchHealth(); }, []);
 
   const handleFlagInvalid = async () => {
@@ -301,7 +317,7 @@ const DeliveryHealthPanel = () => {
           {health.problematic_contacts.length > 0 && (
             <div className="border rounded-lg overflow-hidden">
               <div className="bg-white px-4 py-2 border-b font-medium text-sm text-slate-700">
-                Problémové kontakty ({health.problematic_contacts.length})
+                Problémové kontakty ({health.summary.problematic})
               </div>
               <div className="max-h-[250px] overflow-y-auto">
                 {health.problematic_contacts.map((p, i) => (
@@ -326,6 +342,13 @@ const DeliveryHealthPanel = () => {
                     </Badge>
                   </div>
                 ))}
+                {health.next_cursor && (
+                  <div className="px-4 py-2 bg-white text-center">
+                    <Button variant="ghost" size="sm" onClick={loadMoreProblematic} disabled={loadingMore} data-testid="delivery-health-load-more">
+                      {loadingMore ? 'Načítám…' : 'Načíst další'}
+                    </Button>
+                  </div>
+                )}
               </div>
             </div>
           )}
@@ -22,6 +22,8 @@ import { FieldError, FIELD_ERROR_CLASS } from '../../components/ui/field-error';
 import { Badge } from '../../components/ui/badge';
 import { AuthContext } from '../../context/AuthContext';
 
+const SCHOOLS_PAGE_SIZE = 50;
+
 export const SchoolsPage = () => {
   const { t } = useTranslation();
   const navigate = useNavigate();
@@ -47,6 +49,11 @@ export const SchoolsPage = () => {
   const [showArchivedContacts, setShowArchivedContacts] = useState(false);
   const [availableTags, setAvailableTags] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  const [sortOrder, setSortOrder] = useState('name');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalSchools, setTotalSchools] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Import modal state
   const [showImportModal, setShowImportModal] = useState(false);
@@ -231,41 +238,69 @@ export const SchoolsPage = () => {
     }
   };
 
+  const buildSchoolParams = () => {
+    const params = new URLSearchParams();
+    if (sourceFilter && sourceFilter !== 'all') {
+      params.append('source', sourceFilter);
+    }
+    if (tagFilter && tagFilter !== 'all') {
+      params.append('tag', tagFilter);
+    }
+    if (invalidFilter) {
+      params.append('has_invalid', 'true');
+    }
+    params.append('archived', schoolView === 'archived' ? 'true' : 'false');
+    if (showArchivedContacts || schoolView === 'archived') {
+      params.append('include_archived_contacts', 'true');
+    }
+    if (debouncedSearch.trim()) {
+      params.append('search', debouncedSearch.trim());
+    }
+    params.append('sort', sortOrder);
+    params.append('limit', String(SCHOOLS_PAGE_SIZE));
+    return params;
+  };
+
   const fetchData = async () => {
     setLoading(true);
     try {
-      const params = new URLSearchParams();
-      if (sourceFilter && sourceFilter !== 'all') {
-        params.append('source', sourceFilter);
-      }
-      if (tagFilter && tagFilter !== 'all') {
-        params.append('tag', tagFilter);
-      }
-      if (invalidFilter) {
-        params.append('has_invalid', 'true');
-      }
-      params.append('archived', schoolView === 'archived' ? 'true' : 'false');
-      if (showArchivedContacts || schoolView === 'archived') {
-        params.append('include_archived_contacts', 'true');
-      }
-
       const [schoolsRes, proRes, programsRes] = await Promise.all([
-        axios.get(`${API}/schools${params.toString() ? '?' + params.toString() : ''}`),
+        axios.get(`${API}/schools?${buildSchoolParams().toString()}`),
         axios.get(`${API}/settings/pro`),
         axios.get(`${API}/programs`)
       ]);
-      setSchools(Array.isArray(schoolsRes.data) ? schoolsRes.data : []);
+      setSchools(Array.isArray(schoolsRes.data?.items) ? schoolsRes.data.items : []);
+      setNextCursor(schoolsRes.data?.next_cursor || null);
+      setTotalSchools(schoolsRes.data?.total || 0);
       setIsPro(proRes.data.is_pro);
       setPrograms(Array.isArray(programsRes.data) ? programsRes.data : []);
     } catch (error) {
       toast.error(t('common.error'));
       setSchools([]);
+      setNextCursor(null);
+      setTotalSchools(0);
       setPrograms([]);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreSchools = async () => {
+    setLoadingMore(true);
+    try {
+      const params = buildSchoolParams();
+      params.append('cursor', nextCursor);
+      const res = await axios.get(`${API}/schools?${params.toString()}`);
+      setSchools(prev => [...prev, ...(res.data?.items || [])]);
+      setNextCursor(res.data?.next_cursor || null);
+      setTotalSchools(res.data?.total || 0);
+    } catch (error) {
+      toast.error('Nepodařilo se načíst další školy');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const fetchTags = async () => {
     try {
       const response = await axios.get(`${API}/schools/tags`);
@@ -279,7 +314,12 @@ export const SchoolsPage = () => {
     if (!loading) {
       fetchData();
     }
-  }, [sourceFilter, tagFilter, invalidFilter, schoolView, showArchivedContacts]);
+  }, [sourceFilter, tagFilter, invalidFilter, schoolView, showArchivedContacts, debouncedSearch, sortOrder]);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchQuery), 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
 
   useEffect(() => {
     setSelectedSchools([]);
@@ -363,32 +403,44 @@ export const SchoolsPage = () => {
       const formData = new FormData();
       formData.append('file', importFile);
 
-      setImportProgress(30);
-
       const response = await axios.post(
         `${API}/schools/import?update_existing=${updateExisting}`,
         formData,
         {
           headers: { 'Content-Type': 'multipart/form-data' },
           onUploadProgress: (progressEvent) => {
-            const progress = Math.round((progressEvent.loaded * 50) / progressEvent.total) + 30;
-            setImportProgress(Math.min(progress, 80));
+            const progress = Math.round((progressEvent.loaded * 20) / progressEvent.total) + 10;
+            setImportProgress(Math.min(progress, 30));
           }
         }
       );
 
+      // The import runs as a background job; poll its progress
+      const jobId = response.data.job_id;
+      let job = response.data;
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const statusRes = await axios.get(`${API}/schools/import/${jobId}`);
+        job = statusRes.data;
+        setImportProgress(30 + Math.round((job.progress || 0) * 0.7));
+      }
+      if (job.status !== 'done' || !job.result) {
+        throw new Error(job.failure_reason || 'Import se nezdařil');
+      }
+      const result = { ...job.result, job_id: jobId };
+
       setImportProgress(100);
-      setImportResult(response.data);
+      setImportResult(result);
 
-      if (response.data.new_schools > 0 || response.data.new_contacts > 0) {
-        toast.success(`Úspěšně: ${response.data.new_schools} nových škol, ${response.data.new_contacts} nových kontaktů`);
+      if (result.new_schools > 0 || result.new_contacts > 0) {
+        toast.success(`Úspěšně: ${result.new_schools} nových škol, ${result.new_contacts} nových kontaktů`);
         fetchData();
-      } else if (response.data.duplicates > 0) {
-        toast.info(`Všechny kontakty již existují (${response.data.duplicates} duplicit)`);
+      } else if (result.duplicates > 0) {
+        toast.info(`Všechny kontakty již existují (${result.duplicates} duplicit)`);
       }
 
     } catch (error) {
-      toast.error(error.response?.data?.detail || 'Chyba při importu');
+      toast.error(error.response?.data?.detail || error.message || 'Chyba při importu');
       setImportResult({
         success: false,
         total_rows: 0,
@@ -398,16 +450,31 @@ export const SchoolsPage = () => {
         skipped: 0,
         errors: 1,
         duplicates: 0,
-        error_details: [{ row: 0, error: error.response?.data?.detail || 'Neznámá chyba' }]
+        error_details: [{ row: 0, error: error.response?.data?.detail || error.message || 'Neznámá chyba' }]
       });
     } finally {
       setImporting(false);
     }
   };
 
-  const handleDownloadErrors = () => {
+  const handleDownloadErrors = async () => {
     if (!importResult?.error_details?.length) return;
 
+    // Full report from the server (the result only carries the first 100 errors)
+    if (importResult.job_id) {
+      try {
+        const res = await axios.get(`${API}/schools/import/${importResult.job_id}/errors`, { responseType: 'blob' });
+        const url = window.URL.createObjectURL(res.data);
+        const link = document.createElement('a');
+        link.href = url;
+        link.setAttribute('download', 'import_chyby.csv');
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+        return;
+      } catch { /* fall back to the errors we already have */ }
+    }
+
     const errors = importResult.error_details;
     const csv = "Řádek;Chyba\n" + errors.map(e => `${e.row};${e.error}`).join('\n');
     const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
@@ -575,17 +642,8 @@ export const SchoolsPage = () => {
     }
   };
 
-  // Filter schools by search query
-  const filteredSchools = schools.filter(school => {
-    if (!searchQuery) return true;
-    const query = searchQuery.toLowerCase();
-    return (
-      school.name?.toLowerCase().includes(query) ||
-      school.email?.toLowerCase().includes(query) ||
-      school.city?.toLowerCase().includes(query) ||
-      school.contacts?.some(c => c.email?.toLowerCase().includes(query) || c.name?.toLowerCase().includes(query))
-    );
-  });
+  // Search, filters and sorting are applied server-side; this is the loaded pages.
+  const filteredSchools = schools;
 
   const toggleSchoolSelection = (schoolId) => {
     setSelectedSchools(prev =>
@@ -875,6 +933,19 @@ export const SchoolsPage = () => {
               />
             </div>
 
+            {/* Sort */}
+            <Select value={sortOrder} onValueChange={setSortOrder}>
+              <SelectTrigger className="w-full sm:w-[170px]" data-testid="school-sort">
+                <SelectValue placeholder="Řazení" />
+              </SelectTrigger>
+              <SelectContent>
+                <SelectItem value="name">Podle názvu</SelectItem>
+                <SelectItem value="city">Podle města</SelectItem>
+                <SelectItem value="newest">Nejnovější</SelectItem>
+                <SelectItem value="bookings">Nejvíce rezervací</SelectItem>
+              </SelectContent>
+            </Select>
+
             {/* Source Filter */}
             <Select value={sourceFilter} onValueChange={setSourceFilter}>
               <SelectTrigger className="w-full sm:w-[180px]" data-testid="source-filter">
@@ -955,8 +1026,8 @@ export const SchoolsPage = () => {
 
           {/* Results count */}
           <div className="mt-3 text-sm text-gray-500">
-            Nalezeno: {filteredSchools.length} škol
-            {(sourceFilter !== 'all' || tagFilter !== 'all' || invalidFilter || showArchivedContacts) && (
+            Nalezeno: {totalSchools} škol
+            {(sourceFilter !== 'all' || tagFilter !== 'all' || searchQuery || invalidFilter || showArchivedContacts) && (
               <span className="ml-2 text-xs bg-blue-100 text-blue-700 px-2 py-0.5 rounded">
                 Filtrováno
               </span>
@@ -1241,6 +1312,14 @@ export const SchoolsPage = () => {
             ))}
           </div>
         )}
+
+        {!loading && nextCursor && (
+          <div className="flex justify-center">
+            <Button variant="outline" onClick={loadMoreSchools} disabled={loadingMore} data-testid="schools-load-more">
+              {loadingMore ? 'Načítám…' : `Načíst další (${filteredSchools.length} z ${totalSchools})`}
+            </Button>
+          </div>
+        )}
       </div>
 
       {/* Propagation Modal */}
@@ -52,6 +52,10 @@ const SummaryRow = ({ icon: Icon, label, value, mono = false, testid }) => {
   );
 };
 
+const MAX_POLLS = 15;
+const LONG_POLL_SECONDS = 10;
+const MAX_LONG_POLLS = 3;
+
 export default function PaymentReturnPage() {
   const [params] = useSearchParams();
   const navigate = useNavigate();
@@ -71,20 +75,22 @@ export default function PaymentReturnPage() {
     }
     let cancelled = false;
     let tries = 0;
+    // by-ref long-polls: the server answers as soon as the webhook lands
+    const maxTries = refId ? MAX_LONG_POLLS : MAX_POLLS;
     const poll = async () => {
       tries += 1;
       setAttempts(tries);
       try {
         const url = refId
-          ? `${API}/event-payments/by-ref/${refId}`
+          ? `${API}/event-payments/by-ref/${refId}?wait=${LONG_POLL_SECONDS}`
           : `${API}/event-payments/by-vs/${institutionId}/${vs}`;
         const res = await axios.get(url);
         if (cancelled) return;
         setDetail(res.data);
         if (res.data.payment_status === 'paid') setStatus('paid');
         else if (res.data.payment_status === 'failed') setStatus('failed');
-        else if (tries >= 15) setStatus(hint === 'cancelled' ? 'failed' : 'unknown');
-        else setTimeout(poll, 2000);
+        else if (tries >= maxTries) setStatus(hint === 'cancelled' ? 'failed' : 'unknown');
+        else setTimeout(poll, refId ? 0 : 2000);
       } catch {
         if (tries >= 8) setStatus('unknown');
         else setTimeout(poll, 2000);
@@ -121,7 +127,7 @@ export default function PaymentReturnPage() {
             <Loader2 className="w-14 h-14 text-slate-400 animate-spin mx-auto mb-4" />
             <h1 className="text-2xl font-bold text-slate-900 mb-1">Ověřujeme platbu…</h1>
             <p className="text-gray-600 mb-1">Čekáme na potvrzení od banky.</p>
-            <p className="text-xs text-gray-400">Pokus {attempts} z 15</p>
+            <p className="text-xs text-gray-400">Pokus {attempts} z {refId ? MAX_LONG_POLLS : MAX_POLLS}</p>
           </div>
         )}
 
@@ -36,6 +36,8 @@ export const TeacherAccountPage = () => {
   const [tab, setTab] = useState('favorites');
   const [favorites, setFavorites] = useState([]);
   const [bookings, setBookings] = useState([]);
+  const [bookingsCursor, setBookingsCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loadingData, setLoadingData] = useState(false);
 
   useEffect(() => {
@@ -53,7 +55,8 @@ export const TeacherAccountPage = () => {
         axios.get(`${API_URL}/api/teacher/bookings`,  authConfig()),
       ]);
       setFavorites(favRes.data || []);
-      setBookings(bRes.data || []);
+      setBookings(bRes.data?.items || []);
+      setBookingsCursor(bRes.data?.next_cursor || null);
     } catch (_e) {
       toast.error('Nepodařilo se načíst data.');
     } finally {
@@ -61,6 +64,22 @@ export const TeacherAccountPage = () => {
     }
   };
 
+  const loadMoreBookings = async () => {
+    setLoadingMore(true);
+    try {
+      const res = await axios.get(`${API_URL}/api/teacher/bookings`, {
+        ...authConfig(),
+        params: { cursor: bookingsCursor },
+      });
+      setBookings(prev => [...prev, ...(res.data?.items || [])]);
+      setBookingsCursor(res.data?.next_cursor || null);
+    } catch (_e) {
+      toast.error('Nepodařilo se načíst další rezervace.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => { if (isAuthenticated) loadData();
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [isAuthenticated]);
@@ -128,7 +147,13 @@ export const TeacherAccountPage = () => {
           />
         )}
         {tab === 'history' && (
-          <HistoryTab loading={loadingData} bookings={bookings} />
+          <HistoryTab
+            loading={loadingData}
+            bookings={bookings}
+            hasMore={Boolean(bookingsCursor)}
+            loadingMore={loadingMore}
+            onLoadMore={loadMoreBookings}
+          />
         )}
         {tab === 'profile' && (
           <ProfileTab teacher={teacher} onUpdate={updateProfile} />
@@ -193,7 +218,7 @@ const FavoritesTab = ({ loading, favorites, onRemove }) => {
 };
 
 // ─── History tab ──────────────────────────────────────────────────────────────
-const HistoryTab = ({ loading, bookings }) => {
+const HistoryTab = ({ loading, bookings, hasMore, loadingMore, onLoadMore }) => {
   if (loading) return <div className="py-10 text-center"><Loader2 className="w-6 h-6 mx-auto animate-spin text-[#4A6FA5]" /></div>;
   if (bookings.length === 0) {
     return (
@@ -229,6 +254,13 @@ const HistoryTab = ({ loading, bookings }) => {
           </Card>
         );
       })}
+      {hasMore && (
+        <div className="text-center pt-1">
+          <Button variant="ghost" size="sm" onClick={onLoadMore} disabled={loadingMore} data-testid="teacher-history-load-more">
+            {loadingMore ? 'Načítám…' : 'Načíst další'}
+          </Button>
+        </div>
+      )}
     </div>
   );
 };